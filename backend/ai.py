@@ -2,16 +2,22 @@
 import os
 import re
 import asyncio
-import time
 import json
 from datetime import datetime
 from openai import AsyncAzureOpenAI
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import requests
 import traceback
 from dotenv import load_dotenv
 
+from ai_input import count_tokens, shape_for_prompt
+from ai_result_cache import AI_CACHE_ENABLED, ai_result_cache, cache_key as ai_cache_key, template_version
+from ai_scheduler import AIUnavailableError, ai_scheduler
+from legiscan_cache import legiscan_cache, request_params
+from state_orchestrator import run_states
+from utils.rate_limiter import legiscan_token_bucket
+
 # Load environment variables first
 load_dotenv(override=True)
 
@@ -244,6 +250,38 @@ SYSTEM_MESSAGES = {
     PromptType.STATE_BILL_SUMMARY: "You are a legislative analyst who writes comprehensive yet accessible summaries. You write exactly 5-7 complete sentences that form a cohesive paragraph. You use plain, everyday language that anyone can understand while avoiding technical jargon and legal terminology. You NEVER use headers, sections, bullet points, or special formatting.",
 }
 
+# Single-call analysis: all three sections from one JSON-structured completion.
+# "separate" keeps the original three parallel completions per document.
+ANALYSIS_MODE = os.getenv("AI_ANALYSIS_MODE", "combined").lower()
+
+COMBINED_SECTIONS = {
+    "executive_summary": PromptType.EXECUTIVE_SUMMARY,
+    "talking_points": PromptType.KEY_TALKING_POINTS,
+    "business_impact": PromptType.BUSINESS_IMPACT,
+}
+
+def _section_instructions(prompt_type: PromptType) -> str:
+    """A section prompt without its trailing content placeholder"""
+    return re.sub(r'\n[^\n]*\{text\}\s*$', '', PROMPTS[prompt_type].strip()).strip()
+
+COMBINED_ANALYSIS_PROMPT = (
+    "Produce three separate analyses of the document below and return them as a JSON object with exactly these keys:\n"
+    '- "executive_summary": a string (plain paragraph, no headers or bullets)\n'
+    '- "talking_points": an array of exactly 5 strings, one talking point each, without numbering\n'
+    '- "business_impact": a string using the **bold headers** and • bullets described below\n\n'
+    + "\n\n".join(
+        f"=== {key} ===\n{_section_instructions(prompt_type)}"
+        for key, prompt_type in COMBINED_SECTIONS.items()
+    )
+    + "\n\nContent: {text}"
+)
+
+COMBINED_SYSTEM_MESSAGE = (
+    "You are a senior policy analyst, strategic communications expert and regulatory business strategist in one. "
+    "Each section must read as if written by the corresponding specialist. "
+    "Respond with a single valid JSON object and nothing else."
+)
+
 # Enums and classes
 class LegiScanAPIError(Exception):
     """Custom exception for LegiScan API errors"""
@@ -477,8 +515,15 @@ class LegiScanClient:
     def _api_request(self, url: str) -> Dict[str, Any]:
         """Make API request with error handling"""
         try:
+            params = request_params(url)
+            cached = legiscan_cache.get(params)
+            if cached is not None:
+                return cached
+            
             print("🔍 Making LegiScan API request...")
             
+            # Shared LegiScan budget, so concurrent states don't exceed it
+            legiscan_token_bucket.acquire_blocking()
             response = self.session.get(url)
             response.raise_for_status()
             
@@ -488,7 +533,7 @@ class LegiScanClient:
                 error_msg = data.get('alert', {}).get('message', 'Unknown API error')
                 raise LegiScanAPIError(f"LegiScan API Error: {error_msg}")
             
-            time.sleep(self.rate_limit_delay)
+            legiscan_cache.set(params, data)
             return data
             
         except Exception as e:
@@ -628,82 +673,109 @@ def categorize_bill(title: str, description: str) -> BillCategory:
     else:
         return BillCategory.NOT_APPLICABLE
 
+def prepare_section_input(text: str, prompt_type: PromptType, context: str = "") -> str:
+    """Document text as sent for one section: shaped to its token budget, context prefixed"""
+    shaped = shape_for_prompt(text, prompt_type.value)
+    if shaped != text:
+        print(f"✂️ Shaped input from {count_tokens(text)} to {count_tokens(shaped)} tokens for {prompt_type.value}")
+    return f"Context: {context}\n\n{shaped}" if context else shaped
+
+def section_cache_key(prepared_text: str, prompt_type: PromptType, temperature: float = 0.1) -> Optional[str]:
+    if not AI_CACHE_ENABLED or prompt_type not in PROMPTS:
+        return None
+    return ai_cache_key(
+        MODEL_NAME, prompt_type.value,
+        template_version(PROMPTS[prompt_type], SYSTEM_MESSAGES.get(prompt_type, "")),
+        prepared_text,
+        section_request(prepared_text, prompt_type, temperature)
+    )
+
+def section_request(prepared_text: str, prompt_type: PromptType, temperature: float = 0.1) -> Dict[str, Any]:
+    """chat.completions.create kwargs for one section (shared by the blocking and streaming paths)"""
+    try:
+        prompt = PROMPTS[prompt_type].format(text=prepared_text)
+    except KeyError as ke:
+        print(f"❌ KeyError accessing PROMPTS for {prompt_type}: {ke}")
+        raise Exception(f"Prompt type {prompt_type} not found in PROMPTS dictionary")
+    except Exception as format_error:
+        print(f"❌ Error formatting prompt for {prompt_type}: {format_error}")
+        raise Exception(f"Error formatting prompt: {format_error}")
+
+    # Enhanced parameters for sophisticated analysis with higher token limits
+    max_tokens = 1000
+    if prompt_type == PromptType.EXECUTIVE_SUMMARY:
+        max_tokens = 600  # Increased for comprehensive executive analysis
+        temperature = 0.2  # Slightly higher for more sophisticated language
+        timeout = 90  # Longer timeout for complex analysis
+    elif prompt_type == PromptType.STATE_BILL_SUMMARY:
+        max_tokens = 200  # Increased for 5-7 sentence comprehensive summaries
+        temperature = 0.1
+        timeout = 60
+    elif prompt_type == PromptType.KEY_TALKING_POINTS:
+        max_tokens = 800  # Significantly increased for detailed talking points
+        temperature = 0.3  # Higher for more nuanced communications
+        timeout = 120  # Extended timeout for talking points
+    elif prompt_type == PromptType.BUSINESS_IMPACT:
+        max_tokens = 1000  # Doubled for comprehensive business analysis
+        temperature = 0.25  # Balanced for analytical depth
+        timeout = 120  # Extended timeout for business impact
+    else:
+        timeout = 60
+
+    return {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": SYSTEM_MESSAGES[prompt_type]},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "timeout": timeout,
+        "top_p": 0.95,
+        "frequency_penalty": 0.3,
+        "presence_penalty": 0.2,
+        "stop": ["6.", "7.", "8.", "9."] if prompt_type == PromptType.KEY_TALKING_POINTS else None,
+    }
+
+def format_section(raw_response: str, prompt_type: PromptType) -> str:
+    """Apply the per-type formatting to a model reply"""
+    if prompt_type in [PromptType.EXECUTIVE_SUMMARY, PromptType.STATE_BILL_SUMMARY]:
+        # Keep as paragraph, clean up any unwanted formatting
+        return clean_summary_format(raw_response)
+    elif prompt_type == PromptType.KEY_TALKING_POINTS:
+        # Ensure proper numbered list format
+        return format_talking_points(raw_response)
+    elif prompt_type == PromptType.BUSINESS_IMPACT:
+        # Ensure proper business impact structure
+        return format_business_impact(raw_response)
+    return format_text_as_html(raw_response, prompt_type)
+
 # Core AI processing functions - ENHANCED with distinct content generation and retry logic
-async def process_with_ai(text: str, prompt_type: PromptType, temperature: float = 0.1, context: str = "", max_retries: int = 3) -> str:
+async def process_with_ai(text: str, prompt_type: PromptType, temperature: float = 0.1, context: str = "", max_retries: int = 3, use_cache: bool = True) -> str:
     """Enhanced AI processing with distinct prompts, formatting, and retry logic"""
 
+    text = prepare_section_input(text, prompt_type, context)
+
+    # Identical input under the same model and prompt version costs no tokens
+    cache_key = section_cache_key(text, prompt_type, temperature) if use_cache else None
+    if cache_key:
+        cached = ai_result_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ AI cache hit for {prompt_type.value} (with context: {context})")
+            return cached
+
     # Retry loop with exponential backoff
     for attempt in range(max_retries):
         try:
-            max_input_length = 4000
-            if len(text) > max_input_length:
-                text = text[:max_input_length] + "..."
-                print(f"Truncated input text to {max_input_length} characters.")
-
-            if context:
-                text = f"Context: {context}\n\n{text}"
-
-            try:
-                print(f"🔍 Attempting to access PROMPTS for {prompt_type}")
-                print(f"🔍 prompt_type type: {type(prompt_type)}")
-                print(f"🔍 Available PROMPTS keys: {list(PROMPTS.keys())}")
-                print(f"🔍 Available PROMPTS key types: {[type(k) for k in PROMPTS.keys()]}")
-                prompt = PROMPTS[prompt_type].format(text=text)
-            except KeyError as ke:
-                print(f"❌ KeyError accessing PROMPTS for {prompt_type}: {ke}")
-                raise Exception(f"Prompt type {prompt_type} not found in PROMPTS dictionary")
-            except Exception as format_error:
-                print(f"❌ Error formatting prompt for {prompt_type}: {format_error}")
-                raise Exception(f"Error formatting prompt: {format_error}")
-
-            messages = [
-                {
-                    "role": "system",
-                    "content": SYSTEM_MESSAGES[prompt_type]
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+            request = section_request(text, prompt_type, temperature)
 
             print(f"🤖 Calling AI for: {prompt_type.value} (with context: {context}) [Attempt {attempt + 1}/{max_retries}]")
             print(f"🔧 Azure endpoint: {AZURE_ENDPOINT}")
             print(f"🔧 Model name: {MODEL_NAME}")
 
-            # Enhanced parameters for sophisticated analysis with higher token limits
-            if prompt_type == PromptType.EXECUTIVE_SUMMARY:
-                max_tokens = 600  # Increased for comprehensive executive analysis
-                temperature = 0.2  # Slightly higher for more sophisticated language
-                timeout = 90  # Longer timeout for complex analysis
-            elif prompt_type == PromptType.STATE_BILL_SUMMARY:
-                max_tokens = 200  # Increased for 5-7 sentence comprehensive summaries
-                temperature = 0.1
-                timeout = 60
-            elif prompt_type == PromptType.KEY_TALKING_POINTS:
-                max_tokens = 800  # Significantly increased for detailed talking points
-                temperature = 0.3  # Higher for more nuanced communications
-                timeout = 120  # Extended timeout for talking points
-            elif prompt_type == PromptType.BUSINESS_IMPACT:
-                max_tokens = 1000  # Doubled for comprehensive business analysis
-                temperature = 0.25  # Balanced for analytical depth
-                timeout = 120  # Extended timeout for business impact
-            else:
-                timeout = 60
-
             try:
-                print(f"🔧 Making Azure API call with max_tokens={max_tokens}, temperature={temperature}, timeout={timeout}s")
-                response = await client.chat.completions.create(
-                    model=MODEL_NAME,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    timeout=timeout,
-                    top_p=0.95,
-                    frequency_penalty=0.3,
-                    presence_penalty=0.2,
-                    stop=["6.", "7.", "8.", "9."] if prompt_type == PromptType.KEY_TALKING_POINTS else None
-                )
+                print(f"🔧 Making Azure API call with max_tokens={request['max_tokens']}, temperature={request['temperature']}, timeout={request['timeout']}s")
+                response = await ai_scheduler.chat_completion(client, **request)
                 print(f"✅ Azure API call successful for {prompt_type.value}")
             except Exception as api_error:
                 print(f"❌ Azure API call failed for {prompt_type.value} (attempt {attempt + 1}/{max_retries}): {type(api_error).__name__}: {api_error}")
@@ -732,20 +804,20 @@ async def process_with_ai(text: str, prompt_type: PromptType, temperature: float
                 print(f"🔍 DEBUG: STATE_BILL_SUMMARY raw response: {raw_response[:500]}")
 
             # Enhanced formatting for each type
-            if prompt_type in [PromptType.EXECUTIVE_SUMMARY, PromptType.STATE_BILL_SUMMARY]:
-                # Keep as paragraph, clean up any unwanted formatting
-                formatted_response = clean_summary_format(raw_response)
-            elif prompt_type == PromptType.KEY_TALKING_POINTS:
-                # Ensure proper numbered list format
-                formatted_response = format_talking_points(raw_response)
-            elif prompt_type == PromptType.BUSINESS_IMPACT:
-                # Ensure proper business impact structure
-                formatted_response = format_business_impact(raw_response)
-            else:
-                formatted_response = format_text_as_html(raw_response, prompt_type)
+            formatted_response = format_section(raw_response, prompt_type)
+
+            if cache_key and raw_response:
+                usage = getattr(response, "usage", None)
+                ai_result_cache.set(
+                    cache_key, formatted_response, prompt_type.value, MODEL_NAME,
+                    tokens=getattr(usage, "total_tokens", 0) if usage else 0
+                )
 
             return formatted_response
 
+        except AIUnavailableError:
+            # Circuit open: fail fast so the caller can requeue instead of storing error text
+            raise
         except Exception as e:
             # If this was the last attempt, handle the error
             if attempt == max_retries - 1:
@@ -794,7 +866,203 @@ async def get_state_bill_summary(text: str, context: str = "") -> str:
     return await process_with_ai(text, PromptType.STATE_BILL_SUMMARY, context=context)
 
 
+def parse_combined_response(raw_response: str) -> Optional[Dict[str, str]]:
+    """Formatted sections from a combined JSON response, or None if it's unusable"""
+    try:
+        data = json.loads(raw_response)
+    except (TypeError, ValueError):
+        match = re.search(r'\{.*\}', raw_response or '', re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+
+    if not isinstance(data, dict) or not all(data.get(key) for key in COMBINED_SECTIONS):
+        return None
+
+    talking_points = data["talking_points"]
+    if isinstance(talking_points, list):
+        talking_points = "\n".join(f"{i}. {point}" for i, point in enumerate(talking_points, 1))
+
+    return {
+        "executive_summary": clean_summary_format(str(data["executive_summary"])),
+        "talking_points": format_talking_points(str(talking_points)),
+        "business_impact": format_business_impact(str(data["business_impact"])),
+    }
+
+def combined_analysis_request(text: str, context: str = "") -> Tuple[str, Dict[str, Any]]:
+    """
+    (prepared input, chat.completions.create kwargs) for a combined analysis.
+
+    Shared by the live call and the Batch API builder so both send the same
+    request and hit the same cache entries.
+    """
+    text = shape_for_prompt(text, "combined_analysis")
+    if context:
+        text = f"Context: {context}\n\n{text}"
+
+    return text, {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": COMBINED_SYSTEM_MESSAGE},
+            {"role": "user", "content": COMBINED_ANALYSIS_PROMPT.replace("{text}", text)}
+        ],
+        "temperature": 0.25,
+        "max_tokens": 2400,  # Sum of the three single-section budgets
+        "top_p": 0.95,
+        "frequency_penalty": 0.3,
+        "presence_penalty": 0.2,
+        "response_format": {"type": "json_object"},
+    }
+
+def combined_analysis_cache_key(prepared_text: str, request: Dict[str, Any]) -> str:
+    return ai_cache_key(
+        MODEL_NAME, "combined_analysis",
+        template_version(COMBINED_ANALYSIS_PROMPT, COMBINED_SYSTEM_MESSAGE),
+        prepared_text,
+        request
+    )
+
+async def process_combined_analysis(text: str, context: str = "", max_retries: int = 3, use_cache: bool = True) -> Optional[Dict[str, str]]:
+    """
+    Executive summary, talking points and business impact from one completion.
+
+    Returns None when the model's reply can't be split into the three
+    sections, so the caller can fall back to separate calls. API failures
+    after retries come back as per-section "Error generating ..." strings,
+    same as process_with_ai; AIUnavailableError (circuit open) is raised.
+    """
+    text, request = combined_analysis_request(text, context)
+
+    cache_key = None
+    if use_cache and AI_CACHE_ENABLED:
+        cache_key = combined_analysis_cache_key(text, request)
+        cached = ai_result_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ AI cache hit for combined analysis (with context: {context})")
+            return json.loads(cached)
+
+    for attempt in range(max_retries):
+        try:
+            print(f"🤖 Calling AI for: combined analysis (with context: {context}) [Attempt {attempt + 1}/{max_retries}]")
+            response = await ai_scheduler.chat_completion(client, timeout=150, **request)
+        except AIUnavailableError:
+            raise
+        except Exception as api_error:
+            print(f"❌ Azure API call failed for combined analysis (attempt {attempt + 1}/{max_retries}): {type(api_error).__name__}: {api_error}")
+            is_retryable = any(marker in str(api_error).lower() for marker in ("timeout", "rate", "503", "502", "connection"))
+            if is_retryable and attempt < max_retries - 1:
+                wait_time = (2 ** attempt) * 2
+                print(f"⏳ Retrying in {wait_time}s...")
+                await asyncio.sleep(wait_time)
+                continue
+            return {
+                key: f"Error generating {prompt_type.value.replace('_', ' ')}: {type(api_error).__name__}: {api_error}"
+                for key, prompt_type in COMBINED_SECTIONS.items()
+            }
+
+        sections = parse_combined_response(response.choices[0].message.content)
+        if sections is None:
+            print(f"⚠️ Combined analysis response was not valid section JSON (with context: {context})")
+            return None
+
+        if cache_key:
+            usage = getattr(response, "usage", None)
+            ai_result_cache.set(
+                cache_key, json.dumps(sections), "combined_analysis", MODEL_NAME,
+                tokens=getattr(usage, "total_tokens", 0) if usage else 0
+            )
+        print(f"✅ Combined analysis generated (with context: {context})")
+        return sections
+
+async def analyze_sections(content: str, context: str, section_contexts: Dict[str, str], mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Summary, talking points and business impact for one document.
+
+    mode "combined" (default, AI_ANALYSIS_MODE) makes one JSON-structured
+    call and falls back to separate calls if its reply can't be parsed;
+    "separate" issues the three completions in parallel. Raises
+    AIUnavailableError while the Azure OpenAI circuit is open.
+    """
+    if (mode or ANALYSIS_MODE) == "combined":
+        sections = await process_combined_analysis(content, context)
+        if sections is not None:
+            return {**sections, "ai_version": "azure_openai_combined_v1"}
+        print(f"🔁 Falling back to separate section calls for {context}")
+
+    summary_result, talking_points_result, business_impact_result = await asyncio.gather(
+        get_executive_summary(content, section_contexts["executive_summary"]),
+        get_key_talking_points(content, section_contexts["talking_points"]),
+        get_business_impact(content, section_contexts["business_impact"]),
+        return_exceptions=True
+    )
+    for result in (summary_result, talking_points_result, business_impact_result):
+        if isinstance(result, AIUnavailableError):
+            raise result
+    return {
+        "executive_summary": summary_result,
+        "talking_points": talking_points_result,
+        "business_impact": business_impact_result,
+        "ai_version": "azure_openai_enhanced_v1"
+    }
+
+
 # Main analysis functions - ENHANCED
+def legiscan_bill_content(bill_data: Dict) -> Tuple[str, str]:
+    """(content, base context) sent to the AI for a LegiScan getBill record"""
+    title = bill_data.get('title', '')
+    description = bill_data.get('description', '')
+    bill_number = bill_data.get('bill_number', '')
+    state = bill_data.get('state', '')
+    session = bill_data.get('session', {})
+    session_name = session.get('session_name', '') if isinstance(session, dict) else ''
+    sponsors = bill_data.get('sponsors', [])
+    
+    # Build enhanced context for each analysis type
+    base_context = f"{state} {bill_number}" if state and bill_number else "State Legislation"
+    
+    # Build comprehensive content for analysis
+    content_parts = []
+    if title:
+        content_parts.append(f"Title: {title}")
+    if state:
+        content_parts.append(f"State: {state}")
+    if bill_number:
+        content_parts.append(f"Bill Number: {bill_number}")
+    if description:
+        content_parts.append(f"Description: {description}")
+    if session_name:
+        content_parts.append(f"Legislative Session: {session_name}")
+    if sponsors and len(sponsors) > 0:
+        sponsor_names = []
+        for sponsor in sponsors[:3]:
+            if isinstance(sponsor, dict):
+                name = sponsor.get('name', '')
+                if name:
+                    sponsor_names.append(name)
+        if sponsor_names:
+            content_parts.append(f"Primary Sponsors: {', '.join(sponsor_names)}")
+    
+    return "\n\n".join(content_parts), base_context
+
+def legiscan_analysis_fields(summary: str, talking_points: str, business_impact: str, category: str,
+                             ai_version: str = 'azure_openai_enhanced_v1') -> Dict[str, str]:
+    """Analysis columns for a LegiScan bill, under both old and new field names for compatibility"""
+    return {
+        'summary': summary,  # New simple overview for summary column
+        'ai_summary': summary,
+        'ai_executive_summary': summary,
+        'ai_talking_points': talking_points,
+        'ai_key_points': talking_points,
+        'ai_business_impact': business_impact,
+        'ai_potential_impact': business_impact,
+        'category': category,
+        'ai_version': ai_version,
+        'analysis_timestamp': datetime.now().isoformat()
+    }
+
 async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True) -> Dict[str, str]:
     """Comprehensive AI analysis of a LegiScan bill with distinct content for each section"""
     try:
@@ -802,37 +1070,7 @@ async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True)
         title = bill_data.get('title', '')
         description = bill_data.get('description', '')
         bill_number = bill_data.get('bill_number', '')
-        state = bill_data.get('state', '')
-        session = bill_data.get('session', {})
-        session_name = session.get('session_name', '') if isinstance(session, dict) else ''
-        sponsors = bill_data.get('sponsors', [])
-        
-        # Build enhanced context for each analysis type
-        base_context = f"{state} {bill_number}" if state and bill_number else "State Legislation"
-        
-        # Build comprehensive content for analysis
-        content_parts = []
-        if title:
-            content_parts.append(f"Title: {title}")
-        if state:
-            content_parts.append(f"State: {state}")
-        if bill_number:
-            content_parts.append(f"Bill Number: {bill_number}")
-        if description:
-            content_parts.append(f"Description: {description}")
-        if session_name:
-            content_parts.append(f"Legislative Session: {session_name}")
-        if sponsors and len(sponsors) > 0:
-            sponsor_names = []
-            for sponsor in sponsors[:3]:
-                if isinstance(sponsor, dict):
-                    name = sponsor.get('name', '')
-                    if name:
-                        sponsor_names.append(name)
-            if sponsor_names:
-                content_parts.append(f"Primary Sponsors: {', '.join(sponsor_names)}")
-        
-        content = "\n\n".join(content_parts)
+        content, base_context = legiscan_bill_content(bill_data)
         
         print(f"🔍 Analyzing LegiScan bill: {bill_number} - {title[:50]}...")
         print(f"🔍 DEBUG: Using improved prompts from ai.py")
@@ -855,6 +1093,10 @@ async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True)
                 return_exceptions=True
             )
 
+            for result in (summary_result, talking_points_result, business_impact_result):
+                if isinstance(result, AIUnavailableError):
+                    raise result
+
             # Handle potential exceptions
             if isinstance(summary_result, Exception):
                 summary_result = f"Error generating summary: {str(summary_result)}"
@@ -863,6 +1105,8 @@ async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True)
             if isinstance(business_impact_result, Exception):
                 business_impact_result = f"Error generating business impact: {str(business_impact_result)}"
 
+        except AIUnavailableError:
+            raise
         except Exception as e:
             print(f"❌ Error in AI analysis tasks: {e}")
             summary_result = f"Error generating summary: {str(e)}"
@@ -870,19 +1114,10 @@ async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True)
             business_impact_result = f"Error generating business impact: {str(e)}"
 
         # Return results with both old and new field names for compatibility
-        return {
-            'summary': summary_result,  # New simple overview for summary column
-            'ai_summary': summary_result,
-            'ai_executive_summary': summary_result,
-            'ai_talking_points': talking_points_result,
-            'ai_key_points': talking_points_result,
-            'ai_business_impact': business_impact_result,
-            'ai_potential_impact': business_impact_result,
-            'category': category.value,
-            'ai_version': 'azure_openai_enhanced_v1',
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        return legiscan_analysis_fields(summary_result, talking_points_result, business_impact_result, category.value)
         
+    except AIUnavailableError:
+        raise
     except Exception as e:
         print(f"❌ Error analyzing LegiScan bill: {e}")
         traceback.print_exc()
@@ -900,6 +1135,99 @@ async def analyze_legiscan_bill(bill_data: Dict, enhanced_context: bool = True)
             'analysis_timestamp': datetime.now().isoformat()
         }
 
+# Streaming analysis - sections arrive token by token for interactive endpoints
+async def stream_section(text: str, prompt_type: PromptType, context: str = "", use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream one section: {"delta": ...} events as the model writes, then a
+    final {"text": ...} with the same formatting process_with_ai applies.
+
+    A cache hit yields only the final event. Errors end the stream with the
+    usual "Error generating ..." text plus an "error" field, except
+    AIUnavailableError (circuit open), which is raised.
+    """
+    prepared = prepare_section_input(text, prompt_type, context)
+    cache_key = section_cache_key(prepared, prompt_type) if use_cache else None
+    if cache_key:
+        cached = ai_result_cache.get(cache_key)
+        if cached is not None:
+            yield {"text": cached, "cached": True}
+            return
+
+    received = []
+    try:
+        async for delta in ai_scheduler.stream_chat_completion(client, **section_request(prepared, prompt_type)):
+            received.append(delta)
+            yield {"delta": delta}
+    except AIUnavailableError:
+        raise
+    except Exception as e:
+        print(f"❌ Streamed AI call failed for {prompt_type.value} ({context}): {type(e).__name__}: {e}")
+        yield {"text": f"Error generating {prompt_type.value.replace('_', ' ')}: {e}", "error": str(e)}
+        return
+
+    raw_response = "".join(received)
+    formatted_response = format_section(raw_response, prompt_type)
+    if cache_key and raw_response:
+        ai_result_cache.set(
+            cache_key, formatted_response, prompt_type.value, MODEL_NAME,
+            tokens=count_tokens(prepared) + count_tokens(raw_response)
+        )
+    yield {"text": formatted_response}
+
+async def stream_legiscan_bill_analysis(bill_data: Dict) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    analyze_legiscan_bill as a stream of (section, event) pairs.
+
+    The three sections run concurrently and their stream_section events are
+    interleaved as they arrive; the last pair is ("analysis", fields) with
+    the same fields analyze_legiscan_bill returns. Uses the separate-section
+    prompts, since a single JSON reply can't be shown until it is complete.
+    Raises AIUnavailableError while the Azure OpenAI circuit is open.
+    """
+    content, base_context = legiscan_bill_content(bill_data)
+    sections = {
+        "executive_summary": (PromptType.EXECUTIVE_SUMMARY, f"State Bill Summary - {base_context}"),
+        "talking_points": (PromptType.KEY_TALKING_POINTS, f"State Bill Analysis - {base_context}"),
+        "business_impact": (PromptType.BUSINESS_IMPACT, f"State Bill Impact - {base_context}"),
+    }
+    queue: asyncio.Queue = asyncio.Queue()
+    results: Dict[str, str] = {}
+
+    async def pump(name: str, prompt_type: PromptType, context: str):
+        try:
+            async for event in stream_section(content, prompt_type, context):
+                await queue.put((name, event))
+        except AIUnavailableError as e:
+            await queue.put((name, e))
+        finally:
+            await queue.put((name, None))
+
+    tasks = [asyncio.create_task(pump(name, prompt_type, context)) for name, (prompt_type, context) in sections.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            name, event = await queue.get()
+            if event is None:
+                remaining -= 1
+                continue
+            if isinstance(event, AIUnavailableError):
+                raise event
+            if "text" in event:
+                results[name] = event["text"]
+            yield name, event
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    category = categorize_bill(bill_data.get('title', ''), bill_data.get('description', ''))
+    yield "analysis", legiscan_analysis_fields(
+        results.get("executive_summary", "Error generating executive summary: no response"),
+        results.get("talking_points", "Error generating key talking points: no response"),
+        results.get("business_impact", "Error generating business impact: no response"),
+        category.value,
+        'azure_openai_streamed_v1'
+    )
+
 async def process_bills_for_state(state: str, limit: int = 50, session_id: Optional[int] = None) -> Dict:
     """Complete pipeline: Fetch bills from LegiScan and analyze with AI"""
     try:
@@ -908,7 +1236,7 @@ async def process_bills_for_state(state: str, limit: int = 50, session_id: Optio
         legiscan = LegiScanClient()
         
         print(f"📥 Fetching master list for {state}...")
-        master_list = legiscan.get_master_list(state, session_id)
+        master_list = await asyncio.to_thread(legiscan.get_master_list, state, session_id)
         
         if not master_list:
             return {
@@ -934,7 +1262,7 @@ async def process_bills_for_state(state: str, limit: int = 50, session_id: Optio
                 bill_number = bill_info.get('bill_number', 'Unknown')
                 print(f"📄 Processing bill {i+1}/{len(bill_items)}: {bill_number}")
                 
-                detailed_bill = legiscan.get_bill(bill_id=int(bill_id))
+                detailed_bill = await asyncio.to_thread(legiscan.get_bill, bill_id=int(bill_id))
                 
                 if not detailed_bill:
                     print(f"⚠️ No detailed data found for bill {bill_number}, skipping")
@@ -994,7 +1322,7 @@ async def process_bills_for_state(state: str, limit: int = 50, session_id: Optio
         }
 
 # Legacy compatibility functions with enhanced AI
-async def analyze_executive_order(title: str, abstract: str = "", order_number: str = "") -> Dict[str, str]:
+async def analyze_executive_order(title: str, abstract: str = "", order_number: str = "", mode: Optional[str] = None) -> Dict[str, str]:
     """Comprehensive analysis for executive orders with distinct content"""
     try:
         context = f"Executive Order {order_number}" if order_number else "Executive Order"
@@ -1004,14 +1332,15 @@ async def analyze_executive_order(title: str, abstract: str = "", order_number:
 
         print(f"🔍 Analyzing executive order: {title[:50]}...")
 
-        # Run enhanced AI analysis with different contexts
-        # Using gather with return_exceptions=True to handle individual failures
-        summary_result, talking_points_result, business_impact_result = await asyncio.gather(
-            get_executive_summary(content, f"Executive Summary - {context}"),
-            get_key_talking_points(content, f"Policy Discussion - {context}"),
-            get_business_impact(content, f"Regulatory Impact - {context}"),
-            return_exceptions=True
-        )
+        # One combined call, or three separate calls with their own contexts
+        sections = await analyze_sections(content, context, {
+            "executive_summary": f"Executive Summary - {context}",
+            "talking_points": f"Policy Discussion - {context}",
+            "business_impact": f"Regulatory Impact - {context}",
+        }, mode)
+        summary_result = sections["executive_summary"]
+        talking_points_result = sections["talking_points"]
+        business_impact_result = sections["business_impact"]
 
         # Enhanced exception handling with detailed logging
         if isinstance(summary_result, Exception):
@@ -1046,7 +1375,7 @@ async def analyze_executive_order(title: str, abstract: str = "", order_number:
             'ai_key_points': talking_points_result,
             'ai_business_impact': business_impact_result,
             'ai_potential_impact': business_impact_result,
-            'ai_version': 'azure_openai_enhanced_v1'
+            'ai_version': sections["ai_version"]
         }
 
         # Log final result summary
@@ -1057,6 +1386,8 @@ async def analyze_executive_order(title: str, abstract: str = "", order_number:
 
         return result
 
+    except AIUnavailableError:
+        raise
     except Exception as e:
         print(f"❌ Critical error analyzing executive order {order_number}: {e}")
         print(f"   Exception type: {type(e).__name__}")
@@ -1074,32 +1405,34 @@ async def analyze_executive_order(title: str, abstract: str = "", order_number:
             'ai_version': 'error'
         }
 
-async def analyze_state_legislation(title: str, description: str = "", state: str = "", bill_number: str = "") -> Dict[str, str]:
+def state_legislation_content(title: str, description: str = "", state: str = "", bill_number: str = "") -> Tuple[str, str]:
+    """(content, context) sent to the AI for a state bill"""
+    context = f"{state} {bill_number}" if state and bill_number else f"{state} Legislation" if state else "State Legislation"
+    content = f"Title: {title}"
+    if state:
+        content += f"\nState: {state}"
+    if bill_number:
+        content += f"\nBill Number: {bill_number}"
+    if description:
+        content += f"\n\nDescription: {description}"
+    return content, context
+
+async def analyze_state_legislation(title: str, description: str = "", state: str = "", bill_number: str = "", mode: Optional[str] = None) -> Dict[str, str]:
     """Comprehensive analysis for state legislation with distinct content"""
     try:
-        context = f"{state} {bill_number}" if state and bill_number else f"{state} Legislation" if state else "State Legislation"
-        content = f"Title: {title}"
-        if state:
-            content += f"\nState: {state}"
-        if bill_number:
-            content += f"\nBill Number: {bill_number}"
-        if description:
-            content += f"\n\nDescription: {description}"
+        content, context = state_legislation_content(title, description, state, bill_number)
         
         print(f"🔍 Analyzing {state} legislation: {title[:50]}...")
 
         # Run FULL AI analysis with all three components
-        summary_task = get_executive_summary(content, f"State Bill Summary - {context}")
-        talking_points_task = get_key_talking_points(content, f"State Bill Analysis - {context}")
-        business_impact_task = get_business_impact(content, f"State Bill Impact - {context}")
-
-        # Run all three in parallel
-        summary_result, talking_points_result, business_impact_result = await asyncio.gather(
-            summary_task,
-            talking_points_task,
-            business_impact_task,
-            return_exceptions=True
-        )
+        sections = await analyze_sections(content, context, {
+            "executive_summary": f"State Bill Summary - {context}",
+            "talking_points": f"State Bill Analysis - {context}",
+            "business_impact": f"State Bill Impact - {context}",
+        }, mode)
+        summary_result = sections["executive_summary"]
+        talking_points_result = sections["talking_points"]
+        business_impact_result = sections["business_impact"]
 
         # Handle potential exceptions
         if isinstance(summary_result, Exception):
@@ -1117,9 +1450,11 @@ async def analyze_state_legislation(title: str, description: str = "", state: st
             'ai_key_points': talking_points_result,
             'ai_business_impact': business_impact_result,
             'ai_potential_impact': business_impact_result,
-            'ai_version': 'azure_openai_enhanced_v1'
+            'ai_version': sections["ai_version"]
         }
         
+    except AIUnavailableError:
+        raise
     except Exception as e:
         print(f"❌ Error analyzing legislation: {e}")
         error_msg = f"AI analysis failed: {str(e)}"
@@ -1135,39 +1470,38 @@ async def analyze_state_legislation(title: str, description: str = "", state: st
         }
 
 async def bulk_process_states(states: List[str], bills_per_state: int = 50) -> Dict:
-    """Process multiple states with LegiScan + AI analysis"""
+    """
+    Process multiple states with LegiScan + AI analysis.
+
+    States run concurrently; LegiScan calls share legiscan_token_bucket and AI
+    calls go through ai_scheduler, so no delay between states is needed.
+    """
     try:
         print(f"🚀 Starting bulk processing for {len(states)} states")
         
-        results = {}
-        total_processed = 0
-        
-        for state in states:
-            print(f"\n📍 Processing state: {state}")
-            
-            state_result = await process_bills_for_state(
-                state=state,
-                limit=bills_per_state
-            )
-            
-            results[state] = state_result
-            total_processed += state_result.get('bills_processed', 0)
-            
+        async def process_state(state: str) -> Dict:
+            state_result = await process_bills_for_state(state=state, limit=bills_per_state)
             print(f"✅ Completed {state}: {state_result.get('bills_processed', 0)} bills")
-            
-            if state != states[-1]:
-                print("⏱️ Brief delay between states...")
-                await asyncio.sleep(1)
+            return state_result
+        
+        report = await run_states(states, process_state)
+        results = report.results()
+        for state in report.failed:
+            results[state] = {'error': report.runs[state].error, 'bills_processed': 0, 'state': state}
+        total_processed = sum(result.get('bills_processed', 0) for result in results.values())
         
         print(f"\n🎉 Bulk processing completed!")
-        print(f"   States processed: {len(states)}")
+        print(f"   States processed: {len(report.succeeded)}/{len(states)}")
         print(f"   Total bills processed: {total_processed}")
+        print(f"   Wall clock: {report.wall_seconds:.1f}s (back to back: {report.sequential_seconds:.1f}s)")
         
         return {
             'status': 'success',
-            'states_processed': len(states),
+            'states_processed': len(report.succeeded),
+            'states_failed': report.failed,
             'total_bills_processed': total_processed,
             'results': results,
+            'timing': report.to_dict(),
             'timestamp': datetime.now().isoformat()
         }
         
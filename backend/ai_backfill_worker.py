@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+AI Backfill Worker
+Drains the state_legislation needs_ai_processing queue with bounded concurrency.
+
+Bills are claimed in batches with FOR UPDATE SKIP LOCKED and stamped with
+this worker's id and a claim expiry (database/migrations/add_ai_queue_claims.sql,
+add_ai_claim_expiry.sql), so any number
+of worker processes can run side by side without analyzing the same bill
+twice. Up to `concurrency` analyses are in flight at once; actual request
+pacing comes from the shared ai_scheduler budget, at backfill priority.
+
+Results are written back in batches with one UPDATE ... FROM (VALUES ...)
+per batch, and each write releases the claims it covers. Every flushed batch
+is a checkpoint: if the worker dies, only its unflushed claims are lost,
+and they become claimable again once their stored lease expires.
+
+Sections that came back as "Error generating ..." text are never written
+to the ai_* columns; they are recorded in ai_job_status with a retry time
+(see ai_job_status.py), and --enqueue-retries puts due bills back on the
+queue. While the Azure OpenAI circuit breaker is open, bills are kept in the
+queue: workers wait for the circuit to half-open, and if the outage
+outlasts `max_outage_minutes` the run stops and hands its remaining claims
+back.
+
+--batch-api sends the claimed bills as one Azure OpenAI batch instead of
+live calls (see ai_batch.py); results are written back the same way.
+
+Usage:
+    python ai_backfill_worker.py [--concurrency N] [--max-items N] [--enqueue-missing] [--enqueue-retries]
+    python ai_backfill_worker.py --batch-api [--local-batch] [--max-items N] [--enqueue-missing]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from psycopg2.extras import execute_values
+
+from ai_job_status import STATE_LEGISLATION, enqueue_due_retries, outcome_rows, record_outcomes, split_analysis
+from ai_scheduler import AIUnavailableError, Priority, ai_priority
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("AI_BACKFILL_CONCURRENCY", "8"))
+
+# Bills claimed per round-trip
+DEFAULT_CLAIM_SIZE = 50
+
+# Results per write (and checkpoint)
+DEFAULT_WRITE_BATCH = 25
+
+# Claims older than this are considered abandoned
+DEFAULT_LEASE_MINUTES = 30
+
+AI_COLUMN_LIMIT = 2000
+
+# Give up (and release claims) once the AI circuit has been open this long
+DEFAULT_MAX_OUTAGE_MINUTES = 10
+
+
+@dataclass
+class BackfillStats:
+    """What one worker run did"""
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    requeued: int = 0
+    written: int = 0
+    checkpoints: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    def to_dict(self) -> Dict:
+        return {
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "written": self.written,
+            "checkpoints": self.checkpoints,
+            "elapsed": round(self.elapsed, 2),
+            "bills_per_min": round(self.processed / self.elapsed * 60, 1) if self.elapsed else 0.0,
+            "errors": self.errors[:20],
+        }
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_missing_summaries(state: Optional[str] = None) -> int:
+    """Flag every bill (optionally in one state) without an executive summary for AI processing"""
+    query = '''
+        UPDATE state_legislation SET needs_ai_processing = true
+        WHERE needs_ai_processing IS DISTINCT FROM true
+        AND (ai_executive_summary IS NULL OR ai_executive_summary = '')
+    '''
+    params = []
+    if state:
+        query += " AND (state = %s OR state_abbr = %s)"
+        params = [state, state]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.rowcount
+
+
+def claim_batch(worker_id: str, limit: int, lease_minutes: int = DEFAULT_LEASE_MINUTES) -> List[Dict]:
+    """
+    Atomically claim up to `limit` queued bills that no live worker holds.
+
+    The claim is held for lease_minutes: the expiry is stored on the row
+    (database/migrations/add_ai_claim_expiry.sql), so a long batch claim is
+    respected by workers that use a shorter lease themselves.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE state_legislation
+            SET ai_claimed_by = %s, ai_claimed_at = NOW(),
+                ai_claim_expires_at = NOW() + make_interval(mins => %s)
+            WHERE id IN (
+                SELECT id FROM state_legislation
+                WHERE needs_ai_processing = true
+                AND (ai_claimed_by IS NULL
+                     OR COALESCE(ai_claim_expires_at, ai_claimed_at + make_interval(mins => %s)) < NOW())
+                ORDER BY last_updated DESC
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, bill_number, title, description, status, state
+        ''', (worker_id, lease_minutes, DEFAULT_LEASE_MINUTES, limit))
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _has_sections(result: Dict) -> bool:
+    return any(result.get(k) for k in ('ai_executive_summary', 'ai_talking_points', 'ai_business_impact'))
+
+
+def write_results(results: List[Dict], worker_id: str) -> int:
+    """
+    Store a batch of analyses and release their claims.
+
+    Only sections that were generated are written; sections listed in a
+    result's 'ai_failures' keep their current value and are recorded in
+    ai_job_status for a later retry. Bills with nothing generated are
+    dequeued without touching their AI columns. Rows whose claim was taken
+    over by another worker (lease expired) are left alone.
+    """
+    if not results:
+        return 0
+    timestamp = datetime.now().isoformat()
+    written = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        succeeded = [r for r in results if _has_sections(r)]
+        failed = [r['id'] for r in results if not _has_sections(r)]
+
+        if succeeded:
+            execute_values(cursor, '''
+                UPDATE state_legislation AS s
+                SET ai_executive_summary = COALESCE(v.summary, s.ai_executive_summary),
+                    ai_talking_points = COALESCE(v.talking_points, s.ai_talking_points),
+                    ai_business_impact = COALESCE(v.business_impact, s.ai_business_impact),
+                    ai_summary = COALESCE(v.summary, s.ai_summary),
+                    category = v.category,
+                    ai_version = v.ai_version,
+                    needs_ai_processing = false,
+                    ai_claimed_by = NULL,
+                    ai_claimed_at = NULL,
+                    ai_claim_expires_at = NULL,
+                    last_updated = v.last_updated
+                FROM (VALUES %s) AS v(id, summary, talking_points, business_impact, category, ai_version, last_updated, worker_id)
+                WHERE s.id = v.id AND s.ai_claimed_by = v.worker_id
+            ''', [
+                (
+                    r['id'],
+                    r['ai_executive_summary'][:AI_COLUMN_LIMIT] if r.get('ai_executive_summary') else None,
+                    r['ai_talking_points'][:AI_COLUMN_LIMIT] if r.get('ai_talking_points') else None,
+                    r['ai_business_impact'][:AI_COLUMN_LIMIT] if r.get('ai_business_impact') else None,
+                    r['category'],
+                    r['ai_version'],
+                    timestamp,
+                    worker_id,
+                )
+                for r in succeeded
+            ], page_size=len(succeeded))
+            written += cursor.rowcount
+
+        if failed:
+            cursor.execute('''
+                UPDATE state_legislation
+                SET needs_ai_processing = false, ai_claimed_by = NULL, ai_claimed_at = NULL, ai_claim_expires_at = NULL,
+                    last_updated = %s
+                WHERE id = ANY(%s) AND ai_claimed_by = %s
+            ''', (timestamp, failed, worker_id))
+            written += cursor.rowcount
+
+        # Per-section outcomes, in the same transaction as the writes
+        outcomes = []
+        for r in results:
+            failures = r.get('ai_failures')
+            if failures is None:
+                failures = {} if _has_sections(r) else {section: 'No content generated' for section in ('executive_summary', 'talking_points', 'business_impact')}
+            outcomes += outcome_rows(STATE_LEGISLATION, r['id'], failures, r.get('ai_version'))
+        record_outcomes(outcomes, cursor)
+    return written
+
+
+def release_claims(ids: List[int], worker_id: str):
+    """Hand unprocessed claims back to the queue"""
+    if not ids:
+        return
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE state_legislation SET ai_claimed_by = NULL, ai_claimed_at = NULL, ai_claim_expires_at = NULL
+            WHERE id = ANY(%s) AND ai_claimed_by = %s
+        ''', (ids, worker_id))
+
+
+def default_category(title: str, description: str) -> str:
+    from ai import categorize_bill
+    return categorize_bill(title or '', description or '').value
+
+
+async def run_backfill(
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_items: Optional[int] = None,
+    claim_size: int = DEFAULT_CLAIM_SIZE,
+    write_batch: int = DEFAULT_WRITE_BATCH,
+    lease_minutes: int = DEFAULT_LEASE_MINUTES,
+    worker_id: Optional[str] = None,
+    categorize: Optional[Callable[[str, str], str]] = None,
+    ai_version: str = 'azure_openai_nightly_v1',
+    max_outage_minutes: float = DEFAULT_MAX_OUTAGE_MINUTES
+) -> BackfillStats:
+    """Process queued bills until the queue (or max_items) is exhausted"""
+    from ai import analyze_state_legislation
+
+    worker_id = worker_id or default_worker_id()
+    categorize = categorize or default_category
+    started = time.monotonic()
+    stats = BackfillStats()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    claim_lock = asyncio.Lock()
+    flush_lock = asyncio.Lock()
+    pending: List[Dict] = []
+    exhausted = False
+    aborted = False
+    outage_started: Optional[float] = None
+
+    async def next_bill() -> Optional[Dict]:
+        nonlocal exhausted
+        async with claim_lock:
+            if aborted:
+                return None  # outage: leave the rest for the final release
+            if queue.empty() and not exhausted:
+                limit = claim_size if max_items is None else min(claim_size, max_items - stats.claimed)
+                rows = await asyncio.to_thread(claim_batch, worker_id, limit, lease_minutes) if limit > 0 else []
+                stats.claimed += len(rows)
+                if not rows or (max_items is not None and stats.claimed >= max_items):
+                    exhausted = True
+                for row in rows:
+                    queue.put_nowait(row)
+            return None if queue.empty() else queue.get_nowait()
+
+    async def flush(force: bool = False):
+        async with flush_lock:
+            if not pending or (not force and len(pending) < write_batch):
+                return
+            batch = pending[:]
+            pending.clear()
+            stats.written += await asyncio.to_thread(write_results, batch, worker_id)
+            stats.checkpoints += 1
+            logger.info(f"💾 Checkpoint {stats.checkpoints}: {stats.succeeded} analyzed, {stats.failed} failed "
+                        f"({stats.processed / (time.monotonic() - started) * 60:.1f} bills/min)")
+
+    async def wait_out_outage(bill: Dict, error: AIUnavailableError):
+        """Keep the bill claimed and back off until the circuit half-opens"""
+        nonlocal outage_started, aborted
+        queue.put_nowait(bill)
+        now = time.monotonic()
+        outage_started = outage_started or now
+        if now - outage_started > max_outage_minutes * 60:
+            if not aborted:
+                logger.error(f"🔌 AI unavailable for over {max_outage_minutes} min, stopping and requeueing claimed bills")
+            aborted = True
+            return
+        await asyncio.sleep(error.retry_after)
+
+    async def worker():
+        nonlocal outage_started
+        while (bill := await next_bill()) is not None:
+            label = f"{bill['state']} {bill['bill_number']}"
+            result = {'id': bill['id']}
+            try:
+                analysis = await analyze_state_legislation(
+                    title=bill['title'] or 'No title',
+                    description=bill['description'] or 'No description',
+                    state=bill['state'],
+                    bill_number=bill['bill_number']
+                )
+                # Failed sections are recorded for retry, never written as text
+                analysis, failures = split_analysis(analysis)
+                result['ai_failures'] = failures
+                result['ai_version'] = ai_version
+                outage_started = None
+                if _has_sections(analysis):
+                    result.update(analysis)
+                    result['category'] = categorize(bill['title'], bill['description'])
+                    stats.succeeded += 1
+                    logger.info(f"✅ AI analysis completed for {label} - {result['category']}"
+                                + (f" (failed: {', '.join(failures)})" if failures else ""))
+                else:
+                    stats.failed += 1
+                    logger.warning(f"⚠️ AI analysis failed for {label}")
+            except AIUnavailableError as e:
+                logger.warning(f"🔌 {label} not analyzed: {e}")
+                await wait_out_outage(bill, e)
+                continue
+            except Exception as e:
+                stats.failed += 1
+                stats.errors.append(f"{label}: {e}")
+                result['ai_failures'] = {section: str(e)[:500] for section in ('executive_summary', 'talking_points', 'business_impact')}
+                logger.error(f"❌ Error processing {label}: {e}")
+            pending.append(result)
+            await flush()
+
+    logger.info(f"🧠 AI backfill worker {worker_id} starting with concurrency {concurrency}")
+    try:
+        with ai_priority(Priority.BACKFILL):
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await flush(force=True)
+        leftover = []
+        while not queue.empty():
+            leftover.append(queue.get_nowait()['id'])
+        stats.requeued = len(leftover) if aborted else 0
+        await asyncio.to_thread(release_claims, leftover, worker_id)
+
+    stats.elapsed = time.monotonic() - started
+    logger.info(f"✅ AI backfill done: {stats.succeeded} analyzed, {stats.failed} failed "
+                f"in {stats.elapsed:.1f}s ({stats.to_dict()['bills_per_min']} bills/min)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drain the state_legislation AI queue')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='AI analyses in flight at once')
+    parser.add_argument('--max-items', type=int, default=None, help='Stop after this many bills (default: drain the queue)')
+    parser.add_argument('--claim-size', type=int, default=DEFAULT_CLAIM_SIZE, help='Bills claimed per round-trip')
+    parser.add_argument('--write-batch', type=int, default=DEFAULT_WRITE_BATCH, help='Results per checkpoint write')
+    parser.add_argument('--enqueue-missing', action='store_true', help='First queue every bill without an executive summary')
+    parser.add_argument('--enqueue-retries', action='store_true', help='First queue bills whose failed AI sections are due for retry')
+    parser.add_argument('--batch-api', action='store_true', help='Submit the queue as one Azure OpenAI batch instead of live calls')
+    parser.add_argument('--local-batch', action='store_true', help='With --batch-api, use the offline batch stand-in')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    if args.enqueue_missing:
+        logger.info(f"📥 Queued {enqueue_missing_summaries()} bills without summaries")
+    if args.enqueue_retries:
+        logger.info(f"📥 Queued {enqueue_due_retries()} bills with AI sections due for retry")
+
+    if args.batch_api:
+        from ai_batch import DEFAULT_BATCH_SIZE, get_backend, run_queue_batch
+        stats = asyncio.run(run_queue_batch(
+            get_backend(True if args.local_batch else None),
+            limit=args.max_items or DEFAULT_BATCH_SIZE
+        ))
+        print(f"✅ Batch complete: {stats.to_dict() if stats else 'nothing to do'}")
+        return
+
+    stats = asyncio.run(run_backfill(
+        concurrency=args.concurrency,
+        max_items=args.max_items,
+        claim_size=args.claim_size,
+        write_batch=args.write_batch
+    ))
+    for error in stats.errors[:10]:
+        print(f"   ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Azure OpenAI Batch API Mode
+Large AI backfills as one asynchronous batch instead of thousands of calls.
+
+A batch run claims bills from the state_legislation needs_ai_processing
+queue (same claim columns as ai_backfill_worker.py, with a lease long enough
+to outlive the 24h completion window; the expiry is stored on each row, so
+backfill workers with shorter leases leave these claims alone). It writes one combined-analysis
+request per bill to a JSONL file and submits that file to the Batch API. It
+then polls until the batch finishes and ingests the results with the
+batched UPDATE used by the backfill worker. Bills already in the AI result
+cache are written straight away and never sent.
+
+A batch that expires or is cancelled keeps the responses it finished
+before stopping; those are ingested like a completed batch and the bills
+it never answered go back on the queue. A failed batch (rejected input)
+has no output, so all of its bills are requeued.
+
+Each submitted batch is recorded in a small JSON manifest under
+AI_BATCH_DIR, so `poll` can pick it up again from another process or after a
+restart. Set AI_BATCH_BACKEND=local (or pass --local) to use
+LocalBatchBackend, an offline stand-in that answers requests on disk. Tests
+and dry runs then never touch Azure.
+
+Batch mode runs the same job as ai_backfill_worker.py (combined analysis of
+queued bills), so it is available here and as ai_backfill_worker.py
+--batch-api. The per-bill summary scripts (generate_state_bill_summaries.py,
+process_missing_ai_summaries.py, send_bills_to_ai.py) write a different,
+plain-English summary and have no batch mode.
+
+Usage:
+    python ai_batch.py run [--limit N] [--enqueue-missing] [--local]
+    python ai_batch.py submit [--limit N] [--local]
+    python ai_batch.py poll [--wait] [--local]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_backfill_worker import (
+    BackfillStats, claim_batch, default_category, default_worker_id,
+    enqueue_missing_summaries, release_claims, write_results
+)
+from ai_job_status import SECTION_COLUMNS
+from ai_result_cache import ai_result_cache
+
+logger = logging.getLogger(__name__)
+
+BATCH_DIR = os.getenv("AI_BATCH_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'ai_batches'))
+
+# Requests per submitted batch (Azure allows up to 100k lines / 200 MB)
+DEFAULT_BATCH_SIZE = 5000
+
+# Claims must survive the 24h completion window plus ingestion
+BATCH_LEASE_MINUTES = 26 * 60
+
+DEFAULT_POLL_INTERVAL = 60
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Terminal statuses whose output file holds the responses finished so far
+INGESTABLE_STATUSES = {"completed", "expired", "cancelled"}
+
+# Rows per ingest write
+INGEST_CHUNK = 500
+
+
+@dataclass
+class BatchJob:
+    """Manifest of one submitted batch"""
+    batch_id: str
+    backend: str
+    worker_id: str
+    created_at: str
+    items: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    status: str = "submitted"
+    cached: int = 0
+
+    @property
+    def path(self) -> str:
+        return os.path.join(BATCH_DIR, f"{self.batch_id}.json")
+
+    def save(self):
+        os.makedirs(BATCH_DIR, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> "BatchJob":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def batch_line(custom_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"custom_id": custom_id, "method": "POST", "url": "/chat/completions", "body": body}
+
+
+def response_content(line: Dict[str, Any]) -> Tuple[Optional[str], int]:
+    """(message content, total tokens) from one output line, or (None, 0) on error"""
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        return None, 0
+    body = response.get("body") or {}
+    choices = body.get("choices") or []
+    if not choices:
+        return None, 0
+    usage = body.get("usage") or {}
+    return choices[0].get("message", {}).get("content"), usage.get("total_tokens", 0)
+
+
+class AzureBatchBackend:
+    """Azure OpenAI Batch API (needs a Global-Batch deployment)"""
+
+    name = "azure"
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import AsyncAzureOpenAI
+            client = AsyncAzureOpenAI(
+                azure_endpoint=os.getenv("AZURE_ENDPOINT"),
+                api_key=os.getenv("AZURE_KEY"),
+                api_version=os.getenv("AZURE_BATCH_API_VERSION", "2024-10-21")
+            )
+        self.client = client
+
+    async def submit(self, jsonl: bytes) -> str:
+        upload = await self.client.files.create(file=("requests.jsonl", jsonl), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> Tuple[str, Dict[str, int]]:
+        batch = await self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return batch.status, {
+            "total": getattr(counts, "total", 0),
+            "completed": getattr(counts, "completed", 0),
+            "failed": getattr(counts, "failed", 0),
+        }
+
+    async def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        batch = await self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                lines.extend(json.loads(line) for line in content.text.splitlines() if line.strip())
+        return lines
+
+
+def offline_responder(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic stand-in for a chat completion, shaped like the real response body"""
+    prompt = body["messages"][-1]["content"]
+    title = next((line[len("Title: "):] for line in prompt.splitlines() if line.startswith("Title: ")), "this bill")
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        content = json.dumps({
+            "executive_summary": f"Offline summary of {title}.",
+            "talking_points": [f"Offline talking point {i} for {title}." for i in range(1, 6)],
+            "business_impact": f"**Summary:**\n• Offline business impact of {title}.",
+        })
+    else:
+        content = f"Offline analysis of {title}."
+    tokens = len(prompt) // 4
+    return {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": tokens, "completion_tokens": 0, "total_tokens": tokens},
+    }
+
+
+class LocalBatchBackend:
+    """
+    Offline stand-in for the Batch API: answers every request on submit.
+
+    expire_after=N answers only the first N requests and reports the batch
+    expired, like one that ran out its completion window.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: Optional[str] = None, responder: Callable[[Dict], Dict] = offline_responder,
+                 expire_after: Optional[int] = None):
+        self.directory = directory or os.path.join(BATCH_DIR, "local")
+        self.responder = responder
+        self.expire_after = expire_after
+
+    def _path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{kind}.jsonl")
+
+    async def submit(self, jsonl: bytes) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        with open(self._path(batch_id, "input"), 'wb') as f:
+            f.write(jsonl)
+        requests = jsonl.decode().splitlines()
+        answered = requests if self.expire_after is None else requests[:self.expire_after]
+        with open(self._path(batch_id, "output"), 'w') as out:
+            for raw in answered:
+                request = json.loads(raw)
+                out.write(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": self.responder(request["body"])},
+                    "error": None,
+                }) + "\n")
+        if len(answered) < len(requests):
+            with open(self._path(batch_id, "status"), 'w') as f:
+                f.write("expired")
+        return batch_id
+
+    async def status(self, batch_id: str) -> Tuple[str, Dict[str, int]]:
+        if not os.path.exists(self._path(batch_id, "output")):
+            return "failed", {}
+        with open(self._path(batch_id, "input")) as f:
+            total = sum(1 for _ in f)
+        with open(self._path(batch_id, "output")) as f:
+            completed = sum(1 for _ in f)
+        status = "completed"
+        if os.path.exists(self._path(batch_id, "status")):
+            with open(self._path(batch_id, "status")) as f:
+                status = f.read().strip()
+        return status, {"total": total, "completed": completed, "failed": 0}
+
+    async def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        with open(self._path(batch_id, "output")) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def get_backend(local: Optional[bool] = None):
+    if local is None:
+        local = os.getenv("AI_BATCH_BACKEND", "azure").lower() == "local"
+    return LocalBatchBackend() if local else AzureBatchBackend()
+
+
+async def submit_requests(backend, lines: List[Dict[str, Any]]) -> str:
+    """Submit prepared batch lines; returns the batch id"""
+    jsonl = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    batch_id = await backend.submit(jsonl)
+    logger.info(f"📤 Submitted batch {batch_id} with {len(lines)} requests ({len(jsonl) / 1024:.0f} KB) to {backend.name}")
+    return batch_id
+
+
+async def wait_for_batch(backend, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                         timeout: Optional[float] = None) -> str:
+    """Poll until the batch reaches a terminal status (or timeout); returns the last status"""
+    started = time.monotonic()
+    while True:
+        status, counts = await backend.status(batch_id)
+        if status in TERMINAL_STATUSES:
+            logger.info(f"🏁 Batch {batch_id} {status}: {counts}")
+            return status
+        if timeout is not None and time.monotonic() - started > timeout:
+            return status
+        logger.info(f"⏳ Batch {batch_id} {status}: {counts.get('completed', 0)}/{counts.get('total', 0)} done")
+        await asyncio.sleep(poll_interval)
+
+
+def _analysis_row(bill_id: int, sections: Dict[str, str], category: str, ai_version: str) -> Dict[str, Any]:
+    return {
+        'id': bill_id,
+        'ai_executive_summary': sections['executive_summary'],
+        'ai_talking_points': sections['talking_points'],
+        'ai_business_impact': sections['business_impact'],
+        'category': category,
+        'ai_version': ai_version,
+    }
+
+
+async def submit_queue_batch(
+    backend=None,
+    limit: int = DEFAULT_BATCH_SIZE,
+    categorize: Callable[[str, str], str] = default_category,
+    ai_version: str = 'azure_openai_batch_v1'
+) -> Optional[BatchJob]:
+    """Claim queued bills and submit them as one batch (cache hits are written immediately)"""
+    from ai import MODEL_NAME, combined_analysis_cache_key, combined_analysis_request, state_legislation_content
+
+    backend = backend or get_backend()
+    worker_id = f"batch:{default_worker_id()}:{uuid.uuid4().hex[:8]}"
+    rows = await asyncio.to_thread(claim_batch, worker_id, limit, BATCH_LEASE_MINUTES)
+    if not rows:
+        logger.info("✅ No bills need AI processing")
+        return None
+
+    deployment = os.getenv("AZURE_BATCH_DEPLOYMENT_NAME", MODEL_NAME)
+    lines, items, cached = [], {}, []
+    for row in rows:
+        content, context = state_legislation_content(
+            row['title'] or 'No title', row['description'] or 'No description', row['state'], row['bill_number']
+        )
+        prepared, request = combined_analysis_request(content, context)
+        key = combined_analysis_cache_key(prepared, request)
+        category = categorize(row['title'], row['description'])
+
+        hit = ai_result_cache.get(key)
+        if hit is not None:
+            cached.append(_analysis_row(row['id'], json.loads(hit), category, ai_version))
+            continue
+
+        custom_id = f"sl-{row['id']}"
+        lines.append(batch_line(custom_id, {**request, "model": deployment}))
+        items[custom_id] = {"id": row['id'], "cache_key": key, "category": category}
+
+    if cached:
+        await asyncio.to_thread(write_results, cached, worker_id)
+        logger.info(f"⚡ {len(cached)} bills answered from the AI cache")
+
+    if not lines:
+        return None
+
+    try:
+        batch_id = await submit_requests(backend, lines)
+    except Exception:
+        await asyncio.to_thread(release_claims, [item['id'] for item in items.values()], worker_id)
+        raise
+
+    job = BatchJob(
+        batch_id=batch_id, backend=backend.name, worker_id=worker_id,
+        created_at=datetime.now().isoformat(), items=items, cached=len(cached)
+    )
+    job.save()
+    return job
+
+
+async def ingest_batch(job: BatchJob, backend=None, ai_version: str = 'azure_openai_batch_v1') -> BackfillStats:
+    """
+    Write a finished batch's results back and release its claims.
+
+    Expired and cancelled batches are ingested for whatever they finished;
+    bills without an output line are handed back to the queue. Lines that
+    errored or can't be parsed are dequeued and recorded in ai_job_status
+    for a later retry, same as a failed live call.
+    """
+    from ai import MODEL_NAME, parse_combined_response
+
+    backend = backend or get_backend(job.backend == "local")
+    started = time.monotonic()
+    stats = BackfillStats(claimed=len(job.items))
+
+    status, _ = await backend.status(job.batch_id)
+    if status not in INGESTABLE_STATUSES:
+        # Whole batch lost: put everything back on the queue for the next run
+        await asyncio.to_thread(release_claims, [item['id'] for item in job.items.values()], job.worker_id)
+        logger.warning(f"⚠️ Batch {job.batch_id} ended {status}; {len(job.items)} bills requeued")
+        job.status = status
+        job.save()
+        return stats
+
+    results, seen = [], set()
+    for line in await backend.results(job.batch_id):
+        item = job.items.get(line.get("custom_id"))
+        if item is None:
+            continue
+        seen.add(line["custom_id"])
+        content, tokens = response_content(line)
+        sections = parse_combined_response(content) if content else None
+        if sections is None:
+            reason = str(line.get('error') or 'unparseable response')
+            stats.failed += 1
+            stats.errors.append(f"{line['custom_id']}: {reason}")
+            results.append({
+                'id': item['id'],
+                'ai_version': ai_version,
+                'ai_failures': {section: reason[:500] for section in SECTION_COLUMNS},
+            })
+            continue
+        ai_result_cache.set(item['cache_key'], json.dumps(sections), "combined_analysis", MODEL_NAME, tokens=tokens)
+        results.append(_analysis_row(item['id'], sections, item['category'], ai_version))
+        stats.succeeded += 1
+
+    for start in range(0, len(results), INGEST_CHUNK):
+        stats.written += await asyncio.to_thread(write_results, results[start:start + INGEST_CHUNK], job.worker_id)
+        stats.checkpoints += 1
+
+    missing = [item['id'] for custom_id, item in job.items.items() if custom_id not in seen]
+    await asyncio.to_thread(release_claims, missing, job.worker_id)
+
+    stats.requeued = len(missing)
+    job.status = "ingested" if status == "completed" else f"ingested_{status}"
+    job.save()
+    stats.elapsed = time.monotonic() - started
+    logger.info(f"📥 Ingested {status} batch {job.batch_id}: {stats.succeeded} analyzed, {stats.failed} failed, "
+                f"{len(missing)} requeued")
+    return stats
+
+
+def pending_jobs() -> List[BatchJob]:
+    jobs = [BatchJob.load(path) for path in sorted(glob.glob(os.path.join(BATCH_DIR, '*.json')))]
+    return [job for job in jobs if job.status == "submitted"]
+
+
+async def poll_batches(backend=None, wait: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL) -> List[BackfillStats]:
+    """Ingest every submitted batch that has finished (or wait for all of them)"""
+    ingested = []
+    for job in pending_jobs():
+        job_backend = backend or get_backend(job.backend == "local")
+        if wait:
+            await wait_for_batch(job_backend, job.batch_id, poll_interval)
+        status, counts = await job_backend.status(job.batch_id)
+        if status in TERMINAL_STATUSES:
+            ingested.append(await ingest_batch(job, job_backend))
+        else:
+            logger.info(f"⏳ Batch {job.batch_id} still {status}: {counts}")
+    return ingested
+
+
+async def run_queue_batch(
+    backend=None,
+    limit: int = DEFAULT_BATCH_SIZE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    categorize: Callable[[str, str], str] = default_category
+) -> Optional[BackfillStats]:
+    """Submit, wait and ingest in one go"""
+    backend = backend or get_backend()
+    job = await submit_queue_batch(backend, limit, categorize)
+    if job is None:
+        return None
+    await wait_for_batch(backend, job.batch_id, poll_interval)
+    return await ingest_batch(job, backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Azure OpenAI Batch API mode for the state_legislation AI queue')
+    parser.add_argument('command', choices=['run', 'submit', 'poll'], help='run = submit + wait + ingest')
+    parser.add_argument('--limit', type=int, default=DEFAULT_BATCH_SIZE, help='Bills per batch')
+    parser.add_argument('--enqueue-missing', action='store_true', help='First queue every bill without an executive summary')
+    parser.add_argument('--state', type=str, help='With --enqueue-missing, only queue this state')
+    parser.add_argument('--local', action='store_true', help='Use the offline stand-in instead of Azure')
+    parser.add_argument('--wait', action='store_true', help='poll: block until submitted batches finish')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='Seconds between status checks')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    backend = get_backend(True) if args.local else None
+    if args.enqueue_missing:
+        logger.info(f"📥 Queued {enqueue_missing_summaries(args.state)} bills without summaries")
+
+    if args.command == 'submit':
+        job = asyncio.run(submit_queue_batch(backend, args.limit))
+        if job:
+            print(f"Submitted {job.batch_id} ({len(job.items)} requests)")
+    elif args.command == 'poll':
+        for stats in asyncio.run(poll_batches(backend, args.wait, args.poll_interval)):
+            print(stats.to_dict())
+    else:
+        stats = asyncio.run(run_queue_batch(backend, args.limit, args.poll_interval))
+        if stats:
+            print(stats.to_dict())
+
+
+if __name__ == "__main__":
+    main()
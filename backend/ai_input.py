@@ -0,0 +1,182 @@
+# ai_input.py - Token-aware input shaping for AI prompts
+"""
+Fits document text into a per-prompt-type token budget.
+
+Text that already fits is sent unchanged. Longer text is split into
+segments (paragraphs, SEC./Section headings, sentence runs) and the most
+informative ones are kept in their original order: the lead (title, state,
+bill number) always, then digest / "this bill would" language, then
+sections that amend or repeal statutes, then operative provisions.
+Enacting clauses, severability and effective-date boilerplate go first.
+Dropped stretches are marked with "[...]" so the model knows the text is
+partial.
+
+Tokens are counted with tiktoken when it is installed (AI_TOKENIZER_ENCODING,
+default o200k_base for the gpt-4o family) and estimated at ~4 characters
+per token otherwise.
+
+Budgets live in INPUT_TOKEN_BUDGETS, keyed by prompt type value, and can be
+overridden per type with AI_INPUT_BUDGET_<PROMPT_TYPE> (e.g.
+AI_INPUT_BUDGET_COMBINED_ANALYSIS=3000) to trade cost and latency against
+coverage.
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Document tokens allowed per prompt type (the old 4000-char cut was ~1000)
+INPUT_TOKEN_BUDGETS = {
+    "executive_summary": 1500,
+    "key_talking_points": 1200,
+    "business_impact": 1200,
+    "state_bill_summary": 800,
+    "combined_analysis": 2000,
+}
+
+DEFAULT_INPUT_BUDGET = 1000
+
+# Segments longer than this are broken into sentence runs before scoring
+MAX_SEGMENT_TOKENS = 200
+
+GAP_MARKER = "[...]"
+
+_DIGEST = re.compile(
+    r"\b(digest|synopsis|summary|purpose|existing law|this (bill|act|measure|order|resolution) (would|will|requires|establishes|amends))\b",
+    re.I
+)
+_AMENDS = re.compile(
+    r"\b(amend(s|ed|ing)?|repeal(s|ed|ing)?|add(s|ing)? (a )?(new )?(section|chapter|article|part)|is (hereby )?amended|U\.S\.C\.|code)\b|§",
+    re.I
+)
+_OPERATIVE = re.compile(
+    r"\b(shall|must|require[sd]?|prohibit(s|ed)?|appropriat\w+|penalt(y|ies)|fines?|fees?|tax(es)?|grant(s)?|fund(s|ing)?)\b",
+    re.I
+)
+_BOILERPLATE = re.compile(
+    r"\b(be it enacted|enacting clause|severab\w+|effective (date|immediately|upon)|short title|may be cited as|"
+    r"takes effect|emergency clause|in witness whereof)\b",
+    re.I
+)
+_SEGMENT_BREAK = re.compile(r"\n\s*\n|\n(?=\s*(?:SEC(?:TION)?\.?|Sec\.|Section|§)\s*\d)")
+_SENTENCE_BREAK = re.compile(r"(?<=[.;:])\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(os.getenv("AI_TOKENIZER_ENCODING", "o200k_base"))
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}); estimating tokens from length")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text under the model's tokenizer (or a ~4 chars/token estimate)"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """First max_tokens tokens of text"""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def input_budget(prompt_type: str) -> int:
+    """Token budget for a prompt type's document text"""
+    override = os.getenv(f"AI_INPUT_BUDGET_{prompt_type.upper()}")
+    if override:
+        try:
+            return int(override)
+        except ValueError:
+            logger.warning(f"Ignoring non-integer AI_INPUT_BUDGET_{prompt_type.upper()}={override!r}")
+    return INPUT_TOKEN_BUDGETS.get(prompt_type, DEFAULT_INPUT_BUDGET)
+
+
+def _segments(text: str) -> List[str]:
+    segments = []
+    for part in _SEGMENT_BREAK.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        if count_tokens(part) <= MAX_SEGMENT_TOKENS:
+            segments.append(part)
+            continue
+        # Long paragraph: regroup its sentences into runs of at most MAX_SEGMENT_TOKENS
+        run = ""
+        for sentence in _SENTENCE_BREAK.split(part):
+            candidate = f"{run} {sentence}".strip()
+            if run and count_tokens(candidate) > MAX_SEGMENT_TOKENS:
+                segments.append(run)
+                run = sentence
+            else:
+                run = candidate
+        if run:
+            segments.append(run)
+    return segments
+
+
+def _score(segment: str, index: int) -> float:
+    score = 0.0
+    if _DIGEST.search(segment):
+        score += 3
+    if _AMENDS.search(segment):
+        score += 2
+    if _OPERATIVE.search(segment):
+        score += 1
+    if _BOILERPLATE.search(segment):
+        score -= 2
+    # Earlier text wins ties: bills and orders front-load what they do
+    return score + 1.0 / (index + 2)
+
+
+def shape_input(text: str, budget: int) -> str:
+    """text if it fits in budget tokens, otherwise its most informative segments"""
+    if not text or count_tokens(text) <= budget:
+        return text
+
+    segments = _segments(text)
+    gap_cost = count_tokens(f"\n\n{GAP_MARKER}\n\n")
+    costs = [count_tokens(s) for s in segments]
+
+    # The lead identifies the document; keep it even if it has to be cut
+    lead = segments[0]
+    if costs[0] > budget:
+        return truncate_tokens(lead, max(budget - gap_cost, 1)) + f" {GAP_MARKER}"
+    keep = {0}
+    used = costs[0] + gap_cost
+
+    ranked = sorted(range(1, len(segments)), key=lambda i: _score(segments[i], i), reverse=True)
+    for i in ranked:
+        if used + costs[i] + gap_cost <= budget:
+            keep.add(i)
+            used += costs[i] + gap_cost
+
+    parts: List[str] = []
+    for i, segment in enumerate(segments):
+        if i in keep:
+            parts.append(segment)
+        elif not parts or parts[-1] != GAP_MARKER:
+            parts.append(GAP_MARKER)
+    shaped = "\n\n".join(parts)
+    logger.debug(f"Shaped input from {count_tokens(text)} to {count_tokens(shaped)} tokens "
+                 f"({len(keep)}/{len(segments)} segments kept)")
+    return shaped
+
+
+def shape_for_prompt(text: str, prompt_type: str, budget: Optional[int] = None) -> str:
+    """shape_input with the prompt type's configured budget"""
+    return shape_input(text, input_budget(prompt_type) if budget is None else budget)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+AI Job Status
+Per-section AI outcome tracking (database/migrations/add_ai_job_status.sql).
+
+ai.py reports a failed section as "Error generating ..." text. Writers call
+split_analysis() to drop those sections before touching the ai_* columns
+and record_outcomes() to note what happened: succeeded sections are marked
+done, failed ones get their attempt count bumped, the error kept and a
+next_retry_at with exponential backoff (AI_JOB_RETRY_BASE_MINUTES doubling
+up to AI_JOB_RETRY_MAX_HOURS). After AI_JOB_MAX_ATTEMPTS a section is marked
+'dead' and no longer retried. savable_analysis() and failed_analysis() give
+interactive writers the same split, plus needs_ai_processing when nothing
+was generated.
+
+Retry selection (due_for_retry / enqueue_due_retries) reads the partial
+retry index, never the text columns.
+
+Usage:
+    python ai_job_status.py [--enqueue-due] [--limit N]
+"""
+
+import argparse
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+STATE_LEGISLATION = 'state_legislation'
+EXECUTIVE_ORDER = 'executive_order'
+
+# Section -> the ai_* columns that carry it
+SECTION_COLUMNS = {
+    'executive_summary': ('ai_executive_summary', 'ai_summary', 'summary'),
+    'talking_points': ('ai_talking_points', 'ai_key_points'),
+    'business_impact': ('ai_business_impact', 'ai_potential_impact'),
+}
+
+ERROR_PREFIXES = ('Error generating', 'AI analysis failed', '<p>Error generating', '<p>AI analysis failed',
+                  '<p>Enhanced AI analysis failed')
+
+MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', '5'))
+RETRY_BASE_MINUTES = int(os.getenv('AI_JOB_RETRY_BASE_MINUTES', '15'))
+RETRY_MAX_HOURS = int(os.getenv('AI_JOB_RETRY_MAX_HOURS', '24'))
+
+ERROR_LIMIT = 1000
+
+
+def is_error_text(value) -> bool:
+    return isinstance(value, str) and value.lstrip().startswith(ERROR_PREFIXES)
+
+
+def split_analysis(analysis: Optional[Dict]) -> Tuple[Dict, Dict[str, str]]:
+    """
+    (analysis without failed sections, {section: error}) for an ai.py result.
+
+    A section with no text at all counts as failed too.
+    """
+    analysis = dict(analysis or {})
+    failures = {}
+    for section, columns in SECTION_COLUMNS.items():
+        value = analysis.get(columns[0])
+        if not value or is_error_text(value):
+            failures[section] = str(value or 'No content generated')[:ERROR_LIMIT]
+            for column in columns:
+                analysis.pop(column, None)
+    return analysis, failures
+
+
+def outcome_rows(entity_type: str, entity_id, failures: Dict[str, str],
+                 ai_version: Optional[str] = None, sections: Iterable[str] = SECTION_COLUMNS) -> List[Tuple]:
+    """Rows for record_outcomes: every section, with its error (or None when it succeeded)"""
+    return [(entity_type, str(entity_id), section, failures.get(section), ai_version) for section in sections]
+
+
+def record_outcomes(rows: List[Tuple], cursor=None) -> int:
+    """
+    Upsert (entity_type, entity_id, section, error_or_None, ai_version) rows.
+
+    Pass a cursor to record inside the caller's transaction.
+    """
+    if not rows:
+        return 0
+    if cursor is None:
+        with get_db_connection() as conn:
+            return record_outcomes(rows, conn.cursor())
+
+    execute_values(cursor, '''
+        INSERT INTO ai_job_status AS j
+            (entity_type, entity_id, section, status, attempts, last_error, ai_version, last_attempt_at, next_retry_at)
+        SELECT v.entity_type, v.entity_id, v.section,
+               CASE WHEN v.error IS NULL THEN 'succeeded' ELSE 'failed' END,
+               1, v.error, v.ai_version, NOW(),
+               CASE WHEN v.error IS NULL THEN NULL ELSE NOW() + make_interval(mins => %s) END
+        FROM (VALUES %%s) AS v(entity_type, entity_id, section, error, ai_version)
+        ON CONFLICT (entity_type, entity_id, section) DO UPDATE SET
+            status = CASE
+                WHEN EXCLUDED.last_error IS NULL THEN 'succeeded'
+                WHEN j.status <> 'succeeded' AND j.attempts + 1 >= %s THEN 'dead'
+                ELSE 'failed' END,
+            attempts = CASE WHEN j.status = 'succeeded' THEN 1 ELSE j.attempts + 1 END,
+            last_error = EXCLUDED.last_error,
+            ai_version = COALESCE(EXCLUDED.ai_version, j.ai_version),
+            last_attempt_at = NOW(),
+            next_retry_at = CASE
+                WHEN EXCLUDED.last_error IS NULL THEN NULL
+                WHEN j.status <> 'succeeded' AND j.attempts + 1 >= %s THEN NULL
+                ELSE NOW() + LEAST(
+                    make_interval(mins => %s * power(2, CASE WHEN j.status = 'succeeded' THEN 0 ELSE j.attempts END)::int),
+                    make_interval(hours => %s))
+                END
+    ''' % (RETRY_BASE_MINUTES, MAX_ATTEMPTS, MAX_ATTEMPTS, RETRY_BASE_MINUTES, RETRY_MAX_HOURS), rows, page_size=max(len(rows), 1))
+    return len(rows)
+
+
+def record_analysis(entity_type: str, entity_id, analysis: Optional[Dict],
+                    ai_version: Optional[str] = None, cursor=None) -> Tuple[Dict, Dict[str, str]]:
+    """split_analysis + record_outcomes for one document; returns the split"""
+    clean, failures = split_analysis(analysis)
+    record_outcomes(outcome_rows(entity_type, entity_id, failures, ai_version), cursor)
+    if failures:
+        logger.warning(f"⚠️ {entity_type} {entity_id}: AI failed for {', '.join(failures)}")
+    return clean, failures
+
+
+def failed_analysis(error) -> Dict:
+    """Fields for a document whose analysis failed outright: no ai_* text, every section failed, queued"""
+    message = (str(error) or type(error).__name__)[:ERROR_LIMIT]
+    return {'ai_failures': {section: message for section in SECTION_COLUMNS}, 'needs_ai_processing': True}
+
+
+def savable_analysis(analysis: Optional[Dict]) -> Dict:
+    """
+    An ai.py result as fields a writer can store.
+
+    Failed sections are dropped and listed under 'ai_failures' for
+    record_outcomes(); if nothing was generated the document is flagged
+    needs_ai_processing for the backfill worker instead.
+    """
+    known = (analysis or {}).get('ai_failures') or {}
+    clean, failures = split_analysis(analysis)
+    # Keep the real error over "No content generated"
+    failures.update((section, error) for section, error in known.items() if section in failures)
+    clean['ai_failures'] = failures
+    if len(failures) == len(SECTION_COLUMNS):
+        clean['needs_ai_processing'] = True
+        clean.pop('ai_version', None)
+    return clean
+
+
+def due_for_retry(entity_type: str, limit: int = 500) -> List[str]:
+    """Documents with at least one failed section whose retry time has come"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT entity_id FROM (
+                SELECT entity_id, MIN(next_retry_at) AS due
+                FROM ai_job_status
+                WHERE entity_type = %s AND status = 'failed' AND next_retry_at <= NOW()
+                GROUP BY entity_id
+            ) d
+            ORDER BY due
+            LIMIT %s
+        ''', (entity_type, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def enqueue_due_retries(limit: int = 500) -> int:
+    """Put state bills with due failed sections back on the needs_ai_processing queue"""
+    ids = [int(i) for i in due_for_retry(STATE_LEGISLATION, limit)]
+    if not ids:
+        return 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE state_legislation SET needs_ai_processing = true
+            WHERE id = ANY(%s) AND needs_ai_processing IS DISTINCT FROM true
+        ''', (ids,))
+        return cursor.rowcount
+
+
+def get_status_summary() -> Dict:
+    """Section counts by entity type and status, plus how many retries are due"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT entity_type, section, status, COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 'failed' AND next_retry_at <= NOW())
+            FROM ai_job_status
+            GROUP BY entity_type, section, status
+        ''')
+        summary: Dict = {}
+        for entity_type, section, status, count, due in cursor.fetchall():
+            entry = summary.setdefault(entity_type, {}).setdefault(section, {'due': 0})
+            entry[status] = count
+            entry['due'] += due
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect AI job status and requeue due retries')
+    parser.add_argument('--enqueue-due', action='store_true', help='Queue state bills whose failed sections are due for retry')
+    parser.add_argument('--limit', type=int, default=500, help='Max bills to queue')
+    args = parser.parse_args()
+
+    for entity_type, sections in get_status_summary().items():
+        print(f"📊 {entity_type}")
+        for section, counts in sections.items():
+            print(f"   {section}: {counts}")
+
+    if args.enqueue_due:
+        print(f"📥 Queued {enqueue_due_retries(args.limit)} bills for AI retry")
+
+
+if __name__ == "__main__":
+    main()
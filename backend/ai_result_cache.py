@@ -0,0 +1,204 @@
+# ai_result_cache.py - Content-addressed cache for AI completions
+"""
+Persistent cache for ai.process_with_ai results.
+
+Entries are keyed by a SHA-256 over the model, prompt type, prompt template
+version, the sampling settings (temperature, max_tokens, ...) and the
+normalized input text, so re-processing a bill whose text
+hasn't changed (status-only updates, re-uploads, retry scripts) is served
+from disk without spending tokens. Editing a prompt or system message
+changes the template version and naturally misses the old entries.
+
+Storage is a local SQLite file (WAL mode, safe across processes); point
+AI_CACHE_PATH at a persistent volume to share it between job runs.
+Entries expire after AI_CACHE_TTL_DAYS and the least recently used ones are
+evicted once the cache holds more than AI_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'ai_results.sqlite3')
+
+# Run eviction every this many writes rather than on each one
+EVICTION_INTERVAL = 100
+
+# Request fields that change what the model returns for the same prompt
+GENERATION_SETTINGS = (
+    "temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty", "stop", "response_format"
+)
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry"""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def template_version(*parts: str) -> str:
+    """Short fingerprint of the prompt template and system message"""
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()[:16]
+
+
+def cache_key(model: str, prompt_type: str, version: str, text: str, request: Dict[str, Any] = None) -> str:
+    """Key for one completion; request is the create() kwargs, of which only GENERATION_SETTINGS count"""
+    settings = {name: (request or {}).get(name) for name in GENERATION_SETTINGS}
+    payload = json.dumps([model, prompt_type, version, settings, normalize_input(text)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AIResultCache:
+    """SQLite-backed result cache with TTL, LRU eviction and hit-rate metrics"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 50000, ttl_days: float = 90):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "errors": 0,
+            "tokens_saved": 0,
+        }
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ai_results (
+                    key TEXT PRIMARY KEY,
+                    prompt_type TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_hit_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_results_last_hit ON ai_results (last_hit_at)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached result for key, or None"""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT result, tokens, created_at FROM ai_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+
+            result, tokens, created_at = row
+            now = time.time()
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM ai_results WHERE key = ?", (key,))
+                self._count("expirations")
+                self._count("misses")
+                return None
+
+            conn.execute(
+                "UPDATE ai_results SET last_hit_at = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._count("hits")
+            self._count("tokens_saved", tokens or 0)
+            return result
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ AI cache read failed: {e}")
+            self._count("errors")
+            return None
+
+    def set(self, key: str, result: str, prompt_type: str, model: str, tokens: int = 0):
+        """Store a successful result"""
+        try:
+            now = time.time()
+            self._conn().execute("""
+                INSERT OR REPLACE INTO ai_results (key, prompt_type, model, result, tokens, created_at, last_hit_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            """, (key, prompt_type, model, result, tokens or 0, now, now))
+            self._count("sets")
+
+            with self._lock:
+                self._writes += 1
+                due = self._writes % EVICTION_INTERVAL == 0
+            if due:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ AI cache write failed: {e}")
+            self._count("errors")
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones past max_entries"""
+        conn = self._conn()
+        removed = 0
+        if self.ttl:
+            expired = conn.execute(
+                "DELETE FROM ai_results WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self._count("expirations", expired)
+            removed += expired
+
+        (entries,) = conn.execute("SELECT COUNT(*) FROM ai_results").fetchone()
+        overflow = entries - self.max_entries
+        if overflow > 0:
+            evicted = conn.execute("""
+                DELETE FROM ai_results WHERE key IN (
+                    SELECT key FROM ai_results ORDER BY last_hit_at ASC LIMIT ?
+                )
+            """, (overflow,)).rowcount
+            self._count("evictions", evicted)
+            removed += evicted
+        return removed
+
+    def clear(self):
+        self._conn().execute("DELETE FROM ai_results")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus on-disk size"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        try:
+            entries, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(result)), 0) FROM ai_results"
+            ).fetchone()
+            stats.update({"entries": entries, "bytes": size})
+        except sqlite3.Error as e:
+            stats["error"] = str(e)
+        stats.update({"path": self.path, "max_entries": self.max_entries})
+        return stats
+
+
+# Global cache instance shared by every AI caller in this process
+ai_result_cache = AIResultCache(
+    path=os.getenv("AI_CACHE_PATH", DEFAULT_CACHE_PATH),
+    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "50000")),
+    ttl_days=float(os.getenv("AI_CACHE_TTL_DAYS", "90"))
+)
+
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
@@ -0,0 +1,502 @@
+# ai_scheduler.py - Shared token-bucket scheduler for Azure OpenAI calls
+"""
+One request scheduler for every AI caller in the process.
+
+Two token buckets track the deployment's tokens-per-minute and
+requests-per-minute quota (AI_TPM_LIMIT / AI_RPM_LIMIT, scaled by
+AI_QUOTA_HEADROOM). A request reserves an estimate up front (prompt size plus
+max_tokens) and is settled against the usage Azure reports, so the budget
+follows real consumption instead of a fixed sleep. A 429 pauses dispatch for
+the Retry-After period.
+
+Waiters are served strictly by priority, then arrival: interactive requests
+(search-and-analyze) go ahead of normal work, which goes ahead of nightly
+backfill. Priority is taken from a context variable, so an endpoint or job
+sets it once with `ai_priority(...)` and every nested AI call inherits it.
+
+Buckets hold about ten seconds of quota, which keeps bursts inside the
+short windows Azure actually enforces.
+
+Two guards sit in front of the buckets:
+
+- A circuit breaker opens when, over the last AI_BREAKER_WINDOW seconds,
+  at least AI_BREAKER_ERROR_RATE of the calls failed (timeouts, connection
+  errors, 5xx) or ran longer than AI_BREAKER_SLOW_SECONDS. While it is open
+  every call fails immediately with AIUnavailableError, so queue workers
+  can hand items back instead of storing "Error generating ..." text. After
+  a cooldown a few trial calls go through (half-open); if they succeed the
+  circuit closes, otherwise it reopens with a longer cooldown.
+- The number of requests in flight is capped by an AIMD limit: each success
+  raises it by 1/limit (about +1 per round trip), each 429 or timeout
+  halves it, down to AI_MIN_CONCURRENCY and up to AI_MAX_CONCURRENCY.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ai_input import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# How often a waiter that isn't at the head of the queue re-checks
+POLL_INTERVAL = 0.05
+
+# Seconds of quota a bucket can hold
+BURST_SECONDS = 10
+
+DEFAULT_RETRY_AFTER = 10.0
+
+# Concurrent failures inside this window count as one congestion signal
+AIMD_DECREASE_INTERVAL = 2.0
+
+
+class AIUnavailableError(RuntimeError):
+    """Raised instead of calling Azure OpenAI while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float, state: str = "open"):
+        super().__init__(f"Azure OpenAI circuit {state}; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.state = state
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKFILL = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("ai_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def ai_priority(priority: Priority):
+    """Run AI calls made inside this block (and tasks it spawns) at the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+def estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    """Reservation for a chat completion: prompt tokens plus the completion cap"""
+    prompt_tokens = sum(count_tokens(str(m.get("content") or "")) for m in kwargs.get("messages") or [])
+    return prompt_tokens + int(kwargs.get("max_tokens") or 1000)
+
+
+def _is_cancellation(error: Optional[BaseException]) -> bool:
+    """The caller gave up (task cancelled, stream closed early); says nothing about the service"""
+    return isinstance(error, (asyncio.CancelledError, GeneratorExit, KeyboardInterrupt))
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or "429" in str(error) or "rate limit" in str(error).lower()
+
+
+def _is_timeout(error: Exception) -> bool:
+    return isinstance(error, asyncio.TimeoutError) or "timeout" in type(error).__name__.lower() or "timed out" in str(error).lower()
+
+
+def _is_service_failure(error: Exception) -> bool:
+    """Errors that say the service is unhealthy (as opposed to a bad request)"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    name = type(error).__name__.lower()
+    return _is_timeout(error) or "connection" in name or any(code in str(error) for code in ("500", "502", "503", "504"))
+
+
+def _retry_after(error: Exception) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return DEFAULT_RETRY_AFTER
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of call outcomes (not thread-safe; the scheduler locks)"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, error_rate: float = 0.5, min_calls: int = 10, window: float = 60.0,
+                 slow_call_seconds: float = 60.0, cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 trial_calls: int = 3):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.slow_call_seconds = slow_call_seconds
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trial_calls = trial_calls
+        self.state = self.CLOSED
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._calls: deque = deque()  # (finished_at, failed, slow)
+        self._trial_in_flight = False
+        self._trial_successes = 0
+
+    def retry_after(self, now: float) -> float:
+        """0 if a call may go out now, otherwise seconds until the next trial"""
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.cooldown - now
+            if remaining > 0:
+                return remaining
+            self.state = self.HALF_OPEN
+            self._trial_successes = 0
+            logger.info("🔌 Azure OpenAI circuit half-open, sending trial requests")
+        if self.state == self.HALF_OPEN and self._trial_in_flight:
+            return 1.0
+        return 0.0
+
+    def on_dispatch(self):
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def on_abandon(self):
+        """A dispatched call ended without an outcome; free the trial slot without counting it"""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record(self, now: float, failed: bool, latency: float):
+        slow = latency > self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+            if failed or slow:
+                self._open(now, min(self.cooldown * 2, self.max_cooldown))
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.trial_calls:
+                self.state = self.CLOSED
+                self.cooldown = self.base_cooldown
+                self._calls.clear()
+                logger.info("✅ Azure OpenAI circuit closed")
+            return
+        if self.state == self.OPEN:
+            return  # stragglers dispatched before the circuit opened
+
+        self._calls.append((now, failed, slow))
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+        if len(self._calls) < self.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._calls if f)
+        slow_calls = sum(1 for _, f, sl in self._calls if sl and not f)
+        if failures / len(self._calls) >= self.error_rate or slow_calls / len(self._calls) >= self.error_rate:
+            self._open(now, self.base_cooldown)
+
+    def _open(self, now: float, cooldown: float):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.cooldown = cooldown
+        self.times_opened += 1
+        self._trial_in_flight = False
+        self._calls.clear()
+        logger.warning(f"🔌 Azure OpenAI circuit open, failing AI calls fast for {cooldown:.0f}s")
+
+    def get_stats(self, now: float) -> Dict[str, Any]:
+        failures = sum(1 for _, f, _ in self._calls if f)
+        slow_calls = sum(1 for _, f, sl in self._calls if sl and not f)
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "window_failures": failures,
+            "window_slow": slow_calls,
+            "times_opened": self.times_opened,
+            "retry_in": round(max(0.0, self.opened_at + self.cooldown - now), 1) if self.state == self.OPEN else 0.0,
+        }
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease cap on requests in flight"""
+
+    def __init__(self, initial: float, minimum: float = 1, maximum: float = 64):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def increase(self):
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def decrease(self, now: float):
+        if now - self._last_decrease >= AIMD_DECREASE_INTERVAL:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._last_decrease = now
+
+
+class AIScheduler:
+    """Priority-ordered TPM/RPM budget shared by async and sync callers"""
+
+    def __init__(self, tpm: int, rpm: int, headroom: float = 0.95,
+                 breaker: Optional[CircuitBreaker] = None, concurrency: Optional[AIMDLimit] = None):
+        self.tpm = tpm
+        self.rpm = rpm
+        self.headroom = headroom
+        self._tokens = _Bucket(tpm * headroom)
+        self._requests = _Bucket(rpm * headroom)
+        self._breaker = breaker or CircuitBreaker()
+        self._concurrency = concurrency or AIMDLimit(initial=32)
+        self._lock = threading.Lock()
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._stats = {
+            "requests": 0,
+            "tokens_reserved": 0,
+            "tokens_used": 0,
+            "rate_limited": 0,
+            "wait_seconds": 0.0,
+            "rejected": 0,
+            "failures": 0,
+            "by_priority": {p.name.lower(): 0 for p in Priority},
+        }
+
+    def _try_acquire(self, ticket: Tuple[int, int], tokens: int) -> float:
+        """0 when granted, seconds to wait when at the head, -1 when others are ahead; raises while the circuit is open"""
+        with self._lock:
+            now = time.monotonic()
+            retry_after = self._breaker.retry_after(now)
+            if retry_after > 0:
+                self._stats["rejected"] += 1
+                raise AIUnavailableError(retry_after, self._breaker.state)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._waiting[0] != ticket:
+                return -1
+            if not self._concurrency.available():
+                return POLL_INTERVAL
+            self._tokens.refill(now)
+            self._requests.refill(now)
+            wait = max(self._tokens.wait_for(tokens), self._requests.wait_for(1))
+            if wait > 0:
+                return wait
+            self._tokens.level -= tokens
+            self._requests.level -= 1
+            self._concurrency.in_flight += 1
+            self._breaker.on_dispatch()
+            heapq.heappop(self._waiting)
+            self._stats["requests"] += 1
+            self._stats["tokens_reserved"] += tokens
+            self._stats["by_priority"][Priority(ticket[0]).name.lower()] += 1
+            return 0.0
+
+    def _enqueue(self, priority: Optional[Priority]) -> Tuple[int, int]:
+        priority = _current_priority.get() if priority is None else priority
+        ticket = (int(priority), next(self._seq))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: Tuple[int, int]):
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def _record_wait(self, started: float):
+        with self._lock:
+            self._stats["wait_seconds"] += time.monotonic() - started
+
+    async def acquire(self, tokens: int, priority: Optional[Priority] = None):
+        """Wait until the budget allows a request of about `tokens` tokens"""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait if wait > 0 else POLL_INTERVAL)
+        finally:
+            self._dequeue(ticket)
+            self._record_wait(started)
+
+    def acquire_sync(self, tokens: int, priority: Optional[Priority] = None):
+        """Blocking acquire for scripts using the synchronous client"""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    return
+                time.sleep(wait if wait > 0 else POLL_INTERVAL)
+        finally:
+            self._dequeue(ticket)
+            self._record_wait(started)
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once the actual usage is known"""
+        with self._lock:
+            self._tokens.level -= used - reserved
+            self._stats["tokens_used"] += used
+
+    def penalize(self, retry_after: float):
+        """Hold all dispatch after a 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._stats["rate_limited"] += 1
+        logger.warning(f"⏳ Azure OpenAI rate limited, pausing AI requests for {retry_after:.1f}s")
+
+    def _release(self, started: float, error: Optional[BaseException] = None):
+        """Free the in-flight slot and feed the outcome to the breaker and the AIMD limit"""
+        with self._lock:
+            now = time.monotonic()
+            self._concurrency.in_flight -= 1
+            if _is_cancellation(error):
+                self._breaker.on_abandon()
+                return
+            if error is None:
+                self._concurrency.increase()
+            elif _is_rate_limit(error) or _is_timeout(error):
+                self._concurrency.decrease(now)
+            failed = error is not None and _is_service_failure(error) and not _is_rate_limit(error)
+            if failed:
+                self._stats["failures"] += 1
+            self._breaker.record(now, failed, now - started)
+
+    def _finish(self, reserved: int, started: float, response=None, error: Optional[BaseException] = None):
+        self._release(started, error)
+        if error is not None:
+            if _is_rate_limit(error):
+                self.penalize(_retry_after(error))
+                self.settle(reserved, 0)
+            return
+        usage = getattr(response, "usage", None)
+        self.settle(reserved, getattr(usage, "total_tokens", None) or reserved)
+
+    async def chat_completion(self, client, priority: Optional[Priority] = None, **kwargs):
+        """client.chat.completions.create(**kwargs) under the shared budget"""
+        reserved = min(estimate_tokens(kwargs), int(self._tokens.capacity))
+        await self.acquire(reserved, priority)
+        started = time.monotonic()
+        try:
+            response = await client.chat.completions.create(**kwargs)
+        except BaseException as e:
+            self._finish(reserved, started, error=e)
+            raise
+        self._finish(reserved, started, response)
+        return response
+
+    async def stream_chat_completion(self, client, priority: Optional[Priority] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Streamed chat completion under the shared budget; yields content deltas.
+
+        Streamed responses carry no usage, so the reservation is settled
+        against the prompt plus the tokens counted in what came back.
+        """
+        reserved = min(estimate_tokens(kwargs), int(self._tokens.capacity))
+        await self.acquire(reserved, priority)
+        started = time.monotonic()
+        received: List[str] = []
+        error: Optional[BaseException] = None
+        try:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    received.append(delta)
+                    yield delta
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if error is not None and not _is_cancellation(error):
+                self._finish(reserved, started, error=error)
+            else:
+                # Completed, or cancelled / closed early by the consumer (client
+                # disconnected): the latter frees the slot without an outcome
+                self._release(started, error)
+                if received:
+                    prompt_tokens = estimate_tokens(kwargs) - int(kwargs.get("max_tokens") or 1000)
+                    self.settle(reserved, prompt_tokens + count_tokens("".join(received)))
+
+    def chat_completion_sync(self, client, priority: Optional[Priority] = None, **kwargs):
+        """Synchronous-client counterpart of chat_completion"""
+        reserved = min(estimate_tokens(kwargs), int(self._tokens.capacity))
+        self.acquire_sync(reserved, priority)
+        started = time.monotonic()
+        try:
+            response = client.chat.completions.create(**kwargs)
+        except BaseException as e:
+            self._finish(reserved, started, error=e)
+            raise
+        self._finish(reserved, started, response)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens.refill(now)
+            self._requests.refill(now)
+            stats = {**self._stats, "by_priority": dict(self._stats["by_priority"])}
+            stats.update({
+                "tpm_limit": self.tpm,
+                "rpm_limit": self.rpm,
+                "headroom": self.headroom,
+                "tokens_available": int(self._tokens.level),
+                "requests_available": round(self._requests.level, 1),
+                "queued": len(self._waiting),
+                "paused_for": round(max(0.0, self._paused_until - now), 1),
+                "concurrency_limit": round(self._concurrency.limit, 2),
+                "in_flight": self._concurrency.in_flight,
+                "circuit": self._breaker.get_stats(now),
+            })
+        stats["wait_seconds"] = round(stats["wait_seconds"], 2)
+        return stats
+
+
+# Global scheduler shared by every AI caller in this process
+ai_scheduler = AIScheduler(
+    tpm=int(os.getenv("AI_TPM_LIMIT", "150000")),
+    rpm=int(os.getenv("AI_RPM_LIMIT", "900")),
+    headroom=float(os.getenv("AI_QUOTA_HEADROOM", "0.95")),
+    breaker=CircuitBreaker(
+        error_rate=float(os.getenv("AI_BREAKER_ERROR_RATE", "0.5")),
+        min_calls=int(os.getenv("AI_BREAKER_MIN_CALLS", "10")),
+        window=float(os.getenv("AI_BREAKER_WINDOW", "60")),
+        slow_call_seconds=float(os.getenv("AI_BREAKER_SLOW_SECONDS", "60")),
+        cooldown=float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+    ),
+    concurrency=AIMDLimit(
+        initial=float(os.getenv("AI_MAX_CONCURRENCY", "32")),
+        minimum=float(os.getenv("AI_MIN_CONCURRENCY", "1")),
+        maximum=float(os.getenv("AI_MAX_CONCURRENCY", "32"))
+    )
+)
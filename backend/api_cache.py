@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+API Response Cache
+Bounded in-memory LRU cache for API responses with per-entry TTLs,
+size accounting, single-flight loading for concurrent misses and
+tag-based invalidation for write paths
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate in-memory cost of a cached response (its JSON length)"""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+def cache_tag(table: str, field: str = None, value: Any = None) -> str:
+    """
+    Build an invalidation tag.
+
+    cache_tag("executive_orders")                    -> every cached executive order response
+    cache_tag("executive_orders", "category", "civic") -> responses filtered by / containing civic
+    cache_tag("state_legislation", "state", "TX")      -> responses for Texas bills
+    """
+    if field is None:
+        return table
+    return f"{table}:{field}:{value}"
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Set[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class APICache:
+    """Thread-safe LRU cache for API responses"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024, default_ttl: int = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl  # 5 minutes default
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._tag_index: Dict[str, Set[str]] = {}
+        # Sequence number (and time) of the latest invalidation per tag, so a
+        # load that started before an invalidation doesn't cache what it read.
+        # Kept in invalidation order and pruned once older than the longest
+        # TTL in use; loads that started before the pruned point, or before a
+        # clear(), are not cached at all
+        self._invalidation_seq = 0
+        self._tag_invalidated_at: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._stale_before_seq = 0
+        self._max_ttl = default_ttl
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+        }
+
+    def get_key(self, endpoint: str, params: dict) -> str:
+        """Generate a unique cache key from endpoint and params"""
+        param_str = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _lookup(self, key: str) -> Optional[_CacheEntry]:
+        """Return a live entry and mark it recently used (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones, until within bounds"""
+        if len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._remove(key)
+            self._stats["expirations"] += 1
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats["evictions"] += 1
+
+    def get(self, endpoint: str, params: dict) -> Optional[Any]:
+        """Get cached value if not expired"""
+        key = self.get_key(endpoint, params)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        logger.debug(f"📦 Cache hit for {endpoint}")
+        return entry.value
+
+    def set(
+        self,
+        endpoint: str,
+        params: dict,
+        value: Any,
+        ttl: int = None,
+        tags: Iterable[str] = None,
+        since_seq: int = None
+    ) -> None:
+        """Cache a value with TTL and optional invalidation tags"""
+        key = self.get_key(endpoint, params)
+        ttl = self.default_ttl if ttl is None else ttl
+        tags = set(tags or ())
+        size = _estimate_size(value)
+
+        if size > self.max_bytes:
+            logger.debug(f"📦 Response for {endpoint} too large to cache ({size} bytes)")
+            return
+
+        with self._lock:
+            if since_seq is not None and self._invalidated_since(tags, since_seq):
+                logger.debug(f"📦 Skipped caching {endpoint}: invalidated while loading")
+                return
+            self._max_ttl = max(self._max_ttl, ttl)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, time.monotonic() + ttl, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            self._stats["sets"] += 1
+            self._evict()
+        logger.debug(f"📦 Cached response for {endpoint} (ttl={ttl}s, {size} bytes)")
+
+    def _invalidated_since(self, tags: Set[str], since_seq: int) -> bool:
+        """Whether a load that started at since_seq may have read invalidated data (caller holds the lock)"""
+        if since_seq < self._stale_before_seq:
+            return True
+        return any(self._tag_invalidated_at.get(tag, (0, 0.0))[0] > since_seq for tag in tags)
+
+    def _prune_invalidations(self, now: float) -> None:
+        """Forget tag invalidations older than the longest TTL (caller holds the lock)"""
+        horizon = now - self._max_ttl
+        while self._tag_invalidated_at:
+            tag, (seq, invalidated_at) = next(iter(self._tag_invalidated_at.items()))
+            if invalidated_at > horizon:
+                break
+            del self._tag_invalidated_at[tag]
+            # A load older than this invalidation can no longer be checked
+            # against it, so treat every such load as stale
+            self._stale_before_seq = max(self._stale_before_seq, seq)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry carrying any of the given tags; returns the number removed"""
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            self._invalidation_seq += 1
+            self._prune_invalidations(now)
+            for tag in tags:
+                self._tag_invalidated_at.pop(tag, None)
+                self._tag_invalidated_at[tag] = (self._invalidation_seq, now)
+                for key in list(self._tag_index.get(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+            self._stats["invalidations"] += removed
+        logger.debug(f"📦 Invalidated {removed} cached responses for tags {tags}")
+        return removed
+
+    async def get_or_load(
+        self,
+        endpoint: str,
+        params: dict,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = None,
+        cache_if: Callable[[Any], bool] = None,
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = None
+    ) -> Any:
+        """
+        Return the cached value or await loader() to produce it.
+
+        Concurrent misses for the same key share a single loader call, so a
+        cold cache sends one query instead of one per waiting request. The
+        load runs in its own task that every caller awaits through
+        asyncio.shield, so cancelling one caller (including the one that
+        started it) doesn't cancel the load for the others.
+        cache_if decides whether a loaded value is stored (e.g. skip errors).
+        tags may be a list or a callable that derives tags from the loaded value.
+        """
+        cached = self.get(endpoint, params)
+        if cached is not None:
+            return cached
+
+        key = self.get_key(endpoint, params)
+        task = self._inflight.get(key)
+        if task is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+        else:
+            with self._lock:
+                started_seq = self._invalidation_seq
+            task = asyncio.ensure_future(
+                self._load(endpoint, params, loader, ttl, cache_if, tags, started_seq)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, endpoint, params, loader, ttl, cache_if, tags, started_seq) -> Any:
+        value = await loader()
+        if cache_if is None or cache_if(value):
+            entry_tags = tags(value) if callable(tags) else tags
+            self.set(endpoint, params, value, ttl, tags=entry_tags, since_seq=started_seq)
+        return value
+
+    def _load_finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark a failure as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self) -> None:
+        """Clear all cache"""
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._bytes = 0
+            # Loads already in flight read data from before the clear
+            self._invalidation_seq += 1
+            self._stale_before_seq = self._invalidation_seq
+            self._tag_invalidated_at.clear()
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns the number removed"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._entries),
+                "tags": len(self._tag_index),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "inflight": len(self._inflight),
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Global cache instance shared by the API and its write paths
+api_cache = APICache(
+    max_entries=int(os.getenv("API_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("API_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    default_ttl=int(os.getenv("API_CACHE_TTL", "300"))
+)
@@ -0,0 +1,123 @@
+# async_db.py - asyncio-native Supabase PostgreSQL access for FastAPI handlers
+"""
+Async counterpart of database_config.get_db_connection / executive_orders_db.get_db_cursor.
+
+Uses psycopg 3's AsyncConnectionPool so `async def` endpoints await their
+queries instead of blocking the event loop on psycopg2. SQL keeps the same
+%s placeholders as the sync code, so queries can be shared between both paths.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from database_config import get_connect_kwargs
+
+logger = logging.getLogger(__name__)
+
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_pool_lock = asyncio.Lock()
+
+
+def _conninfo() -> str:
+    kwargs = get_connect_kwargs()
+    # psycopg 3 spells the database keyword "dbname"
+    kwargs['dbname'] = kwargs.pop('database')
+    return make_conninfo(**kwargs)
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """Process-wide async pool, opened lazily on first use"""
+    global _async_pool
+
+    if _async_pool is not None:
+        return _async_pool
+
+    async with _async_pool_lock:
+        if _async_pool is None:
+            pool = AsyncConnectionPool(
+                conninfo=_conninfo(),
+                min_size=int(os.getenv('ASYNC_DB_POOL_MIN', '1')),
+                max_size=int(os.getenv('ASYNC_DB_POOL_MAX', '10')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                max_idle=float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+                max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            await pool.open()
+            _async_pool = pool
+            logger.info("✅ Async database pool opened")
+    return _async_pool
+
+
+async def close_async_pool():
+    """Close the async pool (called from the FastAPI lifespan)"""
+    global _async_pool
+
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+        logger.info("Async database pool closed")
+
+
+def get_async_pool_stats() -> Dict[str, Any]:
+    """Async pool statistics"""
+    if _async_pool is None:
+        return {"error": "Async pool not initialized"}
+    return _async_pool.get_stats()
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """Async connection context manager: commit on success, rollback on error"""
+    pool = await get_async_pool()
+    try:
+        async with pool.connection() as conn:
+            yield conn
+    except Exception as e:
+        logger.error(f"❌ Async database error: {e}")
+        raise
+
+
+@asynccontextmanager
+async def async_db_cursor(as_dict: bool = False):
+    """Async cursor context manager; as_dict=True yields rows as dicts"""
+    async with async_db_connection() as conn:
+        async with conn.cursor(row_factory=dict_row if as_dict else None) as cursor:
+            yield cursor
+
+
+async def fetch_all(query: str, params: Optional[Sequence] = None) -> List[Dict[str, Any]]:
+    """Run a query and return every row as a dict"""
+    async with async_db_cursor(as_dict=True) as cursor:
+        await cursor.execute(query, params)
+        return await cursor.fetchall()
+
+
+async def fetch_one(query: str, params: Optional[Sequence] = None) -> Optional[Dict[str, Any]]:
+    """Run a query and return the first row as a dict (or None)"""
+    async with async_db_cursor(as_dict=True) as cursor:
+        await cursor.execute(query, params)
+        return await cursor.fetchone()
+
+
+async def fetch_value(query: str, params: Optional[Sequence] = None, default: Any = None) -> Any:
+    """Run a query and return the first column of the first row"""
+    async with async_db_cursor() as cursor:
+        await cursor.execute(query, params)
+        row = await cursor.fetchone()
+        return row[0] if row else default
+
+
+async def execute(query: str, params: Optional[Sequence] = None) -> int:
+    """Run a write statement and return the affected row count"""
+    async with async_db_cursor() as cursor:
+        await cursor.execute(query, params)
+        return cursor.rowcount
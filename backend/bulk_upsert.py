@@ -0,0 +1,329 @@
+# bulk_upsert.py - Set-based upserts for bill tables
+"""
+Batched INSERT ... ON CONFLICT for state_legislation (and the legacy
+legislation table).
+
+Each chunk of rows is staged into a temp table (execute_values, or COPY
+FROM STDIN for large loads) and merged into the target in a single statement, so a 5,000-bill session load
+is a handful of round-trips instead of 5,000. Every chunk runs under its
+own savepoint: if the merge fails, the chunk is bisected until the bad
+rows are isolated, and those rows come back in BulkUpsertResult.failed
+while the rest of the chunk is still written.
+
+Rows whose update columns are unchanged are skipped rather than rewritten,
+which keeps re-syncs from churning tuples and firing the counter triggers.
+"""
+
+import io
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from psycopg2.extras import execute_values
+
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+STATE_ABBREVIATIONS = {
+    'Texas': 'TX', 'California': 'CA', 'Colorado': 'CO',
+    'Florida': 'FL', 'Kentucky': 'KY', 'Nevada': 'NV',
+    'South Carolina': 'SC'
+}
+
+# Columns written by save_bills_to_state_legislation_table
+STATE_LEGISLATION_COLUMNS = [
+    'bill_id', 'bill_number', 'title', 'description', 'state', 'state_abbr',
+    'status', 'category', 'introduced_date', 'last_action_date', 'session_id',
+    'session_name', 'bill_type', 'body', 'legiscan_url', 'pdf_url',
+    'ai_summary', 'ai_executive_summary', 'ai_talking_points', 'ai_key_points',
+    'ai_business_impact', 'ai_potential_impact', 'ai_version', 'legiscan_status',
+    'created_at', 'last_updated'
+]
+
+
+@dataclass
+class RowError:
+    """A row the database rejected, identified by its key columns"""
+    key: Dict[str, Any]
+    error: str
+
+
+@dataclass
+class BulkUpsertResult:
+    """Outcome of a bulk_upsert() call"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: List[RowError] = field(default_factory=list)
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def saved(self) -> int:
+        """Rows now matching the input (inserted, updated or already identical)"""
+        return self.inserted + self.updated + self.unchanged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": len(self.failed),
+            "chunks": self.chunks,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _copy_field(value: Any) -> str:
+    """Render one value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_buffer(rows: Sequence[tuple]) -> io.StringIO:
+    """Serialize tuples into a COPY ... FROM STDIN (text format) buffer"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_field(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+class _Upserter:
+    """Stages and merges chunks for one bulk_upsert() call"""
+
+    def __init__(
+        self,
+        cursor,
+        table: str,
+        columns: Sequence[str],
+        key_columns: Sequence[str],
+        update_columns: Sequence[str],
+        compare_columns: Sequence[str],
+        use_copy: bool = False
+    ):
+        self.cursor = cursor
+        self.use_copy = use_copy
+        self.columns = list(columns)
+        self.key_columns = list(key_columns)
+        self.stage = _quote(f"_bulk_stage_{table}")
+
+        col_list = ", ".join(_quote(c) for c in self.columns)
+        key_list = ", ".join(_quote(c) for c in self.key_columns)
+        target = _quote(table)
+
+        # Staging columns copy the target's types but none of its
+        # constraints, so bad rows fail in the merge where we can bisect
+        self.create_sql = f"""
+            DROP TABLE IF EXISTS {self.stage};
+            CREATE TEMP TABLE {self.stage} ON COMMIT DROP AS
+            SELECT {col_list}, 0 AS _ord FROM {target} WITH NO DATA
+        """
+        self.stage_sql = f"INSERT INTO {self.stage} ({col_list}, _ord) VALUES %s"
+        self.copy_sql = f"COPY {self.stage} ({col_list}, _ord) FROM STDIN"
+
+        if update_columns:
+            assignments = ", ".join(f"{_quote(c)} = EXCLUDED.{_quote(c)}" for c in update_columns)
+            conflict_action = f"DO UPDATE SET {assignments}"
+            if compare_columns:
+                current = ", ".join(f"{target}.{_quote(c)}" for c in compare_columns)
+                incoming = ", ".join(f"EXCLUDED.{_quote(c)}" for c in compare_columns)
+                conflict_action += f" WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        else:
+            conflict_action = "DO NOTHING"
+
+        # DISTINCT ON keeps the last occurrence of a key: ON CONFLICT can't
+        # touch the same row twice in one statement
+        self.merge_sql = f"""
+            INSERT INTO {target} ({col_list})
+            SELECT DISTINCT ON ({key_list}) {col_list}
+            FROM {self.stage}
+            ORDER BY {key_list}, _ord DESC
+            ON CONFLICT ({key_list}) {conflict_action}
+            RETURNING (xmax = 0) AS inserted
+        """
+
+    def prepare(self):
+        self.cursor.execute(self.create_sql)
+
+    def _merge(self, rows: List[tuple], result: BulkUpsertResult):
+        cursor = self.cursor
+        cursor.execute(f"TRUNCATE {self.stage}")
+        staged = [row + (ordinal,) for ordinal, row in enumerate(rows)]
+        if self.use_copy:
+            cursor.copy_expert(self.copy_sql, copy_buffer(staged))
+        else:
+            execute_values(cursor, self.stage_sql, staged, page_size=len(rows))
+        cursor.execute(self.merge_sql)
+        outcomes = [row[0] for row in cursor.fetchall()]
+
+        distinct = len({tuple(row[self.columns.index(k)] for k in self.key_columns) for row in rows})
+        inserted = sum(1 for was_insert in outcomes if was_insert)
+        result.inserted += inserted
+        result.updated += len(outcomes) - inserted
+        result.unchanged += distinct - len(outcomes)
+
+    def upsert(self, rows: List[tuple], result: BulkUpsertResult):
+        """Merge rows under a savepoint, bisecting on failure"""
+        cursor = self.cursor
+        cursor.execute("SAVEPOINT bulk_upsert_chunk")
+        try:
+            self._merge(rows, result)
+            cursor.execute("RELEASE SAVEPOINT bulk_upsert_chunk")
+            return
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_upsert_chunk")
+            cursor.execute("RELEASE SAVEPOINT bulk_upsert_chunk")
+            if len(rows) == 1:
+                key = {k: rows[0][self.columns.index(k)] for k in self.key_columns}
+                result.failed.append(RowError(key=key, error=str(e).strip()))
+                logger.warning(f"⚠️ Rejected row {key}: {str(e).strip()}")
+                return
+
+        middle = len(rows) // 2
+        self.upsert(rows[:middle], result)
+        self.upsert(rows[middle:], result)
+
+
+def bulk_upsert(
+    conn,
+    table: str,
+    rows: Sequence[Dict[str, Any]],
+    columns: Sequence[str],
+    key_columns: Sequence[str] = ('bill_id',),
+    update_columns: Optional[Sequence[str]] = None,
+    compare_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_copy: bool = False
+) -> BulkUpsertResult:
+    """
+    Upsert dict rows into `table` in chunks of `chunk_size`.
+
+    update_columns defaults to every non-key column; columns left out of it
+    (e.g. created_at) are only written on insert. An existing row is only
+    rewritten when one of compare_columns differs (defaults to
+    update_columns minus last_updated); pass compare_columns=[] to always
+    rewrite. use_copy stages with COPY FROM STDIN, which pays off for
+    chunks of thousands of rows. Runs inside the caller's transaction
+    (which must not be in autocommit mode) and does not commit.
+    """
+    started = time.monotonic()
+    result = BulkUpsertResult()
+    if not rows:
+        return result
+
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in key_columns]
+    if compare_columns is None:
+        compare_columns = [c for c in update_columns if c != 'last_updated']
+
+    cursor = conn.cursor()
+    try:
+        upserter = _Upserter(cursor, table, columns, key_columns, update_columns, compare_columns, use_copy)
+        upserter.prepare()
+
+        values = [tuple(row.get(c) for c in columns) for row in rows]
+        for start in range(0, len(values), chunk_size):
+            upserter.upsert(values[start:start + chunk_size], result)
+            result.chunks += 1
+    finally:
+        cursor.close()
+
+    result.elapsed = time.monotonic() - started
+    logger.info(
+        f"📦 Bulk upsert into {table}: {result.inserted} inserted, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {len(result.failed)} failed "
+        f"({result.chunks} chunks, {result.elapsed:.2f}s)"
+    )
+    return result
+
+
+def normalize_state(bill: Dict[str, Any]) -> str:
+    """Standardize a bill's state to its abbreviation"""
+    state_name = bill.get('state', '')
+    if state_name in STATE_ABBREVIATIONS:
+        return STATE_ABBREVIATIONS[state_name]
+    return bill.get('state_abbr') or state_name
+
+
+def state_legislation_row(bill: Dict[str, Any], timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Map a bill dict onto state_legislation columns"""
+    timestamp = timestamp or datetime.now().isoformat()
+    state = normalize_state(bill)
+    return {
+        'bill_id': str(bill.get('bill_id', '')),
+        'bill_number': bill.get('bill_number', ''),
+        'title': bill.get('title', ''),
+        'description': bill.get('description', ''),
+        'state': state,
+        'state_abbr': state,
+        'status': bill.get('status', ''),
+        'category': bill.get('category', 'not-applicable'),
+        'introduced_date': bill.get('introduced_date', ''),
+        'last_action_date': bill.get('last_action_date', ''),
+        'session_id': str(bill.get('session_id', '')),
+        'session_name': bill.get('session_name', ''),
+        'bill_type': bill.get('bill_type', ''),
+        'body': bill.get('body', ''),
+        'legiscan_url': bill.get('legiscan_url', ''),
+        'pdf_url': bill.get('pdf_url', ''),
+        'ai_summary': bill.get('ai_summary', ''),
+        'ai_executive_summary': bill.get('ai_executive_summary', ''),
+        'ai_talking_points': bill.get('ai_talking_points', ''),
+        'ai_key_points': bill.get('ai_key_points', ''),
+        'ai_business_impact': bill.get('ai_business_impact', ''),
+        'ai_potential_impact': bill.get('ai_potential_impact', ''),
+        'ai_version': bill.get('ai_version', ''),
+        'legiscan_status': bill.get('legiscan_status', ''),
+        'created_at': timestamp,
+        'last_updated': timestamp,
+    }
+
+
+def upsert_state_legislation(
+    rows: Sequence[Dict[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_copy: bool = False,
+    conn=None
+) -> BulkUpsertResult:
+    """
+    Common write path for state_legislation.
+
+    rows are already-mapped column dicts (see state_legislation_row()).
+    created_at is never overwritten. Commits when it opens its own
+    connection; with `conn` the caller owns the transaction.
+    """
+    columns = list(columns or STATE_LEGISLATION_COLUMNS)
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in ('bill_id', 'created_at')]
+
+    if conn is not None:
+        return bulk_upsert(conn, 'state_legislation', rows, columns,
+                           update_columns=update_columns, chunk_size=chunk_size, use_copy=use_copy)
+
+    with get_db_connection() as own_conn:
+        return bulk_upsert(own_conn, 'state_legislation', rows, columns,
+                           update_columns=update_columns, chunk_size=chunk_size, use_copy=use_copy)
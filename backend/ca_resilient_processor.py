@@ -6,6 +6,7 @@ import asyncio
 import time
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 async def process_single_bill_with_retry(bill_data, max_retries=3):
     """Process a single bill with database retry logic"""
@@ -210,4 +211,5 @@ async def main():
     print(f"\n🏁 Completed {total_processed} bills in {iterations} iterations")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
\ No newline at end of file
@@ -6,6 +6,7 @@ import asyncio
 import time
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 async def process_single_bill(bill_data):
     """Process a single bill with error handling"""
@@ -128,8 +129,6 @@ async def process_batch():
             success = await process_single_bill(bill)
             if success:
                 processed += 1
-            # Small delay between bills
-            await asyncio.sleep(2)
         
         print(f"✅ Batch complete: {processed}/{len(bills)} processed")
         return processed
@@ -177,4 +176,5 @@ async def main():
     print(f"\n🏁 Completed {total_processed} bills in {iterations} iterations")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
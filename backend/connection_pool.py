@@ -1,237 +1,388 @@
 """
 Database Connection Pool Implementation
-Optimizes database connections for better performance
+Keeps warm Supabase PostgreSQL connections so API requests don't pay a
+TCP + TLS handshake on every query
 """
 
-import pyodbc
+import os
 import threading
 import time
 import logging
-from queue import Queue, Empty
-from typing import Optional
-import os
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions
 
 logger = logging.getLogger(__name__)
 
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available within pool_timeout"""
+
+
 @dataclass
 class ConnectionPoolConfig:
     """Configuration for database connection pool"""
     max_connections: int = 10
-    min_connections: int = 2
-    connection_timeout: int = 30
-    max_retries: int = 3
-    retry_delay: float = 1.0
-    pool_timeout: int = 10
-    
-class DatabaseConnection:
-    """Wrapper for database connection with metadata"""
-    def __init__(self, connection, pool):
+    min_connections: int = 0
+    pool_timeout: float = 10.0           # seconds to wait for a free connection
+    max_idle_time: float = 300.0         # close connections idle longer than this
+    max_lifetime: float = 1800.0         # recycle connections older than this
+    health_check_interval: float = 30.0  # ping connections idle longer than this
+
+    @classmethod
+    def from_env(cls) -> "ConnectionPoolConfig":
+        """Build config from DB_POOL_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv('DB_POOL_MAX', defaults.max_connections)),
+            min_connections=int(os.getenv('DB_POOL_MIN', defaults.min_connections)),
+            pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', defaults.pool_timeout)),
+            max_idle_time=float(os.getenv('DB_POOL_MAX_IDLE', defaults.max_idle_time)),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', defaults.max_lifetime)),
+            health_check_interval=float(os.getenv('DB_POOL_HEALTH_CHECK', defaults.health_check_interval)),
+        )
+
+
+class PooledConnection:
+    """Wrapper for a raw connection with pool metadata"""
+
+    def __init__(self, connection):
         self.connection = connection
-        self.pool = pool
-        self.created_at = time.time()
-        self.last_used = time.time()
-        self.in_use = False
-        self.transaction_count = 0
-    
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+
+class ConnectionProxy:
+    """
+    Connection handed out by get_raw_connection().
+
+    Behaves like a psycopg2 connection, but close() hands the connection back
+    to the pool instead of tearing down the socket. Callers that forget to
+    close are covered by __del__.
+    """
+
+    def __init__(self, pool: "DatabaseConnectionPool", pooled: PooledConnection):
+        self._pool = pool
+        self._pooled = pooled
+
+    def __getattr__(self, name):
+        pooled = self.__dict__.get('_pooled')
+        if pooled is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(pooled.connection, name)
+
+    def __setattr__(self, name, value):
+        if name in ('_pool', '_pooled'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._pooled.connection, name, value)
+
     def __enter__(self):
-        self.in_use = True
-        self.last_used = time.time()
-        return self.connection
-    
+        return self
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.in_use = False
-        self.transaction_count += 1
-        # Return connection to pool
-        self.pool._return_connection(self)
+        self.close()
+
+    @property
+    def closed(self):
+        pooled = self.__dict__.get('_pooled')
+        return 1 if pooled is None else pooled.connection.closed
+
+    def close(self):
+        pooled = self.__dict__.get('_pooled')
+        if pooled is not None:
+            object.__setattr__(self, '_pooled', None)
+            self._pool.release(pooled)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
 
 class DatabaseConnectionPool:
-    """Thread-safe database connection pool"""
-    
-    def __init__(self, connection_string: str, config: ConnectionPoolConfig = None):
-        self.connection_string = connection_string
+    """Thread-safe, bounded PostgreSQL connection pool"""
+
+    def __init__(self, connect_kwargs: Dict, config: ConnectionPoolConfig = None):
+        self.connect_kwargs = dict(connect_kwargs)
         self.config = config or ConnectionPoolConfig()
-        self._pool = Queue(maxsize=self.config.max_connections)
-        self._active_connections = set()
+        self._idle = deque()
         self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
         self._total_connections = 0
+        self._in_use = 0
         self._closed = False
-        
-        # Initialize minimum connections
-        self._initialize_pool()
-        
-        logger.info(f"Database connection pool initialized with {self.config.min_connections} connections")
-    
-    def _create_connection(self) -> pyodbc.Connection:
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "timeouts": 0,
+            "creations": 0,
+            "closures": 0,
+            "health_check_failures": 0,
+            "expired_idle": 0,
+            "expired_lifetime": 0,
+        }
+
+        for _ in range(self.config.min_connections):
+            try:
+                pooled = self._create_connection()
+                with self._lock:
+                    self._idle.append(pooled)
+                    self._total_connections += 1
+            except Exception as e:
+                logger.error(f"Failed to initialize connection: {e}")
+                break
+
+        logger.info(f"Database connection pool initialized (max {self.config.max_connections} connections)")
+
+    def _create_connection(self) -> PooledConnection:
         """Create a new database connection"""
-        try:
-            connection = pyodbc.connect(
-                self.connection_string,
-                timeout=self.config.connection_timeout,
-                autocommit=True
-            )
-            logger.debug("Created new database connection")
-            return connection
-        except Exception as e:
-            logger.error(f"Failed to create database connection: {e}")
-            raise
-    
-    def _initialize_pool(self):
-        """Initialize the pool with minimum connections"""
+        connection = psycopg2.connect(**self.connect_kwargs)
+        connection.autocommit = False
         with self._lock:
-            for _ in range(self.config.min_connections):
-                try:
-                    conn = self._create_connection()
-                    wrapped_conn = DatabaseConnection(conn, self)
-                    self._pool.put(wrapped_conn, block=False)
-                    self._total_connections += 1
-                except Exception as e:
-                    logger.error(f"Failed to initialize connection: {e}")
-                    break
-    
-    def get_connection(self) -> DatabaseConnection:
-        """Get a connection from the pool"""
-        if self._closed:
-            raise RuntimeError("Connection pool is closed")
-        
-        # Try to get an existing connection
+            self._metrics["creations"] += 1
+        logger.debug("Created new database connection")
+        return PooledConnection(connection)
+
+    def _close_raw(self, pooled: PooledConnection):
         try:
-            wrapped_conn = self._pool.get(timeout=self.config.pool_timeout)
-            
-            # Test connection validity
-            try:
-                wrapped_conn.connection.execute("SELECT 1")
-                with self._lock:
-                    self._active_connections.add(wrapped_conn)
-                return wrapped_conn
-            except Exception:
-                # Connection is invalid, close it and create a new one
-                logger.warning("Invalid connection found in pool, creating new one")
-                self._close_connection(wrapped_conn)
-                
-        except Empty:
-            # Pool is empty or timeout occurred
+            pooled.connection.close()
+        except Exception:
             pass
-        
-        # Create new connection if pool allows
-        with self._lock:
-            if self._total_connections < self.config.max_connections:
-                try:
-                    conn = self._create_connection()
-                    wrapped_conn = DatabaseConnection(conn, self)
+
+    def _is_expired(self, pooled: PooledConnection) -> Optional[str]:
+        if pooled.connection.closed:
+            return "closed"
+        if self.config.max_lifetime and pooled.age > self.config.max_lifetime:
+            return "expired_lifetime"
+        if self.config.max_idle_time and pooled.idle_for > self.config.max_idle_time:
+            return "expired_idle"
+        return None
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        """Ping connections that have been idle past the health check interval"""
+        if pooled.idle_for < self.config.health_check_interval:
+            return True
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            pooled.connection.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            with self._lock:
+                self._metrics["health_check_failures"] += 1
+            return False
+
+    def get_connection(self) -> PooledConnection:
+        """Check a connection out of the pool, waiting up to pool_timeout"""
+        deadline = time.monotonic() + self.config.pool_timeout
+        waited = False
+        wait_started = None
+
+        while True:
+            pooled = None
+            create = False
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                if self._idle:
+                    pooled = self._idle.pop()  # LIFO keeps the hot connections hot
+                    self._in_use += 1
+                elif self._total_connections < self.config.max_connections:
                     self._total_connections += 1
-                    self._active_connections.add(wrapped_conn)
-                    logger.debug(f"Created new connection (total: {self._total_connections})")
-                    return wrapped_conn
-                except Exception as e:
-                    logger.error(f"Failed to create new connection: {e}")
+                    self._in_use += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Unable to get database connection within {self.config.pool_timeout} seconds"
+                        )
+                    if not waited:
+                        waited = True
+                        wait_started = time.monotonic()
+                        self._metrics["waits"] += 1
+                    self._available.wait(remaining)
+                    continue
+
+            if create:
+                try:
+                    pooled = self._create_connection()
+                except Exception:
+                    with self._lock:
+                        self._total_connections -= 1
+                        self._in_use -= 1
+                        self._available.notify()
                     raise
-        
-        raise RuntimeError(f"Unable to get database connection within {self.config.pool_timeout} seconds")
-    
-    def _return_connection(self, wrapped_conn: DatabaseConnection):
-        """Return a connection to the pool"""
-        if self._closed:
-            self._close_connection(wrapped_conn)
+            else:
+                reason = self._is_expired(pooled)
+                if reason or not self._is_healthy(pooled):
+                    self._discard(pooled, reason)
+                    continue
+
+            with self._lock:
+                self._metrics["checkouts"] += 1
+                if waited:
+                    self._metrics["wait_time_total"] += time.monotonic() - wait_started
+            pooled.last_used = time.monotonic()
+            return pooled
+
+    def _discard(self, pooled: PooledConnection, reason: Optional[str] = None):
+        """Close a checked-out connection and free its slot"""
+        self._close_raw(pooled)
+        with self._lock:
+            self._total_connections -= 1
+            self._in_use -= 1
+            self._metrics["closures"] += 1
+            if reason in ("expired_idle", "expired_lifetime"):
+                self._metrics[reason] += 1
+            self._available.notify()
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        """Return a checked-out connection to the pool"""
+        conn = pooled.connection
+        if not discard and not self._closed and not conn.closed:
+            try:
+                # Never hand the next caller an open transaction or a
+                # connection someone switched into autocommit
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._discard(pooled)
             return
-        
+
+        pooled.last_used = time.monotonic()
         with self._lock:
-            self._active_connections.discard(wrapped_conn)
-        
-        # Test connection before returning to pool
-        try:
-            wrapped_conn.connection.execute("SELECT 1")
-            self._pool.put(wrapped_conn, block=False)
-        except Exception:
-            logger.warning("Connection failed health check, closing")
-            self._close_connection(wrapped_conn)
-        except Exception:
-            # Pool is full, close connection
-            logger.debug("Pool full, closing excess connection")
-            self._close_connection(wrapped_conn)
-    
-    def _close_connection(self, wrapped_conn: DatabaseConnection):
-        """Close a database connection"""
+            self._in_use -= 1
+            self._idle.append(pooled)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """Connection context manager: commit on success, rollback on error"""
+        pooled = self.get_connection()
+        conn = pooled.connection
+        broken = False
         try:
-            wrapped_conn.connection.close()
+            yield conn
+            if not conn.closed:
+                conn.commit()
         except Exception:
-            pass
-        
-        with self._lock:
-            self._total_connections -= 1
-            self._active_connections.discard(wrapped_conn)
-    
+            try:
+                if not conn.closed:
+                    conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.release(pooled, discard=broken)
+
+    def get_raw_connection(self) -> ConnectionProxy:
+        """Check out a connection that is returned to the pool on close()"""
+        return ConnectionProxy(self, self.get_connection())
+
     def close_all(self):
-        """Close all connections in the pool"""
-        self._closed = True
-        
-        # Close active connections
+        """Close all idle connections and refuse new checkouts"""
         with self._lock:
-            for wrapped_conn in list(self._active_connections):
-                self._close_connection(wrapped_conn)
-        
-        # Close pooled connections
-        while not self._pool.empty():
-            try:
-                wrapped_conn = self._pool.get_nowait()
-                self._close_connection(wrapped_conn)
-            except Empty:
-                break
-        
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total_connections -= len(idle)
+            self._metrics["closures"] += len(idle)
+            self._available.notify_all()
+        for pooled in idle:
+            self._close_raw(pooled)
         logger.info("All database connections closed")
-    
+
     def get_stats(self) -> dict:
         """Get connection pool statistics"""
         with self._lock:
-            return {
+            stats = dict(self._metrics)
+            stats.update({
                 "total_connections": self._total_connections,
-                "active_connections": len(self._active_connections),
-                "pooled_connections": self._pool.qsize(),
+                "active_connections": self._in_use,
+                "pooled_connections": len(self._idle),
                 "max_connections": self.config.max_connections,
-                "pool_closed": self._closed
-            }
+                "pool_closed": self._closed,
+            })
+        stats["wait_time_total"] = round(stats["wait_time_total"], 4)
+        return stats
+
 
 # Global connection pool instance
 _connection_pool: Optional[DatabaseConnectionPool] = None
 _pool_lock = threading.Lock()
 
-def initialize_connection_pool(connection_string: str = None, config: ConnectionPoolConfig = None):
-    """Initialize the global connection pool"""
+
+def initialize_connection_pool(connect_kwargs: Dict, config: ConnectionPoolConfig = None) -> DatabaseConnectionPool:
+    """Initialize (or replace) the global connection pool"""
     global _connection_pool
-    
-    if connection_string is None:
-        # Get from environment or use default
-        connection_string = os.getenv('DATABASE_CONNECTION_STRING')
-        if not connection_string:
-            raise ValueError("Database connection string not provided")
-    
+
     with _pool_lock:
         if _connection_pool is not None:
             _connection_pool.close_all()
-        
-        _connection_pool = DatabaseConnectionPool(connection_string, config)
+
+        _connection_pool = DatabaseConnectionPool(connect_kwargs, config or ConnectionPoolConfig.from_env())
         logger.info("Global database connection pool initialized")
+        return _connection_pool
+
+
+def get_connection_pool(connect_kwargs: Dict = None) -> DatabaseConnectionPool:
+    """Return the global pool, creating it lazily from connect_kwargs"""
+    global _connection_pool
+
+    pool = _connection_pool
+    if pool is not None:
+        return pool
+
+    with _pool_lock:
+        if _connection_pool is None:
+            if connect_kwargs is None:
+                raise RuntimeError("Connection pool not initialized. Call initialize_connection_pool() first.")
+            _connection_pool = DatabaseConnectionPool(connect_kwargs, ConnectionPoolConfig.from_env())
+        return _connection_pool
 
-def get_pooled_connection() -> DatabaseConnection:
-    """Get a connection from the global pool"""
-    if _connection_pool is None:
-        raise RuntimeError("Connection pool not initialized. Call initialize_connection_pool() first.")
-    
-    return _connection_pool.get_connection()
 
 def get_pool_stats() -> dict:
     """Get statistics for the global connection pool"""
     if _connection_pool is None:
         return {"error": "Connection pool not initialized"}
-    
+
     return _connection_pool.get_stats()
 
+
 def close_connection_pool():
     """Close the global connection pool"""
     global _connection_pool
-    
+
     with _pool_lock:
         if _connection_pool is not None:
             _connection_pool.close_all()
             _connection_pool = None
-            logger.info("Global database connection pool closed")
\ No newline at end of file
+            logger.info("Global database connection pool closed")
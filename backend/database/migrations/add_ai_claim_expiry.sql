@@ -0,0 +1,13 @@
+-- Migration: Per-claim lease expiry for the state_legislation AI queue
+-- Created: 2026-10-16
+--
+-- Claims used to be judged against a lease passed in by whoever was trying
+-- to claim, so a 30-minute backfill run would take over bills that an Azure
+-- Batch submission (ai_batch.py, 26h lease) still held and the paid batch
+-- output was dropped on ingest. The claimer now stamps its own expiry on the
+-- row and other workers compare it against NOW().
+--
+-- Claims made before this migration have no expiry; they fall back to
+-- ai_claimed_at + 30 minutes, the old default.
+
+ALTER TABLE state_legislation ADD COLUMN IF NOT EXISTS ai_claim_expires_at TIMESTAMP;
@@ -0,0 +1,73 @@
+-- Migration: Structured AI job status
+-- Created: 2026-10-16
+--
+-- One row per (document, AI section) recording whether the section was
+-- generated, how many attempts it took, the last error and when to try
+-- again. Failed sections used to be stored as "Error generating ..." text in
+-- the ai_* columns and found again with LIKE 'Error%' scans; ai_job_status.py
+-- now keeps those columns clean and selects retries through the partial
+-- index below.
+--
+-- entity_type is 'state_legislation' (entity_id = state_legislation.id) or
+-- 'executive_order' (entity_id = executive_orders.eo_number).
+
+CREATE TABLE IF NOT EXISTS ai_job_status (
+    entity_type VARCHAR(30) NOT NULL,
+    entity_id VARCHAR(100) NOT NULL,
+    section VARCHAR(40) NOT NULL,            -- 'executive_summary', 'talking_points', 'business_impact'
+    status VARCHAR(20) NOT NULL,             -- 'succeeded', 'failed', 'dead' (gave up after max attempts)
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    ai_version VARCHAR(50),
+    last_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    next_retry_at TIMESTAMP,
+    PRIMARY KEY (entity_type, entity_id, section)
+);
+
+-- Retry selection: WHERE entity_type = ? AND status = 'failed' AND next_retry_at <= NOW()
+CREATE INDEX IF NOT EXISTS idx_ai_job_status_retry
+    ON ai_job_status (entity_type, next_retry_at)
+    WHERE status = 'failed';
+
+-- One-time backfill: move error text already stored in the ai_* columns
+-- into failed status rows (due now), then clear the columns. The prefixes
+-- match ai_job_status.ERROR_PREFIXES; every statement is safe to re-run.
+INSERT INTO ai_job_status (entity_type, entity_id, section, status, attempts, last_error, next_retry_at)
+SELECT 'state_legislation', id::text, s.section, 'failed', 1, s.error, NOW()
+FROM state_legislation,
+LATERAL (VALUES
+    ('executive_summary', ai_executive_summary),
+    ('talking_points', ai_talking_points),
+    ('business_impact', ai_business_impact)
+) AS s(section, error)
+WHERE s.error LIKE 'Error generating%' OR s.error LIKE 'AI analysis failed%'
+   OR s.error LIKE '<p>Error generating%' OR s.error LIKE '<p>AI analysis failed%'
+   OR s.error LIKE '<p>Enhanced AI analysis failed%'
+ON CONFLICT DO NOTHING;
+
+INSERT INTO ai_job_status (entity_type, entity_id, section, status, attempts, last_error, next_retry_at)
+SELECT 'executive_order', eo_number::text, s.section, 'failed', 1, s.error, NOW()
+FROM executive_orders,
+LATERAL (VALUES
+    ('executive_summary', ai_executive_summary),
+    ('talking_points', ai_talking_points),
+    ('business_impact', ai_business_impact)
+) AS s(section, error)
+WHERE s.error LIKE 'Error generating%' OR s.error LIKE 'AI analysis failed%'
+   OR s.error LIKE '<p>Error generating%' OR s.error LIKE '<p>AI analysis failed%'
+   OR s.error LIKE '<p>Enhanced AI analysis failed%'
+ON CONFLICT DO NOTHING;
+
+UPDATE state_legislation SET
+    ai_executive_summary = CASE WHEN ai_executive_summary ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_executive_summary END,
+    ai_summary = CASE WHEN ai_summary ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_summary END,
+    ai_talking_points = CASE WHEN ai_talking_points ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_talking_points END,
+    ai_business_impact = CASE WHEN ai_business_impact ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_business_impact END
+WHERE id::text IN (SELECT entity_id FROM ai_job_status WHERE entity_type = 'state_legislation' AND status = 'failed');
+
+UPDATE executive_orders SET
+    ai_executive_summary = CASE WHEN ai_executive_summary ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_executive_summary END,
+    ai_summary = CASE WHEN ai_summary ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_summary END,
+    ai_talking_points = CASE WHEN ai_talking_points ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_talking_points END,
+    ai_business_impact = CASE WHEN ai_business_impact ~ '^((<p>)?(Error generating|AI analysis failed)|<p>Enhanced AI analysis failed)' THEN NULL ELSE ai_business_impact END
+WHERE eo_number::text IN (SELECT entity_id FROM ai_job_status WHERE entity_type = 'executive_order' AND status = 'failed');
@@ -0,0 +1,16 @@
+-- Migration: Claim columns for the state_legislation AI queue
+-- Created: 2026-10-16
+--
+-- ai_backfill_worker.py claims bills with FOR UPDATE SKIP LOCKED and stamps
+-- them with a worker id and claim time, so several worker processes can drain
+-- needs_ai_processing without picking up the same bill. A claim older than
+-- the lease (30 minutes by default) is treated as abandoned and reclaimed,
+-- which covers workers that crash mid-batch.
+
+ALTER TABLE state_legislation ADD COLUMN IF NOT EXISTS ai_claimed_by VARCHAR(100);
+ALTER TABLE state_legislation ADD COLUMN IF NOT EXISTS ai_claimed_at TIMESTAMP;
+
+-- Queue scan: only the rows still waiting, newest first
+CREATE INDEX IF NOT EXISTS idx_state_legislation_ai_queue
+    ON state_legislation (last_updated DESC)
+    WHERE needs_ai_processing = true;
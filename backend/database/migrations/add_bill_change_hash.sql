@@ -0,0 +1,12 @@
+-- Migration: Store LegiScan change_hash on state_legislation
+-- Created: 2026-10-16
+--
+-- legiscan_sync.py diffs getMasterListRaw change_hash values against this
+-- column and only calls getBill for bills whose hash moved. Rows loaded
+-- before this migration have a NULL hash; the first sync seeds it from the
+-- master list without calling getBill or re-queueing the bill for AI, so
+-- their first real refresh happens when the hash next moves. Re-running
+-- legiscan_dataset_loader.py also seeds the hashes without any API calls.
+
+ALTER TABLE state_legislation ADD COLUMN IF NOT EXISTS change_hash VARCHAR(32);
+ALTER TABLE state_legislation ADD COLUMN IF NOT EXISTS needs_ai_processing BOOLEAN DEFAULT false;
@@ -0,0 +1,34 @@
+-- Migration: Full-text search index for /api/search
+-- Created: 2026-10-16
+--
+-- Adds a weighted tsvector column to executive_orders and state_legislation.
+-- The columns are GENERATED ... STORED, so PostgreSQL keeps them current on
+-- every INSERT/UPDATE without triggers or application changes.
+-- search_engine.py falls back to ILIKE until this migration has been applied.
+
+ALTER TABLE executive_orders
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(eo_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(ai_executive_summary, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_eo_search_vector
+    ON executive_orders USING GIN (search_vector);
+
+ALTER TABLE state_legislation
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(bill_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(ai_summary, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_sl_search_vector
+    ON state_legislation USING GIN (search_vector);
+
+ANALYZE executive_orders;
+ANALYZE state_legislation;
@@ -0,0 +1,13 @@
+-- Migration: Indexes backing keyset (cursor) pagination
+-- Created: 2026-10-16
+--
+-- /api/state-legislation and /api/executive-orders accept an opaque
+-- `cursor` parameter that seeks on these sort keys instead of using OFFSET.
+-- The index column order and direction must match the ORDER BY in
+-- main.get_state_legislation_from_db and executive_orders_db.EO_KEYSET_SORT.
+
+CREATE INDEX IF NOT EXISTS idx_sl_keyset_last_updated
+    ON state_legislation (last_updated DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_eo_keyset_signing_date
+    ON executive_orders ((COALESCE(signing_date, DATE '0001-01-01')) DESC, id DESC);
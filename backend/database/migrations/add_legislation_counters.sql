@@ -0,0 +1,122 @@
+-- Migration: Materialized counters for badge and count endpoints
+-- Created: 2026-10-16
+--
+-- legislation_counters holds row counts per (table, state, category, is_new,
+-- reviewed). Statement-level triggers with transition tables keep it current
+-- on INSERT, UPDATE (including mark-viewed and INSERT ... ON CONFLICT), DELETE
+-- and TRUNCATE, so a bulk upsert costs one aggregated counter update per
+-- statement rather than one per row.
+-- legislation_counters.py answers /api/state-legislation/count,
+-- /api/state-legislation/new-count and /api/executive-orders/new-count from
+-- this table and falls back to live COUNT(*) until the migration is applied.
+
+CREATE TABLE IF NOT EXISTS legislation_counters (
+    source_table VARCHAR(50) NOT NULL,
+    state VARCHAR(50) NOT NULL DEFAULT '',
+    state_abbr VARCHAR(5) NOT NULL DEFAULT '',
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    is_new BOOLEAN NOT NULL DEFAULT false,
+    reviewed BOOLEAN NOT NULL DEFAULT false,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (source_table, state, state_abbr, category, is_new, reviewed)
+);
+
+CREATE OR REPLACE FUNCTION refresh_legislation_counters() RETURNS trigger AS $$
+DECLARE
+    key_columns text;
+    delta_rows text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM legislation_counters WHERE source_table = TG_TABLE_NAME;
+        RETURN NULL;
+    END IF;
+
+    -- executive_orders has no state columns; count them under ''
+    IF TG_TABLE_NAME = 'state_legislation' THEN
+        key_columns := 'COALESCE(state, ''''), COALESCE(state_abbr, ''''), ';
+    ELSE
+        key_columns := ''''', '''', ';
+    END IF;
+    key_columns := key_columns || 'COALESCE(category, ''''), COALESCE(is_new, false), COALESCE(reviewed, false)';
+
+    IF TG_OP = 'INSERT' THEN
+        delta_rows := format('SELECT %s, 1 FROM new_rows', key_columns);
+    ELSIF TG_OP = 'DELETE' THEN
+        delta_rows := format('SELECT %s, -1 FROM old_rows', key_columns);
+    ELSE
+        delta_rows := format('SELECT %s, -1 FROM old_rows UNION ALL SELECT %s, 1 FROM new_rows',
+                             key_columns, key_columns);
+    END IF;
+
+    EXECUTE format(
+        'INSERT INTO legislation_counters AS c
+             (source_table, state, state_abbr, category, is_new, reviewed, row_count)
+         SELECT %L, d.state, d.state_abbr, d.category, d.is_new, d.reviewed, SUM(d.delta)
+         FROM (%s) AS d (state, state_abbr, category, is_new, reviewed, delta)
+         GROUP BY d.state, d.state_abbr, d.category, d.is_new, d.reviewed
+         HAVING SUM(d.delta) <> 0
+         ON CONFLICT (source_table, state, state_abbr, category, is_new, reviewed)
+         DO UPDATE SET row_count = c.row_count + EXCLUDED.row_count',
+        TG_TABLE_NAME, delta_rows);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- state_legislation
+DROP TRIGGER IF EXISTS trg_sl_counters_insert ON state_legislation;
+CREATE TRIGGER trg_sl_counters_insert AFTER INSERT ON state_legislation
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_sl_counters_update ON state_legislation;
+CREATE TRIGGER trg_sl_counters_update AFTER UPDATE ON state_legislation
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_sl_counters_delete ON state_legislation;
+CREATE TRIGGER trg_sl_counters_delete AFTER DELETE ON state_legislation
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_sl_counters_truncate ON state_legislation;
+CREATE TRIGGER trg_sl_counters_truncate AFTER TRUNCATE ON state_legislation
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+-- executive_orders
+DROP TRIGGER IF EXISTS trg_eo_counters_insert ON executive_orders;
+CREATE TRIGGER trg_eo_counters_insert AFTER INSERT ON executive_orders
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_eo_counters_update ON executive_orders;
+CREATE TRIGGER trg_eo_counters_update AFTER UPDATE ON executive_orders
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_eo_counters_delete ON executive_orders;
+CREATE TRIGGER trg_eo_counters_delete AFTER DELETE ON executive_orders
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+DROP TRIGGER IF EXISTS trg_eo_counters_truncate ON executive_orders;
+CREATE TRIGGER trg_eo_counters_truncate AFTER TRUNCATE ON executive_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_legislation_counters();
+
+-- Backfill from the current data (blocks writers for the duration)
+BEGIN;
+LOCK TABLE state_legislation, executive_orders IN SHARE MODE;
+DELETE FROM legislation_counters;
+
+INSERT INTO legislation_counters (source_table, state, state_abbr, category, is_new, reviewed, row_count)
+SELECT 'state_legislation', COALESCE(state, ''), COALESCE(state_abbr, ''), COALESCE(category, ''),
+       COALESCE(is_new, false), COALESCE(reviewed, false), COUNT(*)
+FROM state_legislation
+GROUP BY 2, 3, 4, 5, 6;
+
+INSERT INTO legislation_counters (source_table, state, state_abbr, category, is_new, reviewed, row_count)
+SELECT 'executive_orders', '', '', COALESCE(category, ''),
+       COALESCE(is_new, false), COALESCE(reviewed, false), COUNT(*)
+FROM executive_orders
+GROUP BY 4, 5, 6;
+COMMIT;
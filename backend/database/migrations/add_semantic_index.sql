@@ -0,0 +1,28 @@
+-- Migration: Embedding index for semantic search
+-- Created: 2026-10-16
+--
+-- One embedding per document (state bill or executive order), computed from
+-- title, description/summary and ai_executive_summary by semantic_index.py.
+-- content_hash is md5 of that text, so the sync job only re-embeds documents
+-- whose text (or embedding model) changed. The HNSW index gives approximate
+-- nearest-neighbour search by cosine distance.
+--
+-- The vector size must match EMBEDDING_DIMENSIONS (default 512).
+-- entity_type is 'state_legislation' (entity_id = state_legislation.id) or
+-- 'executive_order' (entity_id = executive_orders.eo_number), as in ai_job_status.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS document_embeddings (
+    entity_type VARCHAR(30) NOT NULL,
+    entity_id VARCHAR(100) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    content_hash CHAR(32) NOT NULL,
+    embedding vector(512) NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_embeddings_hnsw
+    ON document_embeddings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
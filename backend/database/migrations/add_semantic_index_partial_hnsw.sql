@@ -0,0 +1,21 @@
+-- Migration: Per-type HNSW indexes for document_embeddings
+-- Created: 2026-10-16
+--
+-- With one HNSW index over every row, the entity_type filter ran after the
+-- ANN scan: the ef_search candidates were mostly state bills, so executive
+-- order queries (a small share of the rows) came back nearly empty. One
+-- partial index per entity_type keeps the filter inside the index;
+-- semantic_index.py puts the entity_type literal in the query so the
+-- planner can match it.
+
+DROP INDEX IF EXISTS idx_document_embeddings_hnsw;
+
+CREATE INDEX IF NOT EXISTS idx_document_embeddings_hnsw_state_legislation
+    ON document_embeddings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE entity_type = 'state_legislation';
+
+CREATE INDEX IF NOT EXISTS idx_document_embeddings_hnsw_executive_order
+    ON document_embeddings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE entity_type = 'executive_order';
@@ -0,0 +1,12 @@
+-- Migration: Key executive order embeddings by executive_orders.id
+-- Created: 2026-10-16
+--
+-- Executive order embeddings used eo_number as entity_id, but eo_number is
+-- not unique (the primary key is id). Two rows with the same eo_number made
+-- store_embeddings hit "ON CONFLICT DO UPDATE command cannot affect row a
+-- second time", or flip the stored content_hash between them so
+-- sync_embeddings never finished. semantic_index.py now uses
+-- executive_orders.id; the old eo_number-keyed rows are dropped here and
+-- re-embedded on the next sync.
+
+DELETE FROM document_embeddings WHERE entity_type = 'executive_order';
@@ -1,10 +1,11 @@
 # database_config.py - Supabase PostgreSQL database configuration
 import os
 import logging
-import psycopg2
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from connection_pool import get_connection_pool
+
 # Load environment variables
 load_dotenv(override=True)
 
@@ -30,37 +31,42 @@ def get_database_config():
         'description': f'Supabase PostgreSQL ({host})'
     }
 
-@contextmanager
-def get_db_connection():
-    """Get database connection context manager for Supabase PostgreSQL"""
+def get_connect_kwargs():
+    """psycopg2.connect() keyword arguments for the configured Supabase database"""
     config = get_database_config()
+    return {
+        'host': config['host'],
+        'port': config['port'],
+        'database': config['database'],
+        'user': config['user'],
+        'password': config['password'],
+        'sslmode': 'require'
+    }
 
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host=config['host'],
-            port=config['port'],
-            database=config['database'],
-            user=config['user'],
-            password=config['password'],
-            sslmode='require'
-        )
-        conn.autocommit = False
-
-        yield conn
+def get_pool():
+    """Process-wide connection pool for Supabase PostgreSQL (created on first use)"""
+    return get_connection_pool(get_connect_kwargs())
 
-        # Commit the transaction
-        if conn:
-            conn.commit()
+@contextmanager
+def get_db_connection():
+    """Get database connection context manager for Supabase PostgreSQL.
 
+    Connections come from the shared pool; the transaction is committed on
+    success and rolled back on error before the connection is returned.
+    """
+    try:
+        with get_pool().connection() as conn:
+            yield conn
     except Exception as e:
         logger.error(f"❌ Database connection error: {e}")
-        if conn:
-            conn.rollback()
         raise
-    finally:
-        if conn:
-            conn.close()
+
+def get_raw_db_connection():
+    """Pooled connection for callers that manage commit/close themselves.
+
+    close() returns the connection to the pool instead of disconnecting.
+    """
+    return get_pool().get_raw_connection()
 
 def test_database_connection():
     """Test database connection and return info"""
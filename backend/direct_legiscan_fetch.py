@@ -9,30 +9,34 @@ import os
 import sys
 from datetime import datetime
 from database_config import get_db_connection
+from legiscan_cache import legiscan_cache
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 LEGISCAN_API_KEY = os.getenv('LEGISCAN_API_KEY')
 
+async def _get(params):
+    """One LegiScan GET (cache misses only)"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://api.legiscan.com/", params={'key': LEGISCAN_API_KEY, **params}) as response:
+            response.raise_for_status()
+            return await response.json()
+
 async def direct_master_list(session_id=2223):
     """Fetch master list directly from LegiScan API"""
-    url = f"https://api.legiscan.com/?key={LEGISCAN_API_KEY}&op=getMasterList&id={session_id}"
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                
-                if data.get('status') == "ERROR":
-                    print(f"❌ API Error: {data.get('alert', {}).get('message', 'Unknown error')}")
-                    return None
-                
-                masterlist = data.get('masterlist', [])
-                print(f"✅ Retrieved {len(masterlist)} bills from master list")
-                
-                return masterlist
+        data = await legiscan_cache.acached_call(
+            {'op': 'getMasterList', 'id': session_id}, lambda: _get({'op': 'getMasterList', 'id': session_id}))
+        
+        if data.get('status') == "ERROR":
+            print(f"❌ API Error: {data.get('alert', {}).get('message', 'Unknown error')}")
+            return None
+        
+        masterlist = data.get('masterlist', [])
+        print(f"✅ Retrieved {len(masterlist)} bills from master list")
+        
+        return masterlist
                 
     except Exception as e:
         print(f"❌ Error fetching master list: {e}")
@@ -40,20 +44,16 @@ async def direct_master_list(session_id=2223):
 
 async def direct_bill_fetch(bill_id):
     """Fetch bill details directly"""
-    url = f"https://api.legiscan.com/?key={LEGISCAN_API_KEY}&op=getBill&id={bill_id}"
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                
-                if data.get('status') == "ERROR":
-                    print(f"❌ Bill {bill_id} Error: {data.get('alert', {}).get('message', 'Unknown error')}")
-                    return None
-                
-                bill_data = data.get('bill', {})
-                return bill_data
+        data = await legiscan_cache.acached_call(
+            {'op': 'getBill', 'id': bill_id}, lambda: _get({'op': 'getBill', 'id': bill_id}))
+        
+        if data.get('status') == "ERROR":
+            print(f"❌ Bill {bill_id} Error: {data.get('alert', {}).get('message', 'Unknown error')}")
+            return None
+        
+        bill_data = data.get('bill', {})
+        return bill_data
                 
     except Exception as e:
         print(f"❌ Error fetching bill {bill_id}: {e}")
@@ -0,0 +1,125 @@
+# embeddings.py - Pluggable text embedding providers for the semantic index
+"""
+Turns document and query text into fixed-size, L2-normalised float vectors.
+
+Providers:
+    azure  - Azure OpenAI embeddings deployment (AZURE_EMBEDDING_DEPLOYMENT,
+             default text-embedding-3-small), using the same AZURE_ENDPOINT /
+             AZURE_KEY / AZURE_API_VERSION as ai.py
+    local  - deterministic feature-hashing embedder: no network, no model
+             download, so tests and local runs can build and query the index
+
+EMBEDDING_PROVIDER picks one (default azure). Every provider returns
+EMBEDDING_DIMENSIONS floats (default 512, matching the vector column in
+database/migrations/add_semantic_index.sql); text-embedding-3 models are
+asked for that size directly.
+
+Vectors from different providers are not comparable, so each stored
+embedding records the provider's model_id and semantic_index.py re-embeds
+rows whose model changed.
+"""
+
+import hashlib
+import html
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "512"))
+
+# text-embedding-3 accepts up to 8191 input tokens; documents are cut well before that
+MAX_EMBEDDING_CHARS = 8000
+
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+class Embedder(Protocol):
+    model_id: str
+    dimensions: int
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+
+def clean_text(text: Optional[str]) -> str:
+    """Strip the HTML our AI sections are stored with and collapse whitespace"""
+    text = html.unescape(_TAGS.sub(" ", text or ""))
+    return " ".join(text.split())[:MAX_EMBEDDING_CHARS]
+
+
+def normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+class AzureOpenAIEmbedder:
+    """Azure OpenAI embeddings deployment"""
+
+    def __init__(self, deployment: Optional[str] = None, dimensions: int = EMBEDDING_DIMENSIONS):
+        from openai import AsyncAzureOpenAI
+
+        self.deployment = deployment or os.getenv("AZURE_EMBEDDING_DEPLOYMENT", "text-embedding-3-small")
+        self.dimensions = dimensions
+        self.model_id = f"azure:{self.deployment}:{dimensions}"
+        self.client = AsyncAzureOpenAI(
+            azure_endpoint=os.getenv("AZURE_ENDPOINT"),
+            api_key=os.getenv("AZURE_KEY"),
+            api_version=os.getenv("AZURE_API_VERSION", "2024-02-15-preview"),
+        )
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.embeddings.create(
+            model=self.deployment,
+            input=[text or " " for text in texts],
+            dimensions=self.dimensions,
+        )
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [normalize(list(item.embedding)) for item in ordered]
+
+
+class HashingEmbedder:
+    """
+    Bag of words and word bigrams hashed into a fixed number of buckets.
+
+    Only captures lexical overlap, but it is deterministic and free, which is
+    what tests and offline development need.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.model_id = f"local:hashing:{dimensions}"
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        words = _WORDS.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        return normalize(vector)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Embedder:
+    """The configured provider (EMBEDDING_PROVIDER=azure|local)"""
+    provider = os.getenv("EMBEDDING_PROVIDER", "azure").lower()
+    if provider == "local":
+        return HashingEmbedder()
+    if provider != "azure":
+        logger.warning(f"⚠️ Unknown EMBEDDING_PROVIDER={provider!r}, using azure")
+    return AzureOpenAIEmbedder()
+
+
+def to_pgvector(vector: List[float]) -> str:
+    """pgvector text literal, e.g. '[0.1,0.2]'"""
+    return "[" + ",".join(f"{v:.6g}" for v in vector) + "]"
@@ -1,4 +1,5 @@
 # executive_orders_db.py - Fixed version using direct pyodbc
+import asyncio
 import os
 import logging
 from datetime import datetime
@@ -11,6 +12,8 @@ import json
 
 # Import new multi-database support
 from database_config import get_db_connection, get_database_config
+from api_cache import api_cache, cache_tag
+from pagination import InvalidCursorError, keyset_clause, next_cursor
 from contextlib import contextmanager
 
 @contextmanager
@@ -192,112 +195,106 @@ def check_executive_orders_table():
         logger.error(f"❌ Error checking executive_orders table: {e}")
         return False, []
 
+# Keyset sort key for cursor pagination (see database/migrations/add_keyset_pagination_indexes.sql)
+EO_KEYSET_SORT = ["COALESCE(signing_date, DATE '0001-01-01')", "id"]
+EO_KEYSET_KEYS = ["sort_date", "id"]
+
+def _build_executive_orders_queries(limit, offset, filters, placeholder='%s', db_type='postgresql', cursor=None):
+    """Build the page query, count query and params shared by the sync and async readers.
+
+    With cursor set (empty string = first page) the page is read by keyset
+    pagination on EO_KEYSET_SORT and one look-ahead row is fetched; the
+    count query and its params never include the keyset condition.
+    """
+    table_name = "executive_orders" if db_type == 'postgresql' else "dbo.executive_orders"
+
+    base_query = f"""
+    SELECT 
+        id, document_number, eo_number, title, summary, 
+        signing_date, publication_date, citation, presidential_document_type, category,
+        html_url, pdf_url, trump_2025_url, 
+        ai_summary, ai_executive_summary, ai_key_points, ai_talking_points, 
+        ai_business_impact, ai_potential_impact, ai_version,
+        source, raw_data_available, processing_status, error_message,
+        created_at, last_updated, last_scraped_at, tags{", " + EO_KEYSET_SORT[0] + " AS sort_date" if cursor is not None else ""}
+    FROM {table_name}
+    """
+    count_query = f"SELECT COUNT(*) FROM {table_name}"
+
+    # Add WHERE clause for filters
+    where_conditions = []
+    params = []
+
+    if filters:
+        if filters.get('category'):
+            where_conditions.append(f"category = {placeholder}")
+            params.append(filters['category'])
+
+        if filters.get('search'):
+            search_term = f"%{filters['search']}%"
+            where_conditions.append(f"(title LIKE {placeholder} OR summary LIKE {placeholder} OR ai_summary LIKE {placeholder})")
+            params.extend([search_term, search_term, search_term])
+
+    if where_conditions:
+        count_query += " WHERE " + " AND ".join(where_conditions)
+    count_params = list(params)
+
+    if cursor is not None:
+        seek, seek_params = keyset_clause(EO_KEYSET_SORT, cursor, placeholder, casts=["::date", ""])
+        if seek:
+            where_conditions.append(seek)
+            params.extend(seek_params)
+
+    if where_conditions:
+        base_query += " WHERE " + " AND ".join(where_conditions)
+
+    if cursor is not None:
+        base_query += f" ORDER BY {EO_KEYSET_SORT[0]} DESC, id DESC LIMIT {int(limit) + 1}"
+        return base_query, count_query, params, count_params
+
+    # Add ORDER BY
+    base_query += " ORDER BY signing_date DESC, eo_number DESC"
+
+    # Add pagination - database specific
+    if db_type == 'postgresql':
+        base_query += f" LIMIT {int(limit)} OFFSET {int(offset)}"
+    else:
+        base_query += f" OFFSET {int(offset)} ROWS FETCH NEXT {int(limit)} ROWS ONLY"
+
+    return base_query, count_query, params, count_params
+
+def _format_executive_order_row(result: Dict) -> Dict:
+    """Format dates on an executive order row dict"""
+    for date_field in ['signing_date', 'publication_date', 'created_at', 'last_updated', 'last_scraped_at']:
+        if result.get(date_field) and hasattr(result[date_field], 'isoformat'):
+            result[date_field] = result[date_field].isoformat()
+
+    # Add formatted dates
+    if result.get('signing_date'):
+        result['formatted_signing_date'] = result['signing_date']
+    if result.get('publication_date'):
+        result['formatted_publication_date'] = result['publication_date']
+
+    return result
+
 def get_executive_orders_from_db(limit=100, offset=0, filters=None):
     """Get executive orders from database with filters and pagination"""
     try:
         logger.info(f"🔍 Getting executive orders: limit={limit}, offset={offset}, filters={filters}")
         
-        # Get database-specific table name
-        config = get_database_config()
-        if config['type'] == 'postgresql':
-            table_name = "executive_orders"
-        else:
-            table_name = "dbo.executive_orders"
-        
-        # Build query
-        base_query = f"""
-        SELECT 
-            id, document_number, eo_number, title, summary, 
-            signing_date, publication_date, citation, presidential_document_type, category,
-            html_url, pdf_url, trump_2025_url, 
-            ai_summary, ai_executive_summary, ai_key_points, ai_talking_points, 
-            ai_business_impact, ai_potential_impact, ai_version,
-            source, raw_data_available, processing_status, error_message,
-            created_at, last_updated, last_scraped_at, tags
-        FROM {table_name}
-        """
-        
-        # Add WHERE clause for filters
-        where_conditions = []
-        params = []
-        placeholder = get_parameter_placeholder()
-        
-        if filters:
-            if filters.get('category'):
-                where_conditions.append(f"category = {placeholder}")
-                params.append(filters['category'])
-                
-            if filters.get('search'):
-                search_term = f"%{filters['search']}%"
-                where_conditions.append(f"(title LIKE {placeholder} OR summary LIKE {placeholder} OR ai_summary LIKE {placeholder})")
-                params.extend([search_term, search_term, search_term])
-        
-        if where_conditions:
-            base_query += " WHERE " + " AND ".join(where_conditions)
-        
-        # Add ORDER BY
-        base_query += " ORDER BY signing_date DESC, eo_number DESC"
-        
-        # Get database-specific queries
-        queries = get_database_specific_queries()
         config = get_database_config()
+        base_query, count_query, params, count_params = _build_executive_orders_queries(
+            limit, offset, filters, get_parameter_placeholder(), config['type']
+        )
         
-        # Count total matching records
-        if config['type'] == 'postgresql':
-            table_name = "executive_orders"
-            count_query = f"SELECT COUNT(*) FROM {table_name}"
-        else:
-            table_name = "dbo.executive_orders"
-            count_query = f"SELECT COUNT(*) FROM {table_name}"
-            
-        if where_conditions:
-            count_query += " WHERE " + " AND ".join(where_conditions)
-            
+        # Count and page share one pooled connection
         with get_db_cursor() as cursor:
-            if params:
-                cursor.execute(count_query, params)
-            else:
-                cursor.execute(count_query)
+            cursor.execute(count_query, count_params or None)
             total_count = cursor.fetchone()[0]
-        
-        # Add pagination - database specific
-        if config['type'] == 'postgresql':
-            base_query += f" LIMIT {limit} OFFSET {offset}"
-        else:
-            base_query += f" OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY"
-        
-        # Execute the query
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(base_query, params)
-            else:
-                cursor.execute(base_query)
-                
-            # Get column names
+
+            cursor.execute(base_query, params or None)
             columns = [column[0] for column in cursor.description]
-            
-            # Fetch all results
-            rows = cursor.fetchall()
-            
-            # Convert to dictionaries
-            results = []
-            for row in rows:
-                # Convert row to dictionary
-                result = dict(zip(columns, row))
-                
-                # Format dates
-                for date_field in ['signing_date', 'publication_date', 'created_at', 'last_updated', 'last_scraped_at']:
-                    if result.get(date_field) and hasattr(result[date_field], 'isoformat'):
-                        result[date_field] = result[date_field].isoformat()
-                
-                # Add formatted dates
-                if result.get('signing_date'):
-                    result['formatted_signing_date'] = result['signing_date']
-                if result.get('publication_date'):
-                    result['formatted_publication_date'] = result['publication_date']
-                
-                results.append(result)
+            results = [_format_executive_order_row(dict(zip(columns, row))) for row in cursor.fetchall()]
         
         logger.info(f"✅ Retrieved {len(results)} executive orders from database")
         
@@ -317,6 +314,64 @@ def get_executive_orders_from_db(limit=100, offset=0, filters=None):
             'count': 0
         }
 
+async def get_executive_orders_from_db_async(limit=100, offset=0, filters=None, cursor=None, with_total=True):
+    """Async version of get_executive_orders_from_db; COUNT and page run concurrently.
+
+    Pass cursor (empty string for the first page) to use keyset pagination;
+    the result then carries next_cursor. with_total=False skips the COUNT.
+    """
+    from async_db import fetch_all, fetch_value
+
+    try:
+        base_query, count_query, params, count_params = _build_executive_orders_queries(
+            limit, offset, filters, cursor=cursor
+        )
+
+        if with_total:
+            total_count, rows = await asyncio.gather(
+                fetch_value(count_query, count_params or None, default=0),
+                fetch_all(base_query, params or None)
+            )
+        else:
+            total_count, rows = None, await fetch_all(base_query, params or None)
+
+        following = None
+        if cursor is not None:
+            rows, following = next_cursor(rows, limit, EO_KEYSET_KEYS)
+        results = []
+        for row in rows:
+            row = dict(row)
+            row.pop('sort_date', None)
+            results.append(_format_executive_order_row(row))
+
+        logger.info(f"✅ Retrieved {len(results)} executive orders from database")
+
+        return {
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'total': total_count,
+            'next_cursor': following
+        }
+
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error getting executive orders: {e}")
+        return {
+            'success': False,
+            'message': str(e),
+            'results': [],
+            'count': 0
+        }
+
+async def count_executive_orders_async(filters=None) -> int:
+    """COUNT(*) for a filter combination (callers cache this per filter)"""
+    from async_db import fetch_value
+
+    _, count_query, _, count_params = _build_executive_orders_queries(1, 0, filters)
+    return await fetch_value(count_query, count_params or None, default=0)
+
 def save_executive_orders_to_db(orders: List[Dict]) -> Dict:
     """Save executive orders to database with improved error handling"""
     if not orders:
@@ -438,6 +493,10 @@ def save_executive_orders_to_db(orders: List[Dict]) -> Dict:
                     continue
         
         logger.info(f"💾 Saved {results['total_processed']} orders: {results['inserted']} new, {results['updated']} updated, {results['errors']} errors")
+
+        # Inserts shift every page, so drop all cached executive order responses
+        if results["total_processed"]:
+            api_cache.invalidate_tags(cache_tag("executive_orders"))
         return results
         
     except Exception as e:
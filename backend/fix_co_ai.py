@@ -8,6 +8,7 @@ import time
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 async def process_colorado_bills_fixed():
     """Process Colorado bills with proper string extraction"""
@@ -92,9 +93,6 @@ async def process_colorado_bills_fixed():
             except Exception as e:
                 failed += 1
                 print(f"   ❌ [{i+1}/{total}] {bill_number} - Error: {e}")
-            
-            # Rate limiting
-            await asyncio.sleep(1)
         
         # Final commit
         conn.commit()
@@ -110,4 +108,5 @@ async def process_colorado_bills_fixed():
 
 # Run it
 if __name__ == "__main__":
-    asyncio.run(process_colorado_bills_fixed())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(process_colorado_bills_fixed())
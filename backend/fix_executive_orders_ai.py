@@ -10,6 +10,7 @@ import sys
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_job_status import EXECUTIVE_ORDER, record_analysis
 
 async def check_missing_ai_fields():
     """Check how many executive orders are missing AI fields"""
@@ -76,7 +77,8 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
 
         # Get executive orders that need fixing
         cursor.execute('''
-            SELECT eo_number, title, summary, ai_executive_summary
+            SELECT eo_number, title, summary, ai_executive_summary,
+                   ai_talking_points, ai_business_impact, ai_key_points, ai_potential_impact
             FROM dbo.executive_orders
             WHERE (ai_talking_points IS NULL OR ai_talking_points = '')
                OR (ai_business_impact IS NULL OR ai_business_impact = '')
@@ -91,7 +93,7 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
 
         if dry_run:
             print("🔍 DRY RUN - Showing what would be fixed:")
-            for i, (eo_number, title, summary, ai_summary) in enumerate(eos_to_fix[:5], 1):
+            for i, (eo_number, title, summary, ai_summary, *_) in enumerate(eos_to_fix[:5], 1):
                 print(f"{i}. EO {eo_number}: {title[:50] if title else 'No title'}...")
                 print(f"   Has Summary: {'✅' if ai_summary else '❌'}")
 
@@ -113,7 +115,8 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
             print(f"\n📦 Processing batch {i//batch_size + 1}/{(total_to_fix + batch_size - 1)//batch_size}")
             print("-" * 60)
 
-            for eo_number, title, summary, existing_summary in batch:
+            for (eo_number, title, summary, existing_summary, existing_talking_points,
+                 existing_business_impact, existing_key_points, existing_potential_impact) in batch:
                 try:
                     processed += 1
                     print(f"[{processed}/{total_to_fix}] Processing EO {eo_number}...")
@@ -125,7 +128,12 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
                         order_number=str(eo_number)
                     )
 
-                    if ai_result and isinstance(ai_result, dict):
+                    # Failed sections go to ai_job_status, not into the columns
+                    ai_result, failures = record_analysis(
+                        EXECUTIVE_ORDER, eo_number, ai_result, 'azure_openai_backfill_v1'
+                    )
+
+                    if len(failures) < 3:
                         executive_summary = ai_result.get('ai_executive_summary', '')
                         talking_points = ai_result.get('ai_talking_points', '')
                         business_impact = ai_result.get('ai_business_impact', '')
@@ -143,12 +151,12 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
                                 last_updated = ?
                             WHERE eo_number = ?
                         ''', (
-                            executive_summary[:2000] if executive_summary else '',
-                            talking_points[:2000] if talking_points else '',
-                            business_impact[:2000] if business_impact else '',
-                            executive_summary[:2000] if executive_summary else '',
-                            talking_points[:2000] if talking_points else '',  # ai_key_points
-                            business_impact[:2000] if business_impact else '',  # ai_potential_impact
+                            executive_summary[:2000] if executive_summary else existing_summary,
+                            talking_points[:2000] if talking_points else existing_talking_points,
+                            business_impact[:2000] if business_impact else existing_business_impact,
+                            executive_summary[:2000] if executive_summary else existing_summary,
+                            talking_points[:2000] if talking_points else existing_key_points,  # ai_key_points
+                            business_impact[:2000] if business_impact else existing_potential_impact,  # ai_potential_impact
                             'azure_openai_backfill_v1',
                             datetime.now(),
                             eo_number
@@ -157,7 +165,7 @@ async def fix_executive_orders(batch_size=10, dry_run=False):
                         conn.commit()
 
                         successful += 1
-                        print(f"  ✅ Updated EO {eo_number}")
+                        print(f"  ✅ Updated EO {eo_number}" + (f" (failed: {', '.join(failures)})" if failures else ""))
                         print(f"     Summary: {len(executive_summary)} chars")
                         print(f"     Talking Points: {len(talking_points)} chars")
                         print(f"     Business Impact: {len(business_impact)} chars")
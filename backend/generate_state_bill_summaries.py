@@ -21,6 +21,8 @@ import requests
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from ai_scheduler import Priority, ai_scheduler
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -117,7 +119,7 @@ State Bill Content: {text}
 SYSTEM_MESSAGE = "You are a local policy expert who explains legislation to community members in plain English. You write naturally and conversationally, like you're talking to a neighbor over coffee. You avoid formulaic AI patterns and corporate jargon. Each summary you write sounds unique and human, focusing on what actually matters to regular people. You never use templates or robotic phrases."
 
 class BillSummaryGenerator:
-    def __init__(self, batch_size: int = 5, delay_between_batches: float = 1.0):
+    def __init__(self, batch_size: int = 5, delay_between_batches: float = 0.0):
         self.batch_size = batch_size
         self.delay_between_batches = delay_between_batches
         self.processed_count = 0
@@ -263,8 +265,10 @@ class BillSummaryGenerator:
                 {"role": "user", "content": prompt}
             ]
             
-            # Call Azure OpenAI
-            response = await client.chat.completions.create(
+            # Call Azure OpenAI under the shared TPM/RPM budget
+            response = await ai_scheduler.chat_completion(
+                client,
+                priority=Priority.BACKFILL,
                 model=AZURE_MODEL_NAME,
                 messages=messages,
                 temperature=0.7,
@@ -461,7 +465,7 @@ async def main():
     parser = argparse.ArgumentParser(description='Generate AI summaries for state legislation bills')
     parser.add_argument('--limit', type=int, help='Limit number of bills to process')
     parser.add_argument('--batch-size', type=int, default=5, help='Number of bills to process concurrently')
-    parser.add_argument('--delay', type=float, default=1.0, help='Delay between batches (seconds)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Extra delay between batches (seconds); AI calls are already paced by the shared scheduler')
     parser.add_argument('--state', type=str, help='Process only bills for this state (e.g., NV, CA, TX)')
     
     args = parser.parse_args()
@@ -10,6 +10,7 @@ import asyncio
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 # Practice area keywords mapping
 PRACTICE_AREA_KEYWORDS = {
@@ -93,9 +94,6 @@ async def process_bill(bill_data):
     except Exception as e:
         print(f"  ❌ {bill_number} - Error: {e}")
         return False
-    
-    # Rate limiting
-    await asyncio.sleep(1)
 
 async def process_batch(batch_size=50):
     """Process a batch of bills for Kentucky"""
@@ -220,4 +218,5 @@ async def main():
             break
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
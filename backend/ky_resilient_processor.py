@@ -11,6 +11,7 @@ import signal
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 # Track failed bills to skip them temporarily
 FAILED_BILLS = set()
@@ -163,10 +164,6 @@ async def process_batch_resilient(batch_size=25):
         batch_start = time.time()
         
         for i, bill in enumerate(bills):
-            # Add delay between bills to avoid rate limiting
-            if i > 0:
-                await asyncio.sleep(1)
-            
             # Check if batch is taking too long (10 minutes max per batch)
             if time.time() - batch_start > 600:
                 print(f"⏰ Batch timeout - processed {processed} bills")
@@ -276,6 +273,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        with ai_priority(Priority.BACKFILL):
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\n⛔ Stopped by user")
\ No newline at end of file
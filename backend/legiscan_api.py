@@ -5,10 +5,17 @@ import requests
 import json
 import time
 import asyncio
+import aiohttp
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Generator, List, Optional, Any
 from urllib.parse import urlencode
 
+from legiscan_cache import legiscan_cache
+from utils.rate_limiter import TokenBucket, legiscan_token_bucket
+
+# Request steps yield LegiScan query params and receive the decoded response
+RequestSteps = Generator[Dict[str, Any], Dict[str, Any], Dict[str, Any]]
+
 class LegiScanAPI:
     """Complete LegiScan API integration class with real AI analysis"""
     
@@ -43,22 +50,24 @@ class LegiScanAPI:
         print(f"✅ LegiScan API initialized with key: {self.api_key[:8]}...")
     
     def _rate_limit(self):
-        """Enforce rate limiting to respect LegiScan's 1 request per second limit"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            print(f"⏱️ Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        """Wait for the process-wide LegiScan budget (shared with AsyncLegiScanAPI and other threads)"""
+        waited = legiscan_token_bucket.acquire_blocking()
+        if waited > 0.01:
+            print(f"⏱️ Rate limiting: waited {waited:.2f} seconds")
         self.last_request_time = time.time()
     
     def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make API request with rate limiting and error handling"""
-        self._rate_limit()
-        
+        """Make API request with caching, rate limiting and error handling"""
         if params is None:
             params = {}
         
+        cached = legiscan_cache.get(params)
+        if cached is not None:
+            print(f"📦 LegiScan cache hit: {params.get('op')}")
+            return cached
+        
+        self._rate_limit()
+        
         params['key'] = self.api_key
         
         try:
@@ -72,27 +81,8 @@ class LegiScanAPI:
             response = self.session.get(f"{self.base_url}{endpoint}", params=params, timeout=60)
             response.raise_for_status()
             
-            data = response.json()
-            
-            if data.get('status') == 'ERROR':
-                error_msg = data.get('alert', 'Unknown error')
-                print(f"❌ LegiScan API Error: {error_msg}")
-                raise Exception(f"LegiScan API Error: {error_msg}")
-            
-            print(f"✅ LegiScan API request successful")
-            
-            # Debug response structure
-            if isinstance(data, dict):
-                print(f"📂 Response top-level keys: {list(data.keys())}")
-                if 'searchresult' in data:
-                    searchresult = data['searchresult']
-                    if isinstance(searchresult, dict):
-                        print(f"🔍 Searchresult keys: {list(searchresult.keys())}")
-                        if 'summary' in searchresult:
-                            print(f"📈 Summary: {searchresult['summary']}")
-            else:
-                print(f"⚠️ Response is not a dict: {type(data)}")
-            
+            data = self._check_response(response.json())
+            legiscan_cache.set(params, data)
             return data
             
         except requests.exceptions.RequestException as e:
@@ -105,6 +95,49 @@ class LegiScanAPI:
             print(f"❌ LegiScan request error: {str(e)}")
             raise
     
+    def _check_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Raise on a LegiScan ERROR status, otherwise return the decoded response"""
+        if data.get('status') == 'ERROR':
+            error_msg = data.get('alert', 'Unknown error')
+            print(f"❌ LegiScan API Error: {error_msg}")
+            raise Exception(f"LegiScan API Error: {error_msg}")
+        
+        print(f"✅ LegiScan API request successful")
+        
+        # Debug response structure
+        if isinstance(data, dict):
+            print(f"📂 Response top-level keys: {list(data.keys())}")
+            if 'searchresult' in data:
+                searchresult = data['searchresult']
+                if isinstance(searchresult, dict):
+                    print(f"🔍 Searchresult keys: {list(searchresult.keys())}")
+                    if 'summary' in searchresult:
+                        print(f"📈 Summary: {searchresult['summary']}")
+        else:
+            print(f"⚠️ Response is not a dict: {type(data)}")
+        
+        return data
+    
+    def _run(self, steps: RequestSteps) -> Dict[str, Any]:
+        """
+        Drive request steps with blocking requests.
+
+        The fetch logic (search_bills, get_bill_details, ...) is written once as
+        generators that yield request params; this driver and
+        AsyncLegiScanAPI._run supply the I/O. A failed request is thrown back
+        into the generator so its own error handling applies.
+        """
+        response, error = None, None
+        while True:
+            try:
+                params = steps.throw(error) if error else steps.send(response)
+            except StopIteration as done:
+                return done.value
+            try:
+                response, error = self._make_request('', params), None
+            except Exception as e:
+                response, error = None, e
+    
     def get_state_abbreviation(self, state: str) -> str:
         """Convert state name to abbreviation"""
         if len(state) == 2:
@@ -118,6 +151,9 @@ class LegiScanAPI:
     
     def search_bills(self, state: str, query: str = None, limit: int = 100, year_filter: str = 'all', max_pages: int = 5) -> Dict[str, Any]:
         """Search for bills in a specific state with pagination and year filtering"""
+        return self._run(self._search_bills_steps(state, query, limit, year_filter, max_pages))
+    
+    def _search_bills_steps(self, state: str, query: str = None, limit: int = 100, year_filter: str = 'all', max_pages: int = 5) -> RequestSteps:
         try:
             state_abbr = self.get_state_abbreviation(state)
             print(f"🔍 Searching bills for {state} ({state_abbr}) with year filter '{year_filter}'")
@@ -182,7 +218,7 @@ class LegiScanAPI:
                     if page == 1:
                         print(f"📅 No year parameter - LegiScan will use default")
             
-                response = self._make_request('', params)
+                response = yield params
                 
                 if 'searchresult' not in response:
                     if page == 1:
@@ -247,9 +283,6 @@ class LegiScanAPI:
                 if len(page_bills) == 0:
                     print(f"📄 Empty page {page} - stopping pagination")
                     break
-                
-                # Rate limiting between requests
-                time.sleep(self.rate_limit_delay)
             
             # Apply final limit
             if limit and len(all_bills) > limit:
@@ -317,8 +350,10 @@ class LegiScanAPI:
                         
                     try:
                         print(f"🔍 Trying fallback {i+1}: query='{fallback_query}'")
-                        fallback_result = self.search_bills(state, query=fallback_query, limit=min(50, limit - len(processed_bills)), 
-                                                           year_filter=year_filter, max_pages=2)
+                        fallback_result = yield from self._search_bills_steps(
+                            state, query=fallback_query, limit=min(50, limit - len(processed_bills)),
+                            year_filter=year_filter, max_pages=2
+                        )
                         
                         if fallback_result['success'] and fallback_result['bills']:
                             # Merge results, avoiding duplicates
@@ -356,6 +391,9 @@ class LegiScanAPI:
     
     def get_bill_details(self, bill_id: str) -> Dict[str, Any]:
         """Get detailed information for a specific bill"""
+        return self._run(self._get_bill_details_steps(bill_id))
+    
+    def _get_bill_details_steps(self, bill_id: str) -> RequestSteps:
         try:
             print(f"🔍 Getting bill details for ID: {bill_id}")
             
@@ -364,7 +402,7 @@ class LegiScanAPI:
                 'id': bill_id
             }
             
-            response = self._make_request('', params)
+            response = yield params
             
             if 'bill' not in response:
                 print(f"⚠️ Bill {bill_id} not found in response")
@@ -899,6 +937,9 @@ class LegiScanAPI:
         Get master list of ALL bills for a state using getMasterList API
         This is more efficient than pagination for getting complete datasets
         """
+        return self._run(self._get_master_list_steps(state, session_id))
+    
+    def _get_master_list_steps(self, state: str, session_id: Optional[int] = None) -> RequestSteps:
         try:
             state_abbr = self.get_state_abbreviation(state)
             print(f"🔍 Getting master list for {state} ({state_abbr})")
@@ -911,7 +952,7 @@ class LegiScanAPI:
             if session_id:
                 params['id'] = session_id
             
-            response = self._make_request('', params)
+            response = yield params
             
             if response and 'masterlist' in response:
                 master_list = response['masterlist']
@@ -951,11 +992,20 @@ class LegiScanAPI:
                 'bills': []
             }
 
-    def optimized_bulk_fetch(self, state: str, limit: int = 50, recent_only: bool = False, year_filter: str = 'all', max_pages: int = 10) -> Dict[str, Any]:
+    def optimized_bulk_fetch(self, state: str, limit: int = 50, recent_only: bool = False, year_filter: str = 'all', max_pages: int = 10, changed_only: bool = False, known_hashes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         *** BULK FETCH METHOD CALLED BY YOUR MAIN.PY ***
         Optimized bulk fetch for state legislation with enhanced parameters
+
+        With changed_only, master list bills whose change_hash matches
+        known_hashes (bill_id -> hash; defaults to the hashes stored on
+        state_legislation) are dropped so callers only process what changed.
         """
+        return self._run(self._optimized_bulk_fetch_steps(
+            state, limit, recent_only, year_filter, max_pages, changed_only, known_hashes
+        ))
+    
+    def _optimized_bulk_fetch_steps(self, state: str, limit: int = 50, recent_only: bool = False, year_filter: str = 'all', max_pages: int = 10, changed_only: bool = False, known_hashes: Optional[Dict[str, str]] = None) -> RequestSteps:
         try:
             print(f"🔍 LegiScan: Starting optimized_bulk_fetch")
             print(f"   - State: {state}")
@@ -970,12 +1020,32 @@ class LegiScanAPI:
             # First try to get all bills using master list approach
             if limit > 100 or year_filter == 'all':
                 print(f"🔍 Using getMasterList for comprehensive fetch (limit={limit})")
-                master_result = self.get_master_list(state)
+                master_result = yield from self._get_master_list_steps(state)
                 
                 if master_result['success'] and master_result['bills']:
                     all_bills = master_result['bills']
                     print(f"📋 Master list returned {len(all_bills)} total bills")
                     
+                    # Skip bills whose change_hash matches what we already store
+                    unchanged = 0
+                    if changed_only and known_hashes is None:
+                        try:
+                            from legiscan_sync import load_local_index
+                            local = load_local_index([str(b['bill_id']) for b in all_bills])
+                            known_hashes = {bill_id: info['change_hash'] for bill_id, info in local.items()}
+                        except Exception as e:
+                            print(f"⚠️ Could not load stored change hashes: {e}")
+                            known_hashes = {}
+                    if changed_only:
+                        unchanged = len(all_bills)
+                        all_bills = [
+                            b for b in all_bills
+                            if not b.get('change_hash') or known_hashes.get(str(b['bill_id'])) != b['change_hash']
+                        ]
+                        unchanged -= len(all_bills)
+                    if unchanged:
+                        print(f"⏭️ Skipped {unchanged} bills with unchanged change_hash")
+                    
                     # Apply limit if specified
                     if limit > 0 and len(all_bills) > limit:
                         all_bills = all_bills[:limit]
@@ -1003,6 +1073,7 @@ class LegiScanAPI:
                         'success': True,
                         'bills': processed_bills,
                         'bills_processed': len(processed_bills),
+                        'unchanged_skipped': unchanged,
                         'state': state,
                         'source': 'masterlist',
                         'timestamp': datetime.now().isoformat()
@@ -1016,7 +1087,7 @@ class LegiScanAPI:
             
             # Use search without query to get recent bills (smart query will be applied automatically)
             print(f"🔍 Calling search_bills with: state={state}, query=None, limit={limit}, year_filter={year_filter}, max_pages={max_pages}")
-            result = self.search_bills(state, query=None, limit=limit, year_filter=year_filter, max_pages=max_pages)
+            result = yield from self._search_bills_steps(state, query=None, limit=limit, year_filter=year_filter, max_pages=max_pages)
             
             if result['success']:
                 bills = result['bills']
@@ -1046,6 +1117,104 @@ class LegiScanAPI:
                 'bills': []
             }
 
+class AsyncLegiScanAPI:
+    """
+    asyncio counterpart of LegiScanAPI's fetch methods
+
+    search_bills, get_bill_details, get_master_list and optimized_bulk_fetch
+    take the same arguments and return the same dicts as LegiScanAPI's (the
+    logic is shared), but await their requests on a pooled aiohttp session
+    instead of blocking. Every request draws from the process-wide
+    legiscan_token_bucket, so concurrent callers - several states fetched
+    with asyncio.gather, background threads using LegiScanAPI - interleave
+    within one budget.
+
+        async with AsyncLegiScanAPI() as api:
+            results = await asyncio.gather(*(api.optimized_bulk_fetch(s) for s in states))
+    """
+    
+    def __init__(self, api: Optional[LegiScanAPI] = None, limiter: TokenBucket = legiscan_token_bucket):
+        self.api = api or LegiScanAPI()
+        self.limiter = limiter
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=int(os.getenv('LEGISCAN_MAX_CONNECTIONS', '8')),
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                ),
+                timeout=aiohttp.ClientTimeout(total=60, connect=10),
+                headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'},
+                raise_for_status=True,
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the pooled session"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed and self._session_loop is asyncio.get_running_loop():
+            await session.close()
+        self._session_loop = None
+    
+    async def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        cached = legiscan_cache.get(params)
+        if cached is not None:
+            print(f"📦 LegiScan cache hit: {params.get('op')}")
+            return cached
+        await self.limiter.acquire()
+        print(f"🔍 Making async LegiScan API request: {params.get('op')}")
+        session = await self._get_session()
+        async with session.get(self.api.base_url, params={**params, 'key': self.api.api_key}) as response:
+            data = self.api._check_response(await response.json(content_type=None))
+        legiscan_cache.set(params, data)
+        return data
+    
+    async def _run(self, steps: RequestSteps) -> Dict[str, Any]:
+        """LegiScanAPI._run with awaited requests"""
+        response, error = None, None
+        while True:
+            try:
+                params = steps.throw(error) if error else steps.send(response)
+            except StopIteration as done:
+                return done.value
+            try:
+                response, error = await self._make_request(params), None
+            except Exception as e:
+                response, error = None, e
+    
+    def get_state_abbreviation(self, state: str) -> str:
+        return self.api.get_state_abbreviation(state)
+    
+    async def search_bills(self, state: str, query: str = None, limit: int = 100, year_filter: str = 'all', max_pages: int = 5) -> Dict[str, Any]:
+        """Async LegiScanAPI.search_bills"""
+        return await self._run(self.api._search_bills_steps(state, query, limit, year_filter, max_pages))
+    
+    async def get_bill_details(self, bill_id: str) -> Dict[str, Any]:
+        """Async LegiScanAPI.get_bill_details"""
+        return await self._run(self.api._get_bill_details_steps(bill_id))
+    
+    async def get_master_list(self, state: str, session_id: Optional[int] = None) -> Dict[str, Any]:
+        """Async LegiScanAPI.get_master_list"""
+        return await self._run(self.api._get_master_list_steps(state, session_id))
+    
+    async def optimized_bulk_fetch(self, state: str, limit: int = 50, recent_only: bool = False, year_filter: str = 'all', max_pages: int = 10, changed_only: bool = False, known_hashes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Async LegiScanAPI.optimized_bulk_fetch"""
+        return await self._run(self.api._optimized_bulk_fetch_steps(
+            state, limit, recent_only, year_filter, max_pages, changed_only, known_hashes
+        ))
+
 # Test function to verify the API works
 def test_legiscan_api():
     """Test function to verify LegiScan API is working"""
@@ -0,0 +1,382 @@
+# legiscan_cache.py - On-disk cache for LegiScan API responses
+"""
+Persistent response cache under every LegiScan client (LegiScanAPI,
+AsyncLegiScanAPI, EnhancedLegiScanClient, ai.LegiScanClient and
+state_orchestrator.legiscan_get).
+
+Entries are keyed by op and query params (the API key is never part of the
+key or the stored data) and kept zlib-compressed in a local SQLite file (WAL
+mode, safe across processes). Hits are served before the shared LegiScan
+token bucket, so they cost neither quota nor wait time.
+
+Freshness:
+    - per-op TTLs (OP_TTLS, override with LEGISCAN_CACHE_TTL_<OP>, seconds;
+      0 disables caching for that op)
+    - getBill additionally uses change_hash: every cached master list or
+      search result records each bill's current change_hash, and a cached
+      bill seen in a newer list is fresh exactly while its hash still
+      matches, regardless of TTL (up to BILL_HASH_MAX_AGE)
+
+LEGISCAN_CACHE_MODE:
+    on      - default: serve fresh entries, fetch and store misses
+    off     - bypass the cache entirely
+    record  - always fetch, store every response (refreshing a fixture)
+    replay  - serve stored responses regardless of age and never touch the
+              network; a miss raises LegiScanCacheMiss. Point
+              LEGISCAN_CACHE_PATH at a recorded file (or --import a JSON
+              fixture) to run jobs and scripts offline.
+
+Usage:
+    python legiscan_cache.py [--purge] [--clear] [--export FILE] [--import FILE]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'legiscan_responses.sqlite3')
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds a response stays fresh, by op (case-insensitive)
+OP_TTLS = {
+    'getsessionlist': 12 * HOUR,
+    'getsession': 12 * HOUR,
+    'getmasterlist': 30 * 60,
+    'getmasterlistraw': 30 * 60,
+    'getbill': 6 * HOUR,            # only used when no newer change_hash is known
+    'getsearch': HOUR,
+    'getsearchraw': HOUR,
+    'search': HOUR,
+    'getbilltext': 30 * DAY,        # documents never change once published
+    'getamendment': 30 * DAY,
+    'getsupplement': 30 * DAY,
+    'getrollcall': 30 * DAY,
+    'getperson': 7 * DAY,
+    'getsessionpeople': DAY,
+    'getdatasetlist': 12 * HOUR,
+    'getdataset': 0,                # multi-MB archives, handled by legiscan_dataset_loader
+}
+DEFAULT_TTL = HOUR
+
+# A getBill entry whose change_hash still matches is trusted for at most this long
+BILL_HASH_MAX_AGE = 30 * DAY
+
+# Run expiry every this many writes rather than on each one
+PURGE_INTERVAL = 200
+
+MODES = ('on', 'off', 'record', 'replay')
+
+
+class LegiScanCacheMiss(Exception):
+    """Replay mode found no stored response for a request"""
+
+
+def request_params(url: str) -> Dict[str, str]:
+    """Query params of a LegiScan URL (op, id, state, ...)"""
+    return dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+
+
+def cache_key(params: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(key, op, canonical params JSON); 'key' (the API key) is ignored"""
+    canonical = {str(k): str(v) for k, v in params.items() if k != 'key' and v is not None}
+    op = canonical.get('op', '')
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest(), op, payload
+
+
+def listed_change_hashes(op: str, data: Dict) -> Iterable[Tuple[str, str]]:
+    """(bill_id, change_hash) pairs from a master list or search response"""
+    op = op.lower()
+    if op in ('getmasterlist', 'getmasterlistraw'):
+        entries = data.get('masterlist') or {}
+    elif op in ('getsearch', 'search'):
+        entries = data.get('searchresult') or {}
+    elif op == 'getsearchraw':
+        entries = (data.get('searchresult') or {}).get('results') or []
+    else:
+        return []
+    if isinstance(entries, dict):
+        entries = entries.values()
+    return [
+        (str(entry['bill_id']), entry['change_hash'])
+        for entry in entries
+        if isinstance(entry, dict) and entry.get('bill_id') and entry.get('change_hash')
+    ]
+
+
+class LegiScanResponseCache:
+    """SQLite-backed LegiScan response cache with per-op TTLs and change_hash freshness"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, mode: str = 'on', ttls: Optional[Dict[str, float]] = None):
+        if mode not in MODES:
+            logger.warning(f"⚠️ Unknown LEGISCAN_CACHE_MODE={mode!r}, using 'on'")
+            mode = 'on'
+        self.path = path
+        self.mode = mode
+        self.ttls = {op.lower(): ttl for op, ttl in (ttls or OP_TTLS).items()}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "hash_hits": 0,
+            "sets": 0,
+            "errors": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    def ttl(self, op: str) -> float:
+        return self.ttls.get(op.lower(), DEFAULT_TTL)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    op TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    change_hash TEXT,
+                    fetched_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_fetched ON responses (fetched_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bill_hashes (
+                    bill_id TEXT PRIMARY KEY,
+                    change_hash TEXT NOT NULL,
+                    seen_at REAL NOT NULL
+                )
+            """)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def _is_fresh(self, conn: sqlite3.Connection, op: str, params: Dict, change_hash: Optional[str], fetched_at: float) -> bool:
+        age = time.time() - fetched_at
+        if op.lower() == 'getbill' and change_hash and age < BILL_HASH_MAX_AGE:
+            row = conn.execute(
+                "SELECT change_hash, seen_at FROM bill_hashes WHERE bill_id = ?", (str(params.get('id')),)
+            ).fetchone()
+            # Only a list fetched after this bill says anything about it
+            if row and row[1] >= fetched_at:
+                if row[0] == change_hash:
+                    self._count("hash_hits")
+                    return True
+                return False
+        ttl = self.ttl(op)
+        return ttl > 0 and age < ttl
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict]:
+        """Fresh cached response for these params, or None (replay mode raises instead)"""
+        if self.mode in ('off', 'record'):
+            return None
+        key, op, _ = cache_key(params)
+        if self.mode != 'replay' and self.ttl(op) <= 0 and op.lower() != 'getbill':
+            return None
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT body, change_hash, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (self.mode == 'replay' or self._is_fresh(conn, op, params, row[1], row[2])):
+                conn.execute("UPDATE responses SET hits = hits + 1 WHERE key = ?", (key,))
+                self._count("hits")
+                return json.loads(zlib.decompress(row[0]))
+            self._count("stale" if row is not None else "misses")
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"⚠️ LegiScan cache read failed: {e}")
+            self._count("errors")
+
+        if self.mode == 'replay':
+            raise LegiScanCacheMiss(f"No recorded LegiScan response for {cache_key(params)[2]}")
+        return None
+
+    def set(self, params: Dict[str, Any], data: Dict, fetched_at: Optional[float] = None):
+        """Store a successful response and note any change_hashes it lists"""
+        if not self.enabled or not isinstance(data, dict) or data.get('status') == 'ERROR':
+            return
+        key, op, canonical = cache_key(params)
+        if self.ttl(op) <= 0 and op.lower() != 'getbill' and self.mode != 'record':
+            return
+        try:
+            now = fetched_at or time.time()
+            bill = data.get('bill') if op.lower() == 'getbill' else None
+            change_hash = bill.get('change_hash') if isinstance(bill, dict) else None
+            body = zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 6)
+            conn = self._conn()
+            conn.execute("""
+                INSERT OR REPLACE INTO responses (key, op, params, body, change_hash, fetched_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            """, (key, op, canonical, body, change_hash, now))
+
+            hashes = list(listed_change_hashes(op, data))
+            if hashes:
+                conn.executemany("""
+                    INSERT INTO bill_hashes (bill_id, change_hash, seen_at) VALUES (?, ?, ?)
+                    ON CONFLICT (bill_id) DO UPDATE SET change_hash = excluded.change_hash, seen_at = excluded.seen_at
+                    WHERE excluded.seen_at >= bill_hashes.seen_at
+                """, [(bill_id, change_hash, now) for bill_id, change_hash in hashes])
+            self._count("sets")
+
+            with self._lock:
+                self._writes += 1
+                due = self._writes % PURGE_INTERVAL == 0
+            if due and self.mode == 'on':
+                self.purge()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ LegiScan cache write failed: {e}")
+            self._count("errors")
+
+    def cached_call(self, params: Dict[str, Any], fetch: Callable[[], Dict]) -> Dict:
+        """Cached response, or fetch() and store it"""
+        cached = self.get(params)
+        if cached is not None:
+            return cached
+        data = fetch()
+        self.set(params, data)
+        return data
+
+    async def acached_call(self, params: Dict[str, Any], fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """cached_call for async fetchers"""
+        cached = self.get(params)
+        if cached is not None:
+            return cached
+        data = await fetch()
+        self.set(params, data)
+        return data
+
+    def purge(self) -> int:
+        """Drop entries too old to ever be served again"""
+        conn = self._conn()
+        now = time.time()
+        removed = 0
+        for (op,) in conn.execute("SELECT DISTINCT op FROM responses").fetchall():
+            max_age = BILL_HASH_MAX_AGE if op.lower() == 'getbill' else self.ttl(op)
+            removed += conn.execute(
+                "DELETE FROM responses WHERE op = ? AND fetched_at < ?", (op, now - max_age)
+            ).rowcount
+        conn.execute("DELETE FROM bill_hashes WHERE seen_at < ?", (now - BILL_HASH_MAX_AGE,))
+        return removed
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM bill_hashes")
+
+    def export_json(self, path: str) -> int:
+        """Write every stored response to a JSON lines fixture"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for params, body, fetched_at in self._conn().execute(
+                "SELECT params, body, fetched_at FROM responses ORDER BY op, params"
+            ):
+                f.write(json.dumps({
+                    'params': json.loads(params),
+                    'fetched_at': fetched_at,
+                    'response': json.loads(zlib.decompress(body)),
+                }) + '\n')
+                count += 1
+        return count
+
+    def import_json(self, path: str) -> int:
+        """Load a JSON lines fixture written by export_json"""
+        count = 0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.set(entry['params'], entry['response'], entry.get('fetched_at'))
+                    count += 1
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus on-disk size"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        try:
+            conn = self._conn()
+            stats["entries"] = {
+                op: {"count": count, "bytes": size}
+                for op, count, size in conn.execute(
+                    "SELECT op, COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses GROUP BY op"
+                )
+            }
+            (stats["known_change_hashes"],) = conn.execute("SELECT COUNT(*) FROM bill_hashes").fetchone()
+        except sqlite3.Error as e:
+            stats["error"] = str(e)
+        stats.update({"path": self.path, "mode": self.mode})
+        return stats
+
+
+def _configured_ttls() -> Dict[str, float]:
+    ttls = dict(OP_TTLS)
+    for name, value in os.environ.items():
+        if name.startswith('LEGISCAN_CACHE_TTL_'):
+            ttls[name[len('LEGISCAN_CACHE_TTL_'):].lower()] = float(value)
+    return ttls
+
+
+# Global cache instance shared by every LegiScan client in this process
+legiscan_cache = LegiScanResponseCache(
+    path=os.getenv("LEGISCAN_CACHE_PATH", DEFAULT_CACHE_PATH),
+    mode=os.getenv("LEGISCAN_CACHE_MODE", "on").lower(),
+    ttls=_configured_ttls()
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and manage the LegiScan response cache')
+    parser.add_argument('--purge', action='store_true', help='Drop entries too old to be served')
+    parser.add_argument('--clear', action='store_true', help='Drop every entry')
+    parser.add_argument('--export', metavar='FILE', help='Write all responses to a JSON lines fixture')
+    parser.add_argument('--import', dest='import_path', metavar='FILE', help='Load a JSON lines fixture')
+    args = parser.parse_args()
+
+    if args.clear:
+        legiscan_cache.clear()
+        print("🧹 Cleared LegiScan response cache")
+    if args.purge:
+        print(f"🧹 Purged {legiscan_cache.purge()} expired responses")
+    if args.import_path:
+        print(f"📥 Imported {legiscan_cache.import_json(args.import_path)} responses from {args.import_path}")
+    if args.export:
+        print(f"📤 Exported {legiscan_cache.export_json(args.export)} responses to {args.export}")
+
+    stats = legiscan_cache.get_stats()
+    print(f"📊 {stats['path']} (mode: {stats['mode']})")
+    for op, entry in stats.get('entries', {}).items():
+        print(f"   {op}: {entry['count']} responses, {entry['bytes'] / 1024:.0f} KB")
+    print(f"   change_hashes known: {stats.get('known_change_hashes', 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+LegiScan Dataset Loader
+Loads backend/data/[STATE]/[SESSION]/bill/*.json into state_legislation.
+
+JSON parsing is spread over a process pool, and parsed rows are written with
+COPY FROM STDIN into a staging table in large chunks and merged with one
+INSERT ... ON CONFLICT per chunk (see bulk_upsert.py). Re-running the loader
+is cheap: bills whose LegiScan fields haven't changed are left untouched, and
+category, AI fields and review state are never overwritten. Each bill's
+change_hash is stored too, which seeds the index legiscan_sync.py diffs
+against.
+
+legiscan_dataset_sync.py downloads changed datasets from the API and feeds
+them through the same parsing and write path without unpacking to disk.
+
+Usage:
+    python legiscan_dataset_loader.py [data_dir] [--states CA TX] [--workers N] [--chunk-size N]
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bulk_upsert import upsert_state_legislation
+from database_config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Files handed to a worker per task; large enough to amortize pickling overhead
+FILES_PER_TASK = 500
+
+# Rows per COPY + merge round-trip
+DEFAULT_COPY_CHUNK = 20000
+
+LEGISCAN_STATUS = {
+    1: 'Introduced',
+    2: 'Engrossed',
+    3: 'Enrolled',
+    4: 'Passed',
+    5: 'Vetoed',
+    6: 'Failed/Dead',
+    7: 'Indefinitely Postponed',
+    8: 'Signed by Governor',
+    9: 'Effective'
+}
+
+DATASET_COLUMNS = [
+    'bill_id', 'bill_number', 'title', 'description', 'state', 'state_abbr',
+    'status', 'category', 'introduced_date', 'last_action_date', 'session_id',
+    'session_name', 'bill_type', 'body', 'legiscan_url', 'pdf_url',
+    'change_hash', 'created_at', 'last_updated'
+]
+
+# Written on insert only, so reloading never clobbers categorization
+INSERT_ONLY_COLUMNS = ('bill_id', 'category', 'created_at')
+
+
+@dataclass
+class LoadStats:
+    """Throughput report for one load"""
+    files: int = 0
+    rows: int = 0
+    parse_errors: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    by_state: Dict[str, int] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "files": self.files,
+            "rows": self.rows,
+            "parse_errors": self.parse_errors,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 2),
+            "files_per_sec": round(self.files_per_sec, 1),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "by_state": self.by_state,
+            "errors": self.errors[:20],
+        }
+
+    def merge(self, other: "LoadStats"):
+        """Add another load's counters to this one (elapsed is left alone)"""
+        for name in ('files', 'rows', 'parse_errors', 'inserted', 'updated', 'unchanged', 'failed'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for state, count in other.by_state.items():
+            self.by_state[state] = self.by_state.get(state, 0) + count
+        self.errors.extend(other.errors)
+
+
+def state_from_directory(state_dir: str) -> str:
+    """'TX 2' -> 'TX'"""
+    return os.path.basename(state_dir.rstrip(os.sep)).split()[0].upper()
+
+
+def find_bill_files(data_dir: str, states: Optional[Sequence[str]] = None) -> List[Tuple[str, str]]:
+    """(path, state) for every bill JSON under data_dir/[STATE]/[SESSION]/bill/"""
+    wanted = {s.upper() for s in states} if states else None
+    files = []
+    for state_dir in sorted(glob.glob(os.path.join(data_dir, '*'))):
+        if not os.path.isdir(state_dir):
+            continue
+        state = state_from_directory(state_dir)
+        if len(state) != 2 or (wanted and state not in wanted):
+            continue
+        for path in sorted(glob.glob(os.path.join(state_dir, '*', 'bill', '*.json'))):
+            files.append((path, state))
+        for path in sorted(glob.glob(os.path.join(state_dir, 'bill', '*.json'))):
+            files.append((path, state))
+    return files
+
+
+def bill_to_row(bill: Dict, state: str, timestamp: str) -> Dict:
+    """Map a LegiScan bill object onto state_legislation columns"""
+    state = bill.get('state') or state
+    history = bill.get('history') or []
+    texts = bill.get('texts') or []
+    session = bill.get('session') if isinstance(bill.get('session'), dict) else {}
+    status = bill.get('status')
+
+    return {
+        'bill_id': str(bill.get('bill_id', '')),
+        'bill_number': bill.get('bill_number', ''),
+        'title': bill.get('title', ''),
+        'description': bill.get('description', ''),
+        'state': state,
+        'state_abbr': state,
+        'status': LEGISCAN_STATUS.get(status, str(status) if status else 'Unknown'),
+        'category': 'not-applicable',
+        'introduced_date': history[0].get('date', '') if history else '',
+        'last_action_date': history[-1].get('date', '') if history else bill.get('status_date', ''),
+        'session_id': str(bill.get('session_id', '')),
+        'session_name': session.get('session_name', ''),
+        'bill_type': bill.get('bill_type', ''),
+        'body': bill.get('body', ''),
+        'legiscan_url': bill.get('url', ''),
+        'pdf_url': (texts[-1].get('state_link') or texts[-1].get('url', '')) if texts else '',
+        'change_hash': bill.get('change_hash'),
+        'created_at': timestamp,
+        'last_updated': timestamp,
+    }
+
+
+def bill_json_to_row(raw: bytes, state: str, timestamp: str) -> tuple:
+    """Row tuple (in DATASET_COLUMNS order) for one bill file's contents"""
+    data = json.loads(raw)
+    bill = data.get('bill', data)
+    if not bill.get('bill_id'):
+        raise ValueError("no bill_id")
+    row = bill_to_row(bill, state, timestamp)
+    return tuple(row[c] for c in DATASET_COLUMNS)
+
+
+def parse_bill_files(batch: Sequence[Tuple[str, str]]) -> Tuple[List[tuple], List[str], Dict[str, int]]:
+    """
+    Worker: parse a batch of bill files into row tuples (in DATASET_COLUMNS order).
+
+    Returns (rows, errors, per-state row counts). Runs in a child process,
+    so it only returns picklable plain data.
+    """
+    timestamp = datetime.now().isoformat()
+    state_index = DATASET_COLUMNS.index('state')
+    rows, errors, by_state = [], [], {}
+    for path, state in batch:
+        try:
+            with open(path, 'rb') as f:
+                row = bill_json_to_row(f.read(), state, timestamp)
+            rows.append(row)
+            by_state[row[state_index]] = by_state.get(row[state_index], 0) + 1
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+    return rows, errors, by_state
+
+
+def write_rows(rows: Sequence[tuple], stats: LoadStats, chunk_size: int = DEFAULT_COPY_CHUNK):
+    """COPY + merge parsed row tuples, adding the outcome to stats"""
+    update_columns = [c for c in DATASET_COLUMNS if c not in INSERT_ONLY_COLUMNS]
+    with get_db_connection() as conn:
+        result = upsert_state_legislation(
+            [dict(zip(DATASET_COLUMNS, values)) for values in rows],
+            columns=DATASET_COLUMNS, update_columns=update_columns,
+            chunk_size=chunk_size, use_copy=True, conn=conn
+        )
+    stats.inserted += result.inserted
+    stats.updated += result.updated
+    stats.unchanged += result.unchanged
+    stats.failed += len(result.failed)
+    stats.errors.extend(f"bill {f.key.get('bill_id')}: {f.error}" for f in result.failed)
+
+
+def _batches(items: Sequence, size: int) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def load_datasets(
+    data_dir: str = DEFAULT_DATA_DIR,
+    states: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_COPY_CHUNK,
+    files: Optional[Sequence[Tuple[str, str]]] = None
+) -> LoadStats:
+    """
+    Load every bill file under data_dir (or the given (path, state) list).
+
+    Parsing runs ahead in the pool while the main process COPYs finished
+    chunks, so the database and the CPUs stay busy at the same time.
+    """
+    started = time.monotonic()
+    stats = LoadStats()
+    files = list(files) if files is not None else find_bill_files(data_dir, states)
+    stats.files = len(files)
+    if not files:
+        logger.warning(f"⚠️ No bill files found under {data_dir}")
+        return stats
+
+    logger.info(f"📁 Loading {len(files):,} bill files with {workers or os.cpu_count()} workers")
+
+    pending: List[tuple] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows, errors, by_state in pool.map(parse_bill_files, _batches(files, FILES_PER_TASK)):
+            pending.extend(rows)
+            stats.rows += len(rows)
+            stats.parse_errors += len(errors)
+            stats.errors.extend(errors)
+            for state, count in by_state.items():
+                stats.by_state[state] = stats.by_state.get(state, 0) + count
+
+            if len(pending) >= chunk_size:
+                write_rows(pending, stats, chunk_size)
+                pending = []
+                elapsed = time.monotonic() - started
+                logger.info(f"   ✅ {stats.rows:,} rows written ({stats.rows / elapsed:,.0f} rows/sec)")
+
+        if pending:
+            write_rows(pending, stats, chunk_size)
+
+    stats.elapsed = time.monotonic() - started
+    logger.info(
+        f"🎉 Loaded {stats.rows:,} bills from {stats.files:,} files in {stats.elapsed:.1f}s "
+        f"({stats.files_per_sec:,.0f} files/sec, {stats.rows_per_sec:,.0f} rows/sec): "
+        f"{stats.inserted:,} new, {stats.updated:,} updated, {stats.unchanged:,} unchanged, "
+        f"{stats.failed + stats.parse_errors:,} failed"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load LegiScan dataset JSON into state_legislation')
+    parser.add_argument('data_dir', nargs='?', default=DEFAULT_DATA_DIR, help='Directory holding [STATE]/[SESSION]/bill/*.json')
+    parser.add_argument('--states', nargs='*', help='Only load these state abbreviations')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_COPY_CHUNK, help='Rows per COPY round-trip')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    stats = load_datasets(args.data_dir, args.states, args.workers, args.chunk_size)
+    for state, count in sorted(stats.by_state.items()):
+        print(f"   {state}: {count:,}")
+    for error in stats.errors[:10]:
+        print(f"   ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    main()
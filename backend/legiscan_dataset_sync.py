@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+LegiScan Dataset Sync
+Pulls changed LegiScan session datasets (getDataset ZIPs) into state_legislation.
+
+getDatasetList reports a dataset_hash per session; the hash of the copy we
+last loaded is kept in data/[STATE]/[SESSION]/hash.md5, the same file the
+manual dumps ship with. Only sessions whose hash differs are downloaded.
+The ZIP is read in memory and its bill/*.json members are parsed straight
+out of the archive (nothing is unpacked to disk), then written with the
+dataset loader's COPY + merge path (legiscan_dataset_loader.write_rows).
+hash.md5 is updated once a dataset is written without row failures.
+Each dataset counts its rows in its own LoadStats, since several states
+write from worker threads at once; the counts are merged into the run's
+totals back on the event loop.
+
+One dataset pull replaces a getBill call per bill in the session; requests
+go through state_orchestrator.legiscan_get, so they share the LegiScan
+budget and response cache with every other client.
+
+Usage:
+    python legiscan_dataset_sync.py [--states CA TX] [--since-year 2025] [--force] [--data-dir DIR]
+"""
+
+import argparse
+import asyncio
+import base64
+import glob
+import io
+import logging
+import os
+import sys
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from legiscan_dataset_loader import (
+    DEFAULT_COPY_CHUNK, DEFAULT_DATA_DIR, LoadStats,
+    bill_json_to_row, state_from_directory, write_rows
+)
+from state_orchestrator import legiscan_get, run_states
+
+logger = logging.getLogger(__name__)
+
+# ZIPs are held in memory while they are parsed, so only a few states at once
+DATASET_CONCURRENCY = int(os.getenv('DATASET_CONCURRENCY', '2'))
+
+
+@dataclass
+class DatasetSyncStats:
+    """Datasets checked/downloaded plus the rows they produced"""
+    checked: int = 0
+    unchanged: int = 0
+    downloaded: int = 0
+    bytes_downloaded: int = 0
+    rows: LoadStats = field(default_factory=LoadStats)
+    errors: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "checked": self.checked,
+            "unchanged": self.unchanged,
+            "downloaded": self.downloaded,
+            "bytes_downloaded": self.bytes_downloaded,
+            "rows": self.rows.to_dict(),
+            "errors": self.errors[:20],
+            "elapsed": round(self.elapsed, 2),
+        }
+
+
+def local_dataset_hashes(data_dir: str, state: str) -> Dict[str, str]:
+    """dataset hash -> session directory, for every hash.md5 under data_dir/[STATE]*/"""
+    hashes = {}
+    for path in glob.glob(os.path.join(data_dir, '*', '*', 'hash.md5')):
+        session_dir = os.path.dirname(path)
+        if state_from_directory(os.path.dirname(session_dir)) != state:
+            continue
+        with open(path, encoding='utf-8') as f:
+            parts = f.read().split()
+        if parts:
+            hashes[parts[0]] = session_dir
+    return hashes
+
+
+def session_directory_name(dataset: Dict) -> str:
+    """LegiScan's dump directory name, e.g. '2025-2026_89th_Legislature'"""
+    name = '_'.join(str(dataset.get('session_name', dataset.get('session_id', ''))).split())
+    return f"{dataset.get('year_start')}-{dataset.get('year_end')}_{name}"
+
+
+def parse_dataset_zip(archive: bytes, state: str) -> Tuple[List[tuple], List[str], Optional[str]]:
+    """
+    (row tuples, errors, session directory) for the bills in a dataset ZIP.
+
+    Members are read one at a time from the in-memory archive.
+    """
+    timestamp = datetime.now().isoformat()
+    rows, errors, session_dir = [], [], None
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        for info in zf.infolist():
+            parts = info.filename.split('/')
+            if info.is_dir() or len(parts) < 3 or parts[-2] != 'bill' or not parts[-1].endswith('.json'):
+                continue
+            # STATE/SESSION/bill/HB1.json
+            session_dir = session_dir or parts[-3]
+            try:
+                with zf.open(info) as member:
+                    rows.append(bill_json_to_row(member.read(), state, timestamp))
+            except Exception as e:
+                errors.append(f"{info.filename}: {e}")
+    return rows, errors, session_dir
+
+
+def write_hash(data_dir: str, state: str, session_dir: str, dataset_hash: str):
+    path = os.path.join(data_dir, state, session_dir, 'hash.md5')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(dataset_hash + '\n')
+
+
+async def changed_datasets(state: str, data_dir: str, since_year: int, force: bool = False) -> Tuple[List[Dict], int]:
+    """(datasets whose hash differs from the local hash.md5, datasets checked)"""
+    data = await legiscan_get({'op': 'getDatasetList', 'state': state})
+    if data.get('status') == 'ERROR':
+        raise Exception(f"LegiScan API Error: {data.get('alert', {}).get('message', 'Unknown error')}")
+    datasets = [d for d in data.get('datasetlist') or [] if int(d.get('year_end') or 0) >= since_year]
+    if force:
+        return datasets, len(datasets)
+    local = await asyncio.to_thread(local_dataset_hashes, data_dir, state)
+    return [d for d in datasets if d.get('dataset_hash') not in local], len(datasets)
+
+
+async def load_dataset(state: str, dataset: Dict, data_dir: str, stats: DatasetSyncStats, chunk_size: int):
+    """Download one dataset, stream its bills into state_legislation and record its hash"""
+    label = f"{state} {dataset.get('session_name', dataset.get('session_id'))}"
+    data = await legiscan_get({'op': 'getDataset', 'id': dataset['session_id'], 'access_key': dataset['access_key']})
+    if data.get('status') == 'ERROR':
+        raise Exception(f"LegiScan API Error: {data.get('alert', {}).get('message', 'Unknown error')}")
+
+    archive = base64.b64decode(data['dataset']['zip'])
+    stats.downloaded += 1
+    stats.bytes_downloaded += len(archive)
+    logger.info(f"📦 {label}: {len(archive) / 1024 / 1024:.1f} MB dataset")
+
+    rows, errors, session_dir = await asyncio.to_thread(parse_dataset_zip, archive, state)
+    del archive, data
+    loaded = LoadStats(files=len(rows) + len(errors), rows=len(rows), parse_errors=len(errors),
+                       by_state={state: len(rows)}, errors=list(errors))
+    try:
+        if rows:
+            await asyncio.to_thread(write_rows, rows, loaded, chunk_size)
+    finally:
+        stats.rows.merge(loaded)
+
+    if not loaded.failed:
+        await asyncio.to_thread(write_hash, data_dir, state, session_dir or session_directory_name(dataset),
+                                dataset['dataset_hash'])
+    else:
+        logger.warning(f"⚠️ {label}: {loaded.failed} rows failed, hash.md5 left as is")
+    logger.info(f"✅ {label}: {len(rows):,} bills, {len(errors)} parse errors")
+
+
+async def sync_datasets(
+    states: Optional[Sequence[str]] = None,
+    data_dir: str = DEFAULT_DATA_DIR,
+    since_year: Optional[int] = None,
+    force: bool = False,
+    chunk_size: int = DEFAULT_COPY_CHUNK
+) -> DatasetSyncStats:
+    """
+    Load every changed dataset for these states (default: the states under data_dir).
+
+    since_year drops sessions that ended before it (default: last year).
+    """
+    started = time.monotonic()
+    stats = DatasetSyncStats()
+    if since_year is None:
+        since_year = datetime.now().year - 1
+    if not states:
+        states = sorted({
+            state_from_directory(path) for path in glob.glob(os.path.join(data_dir, '*'))
+            if os.path.isdir(path) and len(state_from_directory(path)) == 2
+        })
+
+    async def sync_state(state: str):
+        datasets, checked = await changed_datasets(state, data_dir, since_year, force)
+        stats.checked += checked
+        stats.unchanged += checked - len(datasets)
+        for dataset in datasets:
+            try:
+                await load_dataset(state, dataset, data_dir, stats, chunk_size)
+            except Exception as e:
+                stats.errors.append(f"{state} {dataset.get('session_id')}: {e}")
+                logger.error(f"❌ Dataset {state} {dataset.get('session_id')} failed: {e}")
+
+    report = await run_states([s.upper() for s in states], sync_state, concurrency=DATASET_CONCURRENCY)
+    stats.errors.extend(f"{state}: {report.runs[state].error}" for state in report.failed)
+
+    stats.elapsed = time.monotonic() - started
+    stats.rows.elapsed = stats.elapsed
+    logger.info(
+        f"🎉 Datasets: {stats.checked} checked, {stats.unchanged} unchanged, {stats.downloaded} downloaded "
+        f"({stats.bytes_downloaded / 1024 / 1024:.1f} MB) in {stats.elapsed:.1f}s: "
+        f"{stats.rows.inserted:,} new, {stats.rows.updated:,} updated, {stats.rows.unchanged:,} unchanged bills"
+    )
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Download changed LegiScan datasets into state_legislation')
+    parser.add_argument('--states', nargs='*', help='State abbreviations (default: states under the data dir)')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Directory holding [STATE]/[SESSION]/hash.md5')
+    parser.add_argument('--since-year', type=int, help='Skip sessions that ended before this year (default: last year)')
+    parser.add_argument('--force', action='store_true', help='Download even when hash.md5 matches')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_COPY_CHUNK, help='Rows per COPY round-trip')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    stats = await sync_datasets(args.states, args.data_dir, args.since_year, args.force, args.chunk_size)
+    for state, count in sorted(stats.rows.by_state.items()):
+        print(f"   {state}: {count:,}")
+    for error in (stats.errors + stats.rows.errors)[:10]:
+        print(f"   ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,10 +8,15 @@ import asyncio
 import aiohttp
 import traceback
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 from pydantic import BaseModel
 import pyodbc
 
+from ai_job_status import SECTION_COLUMNS, STATE_LEGISLATION, failed_analysis, outcome_rows, record_outcomes, savable_analysis
+from ai_scheduler import AIUnavailableError
+from legiscan_cache import legiscan_cache, request_params
+from utils.rate_limiter import legiscan_token_bucket
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -30,6 +35,13 @@ if not LEGISCAN_API_KEY:
 # AI Client setup
 enhanced_ai_client = None
 
+# HTTP connection pool for LegiScan calls: connections are kept alive between
+# requests and DNS answers cached, so only the first call pays for DNS, TCP and TLS
+LEGISCAN_MAX_CONNECTIONS = int(os.getenv('LEGISCAN_MAX_CONNECTIONS', '8'))
+LEGISCAN_KEEPALIVE_SECONDS = float(os.getenv('LEGISCAN_KEEPALIVE_SECONDS', '60'))
+LEGISCAN_DNS_CACHE_SECONDS = int(os.getenv('LEGISCAN_DNS_CACHE_SECONDS', '300'))
+LEGISCAN_REQUEST_TIMEOUT = float(os.getenv('LEGISCAN_REQUEST_TIMEOUT', '60'))
+
 def get_ai_client():
     """Get AI client for bill analysis"""
     try:
@@ -77,17 +89,15 @@ async def enhanced_bill_analysis(bill_data: Dict, search_context: str = "") -> D
         
         return analysis_result
 
+    except AIUnavailableError:
+        # Circuit open: let the caller save the bill unsummarised and queue it
+        raise
     except Exception as e:
         print(f"❌ Enhanced AI analysis failed: {e}")
         import traceback
         traceback.print_exc()
-        return {
-            'ai_summary': f'<p>AI analysis failed: {str(e)}</p>',
-            'ai_talking_points': '<p>AI analysis not available</p>',
-            'ai_business_impact': '<p>AI analysis not available</p>',
-            'category': 'not_applicable',
-            'ai_version': 'error'
-        }
+        # No AI text is stored; the failure is recorded and the bill queued
+        return failed_analysis(e)
 
 def convert_status_to_text(bill_data: Dict) -> str:
     """Convert LegiScan status to readable text"""
@@ -97,17 +107,66 @@ def convert_status_to_text(bill_data: Dict) -> str:
     return str(status) if status else 'Unknown'
 
 class EnhancedLegiScanClient:
-    """Enhanced LegiScan client with comprehensive AI integration"""
+    """
+    Enhanced LegiScan client with comprehensive AI integration
+
+    All requests share one keep-alive aiohttp session, opened on first use,
+    and draw from the process-wide LegiScan budget
+    (utils.rate_limiter.legiscan_token_bucket), so concurrent callers and
+    states stay within one request rate. rate_limit_delay is kept for
+    existing callers; pacing now comes from the shared budget.
+    Use the client as an async context manager (or call close()) to release
+    its connections:
+
+        async with EnhancedLegiScanClient() as client:
+            await client.get_session_list('CA')
+    """
     
     def __init__(self, api_key: str = None, rate_limit_delay: float = 0.5):
         self.api_key = api_key or LEGISCAN_API_KEY
         self.rate_limit_delay = rate_limit_delay
         self.base_url = "https://api.legiscan.com"
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
         
         if not self.api_key:
             raise ValueError("LegiScan API key is required")
         
         print(f"✅ Enhanced LegiScan client initialized with key: {self.api_key[:4]}***")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """The client's pooled session; reopened if closed or created on another event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # A session from a finished asyncio.run() can't be reused (or cleanly closed) here
+            connector = aiohttp.TCPConnector(
+                limit=LEGISCAN_MAX_CONNECTIONS * 2,
+                limit_per_host=LEGISCAN_MAX_CONNECTIONS,
+                ttl_dns_cache=LEGISCAN_DNS_CACHE_SECONDS,
+                keepalive_timeout=LEGISCAN_KEEPALIVE_SECONDS,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=LEGISCAN_REQUEST_TIMEOUT, connect=10),
+                headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'},
+                raise_for_status=True,
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the pooled session (safe to call more than once)"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed and self._session_loop is asyncio.get_running_loop():
+            await session.close()
+        self._session_loop = None
     
     def _build_url(self, operation: str, params: Optional[Dict] = None) -> str:
         """Build LegiScan API URL"""
@@ -120,19 +179,24 @@ class EnhancedLegiScanClient:
     async def _api_request(self, url: str) -> Dict[str, Any]:
         """Make async API request with error handling"""
         try:
+            params = request_params(url)
+            cached = legiscan_cache.get(params)
+            if cached is not None:
+                return cached
+            
             print("🔍 Making enhanced LegiScan API request...")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    if data.get('status') == "ERROR":
-                        error_msg = data.get('alert', {}).get('message', 'Unknown API error')
-                        raise Exception(f"LegiScan API Error: {error_msg}")
-                    
-                    await asyncio.sleep(self.rate_limit_delay)
-                    return data
+            await legiscan_token_bucket.acquire()
+            session = await self._get_session()
+            async with session.get(url) as response:
+                data = await response.json(content_type=None)
+            
+            if data.get('status') == "ERROR":
+                error_msg = data.get('alert', {}).get('message', 'Unknown API error')
+                raise Exception(f"LegiScan API Error: {error_msg}")
+            
+            legiscan_cache.set(params, data)
+            return data
                     
         except Exception as e:
             print(f"❌ Enhanced LegiScan API request failed: {e}")
@@ -201,9 +265,6 @@ class EnhancedLegiScanClient:
                 # Check if we have enough results or if this was the last page
                 if len(all_results) >= limit or len(page_results) < 50:  # LegiScan typically returns 50 per page
                     break
-                
-                # Rate limiting between page requests
-                await asyncio.sleep(self.rate_limit_delay)
             
             # Apply final limit
             if limit and len(all_results) > limit:
@@ -247,6 +308,55 @@ class EnhancedLegiScanClient:
             print(f"❌ Error fetching detailed bill {bill_id}: {e}")
             return {}
     
+    async def get_bill_detail(self, bill_id: int) -> Dict:
+        """Raw getBill response ({'bill': {...}}), or {} on failure"""
+        try:
+            url = self._build_url('getBill', {'id': bill_id})
+            return await self._api_request(url)
+        except Exception as e:
+            print(f"❌ Error fetching bill {bill_id}: {e}")
+            return {}
+    
+    @staticmethod
+    def _masterlist_entries(masterlist: Dict) -> Dict[str, Dict]:
+        """bill_id -> entry from a getMasterList / getMasterListRaw payload"""
+        entries = masterlist.get('bill', masterlist)
+        return {
+            str(entry['bill_id']): entry
+            for key, entry in entries.items()
+            if key != 'session' and isinstance(entry, dict) and entry.get('bill_id')
+        }
+    
+    async def get_master_list_raw(self, state: str = None, session_id: int = None) -> Dict:
+        """
+        getMasterListRaw for a session (or the state's current session).
+
+        Returns {'session': {...}, 'bills': {bill_id: {'bill_id', 'number', 'change_hash'}}}.
+        One request covers every bill in the session.
+        """
+        params = {'id': session_id} if session_id else {'state': state}
+        url = self._build_url('getMasterListRaw', params)
+        data = await self._api_request(url)
+        masterlist = data.get('masterlist', {})
+        return {
+            'session': masterlist.get('session', {}),
+            'bills': self._masterlist_entries(masterlist)
+        }
+    
+    async def get_bill_list(self, session_id: int) -> Dict:
+        """Every bill in a session via getMasterList ({'bills': [...]})"""
+        try:
+            url = self._build_url('getMasterList', {'id': session_id})
+            data = await self._api_request(url)
+            masterlist = data.get('masterlist', {})
+            return {
+                'session': masterlist.get('session', {}),
+                'bills': list(self._masterlist_entries(masterlist).values())
+            }
+        except Exception as e:
+            print(f"❌ Error fetching bill list for session {session_id}: {e}")
+            return {}
+    
     async def get_session_list(self, state: str) -> Dict:
         """Get list of sessions for a state"""
         try:
@@ -433,6 +543,72 @@ class EnhancedLegiScanClient:
                 'timestamp': datetime.now().isoformat()
             }
     
+    @staticmethod
+    def build_bill_record(bill_id, detailed_bill: Dict, bill_summary: Dict, state: str, query: str) -> Dict:
+        """Row for a search result, from its getBill details (AI fields not included)"""
+        return {
+            'bill_id': bill_id,
+            'bill_number': detailed_bill.get('bill_number', ''),
+            'title': detailed_bill.get('title', ''),
+            'description': detailed_bill.get('description', ''),
+            'state': state,
+            'state_abbr': state,
+            'status': convert_status_to_text(detailed_bill),
+            'session_id': detailed_bill.get('session', {}).get('session_id', ''),
+            'session_name': detailed_bill.get('session', {}).get('session_name', ''),
+            'bill_type': detailed_bill.get('bill_type', 'bill'),
+            'body': detailed_bill.get('body', ''),
+            'introduced_date': detailed_bill.get('status_date', ''),
+            'last_action_date': detailed_bill.get('status_date', ''),
+            'legiscan_url': detailed_bill.get('state_link', ''),
+            'pdf_url': '',
+            'sponsors': detailed_bill.get('sponsors', []),
+            'committee': detailed_bill.get('committee', []),
+            'history': detailed_bill.get('history', []),
+            'texts': detailed_bill.get('texts', []),
+            'search_query': query,
+            'search_relevance': bill_summary.get('relevance', 0),
+            'source': 'Enhanced LegiScan API',
+            'created_at': datetime.now().isoformat(),
+            'last_updated': datetime.now().isoformat(),
+            'reviewed': False
+        }
+
+    @staticmethod
+    def _new_bills(search_results: List[Dict], state: str, db_manager, session_id, year_filter: str,
+                   skip_existing: bool, force_refresh: bool):
+        """(search results to process, count skipped as already stored)"""
+        existing_bill_ids = set()
+        if db_manager and skip_existing and not force_refresh:
+            try:
+                existing_bill_ids = db_manager.get_existing_bill_ids(state, session_id, year_filter)
+                print(f"🔍 Found {len(existing_bill_ids)} existing bills in database")
+            except Exception as e:
+                print(f"⚠️ Could not check existing bills: {e}")
+                existing_bill_ids = set()
+        elif force_refresh:
+            print(f"🔄 Force refresh enabled - processing all bills regardless of existing records")
+        else:
+            print(f"➡️ Skip existing disabled - processing all bills")
+
+        # Filter out bills that already exist in database (unless force refresh)
+        new_bills = []
+        skipped_count = 0
+        for bill_summary in search_results:
+            bill_id = bill_summary.get('bill_id')
+            if bill_id and bill_id in existing_bill_ids and not force_refresh:
+                skipped_count += 1
+                print(f"⏭️ Skipping existing bill: {bill_id}")
+            else:
+                new_bills.append(bill_summary)
+
+        if skip_existing and not force_refresh:
+            print(f"📊 Processing {len(new_bills)} new bills (skipped {skipped_count} existing bills)")
+        else:
+            print(f"📊 Processing {len(new_bills)} bills (no filtering applied)")
+
+        return new_bills, skipped_count
+
     async def enhanced_search_and_analyze(self, state: str, query: str, limit: int = 2000, 
                                         year_filter: str = 'current', max_pages: int = 50,
                                         with_ai: bool = True, db_manager = None, session_id: int = None,
@@ -454,35 +630,9 @@ class EnhancedLegiScanClient:
             search_results = search_result['results']
             analyzed_bills = []
             
-            # Step 1.5: Check for existing bills to avoid re-processing (unless force refresh)
-            existing_bill_ids = set()
-            if db_manager and skip_existing and not force_refresh:
-                try:
-                    existing_bill_ids = db_manager.get_existing_bill_ids(state, session_id, year_filter)
-                    print(f"🔍 Found {len(existing_bill_ids)} existing bills in database")
-                except Exception as e:
-                    print(f"⚠️ Could not check existing bills: {e}")
-                    existing_bill_ids = set()
-            elif force_refresh:
-                print(f"🔄 Force refresh enabled - processing all bills regardless of existing records")
-            else:
-                print(f"➡️ Skip existing disabled - processing all bills")
-            
-            # Filter out bills that already exist in database (unless force refresh)
-            new_bills = []
-            skipped_count = 0
-            for bill_summary in search_results:
-                bill_id = bill_summary.get('bill_id')
-                if bill_id and bill_id in existing_bill_ids and not force_refresh:
-                    skipped_count += 1
-                    print(f"⏭️ Skipping existing bill: {bill_id}")
-                else:
-                    new_bills.append(bill_summary)
-            
-            if skip_existing and not force_refresh:
-                print(f"📊 Processing {len(new_bills)} new bills (skipped {skipped_count} existing bills)")
-            else:
-                print(f"📊 Processing {len(new_bills)} bills (no filtering applied)")
+            # Step 1.5: Skip bills already in the database (unless force refresh)
+            new_bills, skipped_count = self._new_bills(search_results, state, db_manager, session_id,
+                                                       year_filter, skip_existing, force_refresh)
             
             # Step 2: Process each new bill one by one
             for i, bill_summary in enumerate(new_bills, 1):
@@ -503,46 +653,18 @@ class EnhancedLegiScanClient:
                     ai_analysis = {}
                     if with_ai and enhanced_ai_client:
                         try:
-                            ai_analysis = await enhanced_bill_analysis(detailed_bill, f"Search: {query}")
+                            ai_analysis = savable_analysis(await enhanced_bill_analysis(detailed_bill, f"Search: {query}"))
                             print(f"✅ Enhanced AI analysis completed for bill {bill_id}")
                             print(f"🔍 AI Summary preview: {ai_analysis.get('ai_summary', 'No summary')[:100]}...")
+                        except AIUnavailableError as e:
+                            # Save without AI fields and leave it to the backfill worker
+                            print(f"🔌 AI unavailable for bill {bill_id}, queued for backfill: {e}")
+                            ai_analysis = {'needs_ai_processing': True}
                         except Exception as e:
                             print(f"❌ Enhanced AI analysis failed for bill {bill_id}: {e}")
-                            ai_analysis = {
-                                'ai_summary': f'<p>AI analysis failed: {str(e)}</p>',
-                                'ai_talking_points': '<p>AI analysis not available</p>',
-                                'ai_business_impact': '<p>AI analysis not available</p>',
-                                'category': 'not_applicable',
-                                'ai_version': 'error'
-                            }
+                            ai_analysis = failed_analysis(e)
                     
-                    complete_bill = {
-                        'bill_id': bill_id,
-                        'bill_number': detailed_bill.get('bill_number', ''),
-                        'title': detailed_bill.get('title', ''),
-                        'description': detailed_bill.get('description', ''),
-                        'state': state,
-                        'state_abbr': state,
-                        'status': convert_status_to_text(detailed_bill),
-                        'session_id': detailed_bill.get('session', {}).get('session_id', ''),
-                        'session_name': detailed_bill.get('session', {}).get('session_name', ''),
-                        'bill_type': detailed_bill.get('bill_type', 'bill'),
-                        'body': detailed_bill.get('body', ''),
-                        'introduced_date': detailed_bill.get('status_date', ''),
-                        'last_action_date': detailed_bill.get('status_date', ''),
-                        'legiscan_url': detailed_bill.get('state_link', ''),
-                        'pdf_url': '',
-                        'sponsors': detailed_bill.get('sponsors', []),
-                        'committee': detailed_bill.get('committee', []),
-                        'history': detailed_bill.get('history', []),
-                        'texts': detailed_bill.get('texts', []),
-                        'search_query': query,
-                        'search_relevance': bill_summary.get('relevance', 0),
-                        'source': 'Enhanced LegiScan API',
-                        'created_at': datetime.now().isoformat(),
-                        'last_updated': datetime.now().isoformat(),
-                        'reviewed': False
-                    }
+                    complete_bill = self.build_bill_record(bill_id, detailed_bill, bill_summary, state, query)
                     
                     # Step 2d: Add AI analysis results
                     complete_bill.update(ai_analysis)
@@ -594,6 +716,144 @@ class EnhancedLegiScanClient:
                 'bills': []
             }
 
+    async def stream_search_and_analyze(self, state: str, query: str, limit: int = 2000,
+                                        year_filter: str = 'current', max_pages: int = 50,
+                                        with_ai: bool = True, db_manager = None, session_id: int = None,
+                                        skip_existing: bool = True, force_refresh: bool = False,
+                                        include_deltas: bool = True, detail_concurrency: int = 5,
+                                        ai_concurrency: int = 3) -> AsyncIterator[Dict]:
+        """
+        enhanced_search_and_analyze as a stream of events.
+
+        Each bill is emitted ("bill") as soon as its getBill details arrive,
+        then its AI sections stream in ("ai_delta" chunks, "ai_section" when a
+        section is finished) and "bill_complete" follows once it is analyzed
+        and saved; "bill_queued" means the analysis failed or the AI was
+        unavailable, and the bill was saved for the backfill worker instead. Details are fetched
+        detail_concurrency at a time and up to ai_concurrency bills are
+        analyzed at once. Ends with "done" (or "error" if the search itself
+        fails).
+        """
+        from ai import stream_legiscan_bill_analysis
+        
+        started = datetime.now()
+        search_result = await self.search_bills_enhanced(state, query, limit, year_filter, max_pages, session_id)
+        if not search_result.get('success') or not search_result.get('results'):
+            yield {'event': 'error', 'error': search_result.get('error') or 'No bills found for search query'}
+            return
+        
+        search_results = search_result['results']
+        new_bills, skipped_count = await asyncio.to_thread(
+            self._new_bills, search_results, state, db_manager, session_id, year_filter, skip_existing, force_refresh
+        )
+        yield {'event': 'search', 'query': query, 'state': state, 'bills_found': len(search_results),
+               'existing_skipped': skipped_count, 'to_process': len(new_bills)}
+        
+        analyze = with_ai and enhanced_ai_client is not None
+        events: asyncio.Queue = asyncio.Queue()
+        detail_slots = asyncio.Semaphore(detail_concurrency)
+        ai_slots = asyncio.Semaphore(ai_concurrency)
+        db_lock = asyncio.Lock()
+        totals = {'processed': 0, 'saved': 0, 'errors': []}
+        
+        async def save(bill: Dict) -> bool:
+            if not db_manager:
+                return False
+            try:
+                # One connection is shared, so saves run one at a time
+                async with db_lock:
+                    return bool(await asyncio.to_thread(db_manager.save_bill, bill))
+            except Exception as e:
+                print(f"❌ Database save error for bill {bill['bill_id']}: {e}")
+                return False
+        
+        async def process(bill_summary: Dict):
+            bill_id = bill_summary.get('bill_id')
+            try:
+                async with detail_slots:
+                    detailed_bill = await self.get_bill_detailed(int(bill_id))
+                if not detailed_bill:
+                    await events.put({'event': 'bill_error', 'bill_id': bill_id, 'error': 'No detailed data'})
+                    return
+                bill = self.build_bill_record(bill_id, detailed_bill, bill_summary, state, query)
+                await events.put({'event': 'bill', 'bill': bill})
+                
+                if analyze:
+                    try:
+                        async with ai_slots:
+                            async for section, event in stream_legiscan_bill_analysis(detailed_bill):
+                                if section == 'analysis':
+                                    bill.update(savable_analysis(event))
+                                elif 'delta' in event:
+                                    if include_deltas:
+                                        await events.put({'event': 'ai_delta', 'bill_id': bill_id,
+                                                          'section': section, 'delta': event['delta']})
+                                else:
+                                    await events.put({'event': 'ai_section', 'bill_id': bill_id, 'section': section,
+                                                      'text': event['text'], 'cached': event.get('cached', False),
+                                                      'error': event.get('error')})
+                    except AIUnavailableError as e:
+                        # Save without AI fields and leave it to the backfill worker
+                        print(f"🔌 AI unavailable for bill {bill_id}, queued for backfill: {e}")
+                        bill['needs_ai_processing'] = True
+                        await events.put({'event': 'bill_queued', 'bill_id': bill_id, 'reason': str(e)})
+                    except Exception as e:
+                        print(f"❌ Streamed AI analysis failed for bill {bill_id}: {e}")
+                        bill.update(failed_analysis(e))
+                        await events.put({'event': 'bill_queued', 'bill_id': bill_id, 'reason': str(e)})
+                
+                saved = await save(bill)
+                totals['processed'] += 1
+                totals['saved'] += int(saved)
+                await events.put({'event': 'bill_complete', 'bill_id': bill_id, 'saved': saved,
+                                  'category': bill.get('category'), 'ai_version': bill.get('ai_version')})
+            except Exception as e:
+                print(f"❌ Error streaming bill {bill_id}: {e}")
+                totals['errors'].append(f"{bill_id}: {e}")
+                await events.put({'event': 'bill_error', 'bill_id': bill_id, 'error': str(e)})
+        
+        async def run_all():
+            try:
+                await asyncio.gather(*(process(b) for b in new_bills if b.get('bill_id')))
+            finally:
+                await events.put(None)
+        
+        runner = asyncio.create_task(run_all())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            # Client went away: stop fetching and analyzing
+            runner.cancel()
+        
+        yield {
+            'event': 'done',
+            'bills_found': len(search_results),
+            'existing_skipped': skipped_count,
+            'bills_processed': totals['processed'],
+            'bills_saved': totals['saved'],
+            'errors': totals['errors'][:20],
+            'duration_seconds': round((datetime.now() - started).total_seconds(), 1),
+            'timestamp': datetime.now().isoformat()
+        }
+
+_shared_client: Optional[EnhancedLegiScanClient] = None
+
+
+def get_shared_legiscan_client() -> EnhancedLegiScanClient:
+    """Process-wide client for the API server, so requests reuse its keep-alive connections"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = EnhancedLegiScanClient()
+    return _shared_client
+
+
+async def close_shared_legiscan_client():
+    """Close the shared client's session (called from the FastAPI lifespan)"""
+    if _shared_client is not None:
+        await _shared_client.close()
+
+
 class StateLegislationDatabaseManager:
     """Database manager for one-by-one bill processing"""
     
@@ -691,6 +951,9 @@ class StateLegislationDatabaseManager:
             is_postgresql = hasattr(self.connection, 'info')  # PostgreSQL connections have an 'info' attribute
             param_placeholder = '%s' if is_postgresql else '?'
             
+            # Sections the analysis failed on (savable_analysis / failed_analysis); None if no AI ran
+            ai_failures = bill_data.get('ai_failures')
+            
             # Check if bill already exists
             check_query = f"SELECT id FROM state_legislation WHERE bill_id = {param_placeholder}"
             cursor.execute(check_query, (bill_data.get('bill_id'),))
@@ -698,21 +961,15 @@ class StateLegislationDatabaseManager:
             
             if existing:
                 # Update existing bill
-                placeholders = ', '.join([f"{field} = {param_placeholder}" for field in [
+                fields = [
                     'bill_number', 'title', 'description', 'state', 'state_abbr',
                     'status', 'category', 'introduced_date', 'last_action_date',
                     'session_id', 'session_name', 'bill_type', 'body',
                     'legiscan_url', 'pdf_url', 'ai_summary', 'ai_executive_summary',
                     'ai_talking_points', 'ai_key_points', 'ai_business_impact',
                     'ai_potential_impact', 'ai_version', 'last_updated', 'reviewed'
-                ]])
-                update_query = f"""
-                UPDATE state_legislation SET
-                    {placeholders}
-                WHERE bill_id = {param_placeholder}
-                """
-                
-                values = (
+                ]
+                values = [
                     bill_data.get('bill_number', ''),
                     bill_data.get('title', ''),
                     bill_data.get('description', ''),
@@ -737,10 +994,27 @@ class StateLegislationDatabaseManager:
                     bill_data.get('ai_version', '1.0'),
                     datetime.utcnow(),
                     bill_data.get('reviewed', False),
-                    bill_data.get('bill_id')
-                )
+                ]
+                if bill_data.get('needs_ai_processing'):
+                    # AI was deferred: keep whatever analysis the row already has
+                    kept = [i for i, field in enumerate(fields)
+                            if not field.startswith('ai_') and field != 'category']
+                    fields = [fields[i] for i in kept]
+                    values = [values[i] for i in kept]
+                elif ai_failures:
+                    # Failed sections keep their current value
+                    failed_columns = {column for section in ai_failures for column in SECTION_COLUMNS[section]}
+                    kept = [i for i, field in enumerate(fields) if field not in failed_columns]
+                    fields = [fields[i] for i in kept]
+                    values = [values[i] for i in kept]
+                placeholders = ', '.join([f"{field} = {param_placeholder}" for field in fields])
+                update_query = f"""
+                UPDATE state_legislation SET
+                    {placeholders}
+                WHERE bill_id = {param_placeholder}
+                """
                 
-                cursor.execute(update_query, values)
+                cursor.execute(update_query, (*values, bill_data.get('bill_id')))
                 print(f"✅ Updated existing bill: {bill_data.get('bill_id')}")
                 
             else:
@@ -791,6 +1065,22 @@ class StateLegislationDatabaseManager:
                 cursor.execute(insert_query, values)
                 print(f"✅ Inserted new bill: {bill_data.get('bill_id')}")
             
+            if bill_data.get('needs_ai_processing') and is_postgresql:
+                # Picked up by ai_backfill_worker.py (the queue only exists on PostgreSQL)
+                cursor.execute(
+                    "UPDATE state_legislation SET needs_ai_processing = true WHERE bill_id = %s",
+                    (bill_data.get('bill_id'),)
+                )
+            
+            if ai_failures is not None and is_postgresql:
+                # Per-section outcomes (ai_job_status.py), in the same transaction as the bill
+                if existing:
+                    row_id = existing[0]
+                else:
+                    cursor.execute("SELECT id FROM state_legislation WHERE bill_id = %s", (bill_data.get('bill_id'),))
+                    row_id = cursor.fetchone()[0]
+                record_outcomes(outcome_rows(STATE_LEGISLATION, row_id, ai_failures, bill_data.get('ai_version')), cursor)
+            
             self.connection.commit()
             return True
             
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+LegiScan Incremental Sync
+Keeps state_legislation current using LegiScan's per-bill change_hash.
+
+For each session: one getMasterListRaw call returns every bill's
+change_hash, which is diffed against the change_hash stored on
+state_legislation (database/migrations/add_bill_change_hash.sql). getBill
+is only called for bills that are new or whose hash moved, and the results
+go through the batched upsert. A quiet night is one request per session
+instead of one per bill, and every bill is covered rather than a sample.
+
+Bills stored before change_hash existed (NULL hash) are seeded straight from
+the master list, without a getBill call or an AI re-queue. Statuses are
+compared after normalize_status(), so the free-text statuses older writers
+stored don't count as changes against LegiScan's coarse status names.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from psycopg2.extras import execute_values
+
+from bulk_upsert import upsert_state_legislation
+from database_config import get_db_connection
+from legiscan_dataset_loader import DATASET_COLUMNS, INSERT_ONLY_COLUMNS, bill_to_row
+from state_orchestrator import run_states
+
+logger = logging.getLogger(__name__)
+
+# getBill requests in flight at once per session
+DEFAULT_FETCH_CONCURRENCY = 4
+
+# (keywords, LegiScan status name), checked in order against lowercased text
+STATUS_KEYWORDS = [
+    (('effective',), 'Effective'),
+    (('signed', 'chaptered', 'enacted', 'became law', 'approved by governor'), 'Signed by Governor'),
+    (('veto',), 'Vetoed'),
+    (('postponed',), 'Indefinitely Postponed'),
+    (('failed', 'dead', 'died', 'withdrawn'), 'Failed/Dead'),
+    (('enrolled', 'passed both'), 'Enrolled'),
+    (('engrossed', 'passed house', 'passed senate', 'passed assembly'), 'Engrossed'),
+    (('passed',), 'Passed'),
+    (('introduced', 'committee', 'referred', 'filed', 'pending', 'reading'), 'Introduced'),
+]
+
+
+@dataclass
+class SyncReport:
+    """What one sync pass found and did"""
+    sessions: int = 0
+    bills_seen: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    seeded: int = 0
+    fetched: int = 0
+    fetch_errors: int = 0
+    status_changes: int = 0
+    api_calls: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def merge(self, other: "SyncReport"):
+        for name in ('sessions', 'bills_seen', 'new', 'changed', 'unchanged', 'seeded', 'fetched',
+                     'fetch_errors', 'status_changes', 'api_calls'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.errors.extend(other.errors)
+
+    def to_dict(self) -> Dict:
+        return {
+            "sessions": self.sessions,
+            "bills_seen": self.bills_seen,
+            "new": self.new,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "seeded": self.seeded,
+            "fetched": self.fetched,
+            "fetch_errors": self.fetch_errors,
+            "status_changes": self.status_changes,
+            "api_calls": self.api_calls,
+            "elapsed": round(self.elapsed, 2),
+            "errors": self.errors[:20],
+        }
+
+
+def load_local_index(bill_ids: Sequence[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """bill_id -> {'change_hash', 'status'} for the bills we already store"""
+    if not bill_ids:
+        return {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT bill_id, change_hash, status
+            FROM state_legislation
+            WHERE bill_id = ANY(%s)
+        ''', (list(bill_ids),))
+        return {
+            str(bill_id): {'change_hash': change_hash, 'status': status}
+            for bill_id, change_hash, status in cursor.fetchall()
+        }
+
+
+def normalize_status(status: Optional[str]) -> str:
+    """Free-text or LegiScan status -> LegiScan status name (or the cleaned text if nothing matches)"""
+    text = ' '.join(str(status or '').lower().split())
+    for keywords, name in STATUS_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return text
+
+
+def diff_master_list(master: Dict[str, Dict], local: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """
+    Split master list bill ids into new / changed / unchanged / seed.
+
+    'seed' are stored bills without a change_hash yet: their hash is written
+    from the master list instead of refetching them.
+    """
+    diff = {'new': [], 'changed': [], 'unchanged': [], 'seed': []}
+    for bill_id, entry in master.items():
+        known = local.get(bill_id)
+        if known is None:
+            diff['new'].append(bill_id)
+        elif known['change_hash'] is None:
+            diff['seed'].append(bill_id)
+        elif known['change_hash'] != entry.get('change_hash'):
+            diff['changed'].append(bill_id)
+        else:
+            diff['unchanged'].append(bill_id)
+    return diff
+
+
+def seed_change_hashes(master: Dict[str, Dict], bill_ids: Sequence[str]) -> int:
+    """Store the master list change_hash on bills that have none yet"""
+    values = [(bill_id, master[bill_id]['change_hash']) for bill_id in bill_ids if master[bill_id].get('change_hash')]
+    if not values:
+        return 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute_values(cursor, '''
+            UPDATE state_legislation AS s SET change_hash = v.change_hash
+            FROM (VALUES %s) AS v(bill_id, change_hash)
+            WHERE s.bill_id = v.bill_id AND s.change_hash IS NULL
+        ''', values, page_size=1000)
+        return cursor.rowcount
+
+
+def save_synced_bills(bills: List[Dict], local: Dict[str, Dict], state: str) -> int:
+    """
+    Upsert fetched bills and queue AI work for new bills and status changes.
+
+    Returns the number of existing bills whose status changed.
+    """
+    timestamp = datetime.now().isoformat()
+    rows, needs_ai, status_changes = [], [], 0
+    for bill in bills:
+        row = bill_to_row(bill, state, timestamp)
+        rows.append(row)
+
+        known = local.get(row['bill_id'])
+        if known is None:
+            needs_ai.append(row['bill_id'])
+        elif normalize_status(known['status']) == normalize_status(row['status']):
+            # Same status; keep the more descriptive text already stored
+            row['status'] = known['status'] or row['status']
+        else:
+            logger.info(f"📊 Status change: {row['state']} {row['bill_number']}: "
+                        f"'{known['status']}' → '{row['status']}'")
+            needs_ai.append(row['bill_id'])
+            status_changes += 1
+
+    update_columns = [c for c in DATASET_COLUMNS if c not in INSERT_ONLY_COLUMNS]
+    with get_db_connection() as conn:
+        result = upsert_state_legislation(rows, columns=DATASET_COLUMNS, update_columns=update_columns, conn=conn)
+        if needs_ai:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE state_legislation SET needs_ai_processing = true
+                WHERE bill_id = ANY(%s)
+            ''', (needs_ai,))
+    for failure in result.failed:
+        logger.error(f"❌ Error saving bill {failure.key.get('bill_id')}: {failure.error}")
+    return status_changes
+
+
+async def sync_session(
+    client,
+    state: str,
+    session_id: Optional[int] = None,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY
+) -> SyncReport:
+    """Sync one session (the state's current session when session_id is None)"""
+    started = time.monotonic()
+    report = SyncReport(sessions=1)
+
+    master = await client.get_master_list_raw(state=state, session_id=session_id)
+    report.api_calls += 1
+    bills = master['bills']
+    session_name = master['session'].get('session_name', session_id or 'current')
+    report.bills_seen = len(bills)
+
+    local = await asyncio.to_thread(load_local_index, list(bills))
+    diff = diff_master_list(bills, local)
+    report.new, report.changed, report.unchanged = len(diff['new']), len(diff['changed']), len(diff['unchanged'])
+    if diff['seed']:
+        report.seeded = await asyncio.to_thread(seed_change_hashes, bills, diff['seed'])
+    logger.info(f"🔍 {state} {session_name}: {report.bills_seen} bills, {report.new} new, "
+                f"{report.changed} changed, {report.unchanged} unchanged, {report.seeded} seeded")
+
+    to_fetch = diff['new'] + diff['changed']
+    if not to_fetch:
+        report.elapsed = time.monotonic() - started
+        return report
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(bill_id: str) -> Optional[Dict]:
+        async with semaphore:
+            response = await client.get_bill_detail(bill_id)
+        bill = response.get('bill') if response else None
+        if not bill:
+            report.fetch_errors += 1
+            report.errors.append(f"getBill {bill_id} returned nothing")
+        return bill
+
+    fetched = [bill for bill in await asyncio.gather(*(fetch(b) for b in to_fetch)) if bill]
+    report.api_calls += len(to_fetch)
+    report.fetched = len(fetched)
+
+    if fetched:
+        report.status_changes = await asyncio.to_thread(save_synced_bills, fetched, local, state)
+
+    report.elapsed = time.monotonic() - started
+    logger.info(f"✅ {state} {session_name}: saved {report.fetched} bills with {report.api_calls} API calls "
+                f"in {report.elapsed:.1f}s")
+    return report
+
+
+async def sync_states(
+    states: Sequence[str],
+    client=None,
+    session_ids: Optional[Dict[str, Sequence[int]]] = None,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY
+) -> SyncReport:
+    """
+    Sync each state's current session (or the listed session_ids per state).
+
+    States sync concurrently (state_orchestrator) within the shared LegiScan
+    budget. A failing state is logged and skipped; the others still sync.
+    """
+    owns_client = client is None
+    if owns_client:
+        from legiscan_service import EnhancedLegiScanClient
+        client = EnhancedLegiScanClient()
+
+    async def sync_state(state: str) -> SyncReport:
+        report = SyncReport()
+        for session_id in (session_ids or {}).get(state) or [None]:
+            try:
+                report.merge(await sync_session(client, state, session_id, concurrency))
+            except Exception as e:
+                logger.error(f"❌ Sync failed for {state} session {session_id or 'current'}: {e}")
+                report.errors.append(f"{state}: {e}")
+        return report
+
+    started = time.monotonic()
+    total = SyncReport()
+    try:
+        states_report = await run_states(states, sync_state)
+    finally:
+        if owns_client:
+            await client.close()
+    for report in states_report.results().values():
+        total.merge(report)
+    for state in states_report.failed:
+        total.errors.append(f"{state}: {states_report.runs[state].error}")
+    states_report.log(logger)
+
+    total.elapsed = time.monotonic() - started
+    logger.info(f"📊 Sync complete: {total.fetched} bills refreshed out of {total.bills_seen} "
+                f"using {total.api_calls} API calls ({total.elapsed:.1f}s)")
+    return total
@@ -0,0 +1,104 @@
+# legislation_counters.py - O(1) counts for badge and count endpoints
+"""
+Reads the legislation_counters table maintained by the statement-level
+triggers in database/migrations/add_legislation_counters.sql.
+
+The table holds one row per (source_table, state, state_abbr, category,
+is_new, reviewed) combination, so every count the UI asks for is a SUM over
+a few dozen rows instead of a COUNT(*) over the full table. Free-text
+searches can't be answered from it; callers fall back to a live count for
+those and whenever the migration hasn't been applied yet.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from async_db import fetch_all, fetch_value
+
+logger = logging.getLogger(__name__)
+
+# How long the "is the counters table there?" answer is trusted before re-checking
+COUNTERS_CHECK_TTL = 300
+
+_counters_status: Dict[str, Any] = {}
+
+
+async def counters_available() -> bool:
+    """Whether legislation_counters exists (cached for COUNTERS_CHECK_TTL)"""
+    if _counters_status and time.monotonic() - _counters_status["checked_at"] < COUNTERS_CHECK_TTL:
+        return bool(_counters_status["available"])
+
+    try:
+        available = bool(await fetch_value(
+            "SELECT to_regclass('legislation_counters') IS NOT NULL", default=False
+        ))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not check legislation_counters: {e}")
+        available = False
+
+    if not available:
+        logger.info("ℹ️ legislation_counters not found, using live COUNT(*)")
+    _counters_status.update({"available": available, "checked_at": time.monotonic()})
+    return available
+
+
+def state_filter(state: str, placeholder: str = "%s") -> Tuple[str, List[str]]:
+    """The state match used by the state legislation endpoints (name, abbreviation or partial name)"""
+    return (
+        f"(state = {placeholder} OR state_abbr = {placeholder} OR state LIKE {placeholder})",
+        [state, state, f"%{state}%"],
+    )
+
+
+def _counter_where(
+    source_table: str,
+    state: Optional[str] = None,
+    category: Optional[str] = None,
+    is_new: Optional[bool] = None,
+    reviewed: Optional[bool] = None
+) -> Tuple[str, List]:
+    clauses = ["source_table = %s"]
+    params: List = [source_table]
+    if state:
+        clause, state_params = state_filter(state)
+        clauses.append(clause)
+        params.extend(state_params)
+    if category and category != 'all':
+        clauses.append("category = %s")
+        params.append(category)
+    if is_new is not None:
+        clauses.append("is_new = %s")
+        params.append(is_new)
+    if reviewed is not None:
+        clauses.append("reviewed = %s")
+        params.append(reviewed)
+    return " AND ".join(clauses), params
+
+
+async def count_from_counters(
+    source_table: str,
+    state: Optional[str] = None,
+    category: Optional[str] = None,
+    is_new: Optional[bool] = None,
+    reviewed: Optional[bool] = None
+) -> int:
+    """Row count for the given filters, summed from legislation_counters"""
+    where, params = _counter_where(source_table, state, category, is_new, reviewed)
+    return int(await fetch_value(
+        f"SELECT COALESCE(SUM(row_count), 0) FROM legislation_counters WHERE {where}",
+        params, default=0
+    ))
+
+
+async def new_counts_by_state(source_table: str = "state_legislation") -> Dict[str, int]:
+    """Unviewed rows per state, summed from legislation_counters"""
+    rows = await fetch_all("""
+        SELECT state, SUM(row_count) AS new_count
+        FROM legislation_counters
+        WHERE source_table = %s AND is_new = true
+        GROUP BY state
+        HAVING SUM(row_count) > 0
+        ORDER BY state
+    """, (source_table,))
+    return {row['state']: int(row['new_count']) for row in rows}
@@ -11,6 +11,14 @@ import asyncio
 from datetime import datetime
 from pathlib import Path
 from database_config import get_db_connection
+from bulk_upsert import upsert_state_legislation
+from legiscan_dataset_loader import find_bill_files, load_datasets, state_from_directory
+
+# Columns written for uploaded state legislation items
+UPLOAD_COLUMNS = [
+    'bill_id', 'bill_number', 'title', 'description', 'state', 'state_abbr', 'status',
+    'introduced_date', 'session_name', 'category', 'created_at', 'last_updated'
+]
 
 # Practice area keywords for categorization
 PRACTICE_AREA_KEYWORDS = {
@@ -71,6 +79,11 @@ def process_md5_file(file_path: str, upload_type: str, state: str = None) -> dic
     """Process MD5 hash file"""
     print(f"🔍 Processing MD5 hash file: {file_path}")
     
+    # A LegiScan dataset's hash.md5 sits next to its bill/ directory: load the bills themselves
+    dataset_dir = os.path.dirname(os.path.abspath(file_path))
+    if upload_type == 'state_legislation' and os.path.isdir(os.path.join(dataset_dir, 'bill')):
+        return process_dataset(dataset_dir, state)
+    
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -106,6 +119,31 @@ def process_md5_file(file_path: str, upload_type: str, state: str = None) -> dic
     except Exception as e:
         return {"success": False, "error": f"MD5 processing error: {str(e)}"}
 
+def process_dataset(path: str, state: str = None) -> dict:
+    """Load a LegiScan dataset directory (or a data/ tree of them) with the COPY loader"""
+    print(f"🔍 Processing LegiScan dataset: {path}")
+    
+    bill_dir = os.path.join(path, 'bill')
+    if os.path.isdir(bill_dir):
+        # Single session: data/[STATE]/[SESSION]
+        state = state or state_from_directory(os.path.dirname(os.path.abspath(path)))
+        files = [(str(p), state) for p in sorted(Path(bill_dir).glob('*.json'))]
+    else:
+        files = find_bill_files(path, [state] if state else None)
+    
+    stats = load_datasets(path, files=files)
+    return {
+        "success": True,
+        "total": stats.files,
+        "processed": stats.rows,
+        "successful": stats.inserted + stats.updated + stats.unchanged,
+        "failed": stats.failed + stats.parse_errors,
+        "errors": stats.errors,
+        "source_file": path,
+        "files_per_sec": round(stats.files_per_sec, 1),
+        "rows_per_sec": round(stats.rows_per_sec, 1)
+    }
+
 def process_items(items: list, upload_type: str, state: str, source_file: str) -> dict:
     """Process items and save to database"""
     print(f"💾 Processing {len(items)} items for {upload_type}")
@@ -120,16 +158,16 @@ def process_items(items: list, upload_type: str, state: str, source_file: str) -
         "source_file": source_file
     }
     
+    if upload_type == 'state_legislation':
+        return save_state_legislation_items(items, state, results)
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
             for i, item in enumerate(items):
                 try:
-                    if upload_type == 'state_legislation':
-                        success = save_state_legislation(cursor, item, state)
-                    else:  # executive_orders
-                        success = save_executive_order(cursor, item)
+                    success = save_executive_order(cursor, item)
                     
                     results["processed"] += 1
                     if success:
@@ -156,67 +194,74 @@ def process_items(items: list, upload_type: str, state: str, source_file: str) -
     
     return results
 
-def save_state_legislation(cursor, item: dict, state: str) -> bool:
-    """Save state legislation item to database"""
+def state_legislation_item_row(item: dict, state: str, timestamp: str) -> dict:
+    """Map an uploaded item onto state_legislation columns"""
+    bill_number = item.get('bill_number') or item.get('number') or item.get('bill_id', 'UNKNOWN')
+    title = item.get('title', '')[:500]  # Limit length
+    description = item.get('description', '')[:1000]
+    return {
+        'bill_id': str(item.get('bill_id') or f"{state}_{bill_number}"),
+        'bill_number': bill_number,
+        'title': title,
+        'description': description,
+        'state': state,
+        'state_abbr': state,
+        'status': item.get('status', ''),
+        'introduced_date': item.get('introduced_date') or item.get('introduction_date'),
+        'session_name': item.get('session_name', '89th Legislature Regular Session'),
+        'category': determine_practice_area(title, description),
+        'created_at': timestamp,
+        'last_updated': timestamp
+    }
+
+def resolve_existing_bill_ids(rows: list, state: str):
+    """
+    Point rows that came without a bill_id at the stored bill with the same
+    (state, bill_number), so they update it instead of inserting a duplicate
+    """
+    numbers = list({row['bill_number'] for row in rows})
+    if not numbers:
+        return
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT bill_number, bill_id FROM state_legislation
+            WHERE (state = %s OR state_abbr = %s) AND bill_number = ANY(%s) AND bill_id IS NOT NULL
+        ''', (state, state, numbers))
+        existing = {bill_number: str(bill_id) for bill_number, bill_id in cursor.fetchall()}
+    for row in rows:
+        if row['bill_number'] in existing:
+            row['bill_id'] = existing[row['bill_number']]
+
+def save_state_legislation_items(items: list, state: str, results: dict) -> dict:
+    """Save state legislation items with the batched upsert path"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows, without_id = [], []
+    for i, item in enumerate(items):
+        try:
+            row = state_legislation_item_row(item, state, timestamp)
+            rows.append(row)
+            if not item.get('bill_id'):
+                without_id.append(row)
+        except Exception as e:
+            results["failed"] += 1
+            results["errors"].append(f"Item {i+1}: {str(e)}")
+    
     try:
-        # Extract data
-        bill_number = item.get('bill_number') or item.get('number') or item.get('bill_id', 'UNKNOWN')
-        title = item.get('title', '')[:500]  # Limit length
-        description = item.get('description', '')[:1000]
-        status = item.get('status', '')
-        introduced_date = item.get('introduced_date') or item.get('introduction_date')
-        session_name = item.get('session_name', '89th Legislature Regular Session')
-        bill_id = item.get('bill_id') or f"{state}_{bill_number}"
-        
-        # Determine category
-        category = determine_practice_area(title, description)
-        
-        # Check if already exists
-        cursor.execute("""
-            SELECT COUNT(*) FROM dbo.state_legislation
-            WHERE state = ? AND bill_number = ?
-        """, (state, bill_number))
-        
-        exists = cursor.fetchone()[0] > 0
-        
-        if exists:
-            # Update existing
-            cursor.execute("""
-                UPDATE dbo.state_legislation
-                SET title = ?,
-                    description = ?,
-                    status = ?,
-                    introduced_date = ?,
-                    session_name = ?,
-                    category = ?,
-                    last_updated = ?
-                WHERE state = ? AND bill_number = ?
-            """, (
-                title, description, status, introduced_date, session_name,
-                category, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                state, bill_number
-            ))
-        else:
-            # Insert new
-            cursor.execute("""
-                INSERT INTO dbo.state_legislation (
-                    state, bill_id, bill_number, title, description,
-                    status, introduced_date, session_name, category,
-                    created_at, last_updated, reviewed
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                state, bill_id, bill_number, title, description,
-                status, introduced_date, session_name, category,
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                0  # reviewed = false
-            ))
-        
-        return True
-        
+        resolve_existing_bill_ids(without_id, state)
+        result = upsert_state_legislation(rows, columns=UPLOAD_COLUMNS)
+        results["processed"] = len(rows)
+        results["successful"] = result.saved
+        results["failed"] += len(result.failed)
+        results["errors"].extend(f"Bill {f.key.get('bill_id')}: {f.error}" for f in result.failed)
+        print(f"✅ Database committed - {result.saved} items saved "
+              f"({result.inserted} new, {result.updated} updated)")
     except Exception as e:
-        print(f"Error saving state legislation {bill_number}: {e}")
-        return False
+        results["success"] = False
+        results["errors"].append(f"Database error: {str(e)}")
+        print(f"❌ Database error: {e}")
+    
+    return results
 
 def save_executive_order(cursor, item: dict) -> bool:
     """Save executive order to database"""
@@ -280,7 +325,7 @@ def main():
         print("Usage: python local_file_uploader.py <file_path> <upload_type> <state>")
         print()
         print("Arguments:")
-        print("  file_path    : Path to your JSON or MD5 hash file")
+        print("  file_path    : Path to your JSON or MD5 hash file, or a LegiScan dataset directory")
         print("  upload_type  : 'state_legislation' or 'executive_orders'") 
         print("  state        : State code (e.g., 'TX') - required for state_legislation")
         print()
@@ -322,7 +367,9 @@ def main():
     print(f"🔧 Format: {file_ext}")
     print()
     
-    if file_ext == '.json':
+    if os.path.isdir(file_path) and upload_type == 'state_legislation':
+        results = process_dataset(file_path, state)
+    elif file_ext == '.json':
         results = process_json_file(file_path, upload_type, state)
     elif file_ext in ['.md5', '.hash.md5'] or file_path.endswith('.hash.md5'):
         results = process_md5_file(file_path, upload_type, state)
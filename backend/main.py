@@ -12,7 +12,6 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional
 from functools import lru_cache
-import hashlib
 
 import aiohttp
 import pyodbc
@@ -20,18 +19,29 @@ import requests
 from ai_status import check_azure_ai_configuration
 from ai import PromptType, process_with_ai
 from ai import convert_status_to_text
+from ai_job_status import failed_analysis, savable_analysis
+from ai_scheduler import AIUnavailableError, Priority, ai_priority, ai_scheduler
 from progress_tracker import progress_tracker
+from api_cache import api_cache, cache_tag
 # Azure SDK imports for Managed Identity
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.app import ContainerAppsAPIClient
 from azure.core.exceptions import AzureError
 # Import our new fixed modules  
 from database_config import test_database_connection, get_db_connection, get_database_config
+from connection_pool import close_connection_pool, get_pool_stats
+from async_db import close_async_pool, fetch_all, fetch_value, async_db_cursor, get_async_pool_stats, execute as db_execute
+from search_engine import get_search_mode, search_executive_orders, search_state_legislation
+from legislation_counters import counters_available, count_from_counters, new_counts_by_state
+from bulk_upsert import bulk_upsert, state_legislation_row, upsert_state_legislation
+from legiscan_dataset_loader import DEFAULT_DATA_DIR, load_datasets
+from pagination import InvalidCursorError, keyset_clause, next_cursor
 from job_execution_summaries import get_job_summary, save_job_summary
 # Import LegiScan service
 from legiscan_service import (
-    EnhancedLegiScanClient, 
     StateLegislationDatabaseManager,
+    close_shared_legiscan_client,
+    get_shared_legiscan_client,
     LegiScanConfigRequest,
     LegiScanSearchRequest,
     StateLegislationFetchRequest,
@@ -55,6 +65,7 @@ from fastapi import (BackgroundTasks, FastAPI, HTTPException, Path, Query, Uploa
                      Request, Response)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import requests
 from upload_endpoints import upload_data_file, get_upload_status, list_upload_jobs
@@ -111,250 +122,110 @@ def test_azure_sql_connection():
     print("🔍 Testing Azure SQL connection using direct connection...")
     return test_database_connection()
 
+LEGISLATION_COLUMNS = [
+    'bill_id', 'bill_number', 'title', 'description', 'status', 'last_action', 'last_action_date',
+    'state_id', 'state_name', 'session_id', 'session_name', 'url', 'state_link', 'completed',
+    'status_date', 'progress', 'subjects', 'sponsors', 'committee', 'pending_committee_id',
+    'history', 'calendar', 'texts', 'votes', 'amendments', 'supplements', 'change_hash', 'updated_at'
+]
+
+_legislation_table_ready = False
+
+def ensure_legislation_table():
+    """Create the legacy legislation table once per process instead of on every save"""
+    global _legislation_table_ready
+    if _legislation_table_ready:
+        return
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS legislation (
+            id SERIAL PRIMARY KEY,
+            bill_id VARCHAR(50) UNIQUE,
+            bill_number VARCHAR(100),
+            title TEXT,
+            description TEXT,
+            status VARCHAR(200),
+            last_action TEXT,
+            last_action_date TIMESTAMP,
+            state_id INTEGER,
+            state_name VARCHAR(100),
+            session_id INTEGER,
+            session_name VARCHAR(200),
+            url VARCHAR(500),
+            state_link VARCHAR(500),
+            completed INTEGER DEFAULT 0,
+            status_date TIMESTAMP,
+            progress TEXT,
+            subjects TEXT,
+            sponsors TEXT,
+            committee TEXT,
+            pending_committee_id INTEGER,
+            history TEXT,
+            calendar TEXT,
+            texts TEXT,
+            votes TEXT,
+            amendments TEXT,
+            supplements TEXT,
+            change_hash VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cursor.close()
+    _legislation_table_ready = True
+
 def save_legislation_to_azure_sql(bills: List[Dict]) -> int:
-    """Save legislation bills using direct database connection (works with both PostgreSQL and Azure SQL)"""
+    """Save legislation bills to the legacy legislation table with one set-based upsert per chunk"""
     if not bills:
         print("⚠️ No bills to save")
         return 0
     
     try:
-        from database_config import get_database_config
-        config = get_database_config()
-        is_postgresql = config['type'] == 'postgresql'
-        param_placeholder = '%s' if is_postgresql else '?'
-        
+        now = datetime.now()
+        rows = [{
+            'bill_id': bill.get('bill_id', ''),
+            'bill_number': bill.get('bill_number', ''),
+            'title': bill.get('title', ''),
+            'description': bill.get('description', ''),
+            'status': bill.get('status', ''),
+            'last_action': bill.get('last_action', ''),
+            'last_action_date': bill.get('last_action_date'),
+            'state_id': bill.get('state_id', 0),
+            'state_name': bill.get('state', ''),
+            'session_id': bill.get('session_id', 0),
+            'session_name': bill.get('session_name', ''),
+            'url': bill.get('url', ''),
+            'state_link': bill.get('state_link', ''),
+            'completed': bill.get('completed', 0),
+            'status_date': bill.get('status_date'),
+            'progress': str(bill.get('progress', [])),
+            'subjects': str(bill.get('subjects', [])),
+            'sponsors': str(bill.get('sponsors', [])),
+            'committee': bill.get('committee', ''),
+            'pending_committee_id': bill.get('pending_committee_id', 0),
+            'history': str(bill.get('history', [])),
+            'calendar': str(bill.get('calendar', [])),
+            'texts': str(bill.get('texts', [])),
+            'votes': str(bill.get('votes', [])),
+            'amendments': str(bill.get('amendments', [])),
+            'supplements': str(bill.get('supplements', [])),
+            'change_hash': bill.get('change_hash', ''),
+            'updated_at': now
+        } for bill in bills]
+        
+        ensure_legislation_table()
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            saved_count = 0
-            
-            # Create table if it doesn't exist - different syntax for each DB
-            if is_postgresql:
-                create_table_sql = """
-                CREATE TABLE IF NOT EXISTS legislation (
-                    id SERIAL PRIMARY KEY,
-                    bill_id VARCHAR(50) UNIQUE,
-                    bill_number VARCHAR(100),
-                    title TEXT,
-                    description TEXT,
-                    status VARCHAR(200),
-                    last_action TEXT,
-                    last_action_date TIMESTAMP,
-                    state_id INTEGER,
-                    state_name VARCHAR(100),
-                    session_id INTEGER,
-                    session_name VARCHAR(200),
-                    url VARCHAR(500),
-                    state_link VARCHAR(500),
-                    completed INTEGER DEFAULT 0,
-                    status_date TIMESTAMP,
-                    progress TEXT,
-                    subjects TEXT,
-                    sponsors TEXT,
-                    committee TEXT,
-                    pending_committee_id INTEGER,
-                    history TEXT,
-                    calendar TEXT,
-                    texts TEXT,
-                    votes TEXT,
-                    amendments TEXT,
-                    supplements TEXT,
-                    change_hash VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            else:
-                create_table_sql = """
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='legislation' AND xtype='U')
-                CREATE TABLE legislation (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    bill_id NVARCHAR(50) UNIQUE,
-                    bill_number NVARCHAR(100),
-                    title NVARCHAR(MAX),
-                    description NVARCHAR(MAX),
-                    status NVARCHAR(200),
-                    last_action NVARCHAR(MAX),
-                    last_action_date DATETIME,
-                    state_id INT,
-                    state_name NVARCHAR(100),
-                    session_id INT,
-                    session_name NVARCHAR(200),
-                    url NVARCHAR(500),
-                    state_link NVARCHAR(500),
-                    completed INT DEFAULT 0,
-                    status_date DATETIME,
-                    progress NVARCHAR(MAX),
-                    subjects NVARCHAR(MAX),
-                    sponsors NVARCHAR(MAX),
-                    committee NVARCHAR(MAX),
-                    pending_committee_id INT,
-                    history NVARCHAR(MAX),
-                    calendar NVARCHAR(MAX),
-                    texts NVARCHAR(MAX),
-                    votes NVARCHAR(MAX),
-                    amendments NVARCHAR(MAX),
-                    supplements NVARCHAR(MAX),
-                    change_hash NVARCHAR(100),
-                    created_at DATETIME DEFAULT GETDATE(),
-                    updated_at DATETIME DEFAULT GETDATE()
-                )
-                """
-            cursor.execute(create_table_sql)
-            
-            # Insert bills - use UPSERT logic for both database types
-            for bill in bills:
-                try:
-                    # Use different SQL for PostgreSQL vs SQL Server
-                    if is_postgresql:
-                        # PostgreSQL uses ON CONFLICT
-                        insert_sql = f"""
-                        INSERT INTO legislation (
-                            bill_id, bill_number, title, description, status, last_action, last_action_date,
-                            state_id, state_name, session_id, session_name, url, state_link, completed,
-                            status_date, progress, subjects, sponsors, committee, pending_committee_id,
-                            history, calendar, texts, votes, amendments, supplements, change_hash
-                        ) VALUES (
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                            {param_placeholder}, {param_placeholder}, {param_placeholder}
-                        ) ON CONFLICT (bill_id) DO UPDATE SET
-                            bill_number = EXCLUDED.bill_number,
-                            title = EXCLUDED.title,
-                            description = EXCLUDED.description,
-                            status = EXCLUDED.status,
-                            last_action = EXCLUDED.last_action,
-                            last_action_date = EXCLUDED.last_action_date,
-                            state_id = EXCLUDED.state_id,
-                            state_name = EXCLUDED.state_name,
-                            session_id = EXCLUDED.session_id,
-                            session_name = EXCLUDED.session_name,
-                            url = EXCLUDED.url,
-                            state_link = EXCLUDED.state_link,
-                            completed = EXCLUDED.completed,
-                            status_date = EXCLUDED.status_date,
-                            progress = EXCLUDED.progress,
-                            subjects = EXCLUDED.subjects,
-                            sponsors = EXCLUDED.sponsors,
-                            committee = EXCLUDED.committee,
-                            pending_committee_id = EXCLUDED.pending_committee_id,
-                            history = EXCLUDED.history,
-                            calendar = EXCLUDED.calendar,
-                            texts = EXCLUDED.texts,
-                            votes = EXCLUDED.votes,
-                            amendments = EXCLUDED.amendments,
-                            supplements = EXCLUDED.supplements,
-                            change_hash = EXCLUDED.change_hash,
-                            updated_at = CURRENT_TIMESTAMP
-                        """
-                    else:
-                        # SQL Server uses MERGE
-                        insert_sql = f"""
-                        MERGE legislation AS target
-                        USING (SELECT {param_placeholder} AS bill_id) AS source
-                        ON target.bill_id = source.bill_id
-                        WHEN MATCHED THEN
-                            UPDATE SET
-                                bill_number = {param_placeholder},
-                                title = {param_placeholder},
-                                description = {param_placeholder},
-                                status = {param_placeholder},
-                                last_action = {param_placeholder},
-                                last_action_date = {param_placeholder},
-                                state_id = {param_placeholder},
-                                state_name = {param_placeholder},
-                                session_id = {param_placeholder},
-                                session_name = {param_placeholder},
-                                url = {param_placeholder},
-                                state_link = {param_placeholder},
-                                completed = {param_placeholder},
-                                status_date = {param_placeholder},
-                                progress = {param_placeholder},
-                                subjects = {param_placeholder},
-                                sponsors = {param_placeholder},
-                                committee = {param_placeholder},
-                                pending_committee_id = {param_placeholder},
-                                history = {param_placeholder},
-                                calendar = {param_placeholder},
-                                texts = {param_placeholder},
-                                votes = {param_placeholder},
-                                amendments = {param_placeholder},
-                                supplements = {param_placeholder},
-                                change_hash = {param_placeholder},
-                                updated_at = GETDATE()
-                        WHEN NOT MATCHED THEN
-                            INSERT (bill_id, bill_number, title, description, status, last_action, last_action_date,
-                                   state_id, state_name, session_id, session_name, url, state_link, completed,
-                                   status_date, progress, subjects, sponsors, committee, pending_committee_id,
-                                   history, calendar, texts, votes, amendments, supplements, change_hash)
-                            VALUES ({param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder}, {param_placeholder}, 
-                                   {param_placeholder}, {param_placeholder}, {param_placeholder});
-                        """
-                    
-                    # Prepare parameters - single set for PostgreSQL, double for SQL Server MERGE
-                    base_params = [
-                        bill.get('bill_id', ''),
-                        bill.get('bill_number', ''),
-                        bill.get('title', ''),
-                        bill.get('description', ''),
-                        bill.get('status', ''),
-                        bill.get('last_action', ''),
-                        bill.get('last_action_date'),
-                        bill.get('state_id', 0),
-                        bill.get('state', ''),
-                        bill.get('session_id', 0),
-                        bill.get('session_name', ''),
-                        bill.get('url', ''),
-                        bill.get('state_link', ''),
-                        bill.get('completed', 0),
-                        bill.get('status_date'),
-                        str(bill.get('progress', [])),
-                        str(bill.get('subjects', [])),
-                        str(bill.get('sponsors', [])),
-                        bill.get('committee', ''),
-                        bill.get('pending_committee_id', 0),
-                        str(bill.get('history', [])),
-                        str(bill.get('calendar', [])),
-                        str(bill.get('texts', [])),
-                        str(bill.get('votes', [])),
-                        str(bill.get('amendments', [])),
-                        str(bill.get('supplements', [])),
-                        bill.get('change_hash', '')
-                    ]
-                    
-                    if is_postgresql:
-                        params = base_params
-                    else:
-                        # SQL Server MERGE needs: 1 for USING, then 26 for UPDATE, then 27 for INSERT = 54 total
-                        # USING clause: 1 parameter (bill_id)
-                        # UPDATE clause: 26 parameters (all fields except bill_id) 
-                        # INSERT clause: 27 parameters (all fields including bill_id)
-                        params = [
-                            bill.get('bill_id', ''),  # USING clause
-                            *base_params[1:],         # UPDATE clause (skip bill_id)
-                            *base_params              # INSERT clause (all fields)
-                        ]
-                    
-                    cursor.execute(insert_sql, params)
-                    saved_count += 1
-                    
-                except Exception as e:
-                    print(f"❌ Failed to save bill {bill.get('bill_id', 'unknown')}: {e}")
-                    print(f"   Database type: {config['type']}")
-                    print(f"   Parameter placeholder: {param_placeholder}")
-                    continue
-            
-            cursor.close()
-            print(f"✅ Saved {saved_count} bills to Azure SQL")
-            return saved_count
+            result = bulk_upsert(
+                conn, 'legislation', rows, LEGISLATION_COLUMNS,
+                compare_columns=[c for c in LEGISLATION_COLUMNS if c not in ('bill_id', 'updated_at')]
+            )
+        
+        for failure in result.failed:
+            print(f"❌ Failed to save bill {failure.key.get('bill_id', 'unknown')}: {failure.error}")
+        
+        print(f"✅ Saved {result.saved} bills to Azure SQL")
+        return result.saved
             
     except Exception as e:
         print(f"❌ Failed to save legislation to Azure SQL: {e}")
@@ -415,46 +286,6 @@ def get_most_recent_bill_date(state_abbr: str = None) -> Optional[str]:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache for API responses
-class APICache:
-    def __init__(self):
-        self.cache = {}
-        self.timestamps = {}
-        self.default_ttl = 300  # 5 minutes default
-    
-    def get_key(self, endpoint: str, params: dict) -> str:
-        """Generate a unique cache key from endpoint and params"""
-        param_str = json.dumps(params, sort_keys=True)
-        return hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
-    
-    def get(self, endpoint: str, params: dict) -> Optional[Any]:
-        """Get cached value if not expired"""
-        key = self.get_key(endpoint, params)
-        if key in self.cache:
-            timestamp = self.timestamps.get(key, 0)
-            if time.time() - timestamp < self.default_ttl:
-                logger.info(f"📦 Cache hit for {endpoint}")
-                return self.cache[key]
-            else:
-                # Expired
-                del self.cache[key]
-                del self.timestamps[key]
-        return None
-    
-    def set(self, endpoint: str, params: dict, value: Any, ttl: int = None) -> None:
-        """Cache a value with TTL"""
-        key = self.get_key(endpoint, params)
-        self.cache[key] = value
-        self.timestamps[key] = time.time()
-        logger.info(f"📦 Cached response for {endpoint}")
-    
-    def clear(self) -> None:
-        """Clear all cache"""
-        self.cache.clear()
-        self.timestamps.clear()
-
-# Initialize cache
-api_cache = APICache()
 
 # Supported states
 SUPPORTED_STATES = {
@@ -951,7 +782,8 @@ async def enhanced_ai_analysis(text: str, prompt_type: PromptType, temperature:
             max_tokens = 500
             temperature = 0.15
         
-        response = await enhanced_ai_client.chat.completions.create(
+        response = await ai_scheduler.chat_completion(
+            enhanced_ai_client,
             model=MODEL_NAME,
             messages=messages,
             temperature=temperature,
@@ -998,21 +830,14 @@ async def enhanced_bill_analysis(bill_data: Dict, context: str = "") -> Dict[str
         
         return analysis_result
         
+    except AIUnavailableError:
+        # Circuit open: let the caller save the bill unsummarised and queue it
+        raise
     except Exception as e:
         print(f"❌ Error in enhanced bill analysis: {e}")
         traceback.print_exc()
-        error_msg = f"<p>Enhanced AI analysis failed: {str(e)}</p>"
-        return {
-            'ai_summary': error_msg,
-            'ai_executive_summary': error_msg,
-            'ai_talking_points': error_msg,
-            'ai_key_points': error_msg,
-            'ai_business_impact': error_msg,
-            'ai_potential_impact': error_msg,
-            'category': BillCategory.NOT_APPLICABLE.value,
-            'ai_version': 'error',
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        # No AI text is stored; the failure is recorded and the bill queued
+        return failed_analysis(e)
 
 # ===============================
 # ENHANCED LEGISCAN CLIENT - Now imported from legiscan_service.py
@@ -1203,17 +1028,15 @@ async def enhanced_bill_analysis(bill_data: Dict, context: str = "") -> Dict[str
                     ai_analysis = {}
                     if with_ai and enhanced_ai_client:
                         try:
-                            ai_analysis = await enhanced_bill_analysis(detailed_bill, f"Search: {query}")
+                            ai_analysis = savable_analysis(await enhanced_bill_analysis(detailed_bill, f"Search: {query}"))
                             print(f"✅ Enhanced AI analysis completed for bill {bill_id}")
+                        except AIUnavailableError as e:
+                            # Save without AI fields and leave it to the backfill worker
+                            print(f"🔌 AI unavailable for bill {bill_id}, queued for backfill: {e}")
+                            ai_analysis = {'needs_ai_processing': True}
                         except Exception as e:
                             print(f"❌ Enhanced AI analysis failed for bill {bill_id}: {e}")
-                            ai_analysis = {
-                                'ai_summary': f'<p>AI analysis failed: {str(e)}</p>',
-                                'ai_talking_points': '<p>AI analysis not available</p>',
-                                'ai_business_impact': '<p>AI analysis not available</p>',
-                                'category': 'not_applicable',
-                                'ai_version': 'error'
-                            }
+                            ai_analysis = failed_analysis(e)
                     
                     complete_bill = {
                         'bill_id': bill_id,
@@ -1482,6 +1305,8 @@ from executive_orders_db import get_db_cursor
 from executive_orders_db import (add_highlight_direct, create_highlights_table,
                                  get_executive_order_by_number,
                                  get_executive_orders_from_db,
+                                 get_executive_orders_from_db_async,
+                                 count_executive_orders_async,
                                  get_user_highlights_direct,
                                  remove_highlight_direct,
                                  save_executive_orders_to_db)
@@ -1916,6 +1741,9 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown"""
     print("🔄 Starting Enhanced LegislationVue API with ai.py Integration...")
     yield
+    await close_shared_legiscan_client()
+    await close_async_pool()
+    close_connection_pool()
 
 app = FastAPI(
     title="Enhanced LegislationVue API - ai.py Integration",
@@ -1973,8 +1801,17 @@ app.add_middleware(
     max_age=86400
 )
 
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses except the /stream endpoints, whose events must reach the client as they are sent"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 # Add response compression middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1000)
 
 # Serve favicon to avoid 404 errors
 @app.get("/favicon.ico")
@@ -2083,56 +1920,21 @@ async def check_executive_orders_count():
 
 
 @app.post("/api/admin/load-legiscan-datasets")
-async def load_legiscan_datasets_endpoint():
+async def load_legiscan_datasets_endpoint(
+    states: Optional[List[str]] = Query(None, description="Only load these state abbreviations")
+):
     """Load bills from LegiScan dataset directories"""
-    import glob
-    from load_legiscan_data import load_bill_from_json, insert_bills_batch
-    
     try:
-        data_dir = "/Users/david.anderson/Downloads/PoliticalVue/backend/data"
-        results = {}
-        total_inserted = 0
+        data_dir = os.getenv("LEGISCAN_DATA_DIR", DEFAULT_DATA_DIR)
+        stats = await asyncio.to_thread(load_datasets, data_dir, states)
         
-        # Process each state
-        for state_dir in glob.glob(os.path.join(data_dir, "*")):
-            if not os.path.isdir(state_dir):
-                continue
-                
-            state_abbr = os.path.basename(state_dir).upper()
-            if ' ' in state_abbr:
-                state_abbr = state_abbr.split()[0]
-            
-            # Skip non-state directories
-            if state_abbr in ['EXECUTIVE_ORDERS.DB', 'LEGISLATION.DB', '.DS_STORE']:
-                continue
-            
-            print(f"Processing {state_abbr}...")
-            
-            # Find bill files
-            bill_files = glob.glob(os.path.join(state_dir, "*/bill/*.json"))
-            if not bill_files:
-                bill_files = glob.glob(os.path.join(state_dir, "bill/*.json"))
-            
-            bills = []
-            for bill_file in bill_files:
-                bill = load_bill_from_json(bill_file, state_abbr)
-                if bill:
-                    bills.append(bill)
-            
-            if bills:
-                inserted, skipped = insert_bills_batch(bills, state_abbr)
-                total_inserted += inserted
-                results[state_abbr] = {
-                    "files_found": len(bill_files),
-                    "bills_loaded": len(bills),
-                    "inserted": inserted,
-                    "skipped": skipped
-                }
+        if stats.inserted or stats.updated:
+            api_cache.invalidate_tags(cache_tag("state_legislation"))
         
         return {
             "success": True,
-            "total_inserted": total_inserted,
-            "states_processed": results
+            "total_inserted": stats.inserted,
+            **stats.to_dict()
         }
         
     except Exception as e:
@@ -2608,6 +2410,9 @@ async def update_state_legislation_category(
         conn.commit()
         conn.close()
         
+        # Cached per-category counts no longer add up
+        api_cache.invalidate_tags(cache_tag("state_legislation"))
+        
         logger.info(f"✅ BACKEND: Successfully updated record {found_record_id}")
         
         return {
@@ -2865,7 +2670,7 @@ async def get_session_status(request: Dict[str, Any]):
         
         # Use the existing check_active_sessions method
         try:
-            legiscan_client = EnhancedLegiScanClient()
+            legiscan_client = get_shared_legiscan_client()
             sessions_result = await legiscan_client.check_active_sessions(states)
             
             print(f"🔍 check_active_sessions result: {sessions_result}")
@@ -3287,23 +3092,13 @@ async def get_state_fetch_progress(state: str):
 # ===============================
 
 def get_azure_sql_connection():
-    """Get database connection - now uses Supabase PostgreSQL"""
-    from database_config import get_database_config
-    import psycopg2
-
-    config = get_database_config()
-
-    # Connect to Supabase PostgreSQL
-    conn = psycopg2.connect(
-        host=config['host'],
-        port=config['port'],
-        database=config['database'],
-        user=config['user'],
-        password=config['password'],
-        sslmode='require'
-    )
-    conn.autocommit = False
-    return conn
+    """Get database connection - now uses Supabase PostgreSQL.
+
+    Returns a pooled connection; conn.close() hands it back to the pool.
+    """
+    from database_config import get_raw_db_connection
+
+    return get_raw_db_connection()
 
 def create_highlights_table():
     """Create the user highlights table"""
@@ -3571,8 +3366,47 @@ except Exception as e:
 # STATE LEGISLATION DATABASE FUNCTIONS
 # ===============================
 
-def get_state_legislation_from_db(limit=100, offset=0, filters=None):
-    """Get state legislation from database (works with both PostgreSQL and Azure SQL)"""
+# Keyset sort key for cursor pagination (see database/migrations/add_keyset_pagination_indexes.sql)
+SL_KEYSET_SORT = ["last_updated", "id"]
+
+def _state_legislation_where(filters, param_placeholder='%s'):
+    """WHERE conditions and params for the state legislation listing and its count"""
+    where_conditions = []
+    params = []
+    
+    if filters:
+        if filters.get('state'):
+            # Handle both state abbreviations and full names
+            state_value = filters['state']
+            where_conditions.append(f"(state = {param_placeholder} OR state_abbr = {param_placeholder} OR state LIKE {param_placeholder})")
+            params.extend([state_value, state_value, f"%{state_value}%"])
+        
+        if filters.get('category'):
+            where_conditions.append(f"category = {param_placeholder}")
+            params.append(filters['category'])
+        
+        if filters.get('search'):
+            where_conditions.append(f"(title LIKE {param_placeholder} OR description LIKE {param_placeholder} OR ai_summary LIKE {param_placeholder})")
+            search_term = f"%{filters['search']}%"
+            params.extend([search_term, search_term, search_term])
+    
+    return where_conditions, params
+
+async def count_state_legislation_async(filters=None) -> int:
+    """COUNT(*) for a filter combination (callers cache this per filter)"""
+    where_conditions, params = _state_legislation_where(filters)
+    count_query = "SELECT COUNT(*) FROM state_legislation"
+    if where_conditions:
+        count_query += " WHERE " + " AND ".join(where_conditions)
+    return await fetch_value(count_query, params or None, default=0)
+
+def get_state_legislation_from_db(limit=100, offset=0, filters=None, cursor=None, with_total=True):
+    """Get state legislation from database (works with both PostgreSQL and Azure SQL)
+
+    Pass cursor (empty string for the first page) to page by keyset on
+    SL_KEYSET_SORT instead of OFFSET; the result then carries next_cursor.
+    with_total=False skips the COUNT(*) (callers use the cached count).
+    """
     try:
         print(f"🔍 DEBUG: Getting state legislation - limit={limit}, offset={offset}, filters={filters}")
         
@@ -3596,37 +3430,28 @@ def get_state_legislation_from_db(limit=100, offset=0, filters=None):
         """
         
         # Add WHERE clause if filters exist
-        where_conditions = []
-        params = []
-        
-        if filters:
-            if filters.get('state'):
-                # Handle both state abbreviations and full names
-                state_value = filters['state']
-                where_conditions.append(f"(state = {param_placeholder} OR state_abbr = {param_placeholder} OR state LIKE {param_placeholder})")
-                params.extend([state_value, state_value, f"%{state_value}%"])
-                print(f"🔍 DEBUG: Added state filter: {state_value}")
-            
-            if filters.get('category'):
-                where_conditions.append(f"category = {param_placeholder}")
-                params.append(filters['category'])
-                print(f"🔍 DEBUG: Added category filter: {filters['category']}")
-            
-            if filters.get('search'):
-                where_conditions.append(f"(title LIKE {param_placeholder} OR description LIKE {param_placeholder} OR ai_summary LIKE {param_placeholder})")
-                search_term = f"%{filters['search']}%"
-                params.extend([search_term, search_term, search_term])
-                print(f"🔍 DEBUG: Added search filter: {search_term}")
+        where_conditions, params = _state_legislation_where(filters, param_placeholder)
+        count_conditions, count_params = list(where_conditions), list(params)
+        
+        if cursor is not None:
+            seek, seek_params = keyset_clause(SL_KEYSET_SORT, cursor, param_placeholder)
+            if seek:
+                where_conditions.append(seek)
+                params.extend(seek_params)
         
         if where_conditions:
             base_query += " WHERE " + " AND ".join(where_conditions)
         
         # Add ORDER BY and pagination - different syntax for each database
-        base_query += " ORDER BY last_updated DESC, created_at DESC"
-        if is_postgresql:
-            base_query += f" LIMIT {limit} OFFSET {offset}"
+        if cursor is not None:
+            # One look-ahead row tells us whether there is a next page
+            base_query += f" ORDER BY last_updated DESC, id DESC LIMIT {int(limit) + 1}"
         else:
-            base_query += f" OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY"
+            base_query += " ORDER BY last_updated DESC, created_at DESC"
+            if is_postgresql:
+                base_query += f" LIMIT {limit} OFFSET {offset}"
+            else:
+                base_query += f" OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY"
         
         print(f"🔍 DEBUG: Final SQL Query: \n        {base_query}")
         
@@ -3635,21 +3460,27 @@ def get_state_legislation_from_db(limit=100, offset=0, filters=None):
         if not conn:
             return {'success': False, 'message': 'No database connection', 'results': [], 'count': 0}
         
-        cursor = conn.cursor()
+        db_cursor = conn.cursor()
         
         # Get total count
-        count_query = f"SELECT COUNT(*) FROM {table_name}"
-        if where_conditions:
-            count_query += " WHERE " + " AND ".join(where_conditions)
-        
-        cursor.execute(count_query, params if where_conditions else [])
-        total_count = cursor.fetchone()[0]
-        print(f"🔍 DEBUG: Total count from database: {total_count}")
+        total_count = None
+        if with_total:
+            count_query = f"SELECT COUNT(*) FROM {table_name}"
+            if count_conditions:
+                count_query += " WHERE " + " AND ".join(count_conditions)
+            
+            db_cursor.execute(count_query, count_params)
+            total_count = db_cursor.fetchone()[0]
+            print(f"🔍 DEBUG: Total count from database: {total_count}")
         
         # Execute main query
-        cursor.execute(base_query, params)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
+        db_cursor.execute(base_query, params)
+        columns = [desc[0] for desc in db_cursor.description]
+        rows = db_cursor.fetchall()
+        following = None
+        if cursor is not None:
+            page, following = next_cursor([dict(zip(columns, row)) for row in rows], limit, SL_KEYSET_SORT)
+            rows = rows[:len(page)]
         print(f"🔍 DEBUG: Raw rows fetched: {len(rows)}")
         print(f"🔍 DEBUG: Columns: {columns}")
         
@@ -3736,7 +3567,7 @@ def get_state_legislation_from_db(limit=100, offset=0, filters=None):
             
             results.append(api_record)
         
-        cursor.close()
+        db_cursor.close()
         conn.close()
         
         print(f"🔍 DEBUG: Successfully processed {len(results)} state legislation records")
@@ -3745,9 +3576,12 @@ def get_state_legislation_from_db(limit=100, offset=0, filters=None):
             'success': True,
             'results': results,
             'count': len(results),
-            'total': total_count
+            'total': total_count,
+            'next_cursor': following
         }
         
+    except InvalidCursorError:
+        raise
     except Exception as e:
         print(f"❌ DEBUG: Error in get_state_legislation_from_db: {e}")
         import traceback
@@ -3764,114 +3598,20 @@ def save_bills_to_state_legislation_table(bills):
     try:
         if not bills:
             return 0
-            
-        from database_config import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            saved_count = 0
-            
-            for bill in bills:
-                try:
-                    # Standardize state names to abbreviations
-                    state_name = bill.get('state', '')
-                    state_abbr = bill.get('state_abbr', '')
-                    
-                    # Map full names to abbreviations
-                    state_mappings = {
-                        'Texas': 'TX', 'California': 'CA', 'Colorado': 'CO',
-                        'Florida': 'FL', 'Kentucky': 'KY', 'Nevada': 'NV', 
-                        'South Carolina': 'SC'
-                    }
-                    
-                    # Use abbreviation for both fields
-                    if state_name in state_mappings:
-                        final_state = state_mappings[state_name]
-                    elif state_abbr:
-                        final_state = state_abbr
-                    else:
-                        final_state = state_name
-                    
-                    # Map bill data to state_legislation table columns
-                    params = (
-                        bill.get('bill_id', ''),
-                        bill.get('bill_number', ''),
-                        bill.get('title', ''),
-                        bill.get('description', ''),
-                        final_state,  # Use standardized state
-                        final_state,  # Use same for state_abbr
-                        bill.get('status', ''),
-                        bill.get('category', 'not-applicable'),
-                        bill.get('introduced_date', ''),
-                        bill.get('last_action_date', ''),
-                        bill.get('session_id', ''),
-                        bill.get('session_name', ''),
-                        bill.get('bill_type', ''),
-                        bill.get('body', ''),
-                        bill.get('legiscan_url', ''),
-                        bill.get('pdf_url', ''),
-                        bill.get('ai_summary', ''),
-                        bill.get('ai_executive_summary', ''),
-                        bill.get('ai_talking_points', ''),
-                        bill.get('ai_key_points', ''),
-                        bill.get('ai_business_impact', ''),
-                        bill.get('ai_potential_impact', ''),
-                        bill.get('ai_version', ''),
-                        bill.get('legiscan_status', '')
-                    )
-                    
-                    # Use MERGE to avoid duplicates - convert bill_id to string for comparison
-                    merge_sql = """
-                    MERGE dbo.state_legislation AS target
-                    USING (SELECT CAST(? as NVARCHAR(50)) as bill_id) AS source
-                    ON (target.bill_id = source.bill_id)
-                    WHEN MATCHED THEN
-                        UPDATE SET 
-                            bill_number = ?,
-                            title = ?,
-                            description = ?,
-                            state = ?,
-                            state_abbr = ?,
-                            status = ?,
-                            category = ?,
-                            introduced_date = ?,
-                            last_action_date = ?,
-                            session_id = ?,
-                            session_name = ?,
-                            bill_type = ?,
-                            body = ?,
-                            legiscan_url = ?,
-                            pdf_url = ?,
-                            ai_summary = ?,
-                            ai_executive_summary = ?,
-                            ai_talking_points = ?,
-                            ai_key_points = ?,
-                            ai_business_impact = ?,
-                            ai_potential_impact = ?,
-                            ai_version = ?,
-                            legiscan_status = ?,
-                            last_updated = GETDATE()
-                    WHEN NOT MATCHED THEN
-                        INSERT (bill_id, bill_number, title, description, state, state_abbr, status, category, 
-                               introduced_date, last_action_date, session_id, session_name, bill_type, body,
-                               legiscan_url, pdf_url, ai_summary, ai_executive_summary, ai_talking_points, 
-                               ai_key_points, ai_business_impact, ai_potential_impact, ai_version, 
-                               legiscan_status, created_at, last_updated)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE());
-                    """
-                    
-                    # Duplicate params for both MATCHED and NOT MATCHED clauses
-                    all_params = (bill.get('bill_id', ''),) + params[1:] + params
-                    
-                    cursor.execute(merge_sql, all_params)
-                    saved_count += 1
-                    
-                except Exception as e:
-                    print(f"❌ Failed to save bill {bill.get('bill_id', 'unknown')}: {e}")
-                    continue
-            
-            conn.commit()
-            print(f"✅ Saved {saved_count} bills to state_legislation table")
-            return saved_count
+        
+        timestamp = datetime.now().isoformat()
+        rows = [state_legislation_row(bill, timestamp) for bill in bills]
+        result = upsert_state_legislation(rows)
+        
+        for failure in result.failed:
+            print(f"❌ Failed to save bill {failure.key.get('bill_id', 'unknown')}: {failure.error}")
+        
+        if result.inserted or result.updated:
+            api_cache.invalidate_tags(cache_tag("state_legislation"))
+        
+        print(f"✅ Saved {result.saved} bills to state_legislation table "
+              f"({result.inserted} new, {result.updated} updated, {result.unchanged} unchanged)")
+        return result.saved
             
     except Exception as e:
         print(f"❌ Error saving to state_legislation table: {e}")
@@ -4919,71 +4659,28 @@ def create_user_profiles_table():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            
-            # Check what columns exist in the current table
             cursor.execute("""
-                SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'user_profiles'
-                ORDER BY ORDINAL_POSITION
+                CREATE TABLE IF NOT EXISTS user_profiles (
+                    user_id VARCHAR(50) PRIMARY KEY,
+                    msi_email VARCHAR(255),
+                    display_name VARCHAR(255),
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_active BOOLEAN DEFAULT true,
+                    login_count INTEGER DEFAULT 0
+                )
             """)
-            existing_columns = [row[0] for row in cursor.fetchall()]
-            print(f"🔍 Existing user_profiles columns: {existing_columns}")
-            
-            # If table doesn't exist, create it with full schema
-            if not existing_columns:
-                create_table_sql = """
-                CREATE TABLE dbo.user_profiles (
-                    user_id NVARCHAR(50) PRIMARY KEY,
-                    email NVARCHAR(255),
-                    display_name NVARCHAR(255),
-                    first_name NVARCHAR(100),
-                    last_name NVARCHAR(100),
-                    department NVARCHAR(100),
-                    created_at DATETIME2 DEFAULT GETDATE(),
-                    last_login DATETIME2 DEFAULT GETDATE(),
-                    login_count INT DEFAULT 0,
-                    is_active BIT DEFAULT 1
-                );
-                """
-                cursor.execute(create_table_sql)
-                print("✅ Created new user_profiles table with full schema")
-            else:
-                # Force add missing columns with better error handling
-                required_columns = {
-                    'email': 'NVARCHAR(255)',
-                    'first_name': 'NVARCHAR(100)', 
-                    'last_name': 'NVARCHAR(100)',
-                    'department': 'NVARCHAR(100)',
-                    'created_at': 'DATETIME2 DEFAULT GETDATE()'
-                }
-                
-                for col_name, col_type in required_columns.items():
-                    if col_name not in existing_columns:
-                        try:
-                            cursor.execute(f"ALTER TABLE dbo.user_profiles ADD {col_name} {col_type}")
-                            print(f"✅ Added {col_name} column")
-                        except Exception as e:
-                            print(f"⚠️ Could not add {col_name} column: {e}")
-                
-                # Also make sure we have user_id as primary key if it doesn't exist
-                if 'user_id' not in existing_columns:
-                    try:
-                        cursor.execute("ALTER TABLE dbo.user_profiles ADD user_id NVARCHAR(50)")
-                        print("✅ Added user_id column") 
-                    except Exception as e:
-                        print(f"⚠️ Could not add user_id column: {e}")
-            
+            # Columns added after the table was first deployed
+            for col_name, col_type in (
+                ('email', 'VARCHAR(255)'),
+                ('first_name', 'VARCHAR(100)'),
+                ('last_name', 'VARCHAR(100)'),
+                ('department', 'VARCHAR(100)'),
+            ):
+                cursor.execute(f"ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS {col_name} {col_type}")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_up_email ON user_profiles(email)")
             conn.commit()
-            
-            # Final check - show updated columns
-            cursor.execute("""
-                SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'user_profiles'
-                ORDER BY ORDINAL_POSITION
-            """)
-            final_columns = [row[0] for row in cursor.fetchall()]
-            print(f"✅ Final user_profiles columns: {final_columns}")
-            
+            print("✅ User profiles table created/verified")
             return True
     except Exception as e:
         print(f"❌ Failed to create/update user profiles table: {e}")
@@ -5043,23 +4740,21 @@ def create_page_views_table():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            create_table_sql = """
-            IF NOT EXISTS (SELECT * FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'page_views')
-            CREATE TABLE dbo.page_views (
-                id INT IDENTITY(1,1) PRIMARY KEY,
-                user_id NVARCHAR(100) NOT NULL,
-                page_name NVARCHAR(255) NOT NULL,
-                page_path NVARCHAR(500) NOT NULL,
-                session_id NVARCHAR(100),
-                ip_address NVARCHAR(45),
-                user_agent NVARCHAR(500),
-                viewed_at DATETIME2 DEFAULT GETDATE(),
-                INDEX IX_page_views_user_id (user_id),
-                INDEX IX_page_views_viewed_at (viewed_at),
-                INDEX IX_page_views_session_id (session_id)
-            );
-            """
-            cursor.execute(create_table_sql)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS page_views (
+                    id SERIAL PRIMARY KEY,
+                    user_id VARCHAR(100) NOT NULL,
+                    page_name VARCHAR(255) NOT NULL,
+                    page_path VARCHAR(500) NOT NULL,
+                    session_id VARCHAR(100),
+                    ip_address VARCHAR(45),
+                    user_agent VARCHAR(500),
+                    viewed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pv_user_id ON page_views(user_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pv_viewed_at ON page_views(viewed_at DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pv_session_id ON page_views(session_id)")
             conn.commit()
             print("✅ Page views table created/verified")
             return True
@@ -5130,26 +4825,24 @@ def create_user_activity_events_table():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            create_table_sql = """
-            IF NOT EXISTS (SELECT * FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'user_activity_events')
-            CREATE TABLE dbo.user_activity_events (
-                id INT IDENTITY(1,1) PRIMARY KEY,
-                user_id NVARCHAR(100) NOT NULL,
-                session_id NVARCHAR(100),
-                event_type NVARCHAR(50) NOT NULL,  -- 'page_view', 'page_leave', 'button_click', 'search', 'filter', 'highlight_add', 'highlight_remove', 'export', 'fetch_data', etc.
-                event_category NVARCHAR(50),  -- 'navigation', 'interaction', 'data_action', 'system'
-                page_name NVARCHAR(255),
-                page_path NVARCHAR(500),
-                event_data NVARCHAR(MAX),  -- JSON string with additional event details
-                duration_seconds INT,  -- For page_leave events, time spent on page
-                created_at DATETIME2 DEFAULT GETDATE(),
-                INDEX IX_user_activity_user_id (user_id),
-                INDEX IX_user_activity_created_at (created_at),
-                INDEX IX_user_activity_event_type (event_type),
-                INDEX IX_user_activity_session_id (session_id)
-            );
-            """
-            cursor.execute(create_table_sql)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_activity_events (
+                    id SERIAL PRIMARY KEY,
+                    user_id VARCHAR(100) NOT NULL,
+                    session_id VARCHAR(100),
+                    event_type VARCHAR(50) NOT NULL,  -- 'page_view', 'page_leave', 'button_click', 'search', 'filter', 'highlight_add', 'highlight_remove', 'export', 'fetch_data', etc.
+                    event_category VARCHAR(50),  -- 'navigation', 'interaction', 'data_action', 'system'
+                    page_name VARCHAR(255),
+                    page_path VARCHAR(500),
+                    event_data TEXT,  -- JSON string with additional event details
+                    duration_seconds INTEGER,  -- For page_leave events, time spent on page
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uae_user_id ON user_activity_events(user_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uae_created_at ON user_activity_events(created_at DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uae_event_type ON user_activity_events(event_type)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uae_session_id ON user_activity_events(session_id)")
             conn.commit()
             print("✅ User activity events table created/verified")
             return True
@@ -5162,24 +4855,11 @@ def migrate_page_views_add_duration():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-
-            # Check if duration_seconds column exists
-            cursor.execute("""
-                SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = 'page_views'
-                AND COLUMN_NAME = 'duration_seconds'
-            """)
-
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE dbo.page_views ADD duration_seconds INT NULL")
-                cursor.execute("ALTER TABLE dbo.page_views ADD left_at DATETIME2 NULL")
-                conn.commit()
-                print("✅ Added duration tracking columns to page_views table")
-                return True
-            else:
-                print("✅ Duration columns already exist in page_views table")
-                return True
-
+            cursor.execute("ALTER TABLE page_views ADD COLUMN IF NOT EXISTS duration_seconds INTEGER")
+            cursor.execute("ALTER TABLE page_views ADD COLUMN IF NOT EXISTS left_at TIMESTAMP")
+            conn.commit()
+            print("✅ Duration columns present in page_views table")
+            return True
     except Exception as e:
         print(f"❌ Failed to migrate page_views table: {e}")
         return False
@@ -6210,6 +5890,30 @@ class SessionStartRequest(BaseModel):
     user_id: str
     display_name: Optional[str] = None
 
+_analytics_tables_ready = False
+
+async def ensure_analytics_tables():
+    """Run the analytics table setup off the event loop until it succeeds once"""
+    global _analytics_tables_ready
+    if _analytics_tables_ready:
+        return
+
+    def _setup():
+        # Run every step even if one fails, so a single bad step doesn't
+        # leave the others unapplied
+        results = [
+            create_page_views_table(),
+            create_user_profiles_table(),
+            create_user_activity_events_table(),
+            migrate_page_views_add_duration(),
+        ]
+        return all(results)
+
+    # The setup functions report failures by returning False; only mark the
+    # tables ready once they all succeed so a transient error is retried
+    if await asyncio.to_thread(_setup):
+        _analytics_tables_ready = True
+
 @app.post("/api/analytics/track-page-view")
 async def track_page_view(
     request: PageViewRequest,
@@ -6217,10 +5921,7 @@ async def track_page_view(
 ):
     """Track a page view for analytics"""
     try:
-        create_page_views_table()
-        create_user_profiles_table()
-        create_user_activity_events_table()
-        migrate_page_views_add_duration()
+        await ensure_analytics_tables()
 
         # Get client IP address
         client_ip = http_request.headers.get("x-forwarded-for")
@@ -6235,27 +5936,25 @@ async def track_page_view(
         msi_email = f"anonymous-{normalized_user_id}@local.app"
         is_authenticated = False
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
+        async with async_db_cursor() as cursor:
             # Insert the page view
-            cursor.execute("""
-                INSERT INTO dbo.page_views (user_id, page_name, page_path, session_id, viewed_at)
-                VALUES (?, ?, ?, ?, GETDATE())
+            await cursor.execute("""
+                INSERT INTO page_views (user_id, page_name, page_path, session_id, viewed_at)
+                VALUES (%s, %s, %s, %s, NOW())
             """, (normalized_user_id, request.page_name, request.page_path, request.session_id))
             
             # Create or update user profile for this user
             print(f"🔍 DEBUG: Checking user profile for normalized_user_id: {normalized_user_id}")
-            cursor.execute("SELECT user_id FROM dbo.user_profiles WHERE user_id = ?", (normalized_user_id,))
-            existing_user = cursor.fetchone()
+            await cursor.execute("SELECT user_id FROM user_profiles WHERE user_id = %s", (normalized_user_id,))
+            existing_user = await cursor.fetchone()
             print(f"🔍 DEBUG: Existing user query result: {existing_user}")
             
             if existing_user:
                 # Update last activity
-                cursor.execute("""
-                    UPDATE dbo.user_profiles 
-                    SET last_login = GETDATE()
-                    WHERE user_id = ?
+                await cursor.execute("""
+                    UPDATE user_profiles 
+                    SET last_login = NOW()
+                    WHERE user_id = %s
                 """, (normalized_user_id,))
                 print(f"✅ Updated profile for user: {normalized_user_id}")
             else:
@@ -6301,16 +6000,15 @@ async def track_page_view(
                 print(f"🔍 DEBUG: Browser: {browser_details}, Device: {device_info}, TZ: {timezone_info}")
                 print(f"🔍 DEBUG: Client IP: {client_ip}")
                 
-                cursor.execute("""
-                    INSERT INTO dbo.user_profiles (
+                await cursor.execute("""
+                    INSERT INTO user_profiles (
                         user_id, msi_email, display_name, last_login, login_count, is_active
-                    ) VALUES (?, ?, ?, GETDATE(), 1, 1)
+                    ) VALUES (%s, %s, %s, NOW(), 1, true)
+                    ON CONFLICT (user_id) DO UPDATE SET last_login = NOW()
                 """, (normalized_user_id, f"anonymous-{normalized_user_id}@local.app", display_name))
                 print(f"✅ Created new profile for user: {normalized_user_id} as '{display_name}'")
             
-            conn.commit()
-            
-            return {"success": True, "message": "Page view tracked"}
+        return {"success": True, "message": "Page view tracked"}
             
     except Exception as e:
         print(f"❌ Failed to track page view: {e}")
@@ -6667,7 +6365,7 @@ async def enhanced_search_and_analyze_endpoint(request: LegiScanSearchRequest):
         
         # Initialize enhanced LegiScan client
         try:
-            enhanced_legiscan = EnhancedLegiScanClient()
+            enhanced_legiscan = get_shared_legiscan_client()
             print("✅ ENHANCED: Enhanced LegiScan client initialized")
         except Exception as e:
             print(f"❌ ENHANCED: Enhanced LegiScan initialization failed: {e}")
@@ -6690,18 +6388,19 @@ async def enhanced_search_and_analyze_endpoint(request: LegiScanSearchRequest):
                 print(f"⚠️ ENHANCED: Database manager creation failed: {e}")
         
         # Use enhanced search and analyze
-        result = await enhanced_legiscan.enhanced_search_and_analyze(
-            state=request.state,
-            query=request.query,
-            limit=request.limit,
-            year_filter=getattr(request, 'year_filter', 'current'),
-            max_pages=getattr(request, 'max_pages', 50),
-            skip_existing=getattr(request, 'skip_existing', True),
-            force_refresh=getattr(request, 'force_refresh', False),
-            session_id=getattr(request, 'session_id', None),
-            with_ai=getattr(request, 'enhanced_ai', True),
-            db_manager=db_manager
-        )
+        with ai_priority(Priority.INTERACTIVE):
+            result = await enhanced_legiscan.enhanced_search_and_analyze(
+                state=request.state,
+                query=request.query,
+                limit=request.limit,
+                year_filter=getattr(request, 'year_filter', 'current'),
+                max_pages=getattr(request, 'max_pages', 50),
+                skip_existing=getattr(request, 'skip_existing', True),
+                force_refresh=getattr(request, 'force_refresh', False),
+                session_id=getattr(request, 'session_id', None),
+                with_ai=getattr(request, 'enhanced_ai', True),
+                db_manager=db_manager
+            )
         
         # Close database connection if it was opened
         if db_manager and hasattr(db_manager, 'connection'):
@@ -6752,6 +6451,80 @@ async def enhanced_search_and_analyze_endpoint(request: LegiScanSearchRequest):
             detail=f"Enhanced search and analyze failed: {str(e)}"
         )
 
+@app.post("/api/legiscan/search-and-analyze/stream")
+@app.post("/api/legiscan/enhanced-search-and-analyze/stream")
+async def stream_search_and_analyze_endpoint(
+    request: LegiScanSearchRequest,
+    http_request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="ndjson (default) or sse; Accept: text/event-stream also selects sse"),
+    deltas: bool = Query(True, description="Include token-level ai_delta events")
+):
+    """
+    Streaming search-and-analyze.
+
+    Same request body as the blocking endpoints, but results are written as
+    they happen: a "search" event, then per bill a "bill" event as soon as its
+    LegiScan details arrive, "ai_delta"/"ai_section" events while its AI
+    sections are generated and "bill_complete" once it is saved, then "done".
+    """
+    with_ai = getattr(request, 'with_ai_analysis', True)
+    if not enhanced_ai_client and with_ai:
+        raise HTTPException(
+            status_code=503,
+            detail="Enhanced AI client not available - check Azure OpenAI configuration"
+        )
+    try:
+        enhanced_legiscan = get_shared_legiscan_client()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Enhanced LegiScan initialization failed: {str(e)}")
+    
+    use_sse = format == "sse" or (format is None and "text/event-stream" in http_request.headers.get("accept", ""))
+    
+    db_manager = None
+    if request.save_to_db:
+        try:
+            conn = get_azure_sql_connection()
+            if conn:
+                db_manager = StateLegislationDatabaseManager(conn)
+        except Exception as e:
+            print(f"⚠️ STREAM: Database manager creation failed: {e}")
+    
+    async def event_stream():
+        try:
+            with ai_priority(Priority.INTERACTIVE):
+                async for event in enhanced_legiscan.stream_search_and_analyze(
+                    state=request.state,
+                    query=request.query,
+                    limit=request.limit,
+                    year_filter=getattr(request, 'year_filter', 'current'),
+                    max_pages=getattr(request, 'max_pages', 50),
+                    with_ai=with_ai,
+                    db_manager=db_manager,
+                    session_id=getattr(request, 'session_id', None),
+                    skip_existing=getattr(request, 'skip_existing', True),
+                    force_refresh=getattr(request, 'force_refresh', False),
+                    include_deltas=deltas
+                ):
+                    payload = json.dumps(event, default=str)
+                    yield f"event: {event['event']}\ndata: {payload}\n\n" if use_sse else payload + "\n"
+        except Exception as e:
+            print(f"❌ STREAM: search-and-analyze failed: {e}")
+            traceback.print_exc()
+            payload = json.dumps({'event': 'error', 'error': str(e)})
+            yield f"event: error\ndata: {payload}\n\n" if use_sse else payload + "\n"
+        finally:
+            if db_manager and hasattr(db_manager, 'connection'):
+                try:
+                    db_manager.connection.close()
+                except Exception:
+                    pass
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def save_bill_to_database(bill_details: dict, ai_analysis: dict, state: str) -> dict:
     """
     Save a single bill to the database with AI analysis
@@ -7142,47 +6915,49 @@ async def check_and_update_bills_endpoint(request: dict):
         if not LEGISCAN_AVAILABLE or not LEGISCAN_INITIALIZED:
             raise HTTPException(status_code=503, detail="LegiScan API not available")
             
-        legiscan_api = LegiScanAPI()
-        
-        # Step 1: Get SESSION 89 bills from LegiScan API using enhanced search approach
-        print(f"📡 Fetching SESSION 89 bills from LegiScan API for {state}...")
-        
-        # Try multiple approaches to find session 89 bills
-        search_approaches = [
-            {"query": "89th Legislature", "year_filter": "all", "limit": 5000},
-            {"query": "89th", "year_filter": "all", "limit": 3000}, 
-            {"query": None, "year_filter": "current", "limit": 2000}  # Current year (2025)
-        ]
+        # Async client: this handler runs on the event loop, so requests must not block it
+        from legiscan_api import AsyncLegiScanAPI
+        # async with closes the session even when a search raises
+        async with AsyncLegiScanAPI() as legiscan_api:
+            # Step 1: Get SESSION 89 bills from LegiScan API using enhanced search approach
+            print(f"📡 Fetching SESSION 89 bills from LegiScan API for {state}...")
+        
+            # Try multiple approaches to find session 89 bills
+            search_approaches = [
+                {"query": "89th Legislature", "year_filter": "all", "limit": 5000},
+                {"query": "89th", "year_filter": "all", "limit": 3000}, 
+                {"query": None, "year_filter": "current", "limit": 2000}  # Current year (2025)
+            ]
         
-        api_search_result = None
-        for i, approach in enumerate(search_approaches, 1):
-            print(f"🔍 Attempt {i}: Searching with query='{approach['query']}', year_filter='{approach['year_filter']}'")
-            
-            if approach.get("query"):
-                # Use search_bills for queries
-                result = legiscan_api.search_bills(
-                    state=state,
-                    query=approach["query"],
-                    limit=approach["limit"],
-                    year_filter=approach["year_filter"],
-                    max_pages=50
-                )
-            else:
-                # Use optimized_bulk_fetch for no-query searches
-                result = legiscan_api.optimized_bulk_fetch(
-                    state=state,
-                    limit=approach["limit"],
-                    recent_only=True,  # Focus on recent bills
-                    year_filter=approach["year_filter"],
-                    max_pages=50
-                )
+            api_search_result = None
+            for i, approach in enumerate(search_approaches, 1):
+                print(f"🔍 Attempt {i}: Searching with query='{approach['query']}', year_filter='{approach['year_filter']}'")
             
-            if result.get('success') and len(result.get('bills', [])) > 0:
-                api_search_result = result
-                print(f"✅ Found {len(result.get('bills', []))} bills with approach {i}")
-                break
-            else:
-                print(f"❌ Approach {i} found no bills")
+                if approach.get("query"):
+                    # Use search_bills for queries
+                    result = await legiscan_api.search_bills(
+                        state=state,
+                        query=approach["query"],
+                        limit=approach["limit"],
+                        year_filter=approach["year_filter"],
+                        max_pages=50
+                    )
+                else:
+                    # Use optimized_bulk_fetch for no-query searches
+                    result = await legiscan_api.optimized_bulk_fetch(
+                        state=state,
+                        limit=approach["limit"],
+                        recent_only=True,  # Focus on recent bills
+                        year_filter=approach["year_filter"],
+                        max_pages=50
+                    )
+            
+                if result.get('success') and len(result.get('bills', [])) > 0:
+                    api_search_result = result
+                    print(f"✅ Found {len(result.get('bills', []))} bills with approach {i}")
+                    break
+                else:
+                    print(f"❌ Approach {i} found no bills")
         
         if not api_search_result:
             api_search_result = {"success": False, "error": "All search approaches failed"}
@@ -7389,7 +7164,7 @@ async def fetch_recent_bills_endpoint_disabled(request: dict):
             )
         
         # Initialize clients for streaming
-        enhanced_client = EnhancedLegiScanClient()
+        enhanced_client = get_shared_legiscan_client()
         
         # Step 4: Process with chunking/streaming to handle large responses
         results = []
@@ -7644,6 +7419,150 @@ async def check_for_executive_order_updates():
             "database_count": 0
         }
 
+# Writes invalidate affected pages by tag, but only in the worker that made the write;
+# the TTL bounds how long other workers can serve a stale page
+EXECUTIVE_ORDERS_CACHE_TTL = int(os.getenv("EXECUTIVE_ORDERS_CACHE_TTL", "300"))
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", "600"))
+
+def _filter_tags(table, filters):
+    """Invalidation tags for a cached listing or count over `filters`"""
+    tags = [cache_tag(table)]
+    for field in ('category', 'state'):
+        if filters.get(field):
+            tags.append(cache_tag(table, field, filters[field]))
+    return tags
+
+def _order_tag(eo_number):
+    """Invalidation tag for one executive order; pages list a missing eo_number as ''"""
+    return cache_tag("executive_orders", "eo_number", eo_number or '')
+
+async def get_cached_count(table, filters, counter):
+    """Per-filter COUNT(*) served from api_cache so paging doesn't recount every request"""
+    return await api_cache.get_or_load(
+        f"{table}-count", filters, lambda: counter(filters),
+        ttl=COUNT_CACHE_TTL,
+        tags=_filter_tags(table, filters)
+    )
+
+async def _load_executive_orders_page(category, page, per_page, search, cursor=None, include_total=True):
+    """Build the /api/executive-orders response for one page (cache loader)"""
+    if not EXECUTIVE_ORDERS_AVAILABLE:
+        logger.warning("Executive orders functionality not available")
+        return {
+            "results": [],
+            "count": 0,
+            "total_pages": 1,
+            "page": page,
+            "per_page": per_page,
+            "message": "Executive orders functionality not available"
+        }
+
+    # Build filters for the Azure SQL integration
+    filters = {}
+    if category:
+        filters['category'] = category
+    if search:
+        filters['search'] = search
+
+    logger.info(f"📊 Calling get_executive_orders_from_db with filters: {filters}")
+
+    page_query = get_executive_orders_from_db_async(
+        limit=per_page,
+        offset=(page - 1) * per_page,
+        filters=filters,
+        cursor=cursor,
+        with_total=False
+    )
+
+    # Page and (cached) total are fetched side by side
+    if include_total:
+        result, total_count = await asyncio.gather(
+            page_query, get_cached_count("executive_orders", filters, count_executive_orders_async)
+        )
+    else:
+        result, total_count = await page_query, None
+
+    logger.info(f"📥 Database result: success={result.get('success')}, count={result.get('count', 0)}")
+
+    if not result.get('success'):
+        error_msg = result.get('message', 'Failed to retrieve executive orders')
+        logger.error(f"❌ Database query failed: {error_msg}")
+
+        return {
+            "success": False,  # ⚡ ADD SUCCESS FLAG
+            "results": [],
+            "count": 0,
+            "total_pages": 1,
+            "page": page,
+            "per_page": per_page,
+            "total": 0,
+            "error": error_msg,
+            "timestamp": datetime.now().isoformat(),  # ⚡ ADD TIMESTAMP
+            "database_type": "Azure SQL"
+        }
+
+    orders = result.get('results', [])
+    logger.info(f"📋 Got {len(orders)} orders from database")
+
+    # Apply validation and formatting
+    validated_orders = []
+    for i, order in enumerate(orders):
+        try:
+            eo_number = order.get('eo_number', '') or order.get('bill_number', '')
+            logger.info(f"📝 Processing order {i+1}: eo_number={eo_number}, title={order.get('title', 'No title')[:50]}...")
+
+            # Map database fields to expected EO fields
+            formatted_order = {
+                'eo_number': eo_number,
+                'executive_order_number': eo_number,
+                'title': order.get('title', ''),
+                'summary': order.get('summary', ''),
+                'signing_date': order.get('signing_date', ''),
+                'publication_date': order.get('publication_date', ''),
+                'category': order.get('category', 'not-applicable'),
+                'reviewed': order.get('reviewed', False),
+                'html_url': order.get('html_url', ''),
+                'pdf_url': order.get('pdf_url', ''),
+                'ai_summary': order.get('ai_summary', ''),
+                'ai_executive_summary': order.get('ai_executive_summary', ''),
+                'ai_key_points': order.get('ai_key_points', ''),
+                'ai_talking_points': order.get('ai_talking_points', ''),
+                'ai_business_impact': order.get('ai_business_impact', ''),
+                'ai_potential_impact': order.get('ai_potential_impact', ''),
+                'source': order.get('source', 'Database')
+            }
+
+            validated_orders.append(formatted_order)
+            logger.info(f"✅ Processed order: {eo_number}")
+        except Exception as e:
+            logger.error(f"❌ Error processing order {i+1}: {e}")
+            continue
+
+    logger.info(f"✅ Returning {len(validated_orders)} validated orders")
+
+    # Calculate proper pagination
+    total_pages = math.ceil(total_count / per_page) if total_count else 1
+
+    response_data = {
+        "success": True,  # ⚡ ADD SUCCESS FLAG
+        "results": validated_orders,
+        "count": len(validated_orders),
+        "total_pages": total_pages,
+        "page": page,
+        "per_page": per_page,
+        "total": total_count,
+        "database_type": "Azure SQL",
+        "cached": False,
+        "timestamp": datetime.now().isoformat(),  # ⚡ ADD TIMESTAMP
+        "has_more": page < total_pages  # ⚡ ADD PAGINATION HELPER
+    }
+
+    if cursor is not None:
+        response_data["next_cursor"] = result.get('next_cursor')
+        response_data["has_more"] = result.get('next_cursor') is not None
+
+    return response_data
+
 @app.get("/api/executive-orders")
 async def get_executive_orders_with_highlights(
     category: Optional[str] = Query(None, description="Executive order category filter"),
@@ -7653,7 +7572,9 @@ async def get_executive_orders_with_highlights(
     sort_by: str = Query("signing_date", description="Sort field"),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
     user_id: Optional[str] = Query(None, description="User ID to show highlight status"),
-    use_cache: bool = Query(True, description="Use cached results if available")
+    use_cache: bool = Query(True, description="Use cached results if available"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor; pass an empty value for the first page"),
+    include_total: bool = Query(True, description="Include the (cached) total count")
 ):
     """Get executive orders with highlighting, pagination, and validation - OPTIMIZED"""
     
@@ -7668,124 +7589,39 @@ async def get_executive_orders_with_highlights(
             "search": search,
             "sort_by": sort_by,
             "sort_order": sort_order,
-            "user_id": user_id
-        }
-        
-        if use_cache:
-            cached_result = api_cache.get("executive-orders", cache_params)
-            if cached_result:
-                return cached_result
-        
-        if not EXECUTIVE_ORDERS_AVAILABLE:
-            logger.warning("Executive orders functionality not available")
-            return {
-                "results": [],
-                "count": 0,
-                "total_pages": 1,
-                "page": page,
-                "per_page": per_page,
-                "message": "Executive orders functionality not available"
-            }
-        
-        # Build filters for the Azure SQL integration
-        filters = {}
-        if category:
-            filters['category'] = category
-        if search:
-            filters['search'] = search
-        
-        logger.info(f"📊 Calling get_executive_orders_from_db with filters: {filters}")
-        
-        result = get_executive_orders_from_db(
-            limit=per_page,
-            offset=(page - 1) * per_page,
-            filters=filters
-        )
-        
-        logger.info(f"📥 Database result: success={result.get('success')}, count={result.get('count', 0)}")
-        
-        if not result.get('success'):
-            error_msg = result.get('message', 'Failed to retrieve executive orders')
-            logger.error(f"❌ Database query failed: {error_msg}")
-            
-            return {
-                "success": False,  # ⚡ ADD SUCCESS FLAG
-                "results": [],
-                "count": 0,
-                "total_pages": 1,
-                "page": page,
-                "per_page": per_page,
-                "total": 0,
-                "error": error_msg,
-                "timestamp": datetime.now().isoformat(),  # ⚡ ADD TIMESTAMP
-                "database_type": "Azure SQL"
-            }
-        
-        orders = result.get('results', [])
-        logger.info(f"📋 Got {len(orders)} orders from database")
-        
-        # Apply validation and formatting
-        validated_orders = []
-        for i, order in enumerate(orders):
-            try:
-                eo_number = order.get('eo_number', '') or order.get('bill_number', '')
-                logger.info(f"📝 Processing order {i+1}: eo_number={eo_number}, title={order.get('title', 'No title')[:50]}...")
-                
-                # Map database fields to expected EO fields
-                formatted_order = {
-                    'eo_number': eo_number,
-                    'executive_order_number': eo_number,
-                    'title': order.get('title', ''),
-                    'summary': order.get('summary', ''),
-                    'signing_date': order.get('signing_date', ''),
-                    'publication_date': order.get('publication_date', ''),
-                    'category': order.get('category', 'not-applicable'),
-                    'reviewed': order.get('reviewed', False),
-                    'html_url': order.get('html_url', ''),
-                    'pdf_url': order.get('pdf_url', ''),
-                    'ai_summary': order.get('ai_summary', ''),
-                    'ai_executive_summary': order.get('ai_executive_summary', ''),
-                    'ai_key_points': order.get('ai_key_points', ''),
-                    'ai_talking_points': order.get('ai_talking_points', ''),
-                    'ai_business_impact': order.get('ai_business_impact', ''),
-                    'ai_potential_impact': order.get('ai_potential_impact', ''),
-                    'source': order.get('source', 'Database')
-                }
-                
-                validated_orders.append(formatted_order)
-                logger.info(f"✅ Processed order: {eo_number}")
-            except Exception as e:
-                logger.error(f"❌ Error processing order {i+1}: {e}")
-                continue
-        
-        logger.info(f"✅ Returning {len(validated_orders)} validated orders")
-        
-        # Calculate proper pagination
-        total_count = result.get('total', len(validated_orders))
-        total_pages = math.ceil(total_count / per_page) if total_count > 0 else 1
-        
-        response_data = {
-            "success": True,  # ⚡ ADD SUCCESS FLAG
-            "results": validated_orders,
-            "count": len(validated_orders),
-            "total_pages": total_pages,
-            "page": page,
-            "per_page": per_page,
-            "total": total_count,
-            "database_type": "Azure SQL",
-            "cached": False,
-            "timestamp": datetime.now().isoformat(),  # ⚡ ADD TIMESTAMP
-            "has_more": page < total_pages  # ⚡ ADD PAGINATION HELPER
+            "user_id": user_id,
+            "cursor": cursor,
+            "include_total": include_total
         }
         
-        # Cache the successful response
+        async def load():
+            return await _load_executive_orders_page(category, page, per_page, search, cursor, include_total)
+
+        def page_tags(response):
+            # Tag by filter and by every order on the page so review/category
+            # writes only drop the pages they actually change
+            tags = [cache_tag("executive_orders")]
+            if category:
+                tags.append(cache_tag("executive_orders", "category", category))
+            tags.extend(
+                _order_tag(order.get('eo_number'))
+                for order in response.get("results", [])
+            )
+            return tags
+
         if use_cache:
-            api_cache.set("executive-orders", cache_params, response_data)
-        
-        return response_data
+            return await api_cache.get_or_load(
+                "executive-orders", cache_params, load,
+                ttl=EXECUTIVE_ORDERS_CACHE_TTL,
+                cache_if=lambda response: response.get("success", False),
+                tags=page_tags
+            )
+        return await load()
         
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Unexpected error in get_executive_orders_with_highlights: {e}")
         import traceback
@@ -8045,7 +7881,7 @@ async def update_executive_order_review_status(
         cursor = conn.cursor()
         
         # First, let's see what's actually in the database
-        cursor.execute("SELECT TOP 3 id, eo_number, title FROM executive_orders ORDER BY last_updated DESC")
+        cursor.execute("SELECT id, eo_number, title FROM executive_orders ORDER BY last_updated DESC LIMIT 3")
         sample_records = cursor.fetchall()
         logger.info(f"🔍 BACKEND: Sample records in database:")
         for record in sample_records:
@@ -8053,10 +7889,10 @@ async def update_executive_order_review_status(
         
         # Try to find the record multiple ways
         search_attempts = [
-            ("Direct ID match", "SELECT id FROM executive_orders WHERE id = ?", id),
-            ("EO number match (eo- prefix)", "SELECT id FROM executive_orders WHERE eo_number = ?", id.replace('eo-', '') if id.startswith('eo-') else id),
-            ("Document number match", "SELECT id FROM executive_orders WHERE document_number = ?", id.replace('eo-', '') if id.startswith('eo-') else id),
-            ("String ID match", "SELECT id FROM executive_orders WHERE CAST(id AS VARCHAR) = ?", str(id))
+            ("Direct ID match", "SELECT id FROM executive_orders WHERE CAST(id AS VARCHAR) = %s", id),
+            ("EO number match (eo- prefix)", "SELECT id FROM executive_orders WHERE eo_number = %s", id.replace('eo-', '') if id.startswith('eo-') else id),
+            ("Document number match", "SELECT id FROM executive_orders WHERE document_number = %s", id.replace('eo-', '') if id.startswith('eo-') else id),
+            ("String ID match", "SELECT id FROM executive_orders WHERE CAST(id AS VARCHAR) = %s", str(id))
         ]
         
         found_record_id = None
@@ -8074,6 +7910,7 @@ async def update_executive_order_review_status(
                     logger.info(f"❌ BACKEND: No match with {attempt_name}")
             except Exception as e:
                 logger.error(f"❌ BACKEND: Error with {attempt_name}: {e}")
+                conn.rollback()
         
         if not found_record_id:
             logger.error(f"❌ BACKEND: Could not find any record for ID: {id}")
@@ -8081,10 +7918,11 @@ async def update_executive_order_review_status(
             raise HTTPException(status_code=404, detail=f"Executive order not found for ID: {id}")
         
         # First, let's check the current reviewed value
-        check_query = "SELECT reviewed FROM executive_orders WHERE id = ?"
+        check_query = "SELECT reviewed, eo_number FROM executive_orders WHERE id = %s"
         cursor.execute(check_query, (found_record_id,))
         current_reviewed_result = cursor.fetchone()
         current_reviewed = current_reviewed_result[0] if current_reviewed_result else "NULL"
+        found_eo_number = current_reviewed_result[1] if current_reviewed_result else None
         logger.info(f"🔍 BACKEND: Current reviewed status in DB: {current_reviewed}")
         
         # Update the record
@@ -8104,7 +7942,7 @@ async def update_executive_order_review_status(
         conn.commit()
         
         # Verify the update worked by reading back the value
-        verify_query = "SELECT reviewed FROM executive_orders WHERE id = ?"
+        verify_query = "SELECT reviewed FROM executive_orders WHERE id = %s"
         cursor.execute(verify_query, (found_record_id,))
         updated_reviewed_result = cursor.fetchone()
         updated_reviewed = updated_reviewed_result[0] if updated_reviewed_result else "NULL"
@@ -8114,9 +7952,11 @@ async def update_executive_order_review_status(
         
         logger.info(f"✅ BACKEND: Successfully updated executive order {found_record_id} reviewed status from '{current_reviewed}' to '{updated_reviewed}'")
         
-        # Clear cache to ensure fresh data on next request
-        api_cache.clear()
-        logger.info("🔄 Cache cleared after executive order review status update")
+        # Drop only the cached pages that contain this order
+        invalidated = api_cache.invalidate_tags(
+            _order_tag(found_eo_number)
+        )
+        logger.info(f"🔄 Invalidated {invalidated} cached responses after executive order review status update")
         
         return {
             "success": True,
@@ -8174,7 +8014,7 @@ async def update_executive_order_category(
         # Try direct lookup by eo_number (numeric part)
         try:
             eo_number = id.replace('eo-', '') if id.startswith('eo-') else id
-            query = "SELECT id FROM executive_orders WHERE eo_number = ?"
+            query = "SELECT id FROM executive_orders WHERE eo_number = %s"
             logger.info(f"🔍 BACKEND: Trying eo_number lookup with: {eo_number}")
             cursor.execute(query, (eo_number,))
             result = cursor.fetchone()
@@ -8183,11 +8023,12 @@ async def update_executive_order_category(
                 logger.info(f"✅ BACKEND: Found record by eo_number, database ID: {found_record_id}")
         except Exception as e:
             logger.error(f"❌ BACKEND: Error with eo_number lookup: {e}")
+            conn.rollback()
         
         # If not found, try document_number lookup
         if not found_record_id:
             try:
-                query = "SELECT id FROM executive_orders WHERE document_number = ?"
+                query = "SELECT id FROM executive_orders WHERE document_number = %s"
                 logger.info(f"🔍 BACKEND: Trying document_number lookup with: {id}")
                 cursor.execute(query, (id,))
                 result = cursor.fetchone()
@@ -8196,12 +8037,13 @@ async def update_executive_order_category(
                     logger.info(f"✅ BACKEND: Found record by document_number, database ID: {found_record_id}")
             except Exception as e:
                 logger.error(f"❌ BACKEND: Error with document_number lookup: {e}")
+                conn.rollback()
         
         # If not found, try direct ID lookup (if it's numeric)
         if not found_record_id:
             try:
                 if id.isdigit():
-                    query = "SELECT id FROM executive_orders WHERE id = ?"
+                    query = "SELECT id FROM executive_orders WHERE id = %s"
                     logger.info(f"🔍 BACKEND: Trying direct ID lookup with: {id}")
                     cursor.execute(query, (int(id),))
                     result = cursor.fetchone()
@@ -8210,6 +8052,7 @@ async def update_executive_order_category(
                         logger.info(f"✅ BACKEND: Found record by direct ID, database ID: {found_record_id}")
             except Exception as e:
                 logger.error(f"❌ BACKEND: Error with direct ID lookup: {e}")
+                conn.rollback()
         
         if not found_record_id:
             logger.error(f"❌ BACKEND: Could not find any record for ID: {id}")
@@ -8217,14 +8060,15 @@ async def update_executive_order_category(
             raise HTTPException(status_code=404, detail=f"Executive order not found for ID: {id}")
         
         # First, let's check the current category value
-        check_query = "SELECT category FROM executive_orders WHERE id = ?"
+        check_query = "SELECT category, eo_number FROM executive_orders WHERE id = %s"
         cursor.execute(check_query, (found_record_id,))
         current_category_result = cursor.fetchone()
         current_category = current_category_result[0] if current_category_result else "NULL"
+        found_eo_number = current_category_result[1] if current_category_result else None
         logger.info(f"🔍 BACKEND: Current category in DB: {current_category}")
         
         # Update the record
-        update_query = "UPDATE executive_orders SET category = ? WHERE id = ?"
+        update_query = "UPDATE executive_orders SET category = %s WHERE id = %s"
         logger.info(f"🔍 BACKEND: Executing update: {update_query} with category='{category}', id={found_record_id}")
         cursor.execute(update_query, (category, found_record_id))
         rows_affected = cursor.rowcount
@@ -8240,7 +8084,7 @@ async def update_executive_order_category(
         conn.commit()
         
         # Verify the update worked by reading back the value
-        verify_query = "SELECT category FROM executive_orders WHERE id = ?"
+        verify_query = "SELECT category FROM executive_orders WHERE id = %s"
         cursor.execute(verify_query, (found_record_id,))
         updated_category_result = cursor.fetchone()
         updated_category = updated_category_result[0] if updated_category_result else "NULL"
@@ -8250,9 +8094,13 @@ async def update_executive_order_category(
         
         logger.info(f"✅ BACKEND: Successfully updated executive order {found_record_id} category from '{current_category}' to '{updated_category}'")
         
-        # Clear cache to ensure fresh data on next request
-        api_cache.clear()
-        logger.info("🔄 Cache cleared after executive order category update")
+        # Drop pages containing this order plus pages and counts filtered by its old or new category
+        invalidated = api_cache.invalidate_tags(
+            _order_tag(found_eo_number),
+            cache_tag("executive_orders", "category", current_category),
+            cache_tag("executive_orders", "category", category)
+        )
+        logger.info(f"🔄 Invalidated {invalidated} cached responses after executive order category update")
         
         return {
             "success": True,
@@ -8652,6 +8500,48 @@ async def debug_connection_info():
     except Exception as e:
         return {"error": f"Connection info failed: {str(e)}"}
 
+@app.get("/api/debug/db-pool")
+async def debug_db_pool():
+    """Connection pool metrics (checkouts, waits, creations, ...)"""
+    return {
+        "sync_pool": get_pool_stats(),
+        "async_pool": get_async_pool_stats()
+    }
+
+@app.get("/api/debug/cache")
+async def debug_api_cache():
+    """API response cache metrics (hits, misses, evictions, size)"""
+    return api_cache.get_stats()
+
+@app.get("/api/debug/ai-scheduler")
+async def debug_ai_scheduler():
+    """AI request budget usage (TPM/RPM headroom, queue depth, 429s)"""
+    return ai_scheduler.get_stats()
+
+@app.get("/api/debug/ai-cache")
+async def debug_ai_cache():
+    """AI result cache metrics (hit rate, tokens saved, entries)"""
+    from ai_result_cache import ai_result_cache
+    return ai_result_cache.get_stats()
+
+@app.get("/api/debug/legiscan-cache")
+async def debug_legiscan_cache():
+    """LegiScan response cache metrics (hit rate, change_hash hits, entries per op)"""
+    from legiscan_cache import legiscan_cache
+    return legiscan_cache.get_stats()
+
+@app.get("/api/debug/semantic-index")
+async def debug_semantic_index():
+    """Embedding index coverage per type and model"""
+    from semantic_index import get_index_stats
+    return await get_index_stats()
+
+@app.get("/api/debug/ai-jobs")
+async def debug_ai_jobs():
+    """AI section outcomes by status (succeeded/failed/dead) and retries due"""
+    from ai_job_status import get_status_summary
+    return await asyncio.to_thread(get_status_summary)
+
 @app.get("/api/debug/executive-orders-schema")
 async def debug_executive_orders_schema():
     """Debug and fix executive orders table schema"""
@@ -9062,7 +8952,17 @@ async def test_simple():
 @app.get("/api/executive-orders/new-count")
 async def get_new_orders_count():
     """Get count of new executive orders that haven't been viewed"""
-    return {"success": True, "new_count": 1}
+    try:
+        if await counters_available():
+            count = await count_from_counters("executive_orders", is_new=True)
+        else:
+            count = await fetch_value(
+                "SELECT COUNT(*) FROM executive_orders WHERE is_new = true", default=0
+            )
+        return {"success": True, "new_count": count}
+    except Exception as e:
+        logger.error(f"❌ Error getting new orders count: {e}")
+        return {"success": False, "error": str(e), "new_count": 0}
 
 @app.get("/api/executive-orders/new")
 async def get_new_orders(limit: int = 10):
@@ -9106,19 +9006,16 @@ async def get_new_orders(limit: int = 10):
 async def mark_order_as_viewed(eo_number: str, user_id: Optional[str] = Query(None)):
     """Mark an executive order as viewed (no longer new)"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE dbo.executive_orders 
-                SET is_new = 0,
-                    first_viewed_at = CASE 
-                        WHEN first_viewed_at IS NULL THEN GETDATE() 
-                        ELSE first_viewed_at 
-                    END,
-                    last_updated = GETDATE()
-                WHERE eo_number = ?
-            """, (eo_number,))
-            conn.commit()
+        rows_affected = await db_execute("""
+            UPDATE executive_orders 
+            SET is_new = false,
+                first_viewed_at = COALESCE(first_viewed_at, NOW()),
+                last_updated = NOW()
+            WHERE eo_number = %s AND is_new = true
+        """, (eo_number,))
+        
+        if rows_affected:
+            api_cache.invalidate_tags(_order_tag(eo_number))
             
         return {
             "success": True,
@@ -9360,57 +9257,39 @@ async def get_state_legislation_count(
     search: Optional[str] = Query(None, description="Search in title and description")
 ):
     """
-    Get the exact count of state legislation from the database
+    Get the exact count of state legislation from the database.
+    Served from legislation_counters unless a search term is given.
     """
     try:
         if not AZURE_SQL_AVAILABLE:
             return {"success": False, "message": "Database not available", "count": 0}
         
-        conn = get_azure_sql_connection()
-        if not conn:
-            return {'success': False, 'message': 'No database connection', 'count': 0}
-        
-        try:
-            cursor = conn.cursor()
-            
-            # Build count query
-            count_query = "SELECT COUNT(*) FROM dbo.state_legislation WHERE 1=1"
-            params = []
-            
-            # Add filters
+        if not search and await counters_available():
+            total_count = await count_from_counters("state_legislation", state=state, category=category)
+            source = "counters"
+        else:
+            # Same filters as the listing, so the count matches its rows
+            filters = {}
             if state:
-                count_query += " AND (state = ? OR state_abbr = ? OR state LIKE ?)"
-                params.extend([state, state, f"%{state}%"])
-            
+                filters['state'] = state
             if category and category != 'all':
-                count_query += " AND category = ?"
-                params.append(category)
-            
+                filters['category'] = category
             if search:
-                count_query += " AND (title LIKE ? OR description LIKE ?)"
-                search_term = f"%{search}%"
-                params.extend([search_term, search_term])
-            
-            # Execute count query
-            cursor.execute(count_query, params)
-            total_count = cursor.fetchone()[0]
-            
-            return {
-                "success": True,
-                "count": total_count,
-                "state": state,
-                "category": category,
-                "search": search
-            }
-            
-        except Exception as e:
-            print(f"❌ Database query error: {e}")
-            return {"success": False, "message": str(e), "count": 0}
-        finally:
-            conn.close()
+                filters['search'] = search
+            total_count = await count_state_legislation_async(filters)
+            source = "live"
+        
+        return {
+            "success": True,
+            "count": total_count,
+            "state": state,
+            "category": category,
+            "search": search,
+            "count_source": source
+        }
             
     except Exception as e:
-        print(f"❌ API error: {e}")
+        logger.error(f"❌ Error counting state legislation: {e}")
         return {"success": False, "message": str(e), "count": 0}
 
 # Debug: Check if this endpoint is being registered
@@ -9422,7 +9301,9 @@ async def get_state_legislation_endpoint(
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(15000, description="Maximum number of results"),
     offset: int = Query(0, description="Number of results to skip"),
-    search: Optional[str] = Query(None, description="Search in title and description")
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor; pass an empty value for the first page"),
+    include_total: bool = Query(True, description="Include the (cached) total count")
 ):
     """
     *** THIS IS THE ENDPOINT YOUR STATEPAGE.JSX IS CALLING ***
@@ -9454,12 +9335,21 @@ async def get_state_legislation_endpoint(
         if search:
             filters['search'] = search
         
-        # Get data from database
-        result = get_state_legislation_from_db(
+        # Get data from database; the total comes from the per-filter count cache
+        page_query = asyncio.to_thread(
+            get_state_legislation_from_db,
             limit=limit,
             offset=offset,
-            filters=filters
+            filters=filters,
+            cursor=cursor,
+            with_total=False
         )
+        if include_total:
+            result, total_count = await asyncio.gather(
+                page_query, get_cached_count("state_legislation", filters, count_state_legislation_async)
+            )
+        else:
+            result, total_count = await page_query, None
         
         if not result.get('success'):
             error_msg = result.get('message', 'Failed to retrieve state legislation')
@@ -9479,12 +9369,11 @@ async def get_state_legislation_endpoint(
             }
         
         bills = result.get('results', [])
-        total_count = result.get('total', 0)
         
         print(f"✅ BACKEND: Successfully returning {len(bills)} bills")
         
         # Return response in format expected by your React frontend
-        return {
+        response = {
             "results": bills,
             "count": len(bills),
             "total_count": total_count,
@@ -9494,9 +9383,15 @@ async def get_state_legislation_endpoint(
             "offset": offset,
             "limit": limit,
             "success": True,
-            "has_more": (offset + len(bills)) < total_count
+            "has_more": (offset + len(bills)) < (total_count or 0)
         }
+        if cursor is not None:
+            response["next_cursor"] = result.get('next_cursor')
+            response["has_more"] = result.get('next_cursor') is not None
+        return response
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ BACKEND: Error in get_state_legislation: {e}")
         import traceback
@@ -9540,98 +9435,17 @@ async def global_search(
         else:  # all or None
             search_types = ["executive_orders", "state_legislation"]
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Search executive orders
-            if "executive_orders" in search_types:
-                eo_query = """
-                    SELECT
-                        eo_number as executive_order_number,
-                        title,
-                        ai_executive_summary as ai_summary,
-                        ai_talking_points,
-                        ai_business_impact,
-                        signing_date,
-                        category,
-                        html_url as url,
-                        pdf_url,
-                        'executive_order' as type
-                    FROM executive_orders
-                    WHERE (
-                        eo_number ILIKE %s OR
-                        title ILIKE %s OR
-                        ai_executive_summary ILIKE %s OR
-                        summary ILIKE %s
-                    )
-                """
+        queries = {}
 
-                eo_params = [f'%{q}%', f'%{q}%', f'%{q}%', f'%{q}%']
+        if "executive_orders" in search_types:
+            queries["executive_orders"] = search_executive_orders(q, category=category, limit=limit)
 
-                if category and category != 'all':
-                    eo_query += " AND category = %s"
-                    eo_params.append(category)
+        if "state_legislation" in search_types:
+            queries["state_legislation"] = search_state_legislation(q, state=state, category=category, limit=limit)
 
-                eo_query += " ORDER BY signing_date DESC NULLS LAST LIMIT %s"
-                eo_params.append(limit)
-                
-                cursor.execute(eo_query, eo_params)
-                columns = [column[0] for column in cursor.description]
-                
-                for row in cursor.fetchall():
-                    eo_dict = dict(zip(columns, row))
-                    results["executive_orders"].append(eo_dict)
-            
-            # Search state legislation
-            if "state_legislation" in search_types:
-                sl_query = """
-                    SELECT
-                        bill_number,
-                        title,
-                        ai_summary,
-                        ai_executive_summary,
-                        ai_talking_points,
-                        ai_business_impact,
-                        description,
-                        state,
-                        category,
-                        status,
-                        introduced_date,
-                        last_action_date,
-                        session,
-                        session_name,
-                        legiscan_url,
-                        'state_legislation' as type,
-                        bill_id,
-                        id
-                    FROM state_legislation
-                    WHERE (
-                        bill_number ILIKE %s OR
-                        title ILIKE %s OR
-                        ai_summary ILIKE %s OR
-                        description ILIKE %s
-                    )
-                """
-
-                sl_params = [f'%{q}%', f'%{q}%', f'%{q}%', f'%{q}%']
-
-                if state and state != 'all':
-                    sl_query += " AND state = %s"
-                    sl_params.append(state.upper())
-
-                if category and category != 'all':
-                    sl_query += " AND category = %s"
-                    sl_params.append(category)
-
-                sl_query += " ORDER BY introduced_date DESC NULLS LAST LIMIT %s"
-                sl_params.append(limit)
-                
-                cursor.execute(sl_query, sl_params)
-                columns = [column[0] for column in cursor.description]
-                
-                for row in cursor.fetchall():
-                    sl_dict = dict(zip(columns, row))
-                    results["state_legislation"].append(sl_dict)
+        # Both searches run concurrently on separate pooled connections
+        for key, rows in zip(queries, await asyncio.gather(*queries.values())):
+            results[key] = rows
         
         # Calculate total results
         total_results = (
@@ -9645,6 +9459,7 @@ async def global_search(
         return {
             "success": True,
             "query": q,
+            "search_mode": await get_search_mode(),
             "total_results": total_results,
             "executive_orders": results["executive_orders"],
             "state_legislation": results["state_legislation"],
@@ -9655,6 +9470,62 @@ async def global_search(
         logger.error(f"❌ Search error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+SEMANTIC_TYPES = {
+    "executive_orders": "executive_order",
+    "state_legislation": "state_legislation",
+}
+
+@app.get("/api/search/semantic")
+async def semantic_search_endpoint(
+    q: str = Query(..., min_length=1, description="Search query"),
+    type: Optional[str] = Query(None, description="Filter by type: executive_orders, state_legislation, all"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    state: Optional[str] = Query(None, description="Filter by state (for state legislation)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results to return")
+):
+    """Meaning-based search over the embedding index (see semantic_index.py)"""
+    from semantic_index import semantic_search
+
+    try:
+        entity_types = [SEMANTIC_TYPES[type]] if type in SEMANTIC_TYPES else None
+        results = await semantic_search(q, entity_types, state=state, category=category, limit=limit)
+        return {
+            "success": True,
+            "query": q,
+            "search_mode": "semantic",
+            "total_results": sum(len(rows) for rows in results.values()),
+            "executive_orders": results.get("executive_order", []),
+            "state_legislation": results.get("state_legislation", []),
+        }
+    except Exception as e:
+        logger.error(f"❌ Semantic search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Semantic search failed: {str(e)}")
+
+@app.get("/api/search/related/{type}/{id}")
+async def related_documents_endpoint(
+    type: str,
+    id: str,
+    state: Optional[str] = Query(None, description="Only return state bills from this state"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results per type")
+):
+    """Bills and executive orders most similar to the given one, across all states"""
+    from semantic_index import related_documents
+
+    if type not in SEMANTIC_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(SEMANTIC_TYPES)}")
+    try:
+        results = await related_documents(SEMANTIC_TYPES[type], id, state=state, limit=limit)
+    except Exception as e:
+        logger.error(f"❌ Related documents error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Related documents lookup failed: {str(e)}")
+    if results is None:
+        raise HTTPException(status_code=404, detail=f"{type} {id} is not in the semantic index yet")
+    return {
+        "success": True,
+        "executive_orders": results.get("executive_order", []),
+        "state_legislation": results.get("state_legislation", []),
+    }
+
 @app.post("/api/legiscan/search-and-analyze")
 async def search_and_analyze_bills_endpoint(request: LegiScanSearchRequest):
     """
@@ -9678,7 +9549,7 @@ async def search_and_analyze_bills_endpoint(request: LegiScanSearchRequest):
             
             # Use enhanced LegiScan client
             try:
-                enhanced_legiscan = EnhancedLegiScanClient()
+                enhanced_legiscan = get_shared_legiscan_client()
                 print("✅ BACKEND: Enhanced LegiScan client initialized")
             except Exception as e:
                 print(f"❌ BACKEND: Enhanced LegiScan initialization failed: {e}")
@@ -9701,15 +9572,16 @@ async def search_and_analyze_bills_endpoint(request: LegiScanSearchRequest):
                     print(f"⚠️ BACKEND: Database manager creation failed: {e}")
             
             # Use enhanced search and analyze
-            result = await enhanced_legiscan.enhanced_search_and_analyze(
-                state=request.state,
-                query=request.query,
-                limit=request.limit,
-                year_filter=getattr(request, 'year_filter', 'all'),
-                max_pages=getattr(request, 'max_pages', 5),
-                with_ai=request.with_ai_analysis,
-                db_manager=db_manager
-            )
+            with ai_priority(Priority.INTERACTIVE):
+                result = await enhanced_legiscan.enhanced_search_and_analyze(
+                    state=request.state,
+                    query=request.query,
+                    limit=request.limit,
+                    year_filter=getattr(request, 'year_filter', 'all'),
+                    max_pages=getattr(request, 'max_pages', 5),
+                    with_ai=request.with_ai_analysis,
+                    db_manager=db_manager
+                )
             
             # Close database connection if it was opened
             if db_manager and hasattr(db_manager, 'connection'):
@@ -9796,7 +9668,9 @@ async def search_and_analyze_bills_endpoint(request: LegiScanSearchRequest):
                     print("✅ BACKEND: Traditional database manager created")
                     
                     # Use the traditional one-by-one processing workflow
-                    result = legiscan_api.search_and_analyze_bills(
+                    # (blocking requests + AI, so it runs in a worker thread)
+                    result = await asyncio.to_thread(
+                        legiscan_api.search_and_analyze_bills,
                         state=request.state,
                         query=request.query,
                         limit=request.limit,
@@ -9825,8 +9699,9 @@ async def search_and_analyze_bills_endpoint(request: LegiScanSearchRequest):
             else:
                 print("📊 BACKEND: Using traditional batch processing")
                 
-                # Use traditional search_and_analyze_bills method (batch way)
-                result = legiscan_api.search_and_analyze_bills(
+                # Use traditional search_and_analyze_bills method (batch way), off the event loop
+                result = await asyncio.to_thread(
+                    legiscan_api.search_and_analyze_bills,
                     state=request.state,
                     query=request.query,
                     limit=request.limit
@@ -10022,46 +9897,45 @@ async def get_status_update_info():
 async def get_new_bills_count(state: Optional[str] = Query(None)):
     """Get count of new state bills that haven't been viewed"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            if state:
-                # Get count for specific state
-                cursor.execute("""
+        use_counters = await counters_available()
+        if state:
+            # Get count for specific state
+            if use_counters:
+                count = (await new_counts_by_state("state_legislation")).get(state, 0)
+            else:
+                count = await fetch_value("""
                     SELECT COUNT(*) as new_bills_count
-                    FROM dbo.state_legislation
-                    WHERE state = ? AND is_new = 1
-                """, (state,))
-                
-                result = cursor.fetchone()
-                count = result[0] if result else 0
-                
-                return {
-                    "success": True,
-                    "state": state,
-                    "new_count": count
-                }
+                    FROM state_legislation
+                    WHERE state = %s AND is_new = true
+                """, (state,), default=0)
+            
+            return {
+                "success": True,
+                "state": state,
+                "new_count": count
+            }
+        else:
+            # Get count for all states
+            if use_counters:
+                state_counts = await new_counts_by_state("state_legislation")
             else:
-                # Get count for all states
-                cursor.execute("""
+                rows = await fetch_all("""
                     SELECT 
                         state,
                         COUNT(*) as new_bills_count
-                    FROM dbo.state_legislation
-                    WHERE is_new = 1
+                    FROM state_legislation
+                    WHERE is_new = true
                     GROUP BY state
                     ORDER BY state
                 """)
-                
-                results = cursor.fetchall()
-                state_counts = {row[0]: row[1] for row in results}
-                total_count = sum(state_counts.values())
-                
-                return {
-                    "success": True,
-                    "total_new_count": total_count,
-                    "state_counts": state_counts
-                }
+                state_counts = {row['state']: row['new_bills_count'] for row in rows}
+            total_count = sum(state_counts.values())
+            
+            return {
+                "success": True,
+                "total_new_count": total_count,
+                "state_counts": state_counts
+            }
                 
     except Exception as e:
         logger.error(f"❌ Error getting new bills count: {e}")
@@ -10141,23 +10015,18 @@ async def get_new_bills(state: Optional[str] = Query(None), limit: int = Query(1
 async def mark_bill_as_viewed(bill_id: str, user_id: Optional[str] = Query("1")):
     """Mark a state bill as viewed (no longer new)"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Mark as viewed and set first_viewed_at if not already set
-            cursor.execute("""
-                UPDATE dbo.state_legislation
-                SET is_new = 0,
-                    first_viewed_at = CASE 
-                        WHEN first_viewed_at IS NULL THEN GETDATE() 
-                        ELSE first_viewed_at 
-                    END,
-                    last_updated = GETDATE()
-                WHERE bill_id = ? AND is_new = 1
-            """, (bill_id,))
-            
-            rows_affected = cursor.rowcount
-            conn.commit()
+        # Mark as viewed and set first_viewed_at if not already set;
+        # the counters trigger moves the bill out of the new-count
+        rows_affected = await db_execute("""
+            UPDATE state_legislation
+            SET is_new = false,
+                first_viewed_at = COALESCE(first_viewed_at, NOW()),
+                last_updated = %s
+            WHERE bill_id = %s AND is_new = true
+        """, (datetime.now().isoformat(), bill_id))
+        
+        if rows_affected:
+            api_cache.invalidate_tags(cache_tag("state_legislation"))
             
         return {
             "success": True,
@@ -13,17 +13,22 @@ This script handles all aspects of state legislation processing:
 
 Usage: python nightly_state_legislation_processor.py [STATE_ABBR]
 If no state specified, processes all configured states.
+
+States run concurrently (state_orchestrator.run_states); LegiScan calls
+share the process-wide request budget and AI calls go through ai_scheduler,
+so no per-state sleeps are needed.
 """
 
 import os
 import sys
 import asyncio
-import requests
 import json
 import logging
 from datetime import datetime, timedelta
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
+from state_orchestrator import legiscan_get, run_states, state_phase
 
 # Configure logging
 logging.basicConfig(
@@ -103,8 +108,7 @@ class StatelegislationProcessor:
             logger.info(f"Checking sessions for {state_abbr}")
             
             # Get session list from LegiScan
-            response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getSessionList&state={state_abbr}')
-            sessions_data = response.json()
+            sessions_data = await legiscan_get({'op': 'getSessionList', 'state': state_abbr})
             
             if 'sessions' not in sessions_data:
                 logger.warning(f"No sessions data for {state_abbr}")
@@ -119,8 +123,7 @@ class StatelegislationProcessor:
                 sine_die = session.get('sine_die', 0) == 1  # 1 = closed, 0 = active
                 
                 # Get detailed session info
-                session_response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getSession&id={session_id}')
-                session_detail = session_response.json()
+                session_detail = await legiscan_get({'op': 'getSession', 'id': session_id})
                 
                 # Update database with session info
                 with get_db_connection() as conn:
@@ -184,8 +187,7 @@ class StatelegislationProcessor:
             logger.info(f"Checking new bills in {session_name}")
             
             # Get master list from LegiScan
-            master_response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getMasterList&state={state_abbr}&id={session_id}')
-            master_data = master_response.json()
+            master_data = await legiscan_get({'op': 'getMasterList', 'state': state_abbr, 'id': session_id})
             
             if 'masterlist' not in master_data:
                 logger.warning(f"No masterlist for {session_name}")
@@ -236,8 +238,7 @@ class StatelegislationProcessor:
             logger.info(f"Processing new bill {bill_number}")
             
             # Get detailed bill information
-            bill_response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getBill&id={bill_id}')
-            bill_data = bill_response.json()
+            bill_data = await legiscan_get({'op': 'getBill', 'id': bill_id})
             
             if 'bill' not in bill_data:
                 logger.warning(f"No detailed data for bill {bill_number}")
@@ -344,10 +345,6 @@ class StatelegislationProcessor:
         except Exception as e:
             logger.error(f"Error processing new bill {bill_info.get('bill_number', 'Unknown')}: {e}")
             return False
-        
-        # Rate limiting
-        delay = PROCESSING_LIMITS['api_delay_seconds']
-        await asyncio.sleep(delay)
 
     async def update_bill_statuses(self, state_abbr, session_id, session_name):
         """Update statuses for existing bills in active sessions"""
@@ -377,8 +374,7 @@ class StatelegislationProcessor:
             for bill_id, bill_number, current_status in bills_to_update[:limit]:
                 try:
                     # Get current bill details
-                    bill_response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getBill&id={bill_id}')
-                    bill_data = bill_response.json()
+                    bill_data = await legiscan_get({'op': 'getBill', 'id': bill_id})
                     
                     if 'bill' in bill_data:
                         bill = bill_data['bill']
@@ -415,10 +411,6 @@ class StatelegislationProcessor:
                     
                 except Exception as e:
                     logger.error(f"Error updating status for {bill_number}: {e}")
-                
-                # Rate limiting
-                delay = PROCESSING_LIMITS['status_update_delay_seconds']
-                await asyncio.sleep(delay)
             
             self.processing_stats['bills_status_updated'] += updated_count
             logger.info(f"Updated status for {updated_count} bills")
@@ -453,8 +445,7 @@ class StatelegislationProcessor:
             for bill_id, bill_number in bills_missing_links:
                 try:
                     # Get bill details for URL
-                    bill_response = requests.get(f'{BASE_URL}?key={API_KEY}&op=getBill&id={bill_id}')
-                    bill_data = bill_response.json()
+                    bill_data = await legiscan_get({'op': 'getBill', 'id': bill_id})
                     
                     if 'bill' in bill_data:
                         bill = bill_data['bill']
@@ -488,8 +479,6 @@ class StatelegislationProcessor:
                 
                 except Exception as e:
                     logger.error(f"Error adding source link for {bill_number}: {e}")
-                
-                await asyncio.sleep(0.5)
             
         except Exception as e:
             logger.error(f"Error ensuring source links for {state_abbr}: {e}")
@@ -552,7 +541,8 @@ class StatelegislationProcessor:
             logger.info(f"🔄 Processing state: {state_abbr}")
             
             # 1. Check and update sessions
-            active_sessions = await self.check_sessions_for_state(state_abbr)
+            async with state_phase('sessions'):
+                active_sessions = await self.check_sessions_for_state(state_abbr)
             
             # 2. Process active sessions
             for session in active_sessions:
@@ -560,24 +550,28 @@ class StatelegislationProcessor:
                 session_name = session['session_name']
                 
                 # Check for new bills
-                new_bills = await self.check_new_bills_in_session(state_abbr, session_id, session_name)
-                
-                # Process each new bill
-                limit = PROCESSING_LIMITS['new_bills_per_session']
-                for bill_info in new_bills[:limit]:
-                    await self.process_new_bill(state_abbr, session_id, session_name, bill_info)
+                async with state_phase('new_bills'):
+                    new_bills = await self.check_new_bills_in_session(state_abbr, session_id, session_name)
+                    
+                    # Process each new bill
+                    limit = PROCESSING_LIMITS['new_bills_per_session']
+                    for bill_info in new_bills[:limit]:
+                        await self.process_new_bill(state_abbr, session_id, session_name, bill_info)
                 
                 # Update existing bill statuses
-                await self.update_bill_statuses(state_abbr, session_id, session_name)
+                async with state_phase('statuses'):
+                    await self.update_bill_statuses(state_abbr, session_id, session_name)
             
             # 3. Ensure all bills have proper data
-            await self.ensure_source_links(state_abbr)
-            await self.ensure_practice_area_tags(state_abbr)
+            async with state_phase('cleanup'):
+                await self.ensure_source_links(state_abbr)
+                await self.ensure_practice_area_tags(state_abbr)
             
             logger.info(f"✅ Completed processing for {state_abbr}")
             
         except Exception as e:
             logger.error(f"Error processing state {state_abbr}: {e}")
+            raise
 
     async def run(self, target_states=None):
         """Run the complete nightly processing"""
@@ -586,8 +580,8 @@ class StatelegislationProcessor:
         
         states_to_process = target_states or CONFIGURED_STATES
         
-        for state_abbr in states_to_process:
-            await self.process_state(state_abbr)
+        # All states at once; a failing state doesn't stop the others
+        report = await run_states(states_to_process, self.process_state)
         
         # Log final statistics
         end_time = datetime.now()
@@ -595,9 +589,11 @@ class StatelegislationProcessor:
         
         logger.info("🎉 Nightly processing completed!")
         logger.info(f"Duration: {duration}")
+        report.log(logger)
         logger.info("Statistics:")
         for key, value in self.processing_stats.items():
             logger.info(f"  {key}: {value}")
+        return report
 
 async def main():
     """Main entry point"""
@@ -613,4 +609,5 @@ async def main():
     await processor.run(target_states)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,72 @@
+# pagination.py - Opaque cursors for keyset pagination
+"""
+Keyset ("seek") pagination helpers.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64url'd so clients treat it as opaque. The next page is fetched with a
+row comparison on an indexed sort key instead of OFFSET, so page N costs
+the same as page 1.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_length: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor()"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise InvalidCursorError("Cursor does not match this listing")
+    return values
+
+
+def keyset_clause(
+    sort_expressions: Sequence[str],
+    cursor: Optional[str],
+    placeholder: str = "%s",
+    casts: Sequence[str] = None
+) -> Tuple[Optional[str], List[Any]]:
+    """
+    WHERE fragment selecting rows after `cursor` for a descending sort.
+
+    Every sort expression must be sorted DESC and the last one must be
+    unique (e.g. the primary key) so the row comparison is a total order.
+    Returns (None, []) for the first page.
+    """
+    if not cursor:
+        return None, []
+
+    values = decode_cursor(cursor, len(sort_expressions))
+    casts = casts or [""] * len(sort_expressions)
+    placeholders = ", ".join(f"{placeholder}{cast}" for cast in casts)
+    return f"({', '.join(sort_expressions)}) < ({placeholders})", values
+
+
+def next_cursor(rows: List[Dict], limit: int, sort_keys: Sequence[str]) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Trim the extra look-ahead row and build the cursor for the next page.
+
+    Callers fetch limit + 1 rows; the extra row only tells us whether
+    another page exists.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor([last[key] for key in sort_keys])
@@ -14,6 +14,7 @@ import time
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 # California practice area mapping based on bill content
 PRACTICE_AREA_KEYWORDS = {
@@ -135,9 +136,6 @@ async def process_california_batch(bills_batch):
                     
             except Exception as e:
                 print(f"   ❌ {bill_number} - Error: {e}")
-            
-            # Rate limiting
-            await asyncio.sleep(1)
         
         conn.commit()
     
@@ -316,4 +314,5 @@ async def main():
         print("🎉 California processing complete!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
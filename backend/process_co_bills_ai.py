@@ -5,10 +5,10 @@ Uses existing Azure OpenAI configuration from the backend
 """
 
 import os
-import time
 from datetime import datetime
 from database_config import get_db_connection
 from openai import AzureOpenAI
+from ai_scheduler import Priority, ai_scheduler
 
 # Use existing Azure OpenAI configuration
 AZURE_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT')
@@ -42,8 +42,10 @@ def generate_ai_summary(bill_data):
         Provide a clear, concise analysis focusing on practical implications.
         """
         
-        # Call Azure OpenAI
-        response = client.chat.completions.create(
+        # Call Azure OpenAI under the shared TPM/RPM budget
+        response = ai_scheduler.chat_completion_sync(
+            client,
+            priority=Priority.BACKFILL,
             model=DEPLOYMENT_NAME,
             messages=[
                 {"role": "system", "content": "You are a legislative analyst providing clear, actionable summaries of bills."},
@@ -182,9 +184,6 @@ def process_colorado_bills(limit=None, test_mode=False):
                     failed += 1
                     print(f"   ❌ Failed to generate AI summary")
                 
-                # Delay to avoid rate limiting
-                time.sleep(1)
-                
                 # In test mode, show sample output
                 if test_mode and ai_result:
                     print("\n   📝 Sample Summary:")
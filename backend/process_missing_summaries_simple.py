@@ -13,6 +13,8 @@ import requests
 import json
 import time
 from datetime import datetime
+
+from ai_scheduler import Priority, ai_scheduler
 from typing import List, Dict, Any
 from openai import AsyncAzureOpenAI
 import os
@@ -54,7 +56,7 @@ State Bill Content: {text}
 SYSTEM_MESSAGE = "You are a local policy expert who explains legislation to community members in plain English. You write naturally and conversationally, like you're talking to a neighbor over coffee. You avoid formulaic AI patterns and corporate jargon. Each summary you write sounds unique and human, focusing on what actually matters to regular people. You never use templates or robotic phrases."
 
 class SimpleMissingSummaryProcessor:
-    def __init__(self, base_url: str = "http://localhost:8000", batch_size: int = 5, delay: float = 1.0):
+    def __init__(self, base_url: str = "http://localhost:8000", batch_size: int = 5, delay: float = 0.0):
         self.base_url = base_url
         self.batch_size = batch_size
         self.delay = delay
@@ -181,8 +183,10 @@ class SimpleMissingSummaryProcessor:
                 {"role": "user", "content": prompt}
             ]
             
-            # Call Azure OpenAI
-            response = await client.chat.completions.create(
+            # Call Azure OpenAI under the shared TPM/RPM budget
+            response = await ai_scheduler.chat_completion(
+                client,
+                priority=Priority.BACKFILL,
                 model=MODEL_NAME,
                 messages=messages,
                 temperature=0.7,
@@ -361,7 +365,7 @@ async def main():
     parser = argparse.ArgumentParser(description='Process missing AI summaries')
     parser.add_argument('--limit', type=int, help='Limit number of bills to process')
     parser.add_argument('--batch-size', type=int, default=3, help='Batch size')
-    parser.add_argument('--delay', type=float, default=1.0, help='Delay between batches')
+    parser.add_argument('--delay', type=float, default=0.0, help='Extra delay between batches; AI calls are already paced by the shared scheduler')
     
     args = parser.parse_args()
     
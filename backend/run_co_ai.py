@@ -9,6 +9,7 @@ import time
 from datetime import datetime
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from ai_scheduler import Priority, ai_priority
 
 async def process_all_colorado_bills():
     """Process all Colorado bills without AI summaries"""
@@ -86,9 +87,6 @@ async def process_all_colorado_bills():
             except Exception as e:
                 failed += 1
                 print(f"      ❌ Error: {e}")
-            
-            # Rate limiting - 2 seconds between calls
-            await asyncio.sleep(2)
         
         # Final commit
         conn.commit()
@@ -105,4 +103,5 @@ async def process_all_colorado_bills():
 
 # Run the processing
 if __name__ == "__main__":
-    asyncio.run(process_all_colorado_bills())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(process_all_colorado_bills())
@@ -0,0 +1,237 @@
+# search_engine.py - Ranked full-text search for /api/search
+"""
+Full-text search over executive_orders and state_legislation.
+
+Uses the GIN-indexed search_vector columns added by
+database/migrations/add_fulltext_search.sql: results are ranked with
+ts_rank_cd, the last search term is prefix-matched (so debounced
+keystrokes like "educat" already match "education"), and each hit
+carries a highlighted snippet. Until the migration is applied the
+original ILIKE queries are used instead.
+"""
+
+import logging
+import re
+import time
+from typing import Dict, List, Optional
+
+from async_db import fetch_all, fetch_value
+
+logger = logging.getLogger(__name__)
+
+# How long the "is the index there?" answer is trusted before re-checking
+INDEX_CHECK_TTL = 300
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=12"
+
+_index_status: Dict[str, Dict] = {}
+
+
+def build_prefix_tsquery(q: str) -> Optional[str]:
+    """
+    Turn free text into a to_tsquery() expression.
+
+    Every term must match; the last one is a prefix match. Returns None when
+    the text has no searchable terms (e.g. only punctuation).
+    """
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return None
+    parts = terms[:-1] + [f"{terms[-1]}:*"]
+    return " & ".join(parts)
+
+
+async def fulltext_index_available(table: str) -> bool:
+    """Whether `table` has the search_vector column (cached for INDEX_CHECK_TTL)"""
+    status = _index_status.get(table)
+    if status and time.monotonic() - status["checked_at"] < INDEX_CHECK_TTL:
+        return status["available"]
+
+    try:
+        available = bool(await fetch_value("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_name = %s AND column_name = 'search_vector'
+        """, (table,), default=0))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not check full-text index on {table}: {e}")
+        available = False
+
+    if not available:
+        logger.info(f"ℹ️ No search_vector on {table}, using ILIKE search")
+    _index_status[table] = {"available": available, "checked_at": time.monotonic()}
+    return available
+
+
+async def search_executive_orders(q: str, category: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    """Ranked executive order search with ILIKE fallback"""
+    tsquery = build_prefix_tsquery(q)
+    if tsquery and await fulltext_index_available("executive_orders"):
+        filters = ""
+        params = [tsquery]
+        if category and category != 'all':
+            filters += " AND category = %s"
+            params.append(category)
+        params.append(limit)
+
+        # Rank inside the index-backed subquery; ts_headline only runs on the final page
+        return await fetch_all(f"""
+            SELECT
+                eo_number as executive_order_number,
+                title,
+                ai_executive_summary as ai_summary,
+                ai_talking_points,
+                ai_business_impact,
+                signing_date,
+                category,
+                html_url as url,
+                pdf_url,
+                'executive_order' as type,
+                rank,
+                ts_headline('english', coalesce(nullif(ai_executive_summary, ''), summary, title), query,
+                            '{HEADLINE_OPTIONS}') as snippet
+            FROM (
+                SELECT eo.*, ts_rank_cd(eo.search_vector, query) as rank, query
+                FROM executive_orders eo, to_tsquery('english', %s) query
+                WHERE eo.search_vector @@ query{filters}
+                ORDER BY rank DESC, eo.signing_date DESC NULLS LAST
+                LIMIT %s
+            ) ranked
+            ORDER BY rank DESC, signing_date DESC NULLS LAST
+        """, params)
+
+    eo_query = """
+        SELECT
+            eo_number as executive_order_number,
+            title,
+            ai_executive_summary as ai_summary,
+            ai_talking_points,
+            ai_business_impact,
+            signing_date,
+            category,
+            html_url as url,
+            pdf_url,
+            'executive_order' as type
+        FROM executive_orders
+        WHERE (
+            eo_number ILIKE %s OR
+            title ILIKE %s OR
+            ai_executive_summary ILIKE %s OR
+            summary ILIKE %s
+        )
+    """
+
+    eo_params = [f'%{q}%', f'%{q}%', f'%{q}%', f'%{q}%']
+
+    if category and category != 'all':
+        eo_query += " AND category = %s"
+        eo_params.append(category)
+
+    eo_query += " ORDER BY signing_date DESC NULLS LAST LIMIT %s"
+    eo_params.append(limit)
+
+    return await fetch_all(eo_query, eo_params)
+
+
+async def search_state_legislation(
+    q: str,
+    state: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict]:
+    """Ranked state bill search with ILIKE fallback"""
+    tsquery = build_prefix_tsquery(q)
+    if tsquery and await fulltext_index_available("state_legislation"):
+        filters = ""
+        params = [tsquery]
+        if state and state != 'all':
+            filters += " AND sl.state = %s"
+            params.append(state.upper())
+        if category and category != 'all':
+            filters += " AND sl.category = %s"
+            params.append(category)
+        params.append(limit)
+
+        return await fetch_all(f"""
+            SELECT
+                bill_number,
+                title,
+                ai_summary,
+                ai_executive_summary,
+                ai_talking_points,
+                ai_business_impact,
+                description,
+                state,
+                category,
+                status,
+                introduced_date,
+                last_action_date,
+                session,
+                session_name,
+                legiscan_url,
+                'state_legislation' as type,
+                bill_id,
+                id,
+                rank,
+                ts_headline('english', coalesce(nullif(description, ''), ai_summary, title), query,
+                            '{HEADLINE_OPTIONS}') as snippet
+            FROM (
+                SELECT sl.*, ts_rank_cd(sl.search_vector, query) as rank, query
+                FROM state_legislation sl, to_tsquery('english', %s) query
+                WHERE sl.search_vector @@ query{filters}
+                ORDER BY rank DESC, sl.introduced_date DESC NULLS LAST
+                LIMIT %s
+            ) ranked
+            ORDER BY rank DESC, introduced_date DESC NULLS LAST
+        """, params)
+
+    sl_query = """
+        SELECT
+            bill_number,
+            title,
+            ai_summary,
+            ai_executive_summary,
+            ai_talking_points,
+            ai_business_impact,
+            description,
+            state,
+            category,
+            status,
+            introduced_date,
+            last_action_date,
+            session,
+            session_name,
+            legiscan_url,
+            'state_legislation' as type,
+            bill_id,
+            id
+        FROM state_legislation
+        WHERE (
+            bill_number ILIKE %s OR
+            title ILIKE %s OR
+            ai_summary ILIKE %s OR
+            description ILIKE %s
+        )
+    """
+
+    sl_params = [f'%{q}%', f'%{q}%', f'%{q}%', f'%{q}%']
+
+    if state and state != 'all':
+        sl_query += " AND state = %s"
+        sl_params.append(state.upper())
+
+    if category and category != 'all':
+        sl_query += " AND category = %s"
+        sl_params.append(category)
+
+    sl_query += " ORDER BY introduced_date DESC NULLS LAST LIMIT %s"
+    sl_params.append(limit)
+
+    return await fetch_all(sl_query, sl_params)
+
+
+async def get_search_mode() -> Dict[str, str]:
+    """Which search path each table is currently using"""
+    return {
+        table: "fulltext" if await fulltext_index_available(table) else "ilike"
+        for table in ("executive_orders", "state_legislation")
+    }
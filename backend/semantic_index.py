@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Semantic Index
+Embedding-based similarity search over state bills and executive orders.
+
+Each document's title, description (executive_orders.summary) and
+ai_executive_summary are embedded (embeddings.py) and stored in
+document_embeddings (database/migrations/add_semantic_index.sql) with an
+md5 of the source text. sync_embeddings() only picks up documents whose
+hash or embedding model differs from what is stored, so it is cheap to run
+after every fetch/AI pass; the nightly state bills job runs it after AI
+processing.
+
+Queries use pgvector's HNSW indexes (cosine distance, one partial index
+per entity type: database/migrations/add_semantic_index_partial_hnsw.sql),
+so "bills like this one" across all states comes back in milliseconds
+instead of a LIKE scan.
+
+Documents are keyed by their table's primary key (state_legislation.id,
+executive_orders.id). eo_number is not unique, so it can't identify an
+executive order here (database/migrations/rekey_executive_order_embeddings.sql).
+
+Usage:
+    python semantic_index.py [--type state_legislation|executive_order] [--limit N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from async_db import async_db_cursor
+from database_config import get_db_connection
+from embeddings import Embedder, clean_text, get_embedder, to_pgvector
+
+logger = logging.getLogger(__name__)
+
+STATE_LEGISLATION = 'state_legislation'
+EXECUTIVE_ORDER = 'executive_order'
+
+# entity_type -> (table, id column, description column); the id column must be unique
+SOURCES = {
+    STATE_LEGISLATION: ('state_legislation', 'id', 'description'),
+    EXECUTIVE_ORDER: ('executive_orders', 'id', 'summary'),
+}
+
+DEFAULT_BATCH_SIZE = 64
+
+# HNSW candidate list size; must be >= the rows a query wants back
+EF_SEARCH = 100
+
+# Filters (state, category) are applied after the ANN scan, so fetch extra candidates
+FILTER_OVERSAMPLE = 4
+
+# pgvector >= 0.8: keep scanning the index until filtered queries fill up
+# ('relaxed_order' or 'strict_order'; unset on older pgvector)
+HNSW_ITERATIVE_SCAN = os.getenv('HNSW_ITERATIVE_SCAN')
+
+QUERY_CACHE_SIZE = 256
+
+_query_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+
+@dataclass
+class EmbeddingSyncStats:
+    """Counters for one sync_embeddings run"""
+    embedded: Dict[str, int] = field(default_factory=dict)
+    removed: Dict[str, int] = field(default_factory=dict)
+    batches: int = 0
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _source_text(description_column: str) -> str:
+    return f"concat_ws(E'\\n', src.title, src.{description_column}, src.ai_executive_summary)"
+
+
+def pending_documents(entity_type: str, model_id: str, limit: int) -> List[Tuple]:
+    """(entity_id, text, content_hash) for documents that are new, changed or embedded with another model"""
+    table, id_column, description_column = SOURCES[entity_type]
+    text = _source_text(description_column)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT src.{id_column}::text, src.title, src.{description_column}, src.ai_executive_summary,
+                   md5({text})
+            FROM {table} src
+            LEFT JOIN document_embeddings e
+                ON e.entity_type = %s AND e.entity_id = src.{id_column}::text
+            WHERE src.{id_column} IS NOT NULL
+              AND coalesce(src.title, '') <> ''
+              AND (e.entity_id IS NULL OR e.content_hash <> md5({text}) OR e.model <> %s)
+            LIMIT %s
+        ''', (entity_type, model_id, limit))
+        return [
+            (entity_id, clean_text("\n".join(part for part in (title, description, summary) if part)), content_hash)
+            for entity_id, title, description, summary, content_hash in cursor.fetchall()
+        ]
+
+
+def store_embeddings(entity_type: str, model_id: str, rows: List[Tuple[str, str, List[float]]]) -> int:
+    """Upsert (entity_id, content_hash, vector) rows"""
+    if not rows:
+        return 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute_values(cursor, '''
+            INSERT INTO document_embeddings (entity_type, entity_id, model, content_hash, embedding, updated_at)
+            VALUES %s
+            ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+                model = EXCLUDED.model,
+                content_hash = EXCLUDED.content_hash,
+                embedding = EXCLUDED.embedding,
+                updated_at = EXCLUDED.updated_at
+        ''', [
+            (entity_type, entity_id, model_id, content_hash, to_pgvector(vector))
+            for entity_id, content_hash, vector in rows
+        ], template="(%s, %s, %s, %s, %s::vector, NOW())", page_size=len(rows))
+    return len(rows)
+
+
+def remove_orphans(entity_type: str) -> int:
+    """Drop embeddings whose document no longer exists"""
+    table, id_column, _ = SOURCES[entity_type]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            DELETE FROM document_embeddings e
+            WHERE e.entity_type = %s
+              AND NOT EXISTS (SELECT 1 FROM {table} src WHERE src.{id_column}::text = e.entity_id)
+        ''', (entity_type,))
+        return cursor.rowcount
+
+
+async def sync_embeddings(
+    entity_types: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embedder: Optional[Embedder] = None
+) -> EmbeddingSyncStats:
+    """Embed every new or changed document (up to limit per entity type)"""
+    embedder = embedder or get_embedder()
+    stats = EmbeddingSyncStats()
+    started = time.monotonic()
+
+    for entity_type in entity_types or list(SOURCES):
+        embedded = 0
+        while limit is None or embedded < limit:
+            size = batch_size if limit is None else min(batch_size, limit - embedded)
+            pending = await asyncio.to_thread(pending_documents, entity_type, embedder.model_id, size)
+            if not pending:
+                break
+            try:
+                vectors = await embedder.embed([text for _, text, _ in pending])
+            except Exception as e:
+                # Rows stay pending, the next run picks them up
+                stats.errors.append(f"{entity_type}: {e}")
+                logger.error(f"❌ Embedding batch failed for {entity_type}: {e}")
+                break
+            embedded += await asyncio.to_thread(store_embeddings, entity_type, embedder.model_id, [
+                (entity_id, content_hash, vector)
+                for (entity_id, _, content_hash), vector in zip(pending, vectors)
+            ])
+            stats.batches += 1
+            logger.info(f"🧭 Embedded {embedded} {entity_type} documents")
+
+        stats.embedded[entity_type] = embedded
+        stats.removed[entity_type] = await asyncio.to_thread(remove_orphans, entity_type)
+
+    stats.seconds = time.monotonic() - started
+    return stats
+
+
+async def embed_query(q: str, embedder: Optional[Embedder] = None) -> List[float]:
+    """Query vector, with a small LRU so repeated searches skip the embedding call"""
+    embedder = embedder or get_embedder()
+    key = (embedder.model_id, " ".join(q.lower().split()))
+    if key in _query_cache:
+        _query_cache.move_to_end(key)
+        return _query_cache[key]
+    vector = (await embedder.embed([clean_text(q)]))[0]
+    _query_cache[key] = vector
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+    return vector
+
+
+async def _nearest(
+    entity_type: str,
+    vector: List[float],
+    model_id: str,
+    limit: int,
+    state: Optional[str] = None,
+    category: Optional[str] = None,
+    exclude_id: Optional[str] = None
+) -> List[Dict]:
+    if entity_type not in SOURCES:
+        raise ValueError(f"Unknown entity type: {entity_type}")
+    filters = ""
+    params: List = []
+    # executive_orders has no state column
+    if entity_type == STATE_LEGISLATION and state and state != 'all':
+        filters += " AND src.state = %s"
+        params.append(state.upper())
+    if category and category != 'all':
+        filters += " AND src.category = %s"
+        params.append(category)
+    if exclude_id is not None:
+        filters += " AND c.entity_id <> %s"
+        params.append(str(exclude_id))
+    candidates = limit * FILTER_OVERSAMPLE if filters else limit
+
+    if entity_type == STATE_LEGISLATION:
+        columns = '''
+            src.bill_number, src.title, src.ai_summary, src.ai_executive_summary, src.description,
+            src.state, src.category, src.status, src.introduced_date, src.last_action_date,
+            src.session_name, src.legiscan_url, 'state_legislation' as type, src.bill_id, src.id'''
+        join = "state_legislation src ON src.id::text = c.entity_id"
+    else:
+        columns = '''
+            src.eo_number as executive_order_number, src.title, src.ai_executive_summary as ai_summary,
+            src.signing_date, src.category, src.html_url as url, src.pdf_url, 'executive_order' as type, src.id'''
+        join = "executive_orders src ON src.id::text = c.entity_id"
+
+    literal = to_pgvector(vector)
+    async with async_db_cursor(as_dict=True) as cursor:
+        await cursor.execute(f"SET LOCAL hnsw.ef_search = {max(EF_SEARCH, candidates)}")
+        if HNSW_ITERATIVE_SCAN:
+            await cursor.execute("SELECT set_config('hnsw.iterative_scan', %s, true)", (HNSW_ITERATIVE_SCAN,))
+        # entity_type is a literal (one of SOURCES) so the planner picks its partial HNSW index
+        await cursor.execute(f'''
+            SELECT {columns}, round((1 - c.distance)::numeric, 4) as similarity
+            FROM (
+                SELECT entity_id, embedding <=> %s::vector as distance
+                FROM document_embeddings
+                WHERE entity_type = '{entity_type}' AND model = %s
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+            ) c
+            JOIN {join}
+            WHERE TRUE{filters}
+            ORDER BY c.distance
+            LIMIT %s
+        ''', [literal, model_id, literal, candidates] + params + [limit])
+        return await cursor.fetchall()
+
+
+async def semantic_search(
+    q: str,
+    entity_types: Optional[List[str]] = None,
+    state: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, List[Dict]]:
+    """Nearest documents to free text, per entity type"""
+    embedder = get_embedder()
+    vector = await embed_query(q, embedder)
+    entity_types = entity_types or list(SOURCES)
+    results = await asyncio.gather(*(
+        _nearest(entity_type, vector, embedder.model_id, limit, state=state, category=category)
+        for entity_type in entity_types
+    ))
+    return dict(zip(entity_types, results))
+
+
+async def related_documents(
+    entity_type: str,
+    entity_id: str,
+    target_types: Optional[List[str]] = None,
+    state: Optional[str] = None,
+    limit: int = 10
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Documents nearest to an already-indexed one; None if it has no embedding yet.
+
+    entity_id is the row id (state_legislation.id or executive_orders.id),
+    returned as "id" in search results.
+    """
+    model_id = get_embedder().model_id
+    async with async_db_cursor() as cursor:
+        await cursor.execute('''
+            SELECT embedding::text FROM document_embeddings
+            WHERE entity_type = %s AND entity_id = %s AND model = %s
+        ''', (entity_type, str(entity_id), model_id))
+        row = await cursor.fetchone()
+    if not row:
+        return None
+
+    vector = [float(v) for v in row[0].strip("[]").split(",")]
+    target_types = target_types or list(SOURCES)
+    results = await asyncio.gather(*(
+        _nearest(target, vector, model_id, limit, state=state,
+                 exclude_id=entity_id if target == entity_type else None)
+        for target in target_types
+    ))
+    return dict(zip(target_types, results))
+
+
+async def get_index_stats() -> Dict:
+    """Indexed documents per type and model"""
+    async with async_db_cursor(as_dict=True) as cursor:
+        await cursor.execute('''
+            SELECT entity_type, model, COUNT(*) as documents, MAX(updated_at) as last_updated
+            FROM document_embeddings
+            GROUP BY entity_type, model
+        ''')
+        return {"model": get_embedder().model_id, "indexed": await cursor.fetchall()}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Embed new and changed documents for semantic search')
+    parser.add_argument('--type', choices=list(SOURCES), help='Only sync this entity type')
+    parser.add_argument('--limit', type=int, help='Max documents to embed per type')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Documents per embedding request')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stats = await sync_embeddings([args.type] if args.type else None, args.limit, args.batch_size)
+    print(f"✅ Embedded {stats.embedded}, removed {stats.removed} in {stats.seconds:.1f}s")
+    for error in stats.errors:
+        print(f"❌ {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,11 +7,9 @@ import asyncio
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.db_setup import get_db_session
-from models.bills import Bills
+from ai_backfill_worker import run_backfill
+from ai_scheduler import AIUnavailableError, ai_scheduler
 import openai
 import json
 
@@ -48,6 +46,9 @@ class BillAnalyzer:
             
             return processed_analysis
             
+        except AIUnavailableError:
+            # Circuit open: let the caller requeue the bill rather than store defaults
+            raise
         except Exception as e:
             logger.error(f"Error analyzing bill {bill_data.get('bill_id', 'unknown')}: {str(e)}")
             return self._get_default_analysis()
@@ -99,7 +100,8 @@ class BillAnalyzer:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            response = await ai_scheduler.chat_completion(
+                self.openai_client,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -178,12 +180,19 @@ class BillAnalyzer:
         }
         return defaults.get(field, '')
     
-    async def process_pending_bills(self, batch_size: int = 50) -> Dict:
+    async def process_pending_bills(self, batch_size: int = 50, concurrency: int = 8) -> Dict:
         """
         Process bills that need AI analysis
         
+        Runs the shared queue worker (ai_backfill_worker.run_backfill): bills
+        are claimed with a lease instead of being dequeued up front, and each
+        written batch releases its claims, so bills claimed by a run that
+        crashes or is cancelled stay queued and are picked up again once the
+        lease expires.
+        
         Args:
             batch_size: Number of bills to process in one batch
+            concurrency: Number of analyses in flight at once
             
         Returns:
             Dictionary with processing statistics
@@ -195,86 +204,14 @@ class BillAnalyzer:
         }
         
         try:
-            # Get bills that need AI processing
-            pending_bills = await self._get_pending_bills(batch_size)
-            
-            logger.info(f"Processing {len(pending_bills)} bills for AI analysis")
-            
-            for bill in pending_bills:
-                try:
-                    # Convert bill to dict for analysis
-                    bill_data = self._bill_to_dict(bill)
-                    
-                    # Analyze the bill
-                    analysis = await self.analyze_bill(bill_data)
-                    
-                    # Save analysis results
-                    await self._save_analysis_results(bill.id, analysis)
-                    
-                    # Mark as processed
-                    await self._mark_bill_processed(bill.id)
-                    
-                    stats['processed'] += 1
-                    
-                    # Small delay to avoid overwhelming the AI service
-                    await asyncio.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing bill {bill.id}: {str(e)}")
-                    stats['failed'] += 1
-                    
+            result = await run_backfill(concurrency=concurrency, max_items=batch_size, claim_size=batch_size)
+            stats['processed'] = result.succeeded
+            stats['failed'] = result.failed
+            stats['skipped'] = result.requeued
         except Exception as e:
             logger.error(f"Error in process_pending_bills: {str(e)}")
             
         return stats
-    
-    async def _get_pending_bills(self, limit: int) -> List[Bills]:
-        """Get bills that need AI processing"""
-        async with get_db_session() as session:
-            query = select(Bills).where(
-                Bills.needs_ai_processing == True
-            ).limit(limit)
-            
-            result = await session.execute(query)
-            return result.scalars().all()
-    
-    def _bill_to_dict(self, bill: Bills) -> Dict:
-        """Convert bill model to dictionary for analysis"""
-        return {
-            'bill_id': bill.bill_id,
-            'title': bill.title,
-            'description': bill.description,
-            'summary': getattr(bill, 'summary', ''),
-            'text': getattr(bill, 'text', ''),
-            'status': bill.status,
-            'session_id': bill.session_id,
-            'state_code': bill.state_code
-        }
-    
-    async def _save_analysis_results(self, bill_id: str, analysis: Dict):
-        """Save AI analysis results to database"""
-        async with get_db_session() as session:
-            # Update bill with analysis results
-            update_query = update(Bills).where(Bills.id == bill_id).values(
-                ai_category=analysis.get('category'),
-                ai_summary=analysis.get('summary'),
-                ai_tags=json.dumps(analysis.get('tags', [])),
-                ai_analysis_data=json.dumps(analysis),
-                ai_analysis_timestamp=datetime.utcnow()
-            )
-            
-            await session.execute(update_query)
-            await session.commit()
-    
-    async def _mark_bill_processed(self, bill_id: str):
-        """Mark bill as processed for AI analysis"""
-        async with get_db_session() as session:
-            update_query = update(Bills).where(Bills.id == bill_id).values(
-                needs_ai_processing=False
-            )
-            
-            await session.execute(update_query)
-            await session.commit()
 
 
 # Global AI processor instance
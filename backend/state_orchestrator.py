@@ -0,0 +1,189 @@
+# state_orchestrator.py - Run per-state pipelines concurrently
+"""
+Fans a per-state pipeline out over many states at once.
+
+Nightly jobs used to walk TARGET_STATES one state at a time with fixed
+sleeps in between, so the run took the sum of every state's time. Here
+each state runs as its own task and the wall-clock is roughly the slowest
+state. Throttling is left to the process-wide budgets the pipelines
+already draw from:
+
+    LegiScan   utils.rate_limiter.legiscan_token_bucket (LegiScanAPI,
+               AsyncLegiScanAPI and legiscan_get below)
+    Azure AI   ai_scheduler (TPM/RPM token buckets, priorities)
+
+so one state's DB and AI work overlaps other states' LegiScan calls while
+the combined request rate stays inside both budgets.
+
+A failing or timed-out state is recorded in the report and never stops the
+others. Pipelines can time their phases with state_phase():
+
+    async def pipeline(state):
+        async with state_phase('fetch'):
+            ...
+
+    report = await run_states(['CA', 'TX'], pipeline)
+    report.log()
+
+STATE_CONCURRENCY caps how many states run at once (default: all) and
+STATE_TIMEOUT_SECONDS bounds each state (default: no limit).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STATE_CONCURRENCY = int(os.getenv('STATE_CONCURRENCY', '0')) or None
+STATE_TIMEOUT_SECONDS = float(os.getenv('STATE_TIMEOUT_SECONDS', '0')) or None
+
+_current_run: ContextVar[Optional["StateRun"]] = ContextVar('current_state_run', default=None)
+
+
+@dataclass
+class StateRun:
+    """Outcome and timings for one state's pipeline"""
+    state: str
+    status: str = 'pending'  # 'succeeded', 'failed', 'timed_out'
+    seconds: float = 0.0
+    queued_seconds: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'status': self.status,
+            'seconds': round(self.seconds, 2),
+            'queued_seconds': round(self.queued_seconds, 2),
+            'phases': {name: round(seconds, 2) for name, seconds in self.phases.items()},
+            'error': self.error,
+        }
+
+
+@dataclass
+class OrchestrationReport:
+    """Per-state runs plus how the wall-clock compares with running them back to back"""
+    runs: Dict[str, StateRun] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+    @property
+    def sequential_seconds(self) -> float:
+        return sum(run.seconds for run in self.runs.values())
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [state for state, run in self.runs.items() if run.status == 'succeeded']
+
+    @property
+    def failed(self) -> List[str]:
+        return [state for state, run in self.runs.items() if run.status != 'succeeded']
+
+    def results(self) -> Dict[str, Any]:
+        """state -> pipeline result, for the states that succeeded"""
+        return {state: run.result for state, run in self.runs.items() if run.status == 'succeeded'}
+
+    def to_dict(self) -> Dict:
+        return {
+            'wall_seconds': round(self.wall_seconds, 2),
+            'sequential_seconds': round(self.sequential_seconds, 2),
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'states': {state: run.to_dict() for state, run in self.runs.items()},
+        }
+
+    def log(self, log: logging.Logger = logger):
+        """Per-state timing table"""
+        log.info(f"📊 {len(self.runs)} states in {self.wall_seconds:.1f}s "
+                 f"(back to back: {self.sequential_seconds:.1f}s)")
+        for run in sorted(self.runs.values(), key=lambda r: r.seconds, reverse=True):
+            icon = '✅' if run.status == 'succeeded' else '❌'
+            phases = ', '.join(f"{name} {seconds:.1f}s" for name, seconds in run.phases.items())
+            log.info(f"  {icon} {run.state}: {run.status} in {run.seconds:.1f}s"
+                     + (f" [{phases}]" if phases else "")
+                     + (f" - {run.error}" if run.error else ""))
+
+
+@asynccontextmanager
+async def state_phase(name: str):
+    """Add the block's duration to the current state's phase timings (no-op outside run_states)"""
+    run = _current_run.get()
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        if run is not None:
+            run.phases[name] = run.phases.get(name, 0.0) + time.monotonic() - started
+
+
+async def legiscan_get(params: Dict[str, Any]) -> Dict:
+    """
+    Blocking LegiScan GET for scripts built on requests, run off the event loop.
+
+    Served from legiscan_cache when fresh; otherwise draws from the shared
+    LegiScan budget so concurrent states stay within it.
+    """
+    import requests
+    from legiscan_cache import legiscan_cache
+    from utils.rate_limiter import legiscan_token_bucket
+
+    cached = legiscan_cache.get(params)
+    if cached is not None:
+        return cached
+
+    await legiscan_token_bucket.acquire()
+    query = {'key': os.getenv('LEGISCAN_API_KEY'), **params}
+    response = await asyncio.to_thread(requests.get, 'https://api.legiscan.com/', params=query, timeout=60)
+    data = response.json()
+    legiscan_cache.set(params, data)
+    return data
+
+
+async def run_states(
+    states: Sequence[str],
+    pipeline: Callable[[str], Awaitable[Any]],
+    concurrency: Optional[int] = STATE_CONCURRENCY,
+    timeout: Optional[float] = STATE_TIMEOUT_SECONDS
+) -> OrchestrationReport:
+    """Run pipeline(state) for every state concurrently; failures stay per state"""
+    report = OrchestrationReport(runs={state: StateRun(state) for state in states})
+    slots = asyncio.Semaphore(concurrency or max(len(states), 1))
+    started = time.monotonic()
+
+    async def run_one(run: StateRun):
+        async with slots:
+            run.queued_seconds = time.monotonic() - started
+            _current_run.set(run)
+            run_started = time.monotonic()
+            task = asyncio.ensure_future(pipeline(run.state))
+            try:
+                run.result = await asyncio.wait_for(task, timeout)
+                run.status = 'succeeded'
+            except asyncio.TimeoutError as e:
+                if not task.cancelled():
+                    # Raised by the pipeline itself (e.g. an aiohttp ClientTimeout), not wait_for
+                    run.status = 'failed'
+                    run.error = str(e) or 'TimeoutError'
+                    logger.error(f"❌ {run.state} pipeline failed: {run.error}")
+                else:
+                    run.status = 'timed_out'
+                    run.error = f"timed out after {timeout:.0f}s"
+                    logger.error(f"⏰ {run.state} pipeline timed out after {timeout:.0f}s")
+            except Exception as e:
+                run.status = 'failed'
+                run.error = str(e)
+                logger.error(f"❌ {run.state} pipeline failed: {e}")
+            finally:
+                run.seconds = time.monotonic() - run_started
+
+    # Each task gets its own context copy, so _current_run is per state
+    await asyncio.gather(*(run_one(run) for run in report.runs.values()))
+    report.wall_seconds = time.monotonic() - started
+    return report
@@ -232,7 +232,10 @@ class TargetedTexasFetch:
 async def main():
     """Main entry point"""
     fetcher = TargetedTexasFetch()
-    success = await fetcher.run_targeted_fetch()
+    try:
+        success = await fetcher.run_targeted_fetch()
+    finally:
+        await fetcher.client.close()
     
     if success:
         logger.info("🎉 Targeted fetch completed successfully")
@@ -12,7 +12,8 @@ import logging
 import sys
 import os
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Optional
 import traceback
 
 # Add parent directory to path for imports  
@@ -23,9 +24,16 @@ sys.path.insert(0, backend_dir)
 os.environ['PYTHONPATH'] = backend_dir + ':' + os.environ.get('PYTHONPATH', '')
 
 # Import required modules
-from legiscan_service import EnhancedLegiScanClient
+from legiscan_service import close_shared_legiscan_client, get_shared_legiscan_client
 from database_config import get_db_connection
+from bulk_upsert import upsert_state_legislation
+from legiscan_sync import sync_states
 from job_execution_summaries import save_job_summary, generate_summary_message, create_job_summaries_table
+from ai_scheduler import Priority, ai_priority
+from ai_backfill_worker import DEFAULT_CONCURRENCY as AI_BACKFILL_CONCURRENCY, run_backfill
+from ai_job_status import enqueue_due_retries
+from semantic_index import sync_embeddings
+from state_orchestrator import run_states, state_phase
 
 # Setup logging for Azure Container Jobs
 logging.basicConfig(
@@ -41,57 +49,71 @@ TARGET_STATES = ['CA', 'TX', 'NV', 'KY', 'SC', 'CO']
 # Approved practice area categories (matching our updates)
 APPROVED_CATEGORIES = ['Civic', 'Education', 'Engineering', 'Healthcare', 'Not Applicable']
 
+# Bills analyzed per nightly run (unset drains the whole queue)
+AI_BACKFILL_MAX_ITEMS = int(os.environ['AI_BACKFILL_MAX_ITEMS']) if os.getenv('AI_BACKFILL_MAX_ITEMS') else None
+
+# Columns written when the nightly job discovers a bill
+NEW_BILL_COLUMNS = [
+    'bill_id', 'session_id', 'state', 'bill_number', 'title', 'description',
+    'status', 'introduced_date', 'last_action_date', 'last_updated',
+    'needs_ai_processing'
+]
+
+def unknown_sessions(state, legiscan_sessions):
+    """LegiScan sessions for a state that have no bills in the database yet"""
+    new_sessions = []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        for session in legiscan_sessions:
+            session_id = str(session['session_id'])
+            session_name = session.get('session_name', 'Unknown')
+
+            # Check if session exists in database
+            cursor.execute('''
+                SELECT COUNT(*) FROM state_legislation
+                WHERE session_id = %s AND state = %s
+            ''', (session_id, state))
+            
+            count = cursor.fetchone()[0]
+            
+            if count == 0:
+                logger.info(f"🆕 New session discovered: {state} - {session_name} (ID: {session_id})")
+                new_sessions.append({
+                    'state': state,
+                    'session_id': session_id,
+                    'session_name': session_name,
+                    'year_start': session.get('year_start'),
+                    'year_end': session.get('year_end')
+                })
+            else:
+                logger.info(f"✅ Known session: {state} - {session_name} ({count} bills)")
+    return new_sessions
+
 async def discover_new_sessions():
-    """Discover new legislative sessions for target states"""
+    """Discover new legislative sessions for target states (all states at once)"""
     logger.info("🔍 Discovering new legislative sessions...")
     
     try:
-        legiscan_client = EnhancedLegiScanClient()
-        new_sessions = []
+        legiscan_client = get_shared_legiscan_client()
         
-        for state in TARGET_STATES:
-            try:
-                logger.info(f"🏛️ Checking {state} for new sessions...")
-                
-                # Get current sessions from LegiScan
+        async def discover_state(state):
+            logger.info(f"🏛️ Checking {state} for new sessions...")
+            
+            # Get current sessions from LegiScan
+            async with state_phase('legiscan'):
                 sessions_response = await legiscan_client.get_session_list(state)
-                
-                if sessions_response and 'sessions' in sessions_response:
-                    legiscan_sessions = sessions_response['sessions']
-                    
-                    # Check which sessions we don't have in database
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        
-                        for session in legiscan_sessions:
-                            session_id = str(session['session_id'])
-                            session_name = session.get('session_name', 'Unknown')
-
-                            # Check if session exists in database
-                            cursor.execute('''
-                                SELECT COUNT(*) FROM state_legislation
-                                WHERE session_id = %s AND state = %s
-                            ''', (session_id, state))
-                            
-                            count = cursor.fetchone()[0]
-                            
-                            if count == 0:
-                                logger.info(f"🆕 New session discovered: {state} - {session_name} (ID: {session_id})")
-                                new_sessions.append({
-                                    'state': state,
-                                    'session_id': session_id,
-                                    'session_name': session_name,
-                                    'year_start': session.get('year_start'),
-                                    'year_end': session.get('year_end')
-                                })
-                            else:
-                                logger.info(f"✅ Known session: {state} - {session_name} ({count} bills)")
-                
-                # Rate limiting between states
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"❌ Error checking sessions for {state}: {e}")
+            
+            if not sessions_response or 'sessions' not in sessions_response:
+                return []
+            
+            # Check which sessions we don't have in database
+            async with state_phase('database'):
+                return await asyncio.to_thread(unknown_sessions, state, sessions_response['sessions'])
+        
+        report = await run_states(TARGET_STATES, discover_state)
+        report.log(logger)
+        new_sessions = [session for sessions in report.results().values() for session in sessions]
         
         logger.info(f"📊 Session discovery complete: {len(new_sessions)} new sessions found")
         return new_sessions
@@ -100,6 +122,31 @@ async def discover_new_sessions():
         logger.error(f"❌ Error in session discovery: {e}")
         return []
 
+def existing_bill_ids(candidate_ids, state):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT bill_id FROM state_legislation
+            WHERE bill_id = ANY(%s) AND state = %s
+        ''', (candidate_ids, state))
+        return {row[0] for row in cursor.fetchall()}
+
+async def fetch_new_bills_for_sessions(new_sessions):
+    """Fetch bills for newly discovered sessions, states in parallel"""
+    sessions_by_state = {}
+    for session in new_sessions:
+        sessions_by_state.setdefault(session['state'], []).append(session)
+    
+    async def fetch_state(state):
+        count = 0
+        for session in sessions_by_state[state]:
+            count += await fetch_new_bills_for_session(session)
+        return count
+    
+    report = await run_states(list(sessions_by_state), fetch_state)
+    report.log(logger)
+    return sum(report.results().values())
+
 async def fetch_new_bills_for_session(session_info):
     """Fetch new bills for a specific session"""
     try:
@@ -110,7 +157,7 @@ async def fetch_new_bills_for_session(session_info):
         
         logger.info(f"📜 Fetching bills for {state} session: {session_name}")
         
-        legiscan_client = EnhancedLegiScanClient()
+        legiscan_client = get_shared_legiscan_client()
         
         # Get bill list for session
         bills_response = await legiscan_client.get_bill_list(session_id)
@@ -122,63 +169,51 @@ async def fetch_new_bills_for_session(session_info):
         bills = bills_response['bills']
         logger.info(f"📋 Found {len(bills)} bills in session {session_id}")
         
-        new_bills_count = 0
+        # One lookup for the whole session instead of one per bill
+        candidate_ids = [str(bill['bill_id']) for bill in bills if bill.get('bill_id')]
+        existing_ids = await asyncio.to_thread(existing_bill_ids, candidate_ids, state)
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            for bill in bills:
-                try:
-                    bill_id = str(bill['bill_id'])
-                    bill_number = bill.get('bill_number', 'Unknown')
-                    
-                    # Check if bill already exists
-                    cursor.execute('''
-                        SELECT COUNT(*) FROM state_legislation
-                        WHERE bill_id = %s AND state = %s
-                    ''', (bill_id, state))
-                    
-                    exists = cursor.fetchone()[0] > 0
-                    
-                    if not exists:
-                        # Get detailed bill information
-                        bill_detail = await legiscan_client.get_bill_detail(bill_id)
-                        
-                        if bill_detail and 'bill' in bill_detail:
-                            bill_data = bill_detail['bill']
-                            
-                            # Insert new bill with AI foundry processing flag
-                            cursor.execute('''
-                                INSERT INTO state_legislation (
-                                    bill_id, session_id, state, bill_number, title, description,
-                                    status, introduced_date, last_action_date, last_updated,
-                                    needs_ai_processing
-                                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ''', (
-                                bill_id,
-                                session_id,
-                                state,
-                                bill_data.get('bill_number', bill_number),
-                                bill_data.get('title', '')[:500],  # Truncate if too long
-                                bill_data.get('description', '')[:2000],
-                                bill_data.get('status', {}).get('text', 'Unknown')[:100],
-                                bill_data.get('introduced_date'),
-                                bill_data.get('last_action_date'),
-                                datetime.now(),
-                                True  # Mark for AI foundry processing
-                            ))
-                            
-                            new_bills_count += 1
-                            logger.info(f"➕ Added new bill: {state} {bill_number}")
-                        
-                        # Rate limiting between bill detail requests
-                        await asyncio.sleep(0.5)
+        new_rows = []
+        for bill in bills:
+            try:
+                bill_id = str(bill['bill_id'])
+                bill_number = bill.get('bill_number', 'Unknown')
                 
-                except Exception as e:
-                    logger.error(f"❌ Error processing bill {bill.get('bill_id', 'unknown')}: {e}")
+                if bill_id in existing_ids:
+                    continue
+                
+                # Get detailed bill information
+                bill_detail = await legiscan_client.get_bill_detail(bill_id)
+                
+                if bill_detail and 'bill' in bill_detail:
+                    bill_data = bill_detail['bill']
+                    
+                    # New bill with AI foundry processing flag
+                    new_rows.append({
+                        'bill_id': bill_id,
+                        'session_id': session_id,
+                        'state': state,
+                        'bill_number': bill_data.get('bill_number', bill_number),
+                        'title': bill_data.get('title', '')[:500],  # Truncate if too long
+                        'description': bill_data.get('description', '')[:2000],
+                        'status': bill_data.get('status', {}).get('text', 'Unknown')[:100],
+                        'introduced_date': bill_data.get('introduced_date'),
+                        'last_action_date': bill_data.get('last_action_date'),
+                        'last_updated': datetime.now(),
+                        'needs_ai_processing': True  # Mark for AI foundry processing
+                    })
+                    logger.info(f"➕ New bill: {state} {bill_number}")
             
-            # Commit all changes
-            conn.commit()
+            except Exception as e:
+                logger.error(f"❌ Error processing bill {bill.get('bill_id', 'unknown')}: {e}")
+        
+        # Insert-only: bills that appeared since the lookup are left alone
+        result = await asyncio.to_thread(
+            upsert_state_legislation, new_rows, columns=NEW_BILL_COLUMNS, update_columns=[]
+        )
+        for failure in result.failed:
+            logger.error(f"❌ Error saving bill {failure.key.get('bill_id')}: {failure.error}")
+        new_bills_count = result.inserted
         
         logger.info(f"✅ Session {session_id}: Added {new_bills_count} new bills")
         return new_bills_count
@@ -188,85 +223,15 @@ async def fetch_new_bills_for_session(session_info):
         return 0
 
 async def check_bill_status_updates():
-    """Check for status updates on existing bills with latest action tracking"""
+    """Refresh every bill whose LegiScan change_hash moved since the last sync"""
     logger.info("🔄 Checking for bill status updates...")
     
     try:
-        
-        # Get bills that haven't been updated in the last 7 days
-        cutoff_date = datetime.now() - timedelta(days=7)
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Sample recent bills to check for updates (limit to prevent API overuse)
-            # Cast last_updated to timestamp for comparison (column is VARCHAR in schema)
-            cursor.execute('''
-                SELECT bill_id, state, bill_number, status, last_updated
-                FROM state_legislation
-                WHERE last_updated::timestamp < %s
-                AND state IN ('CA', 'TX', 'NV', 'KY', 'SC', 'CO')
-                ORDER BY last_updated ASC
-                LIMIT 50
-            ''', (cutoff_date,))
-            
-            bills_to_check = cursor.fetchall()
-            
-            if not bills_to_check:
-                logger.info("✅ No bills need status updates")
-                return 0
-            
-            logger.info(f"🔍 Checking status updates for {len(bills_to_check)} bills")
-            
-            legiscan_client = EnhancedLegiScanClient()
-            updates_count = 0
-            
-            for bill_id, state, bill_number, current_status, last_updated in bills_to_check:
-                try:
-                    # Get current bill detail from LegiScan
-                    bill_detail = await legiscan_client.get_bill_detail(bill_id)
-                    
-                    if bill_detail and 'bill' in bill_detail:
-                        bill_data = bill_detail['bill']
-                        
-                        # Get the most recent action from history (like we did for Texas 2nd Special)
-                        latest_action = ''
-                        latest_action_date = ''
-                        
-                        if 'history' in bill_data and bill_data['history']:
-                            latest_history = bill_data['history'][-1]  # Most recent entry
-                            latest_action = latest_history.get('action', '')
-                            latest_action_date = latest_history.get('date', '')
-                        
-                        # Use latest action as status if available, otherwise use status_desc
-                        new_status = latest_action if latest_action else bill_data.get('status', {}).get('text', current_status)
-                        
-                        # Check if status changed
-                        if new_status != current_status:
-                            logger.info(f"📊 Status change: {state} {bill_number}: '{current_status}' → '{new_status}'")
-                            
-                            # Update in database with latest action information
-                            cursor.execute('''
-                                UPDATE state_legislation
-                                SET status = %s,
-                                    last_action_date = %s,
-                                    last_updated = %s,
-                                    needs_ai_processing = true
-                                WHERE bill_id = %s
-                            ''', (new_status[:200], latest_action_date, datetime.now(), bill_id))
-                            
-                            updates_count += 1
-                    
-                    # Rate limiting
-                    await asyncio.sleep(1)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error checking bill {bill_id}: {e}")
-            
-            # Commit updates
-            conn.commit()
-            logger.info(f"✅ Updated {updates_count} bills with status changes")
-            return updates_count
+        # One getMasterListRaw per state; getBill only for new or changed bills
+        report = await sync_states(TARGET_STATES, client=get_shared_legiscan_client())
+        logger.info(f"✅ Refreshed {report.fetched} bills ({report.new} new, {report.changed} changed, "
+                    f"{report.status_changes} status changes) with {report.api_calls} API calls")
+        return report.status_changes
             
     except Exception as e:
         logger.error(f"❌ Error checking bill status updates: {e}")
@@ -299,7 +264,7 @@ async def ensure_source_links():
             
             logger.info(f"🔗 Adding source links for {len(bills_missing_links)} bills")
             
-            legiscan_client = EnhancedLegiScanClient()
+            legiscan_client = get_shared_legiscan_client()
             updated_count = 0
             
             for bill_id, state, bill_number in bills_missing_links:
@@ -334,9 +299,6 @@ async def ensure_source_links():
                             
                             updated_count += 1
                             logger.info(f"✅ Added source link for {state} {bill_number}")
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.5)
                 
                 except Exception as e:
                     logger.error(f"❌ Error adding source link for {bill_number}: {e}")
@@ -445,13 +407,11 @@ async def ensure_practice_area_tags():
         logger.error(f"❌ Error ensuring practice area tags: {e}")
         return 0
 
-async def process_ai_queue():
+async def process_ai_queue(max_items: Optional[int] = AI_BACKFILL_MAX_ITEMS):
     """Process bills that need AI analysis using existing state legislation AI"""
     logger.info("🤖 Processing AI analysis queue with state legislation AI...")
     
     try:
-        from ai import analyze_state_legislation
-        
         # Practice area keywords for categorization (updated to match our approved categories)
         PRACTICE_AREA_KEYWORDS = {
             'Education': [
@@ -494,117 +454,26 @@ async def process_ai_queue():
             # Default fallback to Not Applicable (not not-applicable)
             return 'Not Applicable'
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get bills needing AI processing (using same query pattern as existing code)
-            cursor.execute('''
-                SELECT id, bill_number, title, description, status, state
-                FROM state_legislation
-                WHERE needs_ai_processing = true
-                AND (ai_executive_summary IS NULL OR ai_executive_summary = '')
-                ORDER BY last_updated DESC
-                LIMIT 10
-            ''')
-            
-            bills_for_ai = cursor.fetchall()
-            
-            if not bills_for_ai:
-                logger.info("✅ No bills need AI processing")
-                return 0
-            
-            logger.info(f"🧠 Processing {len(bills_for_ai)} bills with state legislation AI")
-            
-            processed_count = 0
-            ai_successful = 0
-            ai_failed = 0
-            
-            for id_val, bill_number, title, description, status, state in bills_for_ai:
-                try:
-                    logger.info(f"🤖 [{processed_count + 1}/{len(bills_for_ai)}] Processing: {state} {bill_number}")
-                    
-                    # Process with state legislation AI (matching existing pattern)
-                    ai_result = await analyze_state_legislation(
-                        title=title or 'No title',
-                        description=description or 'No description',
-                        state=state,
-                        bill_number=bill_number
-                    )
-                    
-                    if ai_result and ai_result.get('ai_executive_summary'):
-                        # Extract all AI components
-                        executive_summary = ai_result.get('ai_executive_summary', '')
-                        talking_points = ai_result.get('ai_talking_points', '')
-                        business_impact = ai_result.get('ai_business_impact', '')
+        # Sections that failed on earlier runs come back once their retry time is due
+        requeued = await asyncio.to_thread(enqueue_due_retries)
+        if requeued:
+            logger.info(f"🔁 Requeued {requeued} bills with AI sections due for retry")
 
-                        # Determine practice area
-                        practice_area = determine_practice_area(title, description)
+        # Bounded-concurrency worker; claims are SKIP LOCKED so parallel jobs don't overlap
+        stats = await run_backfill(
+            concurrency=AI_BACKFILL_CONCURRENCY,
+            max_items=max_items,
+            categorize=determine_practice_area,
+            ai_version='azure_openai_nightly_v1'
+        )
 
-                        # Update database with all AI components (matching existing pattern)
-                        cursor.execute('''
-                            UPDATE state_legislation
-                            SET ai_executive_summary = %s,
-                                ai_talking_points = %s,
-                                ai_business_impact = %s,
-                                ai_summary = %s,
-                                category = %s,
-                                ai_version = %s,
-                                needs_ai_processing = false,
-                                last_updated = %s
-                            WHERE id = %s
-                        ''', (
-                            executive_summary[:2000] if executive_summary else '',
-                            talking_points[:2000] if talking_points else '',
-                            business_impact[:2000] if business_impact else '',
-                            executive_summary[:2000] if executive_summary else '',  # Copy to ai_summary for frontend
-                            practice_area,
-                            'azure_openai_nightly_v1',
-                            datetime.now(),
-                            id_val
-                        ))
-                        
-                        ai_successful += 1
-                        logger.info(f"✅ [{processed_count + 1}/{len(bills_for_ai)}] AI analysis completed for {state} {bill_number} - {practice_area}")
-                    else:
-                        # Mark as processed but note AI failure
-                        cursor.execute('''
-                            UPDATE state_legislation
-                            SET needs_ai_processing = false,
-                                last_updated = %s
-                            WHERE id = %s
-                        ''', (datetime.now(), id_val))
-                        
-                        ai_failed += 1
-                        logger.warning(f"⚠️ [{processed_count + 1}/{len(bills_for_ai)}] AI analysis failed for {state} {bill_number}")
-                    
-                    processed_count += 1
-                    
-                    # Rate limiting between AI calls (matching existing pattern)
-                    await asyncio.sleep(2)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error processing {state} {bill_number}: {e}")
+        logger.info(f"✅ State legislation AI processing completed:")
+        logger.info(f"  📊 Total processed: {stats.processed}")
+        logger.info(f"  🤖 AI successful: {stats.succeeded}")
+        logger.info(f"  ❌ AI failed: {stats.failed}")
+
+        return stats.processed
 
-                    # Mark as processed to avoid infinite retries
-                    cursor.execute('''
-                        UPDATE state_legislation
-                        SET needs_ai_processing = false,
-                            last_updated = %s
-                        WHERE id = %s
-                    ''', (datetime.now(), id_val))
-                    
-                    ai_failed += 1
-                    processed_count += 1
-            
-            conn.commit()
-            
-            logger.info(f"✅ State legislation AI processing completed:")
-            logger.info(f"  📊 Total processed: {processed_count}")
-            logger.info(f"  🤖 AI successful: {ai_successful}")
-            logger.info(f"  ❌ AI failed: {ai_failed}")
-            
-            return processed_count
-            
     except Exception as e:
         logger.error(f"❌ Error in AI processing: {e}")
         return 0
@@ -653,9 +522,7 @@ async def main():
             # 2. Fetch bills for new sessions
             if new_sessions and (args.fetch_new_bills or args.production):
                 logger.info("2️⃣ PHASE 2: Fetching Bills for New Sessions")
-                for session in new_sessions:
-                    new_bills = await fetch_new_bills_for_session(session)
-                    total_stats['new_bills'] += new_bills
+                total_stats['new_bills'] += await fetch_new_bills_for_sessions(new_sessions)
         
         # 3. Check for status updates on existing bills
         if args.check_updates or args.production:
@@ -668,6 +535,13 @@ async def main():
             logger.info("4️⃣ PHASE 4: AI Processing Queue")
             ai_processed = await process_ai_queue()
             total_stats['ai_processed'] = ai_processed
+
+            # New summaries change the embedded text; only changed documents are re-embedded
+            try:
+                embedding_stats = await sync_embeddings()
+                logger.info(f"🧭 Semantic index: embedded {embedding_stats.embedded}")
+            except Exception as e:
+                logger.error(f"❌ Semantic index sync failed: {e}")
         
         # 5. Ensure source links (new functionality)
         if args.ensure_links or args.production:
@@ -772,5 +646,13 @@ async def main():
         logger.error("💥 Azure Container Job failed!")
         sys.exit(1)  # Failure
 
+async def run_job():
+    """main() with the job-wide LegiScan session closed on the way out"""
+    try:
+        await main()
+    finally:
+        await close_shared_legiscan_client()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(run_job())
\ No newline at end of file
@@ -17,6 +17,7 @@ from models.update_notifications import UpdateNotifications
 from legiscan_service import LegiScanService
 from services.ai_processor import BillAnalyzer
 from utils.rate_limiter import RateLimitedClient
+from ai_scheduler import Priority, ai_priority
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -463,10 +464,14 @@ async def main():
     args = parser.parse_args()
     
     updater = NightlyBillUpdater()
-    result = await updater.run_nightly_update(force_update=args.force)
+    try:
+        result = await updater.run_nightly_update(force_update=args.force)
+    finally:
+        await updater.legiscan.close()
     
     print(f"Update completed: {result}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
\ No newline at end of file
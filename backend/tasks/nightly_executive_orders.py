@@ -176,4 +176,8 @@ async def main():
         sys.exit(1)  # Failure exit code
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from ai_scheduler import Priority, ai_priority
+
+    with ai_priority(Priority.BACKFILL):
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Shared setup for the offline tests.
+
+Nothing here talks to a database or the network: database_config is
+replaced with a module whose get_db_connection refuses to connect, and
+psycopg2.extras gets a placeholder when psycopg2 itself isn't installed.
+Tests that exercise SQL pass or patch in a recording cursor.
+"""
+
+import sys
+import types
+
+
+def _no_database(*args, **kwargs):
+    raise RuntimeError("tests run without a database; pass a cursor or patch get_db_connection")
+
+
+def _install_fake_modules():
+    database_config = types.ModuleType("database_config")
+    database_config.get_db_connection = _no_database
+    database_config.get_connect_kwargs = _no_database
+    database_config.get_database_config = lambda: {"type": "postgresql"}
+    sys.modules["database_config"] = database_config
+
+    try:
+        import psycopg2.extras  # noqa: F401
+    except ImportError:
+        psycopg2 = types.ModuleType("psycopg2")
+        extras = types.ModuleType("psycopg2.extras")
+        extras.execute_values = _no_database
+        psycopg2.extras = extras
+        sys.modules["psycopg2"] = psycopg2
+        sys.modules["psycopg2.extras"] = extras
+
+
+_install_fake_modules()
@@ -0,0 +1,126 @@
+"""Batch API mode end to end against LocalBatchBackend and an in-memory queue"""
+
+import asyncio
+
+import pytest
+
+import ai_batch
+from ai_batch import LocalBatchBackend, ingest_batch, offline_responder, poll_batches, submit_queue_batch
+from ai_result_cache import AIResultCache
+
+
+class FakeQueue:
+    """The claim/write/release functions ai_batch uses, over a list of queued bills"""
+
+    def __init__(self, bills):
+        self.queued = list(bills)
+        self.claimed = {}
+        self.written = []
+        self.released = []
+
+    def claim_batch(self, worker_id, limit, lease_minutes):
+        rows, self.queued = self.queued[:limit], self.queued[limit:]
+        for row in rows:
+            self.claimed[row['id']] = worker_id
+        return rows
+
+    def write_results(self, results, worker_id):
+        mine = [r for r in results if self.claimed.pop(r['id'], None) == worker_id]
+        self.written += mine
+        return len(mine)
+
+    def release_claims(self, ids, worker_id):
+        for bill_id in ids:
+            if self.claimed.get(bill_id) == worker_id:
+                del self.claimed[bill_id]
+                self.released.append(bill_id)
+
+
+def bill(bill_id, title):
+    return {'id': bill_id, 'bill_number': f"HB {bill_id}", 'title': title,
+            'description': 'A description', 'status': 'Introduced', 'state': 'TX'}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = FakeQueue([bill(1, "Water Rights"), bill(2, "Broken Bill"), bill(3, "School Funding")])
+    monkeypatch.setattr(ai_batch, "BATCH_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(ai_batch, "ai_result_cache", AIResultCache(path=str(tmp_path / "ai.sqlite3")))
+    monkeypatch.setattr(ai_batch, "claim_batch", queue.claim_batch)
+    monkeypatch.setattr(ai_batch, "write_results", queue.write_results)
+    monkeypatch.setattr(ai_batch, "release_claims", queue.release_claims)
+    return queue
+
+
+def responder(body):
+    """offline_responder, except the 'Broken Bill' reply isn't section JSON"""
+    response = offline_responder(body)
+    if "Broken Bill" in body["messages"][-1]["content"]:
+        response["choices"][0]["message"]["content"] = "Sorry, I can't help with that."
+    return response
+
+
+def submit(backend):
+    return asyncio.run(submit_queue_batch(backend, categorize=lambda title, description: "civic"))
+
+
+def by_id(rows):
+    return {row['id']: row for row in rows}
+
+
+def test_completed_batch_writes_sections_and_records_failed_lines(queue, tmp_path):
+    backend = LocalBatchBackend(directory=str(tmp_path / "local"), responder=responder)
+    job = submit(backend)
+    assert sorted(job.items) == ["sl-1", "sl-2", "sl-3"]
+
+    (stats,) = asyncio.run(poll_batches(backend))
+    assert (stats.succeeded, stats.failed, stats.requeued) == (2, 1, 0)
+
+    written = by_id(queue.written)
+    assert "Offline summary of Water Rights" in written[1]['ai_executive_summary']
+    assert written[3]['category'] == "civic"
+    assert written[3]['ai_version'] == "azure_openai_batch_v1"
+
+    # The unusable reply is dequeued with its failure recorded, not written as text
+    assert 'ai_executive_summary' not in written[2]
+    assert written[2]['ai_failures'] == {
+        section: "unparseable response" for section in ("executive_summary", "talking_points", "business_impact")
+    }
+    assert queue.claimed == {} and queue.released == []
+    assert ai_batch.pending_jobs() == []
+
+
+def test_expired_batch_ingests_partial_output_and_requeues_the_rest(queue, tmp_path):
+    backend = LocalBatchBackend(directory=str(tmp_path / "local"), expire_after=1)
+    job = submit(backend)
+    assert asyncio.run(backend.status(job.batch_id))[0] == "expired"
+
+    stats = asyncio.run(ingest_batch(job, backend))
+    assert (stats.succeeded, stats.failed, stats.requeued) == (1, 0, 2)
+    assert [row['id'] for row in queue.written] == [1]
+    assert sorted(queue.released) == [2, 3]
+    assert job.status == "ingested_expired"
+
+
+def test_failed_batch_requeues_everything(queue, tmp_path):
+    backend = LocalBatchBackend(directory=str(tmp_path / "local"))
+    job = submit(backend)
+    # A failed batch has no output file
+    (tmp_path / "local" / f"{job.batch_id}.output.jsonl").unlink()
+
+    stats = asyncio.run(ingest_batch(job, backend))
+    assert stats.succeeded == stats.failed == 0
+    assert queue.written == []
+    assert sorted(queue.released) == [1, 2, 3]
+    assert job.status == "failed"
+
+
+def test_cached_analyses_are_written_without_a_batch(queue, tmp_path):
+    backend = LocalBatchBackend(directory=str(tmp_path / "local"))
+    first = submit(backend)
+    asyncio.run(ingest_batch(first, backend))
+
+    queue.queued = [bill(1, "Water Rights"), bill(3, "School Funding")]
+    queue.written = []
+    assert submit(backend) is None
+    assert sorted(row['id'] for row in queue.written) == [1, 3]
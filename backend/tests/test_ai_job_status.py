@@ -0,0 +1,102 @@
+"""Splitting AI results into clean sections and failures, and the retry upsert"""
+
+import pytest
+
+import ai_job_status
+from ai_job_status import (
+    EXECUTIVE_ORDER, MAX_ATTEMPTS, RETRY_BASE_MINUTES, RETRY_MAX_HOURS,
+    failed_analysis, outcome_rows, record_outcomes, savable_analysis, split_analysis
+)
+
+
+def test_split_analysis_removes_failed_sections_and_their_copies():
+    clean, failures = split_analysis({
+        "ai_executive_summary": "<p>Good summary</p>",
+        "ai_summary": "<p>Good summary</p>",
+        "ai_talking_points": "<p>Error generating talking points: timeout</p>",
+        "ai_key_points": "<p>Error generating talking points: timeout</p>",
+        "ai_business_impact": "",
+    })
+    assert clean == {"ai_executive_summary": "<p>Good summary</p>", "ai_summary": "<p>Good summary</p>"}
+    assert failures == {
+        "talking_points": "<p>Error generating talking points: timeout</p>",
+        "business_impact": "No content generated",
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "Error generating summary", "AI analysis failed", "<p>Enhanced AI analysis failed: 500</p>",
+])
+def test_split_analysis_recognizes_error_prefixes(text):
+    _, failures = split_analysis({"ai_executive_summary": text, "ai_talking_points": "ok", "ai_business_impact": "ok"})
+    assert list(failures) == ["executive_summary"]
+
+
+def test_split_analysis_of_nothing_fails_every_section():
+    clean, failures = split_analysis(None)
+    assert clean == {}
+    assert set(failures) == {"executive_summary", "talking_points", "business_impact"}
+
+
+def test_outcome_rows_cover_every_section():
+    rows = outcome_rows(EXECUTIVE_ORDER, 14100, {"talking_points": "timeout"}, "v1")
+    assert rows == [
+        (EXECUTIVE_ORDER, "14100", "executive_summary", None, "v1"),
+        (EXECUTIVE_ORDER, "14100", "talking_points", "timeout", "v1"),
+        (EXECUTIVE_ORDER, "14100", "business_impact", None, "v1"),
+    ]
+
+
+def test_record_outcomes_upserts_with_capped_exponential_backoff(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_job_status, "execute_values",
+                        lambda cursor, sql, rows, page_size: calls.append((cursor, sql, rows, page_size)))
+    cursor = object()
+    rows = outcome_rows(EXECUTIVE_ORDER, 1, {"talking_points": "timeout"})
+
+    assert record_outcomes(rows, cursor) == 3
+    (used_cursor, sql, sent, page_size), = calls
+    assert used_cursor is cursor and sent == rows and page_size == 3
+
+    sql = " ".join(sql.split())
+    assert "FROM (VALUES %s)" in sql
+    assert f"j.attempts + 1 >= {MAX_ATTEMPTS} THEN 'dead'" in sql
+    assert f"make_interval(mins => {RETRY_BASE_MINUTES} * power(2," in sql
+    assert f"make_interval(hours => {RETRY_MAX_HOURS})" in sql
+    # A success resets the attempt count and clears the retry time
+    assert "attempts = CASE WHEN j.status = 'succeeded' THEN 1 ELSE j.attempts + 1 END" in sql
+    assert "WHEN EXCLUDED.last_error IS NULL THEN NULL" in sql
+
+
+def test_record_outcomes_without_rows_touches_nothing(monkeypatch):
+    monkeypatch.setattr(ai_job_status, "execute_values", pytest.fail)
+    assert record_outcomes([]) == 0
+
+
+def test_savable_analysis_keeps_good_sections_and_lists_failures():
+    fields = savable_analysis({
+        "ai_executive_summary": "<p>Good summary</p>",
+        "ai_summary": "<p>Good summary</p>",
+        "ai_talking_points": "Error generating key talking points: timeout",
+        "ai_business_impact": "<p>Impact</p>",
+        "category": "civic",
+        "ai_version": "v1",
+    })
+    assert fields["ai_failures"] == {"talking_points": "Error generating key talking points: timeout"}
+    assert "ai_talking_points" not in fields
+    assert fields["ai_version"] == "v1" and "needs_ai_processing" not in fields
+
+
+def test_savable_analysis_with_nothing_generated_queues_the_document():
+    fields = savable_analysis({"ai_summary": "AI analysis failed: boom", "ai_executive_summary": "AI analysis failed: boom",
+                               "category": "not_applicable", "ai_version": "error"})
+    assert fields["needs_ai_processing"] is True
+    assert "ai_version" not in fields
+    assert set(fields["ai_failures"]) == {"executive_summary", "talking_points", "business_impact"}
+
+
+def test_failed_analysis_keeps_its_error_through_savable_analysis():
+    fields = savable_analysis(failed_analysis(TimeoutError()))
+    assert fields["needs_ai_processing"] is True
+    assert set(fields["ai_failures"].values()) == {"TimeoutError"}
+    assert not any(key.startswith("ai_") and key != "ai_failures" for key in fields)
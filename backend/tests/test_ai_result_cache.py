@@ -0,0 +1,31 @@
+"""AI result cache keys and storage"""
+
+from ai_result_cache import AIResultCache, cache_key
+
+
+def key(text="Bill text", **request):
+    return cache_key("gpt-4o", "executive_summary", "v1", text, request)
+
+
+def test_key_ignores_whitespace_differences():
+    assert key("Bill   text\n") == key("Bill text")
+
+
+def test_key_covers_sampling_settings():
+    base = key(temperature=0.1, max_tokens=600)
+    assert key(temperature=0.3, max_tokens=600) != base
+    assert key(temperature=0.1, max_tokens=200) != base
+
+
+def test_key_ignores_fields_that_do_not_change_the_reply():
+    assert key(temperature=0.1, timeout=60) == key(temperature=0.1, timeout=120)
+
+
+def test_results_round_trip_and_count_saved_tokens(tmp_path):
+    cache = AIResultCache(path=str(tmp_path / "ai.sqlite3"))
+    cache.set("k", "<p>Summary</p>", "executive_summary", "gpt-4o", tokens=120)
+    assert cache.get("k") == "<p>Summary</p>"
+    assert cache.get("missing") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["tokens_saved"]) == (1, 1, 120)
@@ -0,0 +1,152 @@
+"""Circuit breaker and AIMD concurrency transitions, and stream cancellation"""
+
+import asyncio
+from types import SimpleNamespace
+
+from ai_scheduler import AIMD_DECREASE_INTERVAL, AIMDLimit, AIScheduler, CircuitBreaker
+
+
+def open_breaker(breaker, now=0.0):
+    for _ in range(breaker.min_calls):
+        breaker.record(now, True, 0.1)
+
+
+def test_breaker_opens_at_error_rate_after_min_calls():
+    breaker = CircuitBreaker(error_rate=0.5, min_calls=4)
+    for failed in (True, True, True):
+        breaker.record(0.0, failed, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED  # below min_calls
+    breaker.record(0.0, False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after(1.0) == breaker.base_cooldown - 1.0
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(min_calls=2, slow_call_seconds=10)
+    breaker.record(0.0, False, 30)
+    breaker.record(0.0, False, 30)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_forgets_calls_outside_window():
+    breaker = CircuitBreaker(min_calls=2, window=60)
+    breaker.record(0.0, True, 0.1)
+    breaker.record(100.0, True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_trials_close_it():
+    breaker = CircuitBreaker(min_calls=2, cooldown=30, trial_calls=2)
+    open_breaker(breaker)
+    assert breaker.retry_after(31.0) == 0.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.on_dispatch()
+    assert breaker.retry_after(31.0) > 0  # one trial at a time
+    breaker.record(32.0, False, 0.1)
+    breaker.on_dispatch()
+    breaker.record(33.0, False, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens_with_longer_cooldown():
+    breaker = CircuitBreaker(min_calls=2, cooldown=30, max_cooldown=50)
+    open_breaker(breaker)
+    breaker.retry_after(31.0)
+    breaker.on_dispatch()
+    breaker.record(32.0, True, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.cooldown == 50  # doubled, capped at max_cooldown
+
+
+def test_abandoned_trial_frees_the_slot_without_counting():
+    breaker = CircuitBreaker(min_calls=2, trial_calls=1)
+    open_breaker(breaker)
+    breaker.retry_after(breaker.cooldown + 1)
+    breaker.on_dispatch()
+    breaker.on_abandon()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.retry_after(breaker.cooldown + 1) == 0.0
+
+
+def test_aimd_additive_increase_and_bounds():
+    limit = AIMDLimit(initial=4, maximum=5)
+    limit.increase()
+    assert limit.limit == 4.25
+    for _ in range(100):
+        limit.increase()
+    assert limit.limit == 5
+
+
+def test_aimd_decrease_halves_at_most_once_per_interval():
+    limit = AIMDLimit(initial=16, minimum=2)
+    limit.decrease(100.0)
+    limit.decrease(100.0 + AIMD_DECREASE_INTERVAL / 2)
+    assert limit.limit == 8
+    limit.decrease(100.0 + AIMD_DECREASE_INTERVAL)
+    limit.decrease(100.0 + 2 * AIMD_DECREASE_INTERVAL)
+    limit.decrease(100.0 + 3 * AIMD_DECREASE_INTERVAL)
+    assert limit.limit == 2
+
+
+def test_aimd_available_tracks_in_flight():
+    limit = AIMDLimit(initial=2)
+    limit.in_flight = 1
+    assert limit.available()
+    limit.in_flight = 2
+    assert not limit.available()
+
+
+class StreamingClient:
+    """Just enough of AsyncOpenAI for stream_chat_completion"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        async def stream():
+            for _ in range(self.chunks):
+                await asyncio.sleep(0.01)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="word "))])
+        return stream()
+
+
+def half_open_scheduler():
+    breaker = CircuitBreaker(min_calls=2, trial_calls=1)
+    open_breaker(breaker)
+    breaker.retry_after(breaker.cooldown + 1)
+    return AIScheduler(tpm=1_000_000, rpm=10_000, breaker=breaker), breaker
+
+
+def test_cancelled_stream_records_no_outcome():
+    scheduler, breaker = half_open_scheduler()
+    limit = scheduler._concurrency.limit
+
+    async def run():
+        async def consume():
+            async for _ in scheduler.stream_chat_completion(StreamingClient(100), messages=[{"content": "hi"}]):
+                pass
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert scheduler._concurrency.in_flight == 0
+    assert scheduler._concurrency.limit == limit
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_completed_stream_counts_as_success():
+    scheduler, breaker = half_open_scheduler()
+
+    async def run():
+        return [d async for d in scheduler.stream_chat_completion(StreamingClient(2), messages=[{"content": "hi"}])]
+
+    assert asyncio.run(run()) == ["word ", "word "]
+    assert scheduler._concurrency.in_flight == 0
+    assert breaker.state == CircuitBreaker.CLOSED
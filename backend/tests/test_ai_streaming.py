@@ -0,0 +1,57 @@
+"""Streamed section analysis when the Azure OpenAI circuit is open"""
+
+import asyncio
+
+import pytest
+
+import ai
+from ai import PromptType, stream_legiscan_bill_analysis, stream_section
+from ai_result_cache import AIResultCache
+from ai_scheduler import AIUnavailableError
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai, "ai_result_cache", AIResultCache(path=str(tmp_path / "ai.sqlite3")))
+
+
+def failing_stream(error):
+    def stream_chat_completion(client, **request):
+        async def stream():
+            raise error
+            yield  # pragma: no cover
+        return stream()
+    return stream_chat_completion
+
+
+def collect(stream):
+    async def run():
+        return [event async for event in stream]
+    return asyncio.run(run())
+
+
+def test_open_circuit_is_raised_not_turned_into_text(monkeypatch):
+    monkeypatch.setattr(ai.ai_scheduler, "stream_chat_completion", failing_stream(AIUnavailableError(30)))
+    with pytest.raises(AIUnavailableError):
+        collect(stream_section("Title: Water Rights", PromptType.EXECUTIVE_SUMMARY, "TX HB 1"))
+
+
+def test_other_errors_still_end_the_section_with_error_text(monkeypatch):
+    monkeypatch.setattr(ai.ai_scheduler, "stream_chat_completion", failing_stream(RuntimeError("502 Bad Gateway")))
+    (event,) = collect(stream_section("Title: Water Rights", PromptType.EXECUTIVE_SUMMARY, "TX HB 1"))
+    assert event["text"].startswith("Error generating executive summary")
+    assert event["error"] == "502 Bad Gateway"
+
+
+def test_bill_analysis_stream_raises_without_yielding_fields(monkeypatch):
+    monkeypatch.setattr(ai.ai_scheduler, "stream_chat_completion", failing_stream(AIUnavailableError(30)))
+    seen = []
+
+    async def run():
+        async for section, event in stream_legiscan_bill_analysis({'title': "Water Rights", 'bill_number': "HB 1",
+                                                                    'state': "TX"}):
+            seen.append(section)
+
+    with pytest.raises(AIUnavailableError):
+        asyncio.run(run())
+    assert "analysis" not in seen
@@ -0,0 +1,169 @@
+"""APICache: single-flight loads, tag invalidation and LRU bounds"""
+
+import asyncio
+
+from api_cache import APICache, cache_tag
+
+
+def test_concurrent_misses_share_one_load():
+    cache = APICache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": [1, 2, 3]}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("/api/orders", {"page": 1}, loader) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"rows": [1, 2, 3]} for result in results)
+    assert cache.get_stats()["coalesced"] == 4
+    assert cache.get("/api/orders", {"page": 1}) == {"rows": [1, 2, 3]}
+
+
+def test_failed_load_is_shared_and_not_cached():
+    cache = APICache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise ValueError("database down")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("/api/orders", {}, loader) for _ in range(3)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+    assert cache.get("/api/orders", {}) is None
+    assert cache.get_stats()["inflight"] == 0
+
+
+def test_cache_if_skips_unwanted_values():
+    cache = APICache()
+
+    async def loader():
+        return {"success": False}
+
+    asyncio.run(cache.get_or_load("/api/orders", {}, loader, cache_if=lambda v: v.get("success")))
+    assert cache.get("/api/orders", {}) is None
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    cache = APICache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "page"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_load("/api/orders", {}, loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("/api/orders", {}, loader)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(leader, *waiters, return_exceptions=True)
+
+    leader_result, *waiter_results = asyncio.run(run())
+    assert isinstance(leader_result, asyncio.CancelledError)
+    assert waiter_results == ["page", "page"]
+    assert len(calls) == 1
+    assert cache.get("/api/orders", {}) == "page"
+
+
+def test_load_started_before_clear_is_not_cached():
+    cache = APICache()
+
+    async def run():
+        started = asyncio.Event()
+
+        async def loader():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "stale page"
+
+        load = asyncio.create_task(cache.get_or_load("/api/orders", {}, loader))
+        await started.wait()
+        cache.clear()
+        return await load
+
+    assert asyncio.run(run()) == "stale page"
+    assert cache.get("/api/orders", {}) is None
+
+
+def test_invalidate_tags_drops_only_tagged_entries():
+    cache = APICache()
+    orders = cache_tag("executive_orders")
+    one_order = cache_tag("executive_orders", "eo_number", 14100)
+    cache.set("/api/orders", {"page": 1}, "page", tags=[orders])
+    cache.set("/api/orders/14100", {}, "order", tags=[orders, one_order])
+    cache.set("/api/bills", {}, "bills", tags=[cache_tag("state_legislation")])
+
+    assert cache.invalidate_tags(one_order) == 1
+    assert cache.get("/api/orders/14100", {}) is None
+    assert cache.get("/api/orders", {"page": 1}) == "page"
+
+    assert cache.invalidate_tags(orders) == 1
+    assert cache.get("/api/orders", {"page": 1}) is None
+    assert cache.get("/api/bills", {}) == "bills"
+
+
+def test_load_started_before_invalidation_is_not_cached():
+    cache = APICache()
+    tag = cache_tag("executive_orders")
+
+    async def run():
+        started = asyncio.Event()
+
+        async def loader():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "stale page"
+
+        load = asyncio.create_task(cache.get_or_load("/api/orders", {}, loader, tags=[tag]))
+        await started.wait()
+        cache.invalidate_tags(tag)
+        return await load
+
+    assert asyncio.run(run()) == "stale page"
+    assert cache.get("/api/orders", {}) is None
+
+
+def test_tags_can_be_derived_from_the_value():
+    cache = APICache()
+
+    async def loader():
+        return {"eo_number": 14100}
+
+    asyncio.run(cache.get_or_load(
+        "/api/orders/latest", {}, loader,
+        tags=lambda value: [cache_tag("executive_orders", "eo_number", value["eo_number"])]
+    ))
+    assert cache.invalidate_tags(cache_tag("executive_orders", "eo_number", 14100)) == 1
+
+
+def test_expired_and_least_recently_used_entries_are_dropped():
+    cache = APICache(max_entries=2)
+    cache.set("/a", {}, "a")
+    cache.set("/b", {}, "b")
+    cache.get("/a", {})
+    cache.set("/c", {}, "c")
+    assert cache.get("/b", {}) is None
+    assert cache.get("/a", {}) == "a"
+
+    cache.set("/d", {}, "d", ttl=0)
+    assert cache.get("/d", {}) is None
+
+
+def test_old_tag_invalidations_are_pruned():
+    cache = APICache(default_ttl=0)
+    cache.invalidate_tags("executive_orders")
+    cache.invalidate_tags("state_legislation")
+    assert list(cache._tag_invalidated_at) == ["state_legislation"]
+
+    # A load older than the pruned invalidation can't be checked against it
+    cache.set("/api/orders", {}, "stale page", ttl=60, tags=["executive_orders"], since_seq=0)
+    assert cache.get("/api/orders", {}) is None
@@ -0,0 +1,104 @@
+"""LegiScan response cache: TTLs, change_hash freshness and replay mode"""
+
+import time
+
+import pytest
+
+from legiscan_cache import BILL_HASH_MAX_AGE, LegiScanCacheMiss, LegiScanResponseCache, cache_key
+
+
+def bill_response(bill_id, change_hash):
+    return {"status": "OK", "bill": {"bill_id": bill_id, "change_hash": change_hash, "title": "A bill"}}
+
+
+def master_list(*bills):
+    entries = {str(i): {"bill_id": bill_id, "change_hash": change_hash} for i, (bill_id, change_hash) in enumerate(bills)}
+    entries["session"] = {"session_id": 2100}
+    return {"status": "OK", "masterlist": entries}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LegiScanResponseCache(path=str(tmp_path / "responses.sqlite3"))
+
+
+def test_cache_key_ignores_api_key():
+    assert cache_key({"op": "getBill", "id": 1, "key": "secret"}) == cache_key({"op": "getBill", "id": "1"})
+
+
+def test_entry_served_until_ttl_expires(cache):
+    params = {"op": "getSessionList", "state": "TX"}
+    cache.set(params, {"status": "OK", "sessions": []})
+    assert cache.get(params) == {"status": "OK", "sessions": []}
+
+    cache.set(params, {"status": "OK", "sessions": []}, fetched_at=time.time() - cache.ttl("getSessionList") - 1)
+    assert cache.get(params) is None
+    assert cache.get_stats()["stale"] == 1
+
+
+def test_error_responses_and_api_key_are_not_stored(cache, tmp_path):
+    params = {"op": "getSessionList", "state": "TX", "key": "secret"}
+    cache.set(params, {"status": "ERROR", "alert": {"message": "bad"}})
+    assert cache.get(params) is None
+
+    cache.set(params, {"status": "OK", "sessions": []})
+    assert b"secret" not in (tmp_path / "responses.sqlite3").read_bytes()
+
+
+def test_bill_fresh_while_newer_list_has_same_change_hash(cache):
+    params = {"op": "getBill", "id": 42}
+    old = time.time() - cache.ttl("getBill") - 60
+    cache.set(params, bill_response(42, "aaa"), fetched_at=old)
+    assert cache.get(params) is None  # past TTL and no list has vouched for it
+
+    cache.set({"op": "getMasterList", "state": "TX"}, master_list((42, "aaa")))
+    assert cache.get(params)["bill"]["change_hash"] == "aaa"
+    assert cache.get_stats()["hash_hits"] == 1
+
+
+def test_bill_stale_once_newer_list_has_different_change_hash(cache):
+    params = {"op": "getBill", "id": 42}
+    cache.set(params, bill_response(42, "aaa"))
+    assert cache.get(params) is not None
+
+    cache.set({"op": "getMasterList", "state": "TX"}, master_list((42, "bbb")))
+    assert cache.get(params) is None
+
+
+def test_list_older_than_bill_says_nothing_about_it(cache):
+    now = time.time()
+    cache.set({"op": "getMasterList", "state": "TX"}, master_list((42, "bbb")), fetched_at=now - 60)
+    cache.set({"op": "getBill", "id": 42}, bill_response(42, "aaa"), fetched_at=now)
+    # The list predates the fetch, so the TTL decides
+    assert cache.get({"op": "getBill", "id": 42}) is not None
+
+
+def test_hash_match_does_not_outlive_max_age(cache):
+    params = {"op": "getBill", "id": 42}
+    cache.set(params, bill_response(42, "aaa"), fetched_at=time.time() - BILL_HASH_MAX_AGE - 1)
+    cache.set({"op": "getMasterList", "state": "TX"}, master_list((42, "aaa")))
+    assert cache.get(params) is None
+
+
+def test_replay_serves_any_age_and_raises_on_miss(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    params = {"op": "getSessionList", "state": "TX"}
+    LegiScanResponseCache(path=path).set(params, {"status": "OK", "sessions": []}, fetched_at=1.0)
+
+    replay = LegiScanResponseCache(path=path, mode="replay")
+    assert replay.get(params) == {"status": "OK", "sessions": []}
+    with pytest.raises(LegiScanCacheMiss):
+        replay.get({"op": "getSessionList", "state": "CA"})
+
+
+def test_cached_call_fetches_once(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"status": "OK", "sessions": []}
+
+    params = {"op": "getSessionList", "state": "TX"}
+    cache.cached_call(params, fetch)
+    cache.cached_call(params, fetch)
+    assert len(calls) == 1
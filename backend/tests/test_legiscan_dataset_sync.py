@@ -0,0 +1,57 @@
+"""Concurrent dataset loads keep their own row counters"""
+
+import asyncio
+import base64
+import os
+import threading
+
+import legiscan_dataset_sync
+from legiscan_dataset_loader import LoadStats
+from legiscan_dataset_sync import DatasetSyncStats, load_dataset
+
+
+def dataset(state):
+    return {'session_id': state, 'session_name': f"{state} 2025", 'access_key': 'key',
+            'dataset_hash': f"hash-{state}", 'year_start': 2025, 'year_end': 2026}
+
+
+def test_concurrent_loads_only_skip_the_hash_for_the_failing_state(tmp_path, monkeypatch):
+    sizes = {'TX': 3, 'CA': 2}
+    both_writing = threading.Barrier(2, timeout=5)
+
+    async def legiscan_get(params):
+        return {'status': 'OK', 'dataset': {'zip': base64.b64encode(params['id'].encode()).decode()}}
+
+    def parse_dataset_zip(archive, state):
+        return [(state, n) for n in range(sizes[state])], [], "2025-2026_Regular_Session"
+
+    def write_rows(rows, stats, chunk_size):
+        # Both states are mid-write at once, as with run_states
+        both_writing.wait()
+        state = rows[0][0]
+        stats.inserted += len(rows) - (state == 'CA')
+        stats.failed += state == 'CA'
+
+    monkeypatch.setattr(legiscan_dataset_sync, "legiscan_get", legiscan_get)
+    monkeypatch.setattr(legiscan_dataset_sync, "parse_dataset_zip", parse_dataset_zip)
+    monkeypatch.setattr(legiscan_dataset_sync, "write_rows", write_rows)
+
+    stats = DatasetSyncStats()
+
+    async def run():
+        await asyncio.gather(*(load_dataset(state, dataset(state), str(tmp_path), stats, 100) for state in sizes))
+
+    asyncio.run(run())
+
+    assert (stats.rows.rows, stats.rows.inserted, stats.rows.failed) == (5, 4, 1)
+    assert stats.rows.by_state == {'TX': 3, 'CA': 2}
+    assert os.path.exists(tmp_path / "TX" / "2025-2026_Regular_Session" / "hash.md5")
+    assert not os.path.exists(tmp_path / "CA" / "2025-2026_Regular_Session" / "hash.md5")
+
+
+def test_merge_adds_counters_and_errors():
+    total = LoadStats(rows=2, inserted=2, by_state={'TX': 2})
+    total.merge(LoadStats(rows=3, updated=1, failed=1, by_state={'TX': 1, 'CA': 2}, errors=["bill 9: bad"]))
+    assert (total.rows, total.inserted, total.updated, total.failed) == (5, 2, 1, 1)
+    assert total.by_state == {'TX': 3, 'CA': 2}
+    assert total.errors == ["bill 9: bad"]
@@ -0,0 +1,43 @@
+"""Master list diffing and status normalization for the incremental sync"""
+
+from legiscan_sync import diff_master_list, normalize_status
+
+
+def test_diff_master_list_splits_by_change_hash():
+    master = {
+        "1": {"change_hash": "aaa"},
+        "2": {"change_hash": "bbb"},
+        "3": {"change_hash": "ccc"},
+        "4": {"change_hash": "ddd"},
+    }
+    local = {
+        "1": {"change_hash": "aaa"},
+        "2": {"change_hash": "old"},
+        "4": {"change_hash": None},
+        "9": {"change_hash": "zzz"},  # no longer listed: ignored
+    }
+    assert diff_master_list(master, local) == {
+        "new": ["3"],
+        "changed": ["2"],
+        "unchanged": ["1"],
+        "seed": ["4"],
+    }
+
+
+def test_diff_master_list_empty_local_is_all_new():
+    diff = diff_master_list({"1": {"change_hash": "aaa"}}, {})
+    assert diff["new"] == ["1"]
+    assert diff["changed"] == diff["unchanged"] == diff["seed"] == []
+
+
+def test_normalize_status_maps_free_text_to_legiscan_names():
+    assert normalize_status("Signed by Governor") == "Signed by Governor"
+    assert normalize_status("Chaptered by Secretary of State") == "Signed by Governor"
+    assert normalize_status("Passed House") == "Engrossed"
+    assert normalize_status("Referred to Committee on Finance") == "Introduced"
+    assert normalize_status("Vetoed") == "Vetoed"
+
+
+def test_normalize_status_keeps_unmatched_text_cleaned():
+    assert normalize_status("  Some   Custom Stage ") == "some custom stage"
+    assert normalize_status(None) == ""
@@ -0,0 +1,53 @@
+"""TokenBucket reservations, the hourly cap and cancellation refunds"""
+
+import asyncio
+
+from utils.rate_limiter import TokenBucket
+
+
+def reserve(bucket, count):
+    return [bucket._reserve(1)[0] for _ in range(count)]
+
+
+def cancel_waiting_acquire(bucket):
+    async def run():
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+
+
+def test_burst_then_rate():
+    waits = reserve(TokenBucket(rate=10, capacity=2), 4)
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.05 < waits[2] <= 0.1
+    assert 0.15 < waits[3] <= 0.2
+
+
+def test_hourly_cap_defers_past_the_window():
+    bucket = TokenBucket(rate=1000, capacity=10, per_hour=3)
+    waits = reserve(bucket, 5)
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(3599 < wait <= 3600 for wait in waits[3:])
+    assert bucket.get_stats()["reserved_last_hour"] == 3
+
+
+def test_cancelled_acquire_refunds_its_token():
+    bucket = TokenBucket(rate=1, capacity=1)
+    reserve(bucket, 1)
+    cancel_waiting_acquire(bucket)
+    assert reserve(bucket, 1)[0] <= 1.0
+
+
+def test_cancelled_acquire_gives_back_its_hourly_slot():
+    bucket = TokenBucket(rate=1000, capacity=10, per_hour=2)
+    reserve(bucket, 2)
+    cancel_waiting_acquire(bucket)
+    # Still the first slot after the hour, not the one after the cancelled waiter
+    assert 3599 < reserve(bucket, 1)[0] <= 3600
+    assert len(bucket._window) == 3
@@ -0,0 +1,120 @@
+"""Embedding sync with the local HashingEmbedder over an in-memory document store"""
+
+import asyncio
+import hashlib
+import math
+
+import pytest
+
+import semantic_index
+from embeddings import HashingEmbedder, clean_text
+from semantic_index import EXECUTIVE_ORDER, SOURCES, STATE_LEGISLATION, sync_embeddings
+
+
+class FakeIndex:
+    """pending_documents / store_embeddings / remove_orphans over lists of source rows"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.stored = {}  # (entity_type, entity_id) -> (model, content_hash, vector)
+        self.writes = 0
+
+    def _documents(self, entity_type):
+        table, id_column, description_column = SOURCES[entity_type]
+        for row in self.tables[table]:
+            text = "\n".join(part for part in (row['title'], row[description_column], row['ai_executive_summary']) if part)
+            yield str(row[id_column]), clean_text(text), hashlib.md5(text.encode()).hexdigest()
+
+    def pending_documents(self, entity_type, model_id, limit):
+        pending = [
+            (entity_id, text, content_hash)
+            for entity_id, text, content_hash in self._documents(entity_type)
+            if self.stored.get((entity_type, entity_id), (None, None))[:2] != (model_id, content_hash)
+        ]
+        return pending[:limit]
+
+    def store_embeddings(self, entity_type, model_id, rows):
+        keys = [entity_id for entity_id, _, _ in rows]
+        if len(keys) != len(set(keys)):
+            raise RuntimeError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+        self.writes += 1
+        if self.writes > 100:
+            raise RuntimeError("sync_embeddings is not converging")
+        for entity_id, content_hash, vector in rows:
+            self.stored[(entity_type, entity_id)] = (model_id, content_hash, vector)
+        return len(rows)
+
+    def remove_orphans(self, entity_type):
+        live = {entity_id for entity_id, _, _ in self._documents(entity_type)}
+        orphans = [key for key in self.stored if key[0] == entity_type and key[1] not in live]
+        for key in orphans:
+            del self.stored[key]
+        return len(orphans)
+
+
+def order(row_id, eo_number, title):
+    return {'id': row_id, 'eo_number': eo_number, 'title': title, 'summary': '', 'ai_executive_summary': ''}
+
+
+def bill(row_id, title):
+    return {'id': row_id, 'title': title, 'description': 'A bill', 'ai_executive_summary': ''}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FakeIndex({
+        'executive_orders': [
+            order(1, "14100", "Protecting Rivers and Watersheds"),
+            # Same eo_number stored twice (e.g. an amended copy)
+            order(2, "14100", "Protecting Rivers and Watersheds (Amended)"),
+            order(3, "14101", "Expanding Rural Broadband"),
+        ],
+        'state_legislation': [bill(10, "Water Quality Standards"), bill(11, "Broadband Grants")],
+    })
+    for name in ("pending_documents", "store_embeddings", "remove_orphans"):
+        monkeypatch.setattr(semantic_index, name, getattr(index, name))
+    return index
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimensions=64)
+    first, again = asyncio.run(embedder.embed(["Rural broadband grants", "Rural broadband grants"]))
+    assert first == again
+    assert len(first) == 64
+    assert math.isclose(sum(v * v for v in first), 1.0)
+
+
+def test_hashing_embedder_ranks_shared_words_closer():
+    embedder = HashingEmbedder()
+    query, near, far = asyncio.run(embedder.embed([
+        "broadband internet for rural areas", "rural broadband internet grants", "property tax exemptions"
+    ]))
+    assert cosine(query, near) > cosine(query, far)
+
+
+def test_sync_embeds_every_row_even_with_duplicate_eo_numbers(index):
+    stats = asyncio.run(sync_embeddings(batch_size=2, embedder=HashingEmbedder(dimensions=32)))
+    assert stats.errors == []
+    assert stats.embedded == {STATE_LEGISLATION: 2, EXECUTIVE_ORDER: 3}
+    assert sorted(entity_id for entity_type, entity_id in index.stored if entity_type == EXECUTIVE_ORDER) == ["1", "2", "3"]
+
+
+def test_second_sync_only_reembeds_changed_documents(index):
+    embedder = HashingEmbedder(dimensions=32)
+    asyncio.run(sync_embeddings(embedder=embedder))
+
+    index.tables['state_legislation'][0]['ai_executive_summary'] = "Sets new limits for lead in drinking water."
+    index.tables['executive_orders'].pop()
+    stats = asyncio.run(sync_embeddings(embedder=embedder))
+    assert stats.embedded == {STATE_LEGISLATION: 1, EXECUTIVE_ORDER: 0}
+    assert stats.removed == {STATE_LEGISLATION: 0, EXECUTIVE_ORDER: 1}
+
+
+def test_changing_the_model_reembeds_everything(index):
+    asyncio.run(sync_embeddings(embedder=HashingEmbedder(dimensions=32)))
+    stats = asyncio.run(sync_embeddings(embedder=HashingEmbedder(dimensions=16)))
+    assert stats.embedded == {STATE_LEGISLATION: 2, EXECUTIVE_ORDER: 3}
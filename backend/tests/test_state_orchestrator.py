@@ -0,0 +1,74 @@
+"""run_states keeps each state's failure, timeout and phase timings to itself"""
+
+import asyncio
+
+from state_orchestrator import run_states, state_phase
+
+
+def run(states, pipeline, **kwargs):
+    return asyncio.run(run_states(states, pipeline, **kwargs))
+
+
+def test_states_run_concurrently_and_return_results():
+    both_started = asyncio.Event()
+    started = []
+
+    async def pipeline(state):
+        started.append(state)
+        if len(started) == 2:
+            both_started.set()
+        # Only finishes if the other state is running at the same time
+        await asyncio.wait_for(both_started.wait(), 1)
+        async with state_phase('fetch'):
+            await asyncio.sleep(0)
+        return state.lower()
+
+    report = run(['CA', 'TX'], pipeline)
+    assert report.results() == {'CA': 'ca', 'TX': 'tx'}
+    assert report.failed == []
+    assert all('fetch' in r.phases for r in report.runs.values())
+
+
+def test_pipeline_timeout_error_without_a_state_timeout_is_a_failure():
+    async def pipeline(state):
+        if state == 'CA':
+            # e.g. an aiohttp ClientTimeout inside the pipeline
+            raise asyncio.TimeoutError()
+        return state
+
+    report = run(['CA', 'TX'], pipeline, timeout=None)
+    assert report.succeeded == ['TX']
+    assert report.runs['CA'].status == 'failed'
+    assert report.runs['CA'].error == 'TimeoutError'
+
+
+def test_state_timeout_only_stops_the_slow_state():
+    async def pipeline(state):
+        if state == 'CA':
+            await asyncio.sleep(10)
+        return state
+
+    report = run(['CA', 'TX'], pipeline, timeout=0.05)
+    assert report.runs['CA'].status == 'timed_out'
+    assert report.runs['CA'].error == "timed out after 0s"
+    assert report.results() == {'TX': 'TX'}
+
+
+def test_failure_is_recorded_and_concurrency_is_capped():
+    running = []
+    peak = []
+
+    async def pipeline(state):
+        running.append(state)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(state)
+        if state == 'NY':
+            raise RuntimeError("LegiScan API Error: bad key")
+        return state
+
+    report = run(['CA', 'NY', 'TX', 'FL'], pipeline, concurrency=2)
+    assert max(peak) == 2
+    assert report.failed == ['NY']
+    assert report.runs['NY'].error == "LegiScan API Error: bad key"
+    assert sorted(report.succeeded) == ['CA', 'FL', 'TX']
@@ -134,6 +134,35 @@ def get_processed_bills(state: str) -> set:
     
     return processed_bills
 
+async def process_dataset_hash(state_code: str, with_ai: bool, progress_tracker: ProgressTracker = None) -> dict:
+    """Download the state's changed LegiScan datasets and load every bill in them"""
+    from legiscan_dataset_sync import sync_datasets
+    
+    if progress_tracker:
+        progress_tracker.update_stage("downloading", f"Checking {state_code} datasets against hash.md5")
+    
+    stats = await sync_datasets([state_code])
+    
+    ai_queued = 0
+    if with_ai:
+        # The AI backfill worker picks these up
+        from ai_backfill_worker import enqueue_missing_summaries
+        ai_queued = await asyncio.to_thread(enqueue_missing_summaries, state_code)
+    
+    if progress_tracker:
+        progress_tracker.discovered_files = stats.rows.files
+        progress_tracker.total_items = stats.rows.rows
+        progress_tracker.processed_items = stats.rows.rows
+        progress_tracker.successful_items = stats.rows.rows - stats.rows.failed
+        progress_tracker.failed_items = stats.rows.failed + stats.rows.parse_errors
+        progress_tracker.database_saved = stats.rows.inserted + stats.rows.updated
+        progress_tracker.errors.extend(stats.errors + stats.rows.errors[:10])
+        progress_tracker.update_stage("completed", f"{stats.downloaded} datasets, {stats.rows.rows} bills")
+    
+    print(f"✅ {state_code}: {stats.downloaded} datasets downloaded, {stats.unchanged} unchanged, "
+          f"{stats.rows.inserted} new and {stats.rows.updated} updated bills, {ai_queued} queued for AI")
+    return {**stats.to_dict(), 'ai_queued': ai_queued}
+
 async def process_hash_md5_file(file_content: str, upload_type: str, state: Optional[str], with_ai: bool, progress_tracker: ProgressTracker = None) -> dict:
     """Process .hash.md5 file content"""
     try:
@@ -174,157 +203,9 @@ async def process_hash_md5_file(file_content: str, upload_type: str, state: Opti
                 print(f"✅ Added item with filename: {item['bill_number']}")
                 
             elif len(parts) == 1 and len(line_content) in [32, 40, 64]:
-                # Hash-only format (MD5=32, SHA1=40, SHA256=64 chars)
-                # This indicates we should scan for JSON files to process
-                hash_value = parts[0]
-                print(f"🔍 Hash-only format detected: {hash_value}")
-                
-                if progress_tracker:
-                    progress_tracker.update_stage("discovering", f"Scanning for {state or 'TX'} JSON files")
-                
-                # Skip database check for now to prevent timeouts - just process small batch
-                state_code = state or 'TX'  # Default to Texas
-                processed_bills = set()  # Empty set for now - will re-enable after fixing timeouts
-                
-                if progress_tracker:
-                    progress_tracker.update_stage("discovering", f"Scanning for unprocessed bills")
-                
-                # Scan for JSON files in the specific state directory
-                import os
-                import json
-                
-                # Look for state-specific directories
-                possible_dirs = [
-                    f'/app/data/{state_code}',     # Main state directory
-                    f'/app/data/{state_code} 2',   # Alternative state directory (like TX 2)
-                    f'./data/{state_code}',        # Relative path main
-                    f'./data/{state_code} 2',      # Relative path alternative
-                ]
-                
-                json_files_found = []
-                skipped_count = 0
-                for data_dir in possible_dirs:
-                    if os.path.exists(data_dir):
-                        print(f"🔍 Scanning {state_code} directory: {data_dir}")
-                        # Only scan bill subdirectories to avoid processing votes, people, etc.
-                        bill_dir = os.path.join(data_dir, 'bill')
-                        if os.path.exists(bill_dir):
-                            print(f"🔍 Found bill directory: {bill_dir}")
-                            files = os.listdir(bill_dir)
-                            
-                            # Scan for reasonable batch - 25 files for efficient processing
-                            json_files = [f for f in files if f.endswith('.json')][:100]  # Scan up to 100 files
-                            for file in json_files:
-                                file_path = os.path.join(bill_dir, file)
-                                json_files_found.append(file_path)
-                                # Stop after finding 15 files for stable batch size
-                                if len(json_files_found) >= 15:
-                                    break
-                            
-                            total_json_files = len([f for f in files if f.endswith('.json')])
-                            new_files = total_json_files - skipped_count
-                            
-                            if progress_tracker:
-                                progress_tracker.increment_discovered(new_files)
-                            
-                            print(f"📊 Directory scan: {total_json_files} total, {skipped_count} already processed, {new_files} new")
-                        else:
-                            # Fallback: scan entire directory but prioritize .json files
-                            for root, dirs, files in os.walk(data_dir):
-                                # Skip non-bill directories if possible
-                                if 'bill' in root or root == data_dir:
-                                    json_files = [f for f in files if f.endswith('.json')]
-                                    for file in json_files:
-                                        file_path = os.path.join(root, file)
-                                        json_files_found.append(file_path)
-                                    if progress_tracker:
-                                        progress_tracker.increment_discovered(len(json_files))
-                
-                print(f"🔍 Found {len(json_files_found)} NEW unprocessed JSON files to process")
-                print(f"⏭️ Skipped {skipped_count} already processed bills")
-                
-                if progress_tracker:
-                    progress_tracker.total_items = min(len(json_files_found), 15)  # Process up to 15 bills per batch
-                    progress_tracker.update_stage("extracting", f"Processing {progress_tracker.total_items} bills")
-                
-                if json_files_found:
-                    # Process each JSON file (limit to match total_items)  
-                    max_files = min(15, len(json_files_found))
-                    for idx, file_path in enumerate(json_files_found[:max_files]):
-                        try:
-                            if progress_tracker:
-                                progress_tracker.update_stage("extracting", f"Processing {os.path.basename(file_path)} ({idx+1}/{max_files})")
-                                
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                json_data = json.load(f)
-                            
-                            # Extract bill information from JSON structure
-                            # Handle both direct format and nested 'bill' format
-                            bill_data = json_data.get('bill', json_data)
-                            
-                            bill_number = bill_data.get('bill_number') or bill_data.get('number') or os.path.basename(file_path).replace('.json', '')
-                            
-                            # Skip if this bill is already processed
-                            if bill_number in processed_bills:
-                                skipped_count += 1
-                                if skipped_count <= 5:  # Log first few skips
-                                    print(f"⏭️ Skipping already processed bill: {bill_number}")
-                                continue
-                            
-                            title = bill_data.get('title', f"Bill {bill_number}")
-                            description = bill_data.get('description', title)
-                            
-                            # Extract dates from history if available
-                            introduced_date = None
-                            last_action_date = None
-                            
-                            history = bill_data.get('history', [])
-                            if history:
-                                # First action is usually introduction
-                                introduced_date = history[0].get('date') if history else None
-                                # Last action is most recent
-                                last_action_date = history[-1].get('date') if history else None
-                            
-                            # Handle session information
-                            session = bill_data.get('session', {})
-                            session_name = session.get('session_name') or session.get('session_title', '2025-2026 89th Legislature')
-                            
-                            item = {
-                                'bill_id': bill_data.get('bill_id'),  # Add the missing bill_id
-                                'bill_number': bill_number,
-                                'title': title,
-                                'description': description,
-                                'state': bill_data.get('state', state or 'TX'),
-                                'hash': hash_value,
-                                'filename': os.path.basename(file_path),
-                                'source_file': file_path,
-                                'status': bill_data.get('status', 'Unknown'),
-                                'introduced_date': introduced_date,
-                                'last_action_date': last_action_date,
-                                'session_name': session_name,
-                                'url': bill_data.get('url', ''),
-                                'sponsors': bill_data.get('sponsors', []),
-                                'subjects': bill_data.get('subjects', [])
-                            }
-                            items.append(item)
-                            print(f"✅ Added JSON file item: {bill_number} from {os.path.basename(file_path)}")
-                            
-                        except Exception as e:
-                            print(f"⚠️ Error processing {file_path}: {str(e)}")
-                            if progress_tracker:
-                                progress_tracker.increment_processed(success=False, error=f"JSON parsing error: {str(e)}")
-                            continue
-                else:
-                    # Fallback: create a placeholder if no JSON files found
-                    item = {
-                        'hash': hash_value,
-                        'filename': f"collection_{hash_value[:8]}.json",
-                        'bill_number': f"COLLECTION-{hash_value[:8]}",
-                        'title': f"Document Collection (Hash: {hash_value[:8]})",
-                        'description': f"Hash-only file uploaded but no JSON files found in data directory."
-                    }
-                    items.append(item)
-                    print(f"✅ Added fallback placeholder: {item['bill_number']}")
+                # Hash-only format (MD5=32, SHA1=40, SHA256=64 chars): a LegiScan
+                # dataset hash.md5, so sync the state's changed datasets in bulk
+                return await process_dataset_hash(state or 'TX', with_ai, progress_tracker)
                     
             else:
                 print(f"⚠️ Skipping invalid line {i}: '{line_content}' (length: {len(line_content)})")
@@ -4,8 +4,11 @@ Implements rate limiting for API calls to prevent exceeding limits
 """
 
 import asyncio
+import os
+import threading
 import time
-from typing import Dict, Optional
+from collections import deque
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -89,6 +92,103 @@ class RateLimitedClient:
         }
 
 
+class TokenBucket:
+    """
+    Token bucket meant to be shared by every caller in the process
+
+    A caller reserves its token up front (the balance may go negative), so
+    waiters are served in arrival order: concurrent callers - e.g. several
+    states being fetched at once - interleave within one budget instead of
+    one caller's whole run going first. The state sits behind a threading
+    lock, so the same bucket works from any event loop and from blocking
+    code running in threads.
+
+    per_hour additionally caps reservations in any sliding hour; once it is
+    reached, callers are scheduled an hour after the per_hour-th most recent
+    one.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, per_hour: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.per_hour = per_hour
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        # Scheduled start times of reservations made in the last hour or later
+        self._window = deque()
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def _reserve(self, tokens: float) -> Tuple[float, Optional[float]]:
+        """Take tokens; returns (seconds the caller must wait, its hourly slot)"""
+        slot = None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+            if self.per_hour:
+                while self._window and self._window[0] <= now - 3600:
+                    self._window.popleft()
+                slot = now + wait
+                if self._window:
+                    slot = max(slot, self._window[-1])
+                if len(self._window) >= self.per_hour:
+                    slot = max(slot, self._window[-self.per_hour] + 3600)
+                self._window.append(slot)
+                wait = slot - now
+            self.acquired += 1
+            self.total_wait += wait
+            return wait, slot
+
+    def _refund(self, tokens: float, slot: Optional[float] = None):
+        with self._lock:
+            self._tokens += tokens
+            if slot is not None and slot in self._window:
+                self._window.remove(slot)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait for tokens without blocking the event loop; returns seconds waited"""
+        wait, slot = self._reserve(tokens)
+        if wait > 60:
+            logger.warning(f"⏳ Hourly request budget used up, waiting {wait:.0f}s")
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Cancelled callers give their slot back to the ones behind them
+                self._refund(tokens, slot)
+                raise
+        return wait
+
+    def acquire_blocking(self, tokens: float = 1.0) -> float:
+        """Blocking acquire for synchronous callers; returns seconds waited"""
+        wait, _ = self._reserve(tokens)
+        if wait > 60:
+            logger.warning(f"⏳ Hourly request budget used up, waiting {wait:.0f}s")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict:
+        """Current balance and totals"""
+        with self._lock:
+            now = time.monotonic()
+            available = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            return {
+                'rate_per_second': self.rate,
+                'capacity': self.capacity,
+                'per_hour': self.per_hour,
+                'reserved_last_hour': sum(1 for start in self._window if now - 3600 < start <= now),
+                'scheduled': sum(1 for start in self._window if start > now),
+                'available_tokens': round(available, 2),
+                'acquired': self.acquired,
+                'average_wait_seconds': round(self.total_wait / self.acquired, 3) if self.acquired else 0.0
+            }
+
+
 class LegiScanRateLimiter:
     """
     Specialized rate limiter for LegiScan API with known limits
@@ -165,4 +265,13 @@ class BatchProcessor:
 
 
 # Global rate limiter instance
-legiscan_rate_limiter = LegiScanRateLimiter()
\ No newline at end of file
+legiscan_rate_limiter = LegiScanRateLimiter()
+
+# Process-wide LegiScan request budget, shared by every LegiScan client.
+# Defaults stay inside the limits above (1 req/s, 1000/hour); raise them
+# through the env vars only if your subscription allows more.
+legiscan_token_bucket = TokenBucket(
+    rate=float(os.getenv('LEGISCAN_REQUESTS_PER_SECOND', '0.9')),
+    capacity=float(os.getenv('LEGISCAN_BURST', '1')),
+    per_hour=int(os.getenv('LEGISCAN_REQUESTS_PER_HOUR', '1000')) or None
+)
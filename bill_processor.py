@@ -10,7 +10,6 @@ import sys
 import argparse
 import asyncio
 import json
-import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -26,6 +25,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Shared AI request budget lives with the backend modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from ai_scheduler import AIUnavailableError, Priority, ai_scheduler
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -57,7 +60,7 @@ class ProcessingStats:
 class BillProcessor:
     """Processes legislative bills through Azure AI and saves to database"""
     
-    def __init__(self, batch_size: int = 5, max_workers: int = 2, retry_attempts: int = 3):
+    def __init__(self, batch_size: int = 5, max_workers: int = 8, retry_attempts: int = 3):
         # Configuration
         self.batch_size = batch_size
         self.max_workers = max_workers
@@ -85,10 +88,6 @@ class BillProcessor:
         # Statistics tracking
         self.stats = ProcessingStats()
         
-        # Rate limiting
-        self.last_api_call = 0
-        self.min_api_interval = 2.0  # 2 seconds between API calls
-        
         logger.info(f"🏛️ Legislative Bill Processor Initialized")
         logger.info(f"   Batch Size: {batch_size}")
         logger.info(f"   Max Workers: {max_workers}")
@@ -164,23 +163,9 @@ class BillProcessor:
             logger.error(f"❌ Error parsing {file_path}: {e}")
             return None
     
-    async def rate_limited_api_call(self, func, *args, **kwargs):
-        """Make API call with rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_api_call
-        
-        if time_since_last < self.min_api_interval:
-            sleep_time = self.min_api_interval - time_since_last
-            await asyncio.sleep(sleep_time)
-        
-        self.last_api_call = time.time()
-        return await func(*args, **kwargs)
-    
-    async def generate_ai_analysis(self, bill_data: Dict[str, Any]) -> Dict[str, str]:
-        """Generate AI analysis for a bill using Azure OpenAI"""
-        try:
-            # Prepare bill information for AI analysis
-            bill_text = f"""
+    def analysis_request(self, bill_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completion arguments for one bill (shared by live and batch mode)"""
+        bill_text = f"""
 Bill Number: {bill_data['bill_number']}
 Title: {bill_data['title']}
 Description: {bill_data['description']}
@@ -189,9 +174,9 @@ Subjects: {', '.join(bill_data['subjects'])}
 Chamber: {bill_data['chamber']}
 State: {bill_data['state']}
 Status: {bill_data['status']}
-            """.strip()
-            
-            prompt = f"""
+        """.strip()
+        
+        prompt = f"""
 Analyze this state legislation and provide a comprehensive but concise analysis:
 
 {bill_text}
@@ -204,40 +189,95 @@ Please provide:
 5. BUSINESS_IMPACT: How this might affect businesses or the economy (1-2 sentences)
 
 Format your response as clear paragraphs, not bullet points. Use professional, analytical language.
-            """
-            
-            response = await self.ai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are an expert legislative analyst providing clear, professional analysis of state legislation."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=800,
-                temperature=0.3,
-                timeout=45
+        """
+        
+        return {
+            'model': self.model_name,
+            'messages': [
+                {"role": "system", "content": "You are an expert legislative analyst providing clear, professional analysis of state legislation."},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': 800,
+            'temperature': 0.3
+        }
+    
+    def parse_analysis(self, bill_data: Dict[str, Any], ai_response: str) -> Dict[str, str]:
+        """Map the model's reply onto the analysis columns"""
+        ai_response = ai_response.strip()
+        # Parse the AI response (you might want to make this more sophisticated)
+        return {
+            'ai_summary': ai_response[:500] + "..." if len(ai_response) > 500 else ai_response,
+            'ai_key_provisions': f"Key provisions identified for {bill_data['bill_number']}",
+            'ai_stakeholder_impact': f"Stakeholder analysis for {bill_data['bill_number']}",
+            'ai_political_context': f"Political analysis for {bill_data['bill_number']}",
+            'ai_business_impact': f"Business impact analysis for {bill_data['bill_number']}"
+        }
+    
+    def fallback_analysis(self, bill_data: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            'ai_summary': f"Analysis pending for {bill_data['title']}",
+            'ai_key_provisions': 'Key provisions analysis pending',
+            'ai_stakeholder_impact': 'Stakeholder impact analysis pending',
+            'ai_political_context': 'Political analysis pending',
+            'ai_business_impact': 'Business impact analysis pending'
+        }
+    
+    async def generate_ai_analysis(self, bill_data: Dict[str, Any]) -> Dict[str, str]:
+        """Generate AI analysis for a bill using Azure OpenAI"""
+        try:
+            # Paced by the shared TPM/RPM budget; yields to interactive requests
+            response = await ai_scheduler.chat_completion(
+                self.ai_client,
+                priority=Priority.BACKFILL,
+                timeout=45,
+                **self.analysis_request(bill_data)
             )
+            return self.parse_analysis(bill_data, response.choices[0].message.content)
             
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Parse the AI response (you might want to make this more sophisticated)
-            return {
-                'ai_summary': ai_response[:500] + "..." if len(ai_response) > 500 else ai_response,
-                'ai_key_provisions': f"Key provisions identified for {bill_data['bill_number']}",
-                'ai_stakeholder_impact': f"Stakeholder analysis for {bill_data['bill_number']}",
-                'ai_political_context': f"Political analysis for {bill_data['bill_number']}",
-                'ai_business_impact': f"Business impact analysis for {bill_data['bill_number']}"
-            }
-            
+        except AIUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"❌ AI Analysis Error for {bill_data.get('bill_number', 'Unknown')}: {e}")
             # Return fallback analysis
-            return {
-                'ai_summary': f"Analysis pending for {bill_data['title']}",
-                'ai_key_provisions': 'Key provisions analysis pending',
-                'ai_stakeholder_impact': 'Stakeholder impact analysis pending',
-                'ai_political_context': 'Political analysis pending',
-                'ai_business_impact': 'Business impact analysis pending'
-            }
+            return self.fallback_analysis(bill_data)
+    
+    async def analyze_with_batch_api(self, bills_data: List[Dict[str, Any]], local: bool = False) -> List[Dict[str, Any]]:
+        """
+        Analyze every bill in one Azure OpenAI Batch API job instead of live calls.
+        
+        Batch jobs run at half the token price against their own quota and may
+        take up to 24 hours; bills missing from the output come back unsuccessful
+        so a --resume run picks them up again.
+        """
+        from ai_batch import batch_line, get_backend, response_content, submit_requests, wait_for_batch
+        
+        backend = get_backend(True if local else None)
+        by_id = {str(b['bill_id']): b for b in bills_data}
+        lines = [batch_line(bill_id, self.analysis_request(b)) for bill_id, b in by_id.items()]
+        batch_id = await submit_requests(backend, lines)
+        status = await wait_for_batch(backend, batch_id)
+        
+        outputs = {}
+        if status == 'completed':
+            for line in await backend.results(batch_id):
+                content, _ = response_content(line)
+                if content:
+                    outputs[line.get('custom_id')] = content
+        else:
+            logger.error(f"❌ Batch {batch_id} ended {status}")
+        
+        results = []
+        for bill_id, bill_data in by_id.items():
+            if bill_id in outputs:
+                results.append({
+                    **bill_data,
+                    **self.parse_analysis(bill_data, outputs[bill_id]),
+                    'processed_at': datetime.utcnow().isoformat(),
+                    'success': True
+                })
+            else:
+                results.append({**bill_data, 'error': f'No batch result ({status})', 'success': False})
+        return results
     
     async def process_single_bill(self, bill_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single bill through AI analysis"""
@@ -248,10 +288,8 @@ Format your response as clear paragraphs, not bullet points. Use professional, a
             try:
                 logger.debug(f"🤖 Processing {bill_number} (attempt {attempt + 1})")
                 
-                # Generate AI analysis with rate limiting
-                ai_analysis = await self.rate_limited_api_call(
-                    self.generate_ai_analysis, bill_data
-                )
+                # Generate AI analysis (rate limited by the shared scheduler)
+                ai_analysis = await self.generate_ai_analysis(bill_data)
                 
                 # Combine bill data with AI analysis
                 result = {**bill_data, **ai_analysis}
@@ -262,6 +300,10 @@ Format your response as clear paragraphs, not bullet points. Use professional, a
                 logger.debug(f"   ✅ {bill_number} processed successfully")
                 return result
                 
+            except AIUnavailableError as e:
+                # Circuit open: not checkpointed, so --resume picks the bill up later
+                logger.warning(f"   🔌 {bill_number} skipped: {e}")
+                return {**bill_data, 'error': str(e), 'success': False, 'attempts': attempt + 1}
             except Exception as e:
                 logger.warning(f"   ⚠️ {bill_number} attempt {attempt + 1} failed: {e}")
                 
@@ -405,7 +447,7 @@ Format your response as clear paragraphs, not bullet points. Use professional, a
             print(f"   Elapsed Time: {elapsed}")
         print("=" * 60)
     
-    async def process_bills(self, directory: str, resume: bool = False):
+    async def process_bills(self, directory: str, resume: bool = False, batch_api: bool = False, local_batch: bool = False):
         """Main method to process all bills in a directory"""
         try:
             logger.info(f"🚀 Starting bill processing: {directory}")
@@ -438,6 +480,19 @@ Format your response as clear paragraphs, not bullet points. Use professional, a
                     bills_data = [b for b in bills_data if str(b['bill_id']) not in processed_bills]
                     logger.info(f"📝 Resuming: {len(bills_data)} bills remaining")
             
+            if batch_api and bills_data:
+                logger.info(f"📦 Submitting {len(bills_data)} bills as one Batch API job")
+                for result in await self.analyze_with_batch_api(bills_data, local_batch):
+                    if result['success'] and self.save_bill_to_database(result):
+                        processed_bills.append(str(result['bill_id']))
+                        self.stats.successful += 1
+                    else:
+                        self.stats.failed += 1
+                    self.stats.processed += 1
+                self.save_checkpoint(processed_bills)
+                self.print_progress()
+                bills_data = []
+            
             # Process in batches
             for batch_num in range(0, len(bills_data), self.batch_size):
                 self.stats.current_batch = (batch_num // self.batch_size) + 1
@@ -509,8 +564,10 @@ async def main():
     parser = argparse.ArgumentParser(description='Legislative Bill Processing Pipeline')
     parser.add_argument('--directory', '-d', required=True, help='Directory containing bill files')
     parser.add_argument('--batch-size', type=int, default=5, help='Bills per batch (default: 5)')
-    parser.add_argument('--max-workers', type=int, default=2, help='Max concurrent workers (default: 2)')
+    parser.add_argument('--max-workers', type=int, default=8, help='Max concurrent workers; AI pacing comes from the shared scheduler (default: 8)')
     parser.add_argument('--resume', action='store_true', help='Resume from checkpoint')
+    parser.add_argument('--batch-api', action='store_true', help='Analyze all bills in one Azure OpenAI Batch API job (up to 24h, half price)')
+    parser.add_argument('--local-batch', action='store_true', help='With --batch-api, use the offline batch stand-in')
     
     args = parser.parse_args()
     
@@ -521,7 +578,7 @@ async def main():
     )
     
     # Run processing
-    result = await processor.process_bills(args.directory, args.resume)
+    result = await processor.process_bills(args.directory, args.resume, args.batch_api, args.local_batch)
     
     # Exit with appropriate code
     sys.exit(0 if result['success'] else 1)
@@ -13,6 +13,7 @@ sys.path.append('/app')
 
 from database_config import get_db_connection
 from ai import analyze_executive_order
+from legiscan_cache import legiscan_cache
 
 # Practice area keywords mapping
 PRACTICE_AREA_KEYWORDS = {
@@ -59,9 +60,9 @@ def fetch_legiscan_bills():
     
     print(f"🔍 Fetching bills from LegiScan session {session_id}...")
     
-    url = f'https://api.legiscan.com/?key={api_key}&op=getMasterList&id={session_id}'
-    response = requests.get(url)
-    data = response.json()
+    params = {'op': 'getMasterList', 'id': session_id}
+    data = legiscan_cache.cached_call(params, lambda: requests.get(
+        'https://api.legiscan.com/', params={'key': api_key, **params}).json())
     
     if 'masterlist' not in data:
         print("❌ No masterlist found in LegiScan response")